@@ -0,0 +1,6 @@
+-- 014_survey_responses_keyset_index.sql
+-- 回答一覧のキーセットページング（submitted_at DESC, id DESC）用の複合インデックス。
+-- 回答数の多いアンケートでも 1 ページ分の範囲走査で済むようにする。
+
+ALTER TABLE survey_responses
+    ADD INDEX idx_survey_responses_page (survey_id, submitted_at, id);
@@ -0,0 +1,24 @@
+-- 015_notification_outbox.sql
+-- 通知 Outbox: DM を送る前に 1 件ずつ記録し、送信結果（成功・再試行・断念）を残す。
+-- Bot の再起動や一斉通知のタイムアウトで送信が途中で止まっても、未送信分をワーカーが再送する。
+-- (participant_id, kind) で重複登録を防ぎ、同じ通知を二重に送らない。
+
+CREATE TABLE IF NOT EXISTS notification_outbox (
+    id              BIGINT       NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    participant_id  INT          NOT NULL,
+    kind            VARCHAR(32)  NOT NULL COMMENT '通知の種類（event_result = 選考結果）',
+    event_id        INT          NOT NULL,
+    user_id         BIGINT       NOT NULL COMMENT '送信先 Discord ユーザーID',
+    content         TEXT         NOT NULL,
+    status          VARCHAR(16)  NOT NULL DEFAULT 'pending' COMMENT 'pending / sending / sent / dead',
+    attempts        INT          NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME     NOT NULL DEFAULT NOW(),
+    locked_until    DATETIME     NULL COMMENT 'sending の有効期限。過ぎたら再取得できる',
+    last_error      VARCHAR(500) NULL,
+    created_at      DATETIME     NOT NULL DEFAULT NOW(),
+    sent_at         DATETIME     NULL,
+    UNIQUE KEY uq_outbox_participant_kind (participant_id, kind),
+    KEY idx_outbox_due (status, next_attempt_at),
+    KEY idx_outbox_event (event_id, status),
+    FOREIGN KEY (participant_id) REFERENCES event_participants(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
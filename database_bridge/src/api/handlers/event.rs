@@ -8,8 +8,18 @@ use serde::Deserialize;
 use serde_json::{json, Value};
 use sqlx::MySqlPool;
 
-use crate::db::event_repo;
-use super::internal_error;
+use crate::api::AppState;
+use crate::db::event_repo::{AssignmentItem, AssignmentOutcome, ParticipantUpdate};
+use crate::db::{event_repo, survey_repo};
+use super::{internal_error, map_bridge_error};
+
+/// 締切スケジューラー（Bot）へ締切・ステータスの変更を通知する。
+/// Why: Bot は締切を単調時計のタイマーで待つため、変更があった時だけ一覧を取り直させる。
+fn broadcast_deadline_changed(state: &AppState, event_id: i32) {
+    let _ = state
+        .tx
+        .send(json!({"type": "event.deadline_changed", "event_id": event_id}).to_string());
+}
 
 // ============================================================
 // イベント作成
@@ -46,9 +56,10 @@ pub struct CreateSessionRequest {
 
 /// POST /events
 pub async fn create_event(
-    State(pool): State<MySqlPool>,
+    State(state): State<AppState>,
     Json(payload): Json<CreateEventRequest>,
 ) -> (StatusCode, Json<Value>) {
+    let pool = &state.pool;
     let event_id = match event_repo::insert_event(
         &pool,
         payload.survey_id,
@@ -86,6 +97,9 @@ pub async fn create_event(
         }
     }
 
+    if payload.application_deadline.is_some() {
+        broadcast_deadline_changed(&state, event_id);
+    }
     (StatusCode::CREATED, Json(json!({"status": "ok", "event_id": event_id})))
 }
 
@@ -127,6 +141,63 @@ pub async fn get_event_by_survey(
     }
 }
 
+/// GET /events/:id/acl
+/// イベントに紐づくアンケートの権限情報（オーナー + スタッフ）を 1 回の呼び出しで返す。
+pub async fn get_event_acl(
+    State(pool): State<MySqlPool>,
+    Path(event_id): Path<i32>,
+) -> (StatusCode, Json<Value>) {
+    let survey_id = match event_repo::find_survey_id(&pool, event_id).await {
+        Ok(id) => id,
+        Err(e) => return map_bridge_error(e),
+    };
+    match survey_repo::find_acl(&pool, survey_id as i64).await {
+        Ok(mut acl) => {
+            acl["event_id"] = json!(event_id);
+            (StatusCode::OK, Json(acl))
+        }
+        Err(e) => map_bridge_error(e),
+    }
+}
+
+/// GET /events/:id/admin-bundle
+/// 管理画面・当日受付の描画に必要なもの（イベント・部・回答付き参加者・質問・ACL）を 1 回で返す。
+pub async fn get_event_admin_bundle(
+    State(pool): State<MySqlPool>,
+    Path(event_id): Path<i32>,
+) -> (StatusCode, Json<Value>) {
+    let event = match event_repo::find_event_by_id(&pool, event_id).await {
+        Ok(e) => e,
+        Err(e) => return map_bridge_error(e),
+    };
+    let sessions = match event_repo::find_sessions_by_event(&pool, event_id).await {
+        Ok(s) => s,
+        Err(e) => return internal_error(e),
+    };
+    let participants = match event_repo::find_participants_with_answers(&pool, event_id).await {
+        Ok(p) => p,
+        Err(e) => return internal_error(e),
+    };
+    let survey = match survey_repo::find_by_id(&pool, event.survey_id as i64).await {
+        Ok(s) => s,
+        Err(e) => return map_bridge_error(e),
+    };
+    let acl = match survey_repo::find_acl(&pool, event.survey_id as i64).await {
+        Ok(a) => a,
+        Err(e) => return map_bridge_error(e),
+    };
+    (
+        StatusCode::OK,
+        Json(json!({
+            "event": event,
+            "sessions": sessions,
+            "participants": participants,
+            "survey": survey,
+            "acl": acl,
+        })),
+    )
+}
+
 // ============================================================
 // イベント更新 (PUT /events/:id)
 // ============================================================
@@ -146,10 +217,11 @@ pub struct UpdateEventRequest {
 
 /// PUT /events/:id
 pub async fn update_event(
-    State(pool): State<MySqlPool>,
+    State(state): State<AppState>,
     Path(event_id): Path<i32>,
     Json(payload): Json<UpdateEventRequest>,
 ) -> (StatusCode, Json<Value>) {
+    let pool = &state.pool;
     if let Err(e) = event_repo::update_event(
         &pool,
         event_id,
@@ -189,6 +261,7 @@ pub async fn update_event(
         }
     }
 
+    broadcast_deadline_changed(&state, event_id);
     (StatusCode::OK, Json(json!({"status": "ok"})))
 }
 
@@ -203,12 +276,16 @@ pub struct UpdateStatusRequest {
 
 /// PATCH /events/:id/status
 pub async fn update_event_status(
-    State(pool): State<MySqlPool>,
+    State(state): State<AppState>,
     Path(event_id): Path<i32>,
     Json(payload): Json<UpdateStatusRequest>,
 ) -> (StatusCode, Json<Value>) {
-    match event_repo::update_event_status(&pool, event_id, &payload.status).await {
-        Ok(_) => (StatusCode::OK, Json(json!({"status": "ok"}))),
+    match event_repo::update_event_status(&state.pool, event_id, &payload.status).await {
+        Ok(_) => {
+            // 再オープン / クローズで締切待ちの対象が変わる
+            broadcast_deadline_changed(&state, event_id);
+            (StatusCode::OK, Json(json!({"status": "ok"})))
+        }
         Err(e) => internal_error(e),
     }
 }
@@ -307,20 +384,61 @@ pub async fn update_participant(
     }
 }
 
+#[derive(Deserialize)]
+pub struct BulkUpdateParticipantsRequest {
+    pub items: Vec<ParticipantUpdate>,
+    #[serde(default)]
+    pub all_or_nothing: bool,
+}
+
+/// PATCH /events/:id/participants
+/// 参加者の承認状況・部・個人メモを一括更新する（1 トランザクション、行ごとの結果付き）。
+pub async fn bulk_update_participants(
+    State(pool): State<MySqlPool>,
+    Path(event_id): Path<i32>,
+    Json(payload): Json<BulkUpdateParticipantsRequest>,
+) -> (StatusCode, Json<Value>) {
+    match event_repo::bulk_update_participants(&pool, event_id, &payload.items, payload.all_or_nothing).await {
+        Ok((updated, results)) => (
+            StatusCode::OK,
+            Json(json!({"status": "ok", "updated": updated, "results": results})),
+        ),
+        Err(e) => internal_error(e),
+    }
+}
+
 #[derive(Deserialize)]
 pub struct CheckinRequest {
     pub checked_in: bool,
+    /// 指定時は、このイベントの参加者でなければ 404
+    pub event_id: Option<i32>,
 }
 
 /// PATCH /events/participant/:participant_id/checkin
+///
+/// 変更後の状態を返し、同じイベントの当日受付画面（複数端末）へ WebSocket で
+/// `event.checkin` を配信する。
 pub async fn set_participant_checkin(
-    State(pool): State<MySqlPool>,
+    State(state): State<AppState>,
     Path(participant_id): Path<i32>,
     Json(payload): Json<CheckinRequest>,
 ) -> (StatusCode, Json<Value>) {
-    match event_repo::set_checkin(&pool, participant_id, payload.checked_in).await {
-        Ok(_) => (StatusCode::OK, Json(json!({"status": "ok"}))),
-        Err(e) => internal_error(e),
+    match event_repo::set_checkin(&state.pool, participant_id, payload.event_id, payload.checked_in).await {
+        Ok((event_id, checked_in_at)) => {
+            let body = json!({
+                "event_id": event_id,
+                "participant_id": participant_id,
+                "checked_in_at": checked_in_at,
+            });
+            let mut msg = body.clone();
+            msg["type"] = json!("event.checkin");
+            let _ = state.tx.send(msg.to_string());
+
+            let mut res = body;
+            res["status"] = json!("ok");
+            (StatusCode::OK, Json(res))
+        }
+        Err(e) => map_bridge_error(e),
     }
 }
 
@@ -351,6 +469,17 @@ pub async fn mark_participant_notified(
 // 締切済みイベント一覧（スケジューラー用）
 // ============================================================
 
+/// GET /events/upcoming-deadlines
+/// 締切待ちイベントの締切までの秒数（過ぎていれば 0 以下）。Bot の締切スケジューラーが使う。
+pub async fn list_upcoming_deadlines(
+    State(pool): State<MySqlPool>,
+) -> (StatusCode, Json<Value>) {
+    match event_repo::find_upcoming_deadlines(&pool).await {
+        Ok(list) => (StatusCode::OK, Json(json!(list))),
+        Err(e) => internal_error(e),
+    }
+}
+
 /// GET /events/pending-deadline
 pub async fn list_events_past_deadline(
     State(pool): State<MySqlPool>,
@@ -387,6 +516,41 @@ pub async fn auto_assign(
     }
 }
 
+#[derive(Deserialize)]
+pub struct ApplyAssignmentsRequest {
+    pub items: Vec<AssignmentItem>,
+}
+
+/// POST /events/:id/assignments
+/// Webapp / Bot が計算した割り当て計画を一括で確定する（全件適用 or 何もしない）。
+/// 計画後に状態が変わった参加者や定員超過があれば 200 + status=conflict を返す。
+pub async fn apply_assignments(
+    State(state): State<AppState>,
+    Path(event_id): Path<i32>,
+    Json(payload): Json<ApplyAssignmentsRequest>,
+) -> (StatusCode, Json<Value>) {
+    match event_repo::apply_assignments(&state.pool, event_id, &payload.items).await {
+        Ok(AssignmentOutcome::Applied(updated)) => {
+            match event_repo::find_participants_by_event(&state.pool, event_id).await {
+                Ok(participants) => (
+                    StatusCode::OK,
+                    Json(json!({"status": "ok", "updated": updated, "participants": participants})),
+                ),
+                Err(_) => (StatusCode::OK, Json(json!({"status": "ok", "updated": updated, "participants": []}))),
+            }
+        }
+        Ok(AssignmentOutcome::Stale(ids)) => (
+            StatusCode::OK,
+            Json(json!({"status": "conflict", "reason": "stale", "participant_ids": ids})),
+        ),
+        Ok(AssignmentOutcome::OverCapacity(sids)) => (
+            StatusCode::OK,
+            Json(json!({"status": "conflict", "reason": "capacity", "session_ids": sids})),
+        ),
+        Err(e) => map_bridge_error(e),
+    }
+}
+
 /// GET /events/:id/session-stats
 /// 部ごとの承認済み参加者数と残席数を返す。
 /// 部制なしの場合は session_id=null のキーで返す。
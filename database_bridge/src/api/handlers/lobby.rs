@@ -294,6 +294,44 @@ pub async fn update_member_status(
     }
 }
 
+// ---------------------------------------------------------
+// PATCH /lobby/members/status
+// Webapp の書き込みバッファがまとめた最新ステータスを一括で反映する。
+// ---------------------------------------------------------
+#[derive(Deserialize)]
+pub struct MemberStatusUpdate {
+    passcode: String,
+    user_id: i64,
+    status: String,
+}
+
+#[derive(Deserialize)]
+pub struct BulkMemberStatusRequest {
+    updates: Vec<MemberStatusUpdate>,
+    // 送信元（Webapp のプロセス）の目印。配信にそのまま載せ、送信元が自分の反映分を見分けるのに使う
+    #[serde(default)]
+    source: Option<String>,
+}
+
+pub async fn update_member_statuses(
+    State(state): State<AppState>,
+    Json(payload): Json<BulkMemberStatusRequest>,
+) -> (StatusCode, Json<Value>) {
+    let updates: Vec<(String, i64, String)> = payload.updates
+        .into_iter()
+        .map(|u| (u.passcode, u.user_id, u.status))
+        .collect();
+    match lobby_repo::update_member_statuses(&state.pool, &updates).await {
+        Ok(affected) => {
+            for (passcode, user_id, status) in &updates {
+                let _ = state.tx.send(json!({"type": "member_status_updated", "passcode": passcode, "user_id": user_id, "status": status, "source": payload.source}).to_string());
+            }
+            (StatusCode::OK, Json(json!({"status": "ok", "affected": affected})))
+        },
+        Err(e) => map_bridge_error(e),
+    }
+}
+
 // ---------------------------------------------------------
 // GET /lobby/rooms/{passcode}/matches
 // ---------------------------------------------------------
@@ -349,8 +387,8 @@ pub async fn report_winner(
     Json(payload): Json<ReportWinnerRequest>,
 ) -> (StatusCode, Json<Value>) {
     match lobby_repo::report_match_winner(&state.pool, match_id, payload.winner_id, payload.score1, payload.score2).await {
-        Ok(_) => {
-            let _ = state.tx.send(json!({"type": "match_winner_reported", "match_id": match_id, "winner_id": payload.winner_id}).to_string());
+        Ok(passcode) => {
+            let _ = state.tx.send(json!({"type": "match_winner_reported", "passcode": passcode, "match_id": match_id, "winner_id": payload.winner_id}).to_string());
             (StatusCode::OK, Json(json!({"status": "ok"})))
         },
         Err(e) => map_bridge_error(e),
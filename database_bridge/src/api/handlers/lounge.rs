@@ -209,6 +209,16 @@ pub async fn finish_session(
     (StatusCode::OK, Json(json!({"status":"ok","results":results})))
 }
 
+// ============================================================
+// GET /lounge/players
+// ============================================================
+pub async fn list_players(State(pool): State<MySqlPool>) -> (StatusCode, Json<Value>) {
+    match lounge_repo::list_players(&pool).await {
+        Ok(players) => (StatusCode::OK, Json(json!(players))),
+        Err(e) => map_err(e),
+    }
+}
+
 // ============================================================
 // GET /lounge/players/{user_id}
 // ============================================================
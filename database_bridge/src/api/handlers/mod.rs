@@ -4,6 +4,7 @@ pub mod ws;
 pub mod tournament;
 pub mod lounge;
 pub mod event;
+pub mod outbox;
 
 // api/handlers.rs (now as mod.rs inside handlers/)
 // Why: 各エンドポイントの実装をここに集約する。
@@ -172,6 +173,145 @@ pub async fn list_responses(
     }
 }
 
+/// 回答一覧ページの 1 ページあたりの上限。
+const RESPONSE_PAGE_MAX: i64 = 200;
+
+#[derive(Deserialize)]
+pub struct ResponsePageQuery {
+    limit: Option<i64>,
+    /// 前ページ末尾の submitted_at（before_id とセットで指定）
+    before_at: Option<String>,
+    before_id: Option<i64>,
+    /// {"<質問index>": "値", ...} の JSON 文字列
+    filters: Option<String>,
+}
+
+/// GET /surveys/:id/responses/page?limit=&before_at=&before_id=&filters=
+/// submitted_at DESC, id DESC のキーセットページング。
+/// 先頭ページ（カーソルなし）のみ total（フィルタ適用後の総件数）を返す。
+pub async fn list_responses_page(
+    State(pool): State<MySqlPool>,
+    Path(id): Path<i64>,
+    Query(query): Query<ResponsePageQuery>,
+) -> (StatusCode, Json<Value>) {
+    let limit = query.limit.unwrap_or(50).clamp(1, RESPONSE_PAGE_MAX);
+
+    let mut filters: Vec<(String, String)> = Vec::new();
+    if let Some(raw) = query.filters.as_deref().filter(|s| !s.is_empty()) {
+        let parsed: std::collections::HashMap<String, String> = match serde_json::from_str(raw) {
+            Ok(m) => m,
+            Err(e) => return map_bridge_error(BridgeError::Json(e)),
+        };
+        for (q_idx, value) in parsed {
+            if !response_repo::is_valid_question_index(&q_idx) {
+                return (
+                    StatusCode::BAD_REQUEST,
+                    Json(json!({"status": "error", "message": format!("invalid question index: {q_idx}")})),
+                );
+            }
+            filters.push((q_idx, value));
+        }
+        filters.sort();
+    }
+
+    let before = match (query.before_at.as_deref(), query.before_id) {
+        (Some(at), Some(before_id)) => Some((at, before_id)),
+        _ => None,
+    };
+
+    // 次ページの有無を判定するため 1 件多く取得する
+    let mut items = match response_repo::find_page_by_survey(&pool, id, before, &filters, limit + 1).await {
+        Ok(items) => items,
+        Err(e) => return map_bridge_error(e),
+    };
+    let has_more = items.len() as i64 > limit;
+    items.truncate(limit as usize);
+
+    let next_cursor = if has_more {
+        items.last().map(|r| json!({"submitted_at": r.submitted_at, "id": r.id}))
+    } else {
+        None
+    };
+
+    let total = if before.is_none() {
+        match response_repo::count_by_survey(&pool, id, &filters).await {
+            Ok(n) => Some(n),
+            Err(e) => return map_bridge_error(e),
+        }
+    } else {
+        None
+    };
+
+    (
+        StatusCode::OK,
+        Json(json!({"items": items, "next_cursor": next_cursor, "total": total})),
+    )
+}
+
+/// 結果画面の自由記述プレビュー件数の上限
+const SUMMARY_TEXT_LIMIT_MAX: usize = 100;
+
+#[derive(Deserialize)]
+pub struct ResponseSummaryQuery {
+    /// 選択式の質問 index（カンマ区切り）
+    choice: Option<String>,
+    /// 自由記述の質問 index（カンマ区切り）
+    text: Option<String>,
+    /// 複数回答の質問 index（カンマ区切り。旧形式の "0[]" キーも参照する）
+    multi: Option<String>,
+    text_limit: Option<usize>,
+}
+
+fn split_question_indexes(raw: Option<&str>) -> Result<Vec<String>, String> {
+    let mut keys = Vec::new();
+    for key in raw.unwrap_or("").split(',').map(str::trim).filter(|s| !s.is_empty()) {
+        if !response_repo::is_valid_question_index(key) {
+            return Err(key.to_string());
+        }
+        keys.push(key.to_string());
+    }
+    Ok(keys)
+}
+
+/// GET /surveys/:id/responses/summary?choice=&text=&multi=&text_limit=
+/// 結果画面の質問ごとの集計（選択肢ごとの件数・新しい順の自由記述）を 1 往復で返す。
+pub async fn summarize_responses(
+    State(pool): State<MySqlPool>,
+    Path(id): Path<i64>,
+    Query(query): Query<ResponseSummaryQuery>,
+) -> (StatusCode, Json<Value>) {
+    let parsed = (
+        split_question_indexes(query.choice.as_deref()),
+        split_question_indexes(query.text.as_deref()),
+        split_question_indexes(query.multi.as_deref()),
+    );
+    let (choice, text, multi) = match parsed {
+        (Ok(c), Ok(t), Ok(m)) => (c, t, m),
+        (Err(key), _, _) | (_, Err(key), _) | (_, _, Err(key)) => {
+            return (
+                StatusCode::BAD_REQUEST,
+                Json(json!({"status": "error", "message": format!("invalid question index: {key}")})),
+            );
+        }
+    };
+    let questions: Vec<response_repo::SummaryQuestion> = choice
+        .iter()
+        .map(|k| (k, true))
+        .chain(text.iter().map(|k| (k, false)))
+        .map(|(key, is_choice)| response_repo::SummaryQuestion {
+            key: key.clone(),
+            choice: is_choice,
+            multi: multi.contains(key),
+        })
+        .collect();
+    let text_limit = query.text_limit.unwrap_or(20).min(SUMMARY_TEXT_LIMIT_MAX);
+
+    match response_repo::summarize_by_survey(&pool, id, &questions, text_limit).await {
+        Ok(summary) => (StatusCode::OK, Json(summary)),
+        Err(e) => map_bridge_error(e),
+    }
+}
+
 /// GET /surveys/:id/responses/:user_id
 pub async fn get_user_answers(
     State(pool): State<MySqlPool>,
@@ -268,6 +408,18 @@ pub async fn remove_collaborator(
     }
 }
 
+/// GET /surveys/:id/acl
+/// 権限判定用にオーナー ID とスタッフ ID 一覧をまとめて返す。
+pub async fn get_survey_acl(
+    State(pool): State<MySqlPool>,
+    Path(id): Path<i64>,
+) -> (StatusCode, Json<Value>) {
+    match survey_repo::find_acl(&pool, id).await {
+        Ok(acl) => (StatusCode::OK, Json(acl)),
+        Err(e) => map_bridge_error(e),
+    }
+}
+
 #[derive(Deserialize)]
 pub struct SharedSurveysQuery {
     user_id: i64,
@@ -301,6 +453,15 @@ pub async fn search_users(
     }
 }
 
+/// GET /users
+/// ユーザー名登録済みの全ユーザー（webapp のユーザーディレクトリ初期ロード用）。
+pub async fn list_users(State(pool): State<MySqlPool>) -> (StatusCode, Json<Value>) {
+    match survey_repo::list_usernames(&pool).await {
+        Ok(list) => (StatusCode::OK, Json(json!(list))),
+        Err(e) => map_bridge_error(e),
+    }
+}
+
 /// DELETE /surveys/:id/responses/by-user/:user_id
 /// 本人の回答を削除し、紐づくイベント参加者も削除する。
 pub async fn delete_user_response(
@@ -0,0 +1,151 @@
+// api/handlers/outbox.rs
+// 通知 Outbox（notification_outbox）の HTTP ハンドラー。
+
+use axum::extract::{Path, Query, State};
+use axum::http::StatusCode;
+use axum::Json;
+use serde::Deserialize;
+use serde_json::{json, Value};
+use sqlx::MySqlPool;
+
+use crate::db::outbox_repo::{self, OutboxItem};
+use super::internal_error;
+
+/// 1 回の claim で取り出せる件数の上限
+const MAX_CLAIM: u32 = 200;
+
+#[derive(Deserialize)]
+pub struct EnqueueRequest {
+    pub items: Vec<OutboxItem>,
+}
+
+#[derive(Deserialize)]
+pub struct ClaimRequest {
+    pub limit: Option<u32>,
+    pub lease_seconds: Option<u32>,
+    pub event_id: Option<i32>,
+}
+
+#[derive(Deserialize)]
+pub struct FailedRequest {
+    pub error: Option<String>,
+    pub retry_in_seconds: Option<u32>,
+    pub give_up: Option<bool>,
+}
+
+#[derive(Deserialize)]
+pub struct RequeueRequest {
+    pub user_id: i64,
+    pub content: String,
+}
+
+#[derive(Deserialize)]
+pub struct StuckQuery {
+    pub event_id: Option<i32>,
+}
+
+/// POST /outbox
+/// 通知を積む。(participant_id, kind) が既にあるものは、送信済みでなければ本文を積み直す。
+pub async fn enqueue(
+    State(pool): State<MySqlPool>,
+    Json(payload): Json<EnqueueRequest>,
+) -> (StatusCode, Json<Value>) {
+    match outbox_repo::enqueue(&pool, &payload.items).await {
+        Ok(n) => (StatusCode::OK, Json(json!({"status": "ok", "enqueued": n}))),
+        Err(e) => internal_error(e),
+    }
+}
+
+/// POST /outbox/claim
+/// 送信可能な通知をリース付きで取り出す。
+pub async fn claim(
+    State(pool): State<MySqlPool>,
+    Json(payload): Json<ClaimRequest>,
+) -> (StatusCode, Json<Value>) {
+    let limit = payload.limit.unwrap_or(50).clamp(1, MAX_CLAIM);
+    let lease = payload.lease_seconds.unwrap_or(120).max(10);
+    match outbox_repo::claim(&pool, limit, lease, payload.event_id).await {
+        Ok(items) => (StatusCode::OK, Json(json!(items))),
+        Err(e) => internal_error(e),
+    }
+}
+
+/// POST /outbox/{id}/sent
+/// 送信成功。参加者の notified_at も同時に立てる。
+pub async fn mark_sent(
+    State(pool): State<MySqlPool>,
+    Path(outbox_id): Path<i64>,
+) -> (StatusCode, Json<Value>) {
+    match outbox_repo::mark_sent(&pool, outbox_id).await {
+        Ok(_) => (StatusCode::OK, Json(json!({"status": "ok"}))),
+        Err(e) => internal_error(e),
+    }
+}
+
+/// POST /outbox/{id}/failed
+pub async fn mark_failed(
+    State(pool): State<MySqlPool>,
+    Path(outbox_id): Path<i64>,
+    Json(payload): Json<FailedRequest>,
+) -> (StatusCode, Json<Value>) {
+    match outbox_repo::mark_failed(
+        &pool,
+        outbox_id,
+        payload.error.as_deref().unwrap_or(""),
+        payload.retry_in_seconds.unwrap_or(60),
+        payload.give_up.unwrap_or(false),
+    )
+    .await
+    {
+        Ok(_) => (StatusCode::OK, Json(json!({"status": "ok"}))),
+        Err(e) => internal_error(e),
+    }
+}
+
+/// POST /outbox/{id}/requeue
+/// 断念・再試行待ちの通知を、描画し直した本文ですぐに再送対象に戻す。
+pub async fn requeue(
+    State(pool): State<MySqlPool>,
+    Path(outbox_id): Path<i64>,
+    Json(payload): Json<RequeueRequest>,
+) -> (StatusCode, Json<Value>) {
+    match outbox_repo::requeue(&pool, outbox_id, payload.user_id, &payload.content).await {
+        Ok(true) => (StatusCode::OK, Json(json!({"status": "ok"}))),
+        Ok(false) => (
+            StatusCode::NOT_FOUND,
+            Json(json!({"status": "error", "message": format!("outbox={outbox_id} is not requeueable")})),
+        ),
+        Err(e) => internal_error(e),
+    }
+}
+
+/// GET /outbox/stuck?event_id=
+/// 滞留している通知の一覧（管理画面用）。
+pub async fn list_stuck(
+    State(pool): State<MySqlPool>,
+    Query(q): Query<StuckQuery>,
+) -> (StatusCode, Json<Value>) {
+    match outbox_repo::find_stuck(&pool, q.event_id).await {
+        Ok(items) => (StatusCode::OK, Json(json!(items))),
+        Err(e) => internal_error(e),
+    }
+}
+
+/// GET /outbox/{id}/event
+/// 通知が属するイベント ID と参加者 ID（管理 API の権限確認と再送時の描画用）。
+pub async fn get_outbox_event(
+    State(pool): State<MySqlPool>,
+    Path(outbox_id): Path<i64>,
+) -> (StatusCode, Json<Value>) {
+    match outbox_repo::find_owner(&pool, outbox_id).await {
+        Ok(Some((event_id, participant_id))) => (
+            StatusCode::OK,
+            Json(json!({"event_id": event_id, "participant_id": participant_id})),
+        ),
+        Ok(None) => (
+            StatusCode::NOT_FOUND,
+            Json(json!({"status": "error", "message": format!("outbox={outbox_id}")})),
+        ),
+        Err(e) => internal_error(e),
+    }
+}
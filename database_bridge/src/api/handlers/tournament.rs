@@ -1,6 +1,6 @@
 // api/handlers/tournament.rs
 // Why: 汎用大会・称号システムのHTTPハンドラ。
-use axum::extract::{Path, State};
+use axum::extract::{Path, Query, State};
 use axum::http::StatusCode;
 use axum::Json;
 use serde::Deserialize;
@@ -45,6 +45,30 @@ pub async fn get_standings(
     }
 }
 
+// ============================================================
+// GET /tournament/rooms/{passcode}/export?after=&limit=
+// 大会結果エクスポート用の試合 + スコア（match_id 順のキーセットページング）
+// ============================================================
+const EXPORT_PAGE_MAX: i64 = 1000;
+
+#[derive(Deserialize)]
+pub struct ExportPageQuery {
+    after: Option<i32>,
+    limit: Option<i64>,
+}
+
+pub async fn export_matches_page(
+    State(pool): State<MySqlPool>,
+    Path(passcode): Path<String>,
+    Query(query): Query<ExportPageQuery>,
+) -> (StatusCode, Json<Value>) {
+    let limit = query.limit.unwrap_or(500).clamp(1, EXPORT_PAGE_MAX);
+    match tournament_repo::export_room_matches_page(&pool, &passcode, query.after.unwrap_or(0), limit).await {
+        Ok((matches, next_after)) => (StatusCode::OK, Json(json!({"matches": matches, "next_after": next_after}))),
+        Err(e) => map_err(e),
+    }
+}
+
 // ============================================================
 // POST /tournament/matches/{match_id}/scores/report
 // ============================================================
@@ -184,6 +208,8 @@ pub async fn update_discord_role(
 // ============================================================
 #[derive(Deserialize)]
 pub struct GrantRankRequest {
+    // Python 側は {"mmr": ...} で送る
+    #[serde(alias = "mmr")]
     pub placement: i32,
 }
 
@@ -211,6 +237,42 @@ pub async fn grant_tournament_title(
     }
 }
 
+// ============================================================
+// 称号: POST /titles/grant-batch  (ラウンジ終了時の一括付与)
+// ============================================================
+#[derive(Deserialize)]
+pub struct GrantBatchPlayer {
+    pub user_id: i64,
+    pub mmr: i32,
+    #[serde(default)]
+    pub session_winner: bool,
+}
+
+#[derive(Deserialize)]
+pub struct GrantBatchRequest {
+    pub players: Vec<GrantBatchPlayer>,
+}
+
+pub async fn grant_titles_batch(
+    State(pool): State<MySqlPool>,
+    Json(payload): Json<GrantBatchRequest>,
+) -> (StatusCode, Json<Value>) {
+    let players: Vec<(i64, i32, bool)> = payload.players.iter()
+        .map(|p| (p.user_id, p.mmr, p.session_winner))
+        .collect();
+    match tournament_repo::grant_titles_batch(&pool, &players).await {
+        Ok(rows) => (StatusCode::OK, Json(json!({
+            "status": "ok",
+            "results": rows.iter().map(|(u, granted, activated)| json!({
+                "user_id": u.to_string(),
+                "newly_granted": granted,
+                "activated": activated,
+            })).collect::<Vec<_>>(),
+        }))),
+        Err(e) => map_err(e),
+    }
+}
+
 // ============================================================
 // 称号: GET /titles/player/{user_id}  (図鑑)
 // ============================================================
@@ -224,6 +286,19 @@ pub async fn get_player_titles(
     }
 }
 
+// ============================================================
+// 称号: GET /titles/holdings
+// ============================================================
+pub async fn list_title_holdings(State(pool): State<MySqlPool>) -> (StatusCode, Json<Value>) {
+    match tournament_repo::list_title_holdings(&pool).await {
+        Ok((earned, active)) => (StatusCode::OK, Json(json!({
+            "earned": earned.iter().map(|(u, t)| json!({"user_id": u.to_string(), "title_id": t})).collect::<Vec<_>>(),
+            "active": active.iter().map(|(u, t)| json!({"user_id": u.to_string(), "title_id": t})).collect::<Vec<_>>(),
+        }))),
+        Err(e) => map_err(e),
+    }
+}
+
 // ============================================================
 // 称号: POST /titles/player/{user_id}/grant
 // ============================================================
@@ -36,6 +36,8 @@ pub fn create_router(pool: MySqlPool) -> Router {
         .nest("/lounge", lounge_routes())
         .nest("/titles", title_routes())
         .nest("/events", event_routes())
+        .nest("/outbox", outbox_routes())
+        .route("/users", get(handlers::list_users))
         .route("/users/search", get(handlers::search_users))
         .route("/ws/hyouibana", get(handlers::ws::ws_handler))
         .route("/logs", get(handlers::list_recent_logs).post(handlers::log_operation))
@@ -52,6 +54,7 @@ fn lobby_routes() -> Router<AppState> {
         .route("/rooms/{passcode}", get(crate::api::handlers::lobby::get_room).patch(crate::api::handlers::lobby::update_room).delete(crate::api::handlers::lobby::delete_room))
         .route("/rooms/{passcode}/start", post(crate::api::handlers::lobby::start_tournament))
         .route("/rooms/{passcode}/members/{user_id}/status", patch(crate::api::handlers::lobby::update_member_status))
+        .route("/members/status", patch(crate::api::handlers::lobby::update_member_statuses))
         .route("/rooms/{passcode}/matches", get(crate::api::handlers::lobby::list_matches).post(crate::api::handlers::lobby::create_match))
         .route("/matches/{match_id}/winner", post(crate::api::handlers::lobby::report_winner))
         .route("/join", post(crate::api::handlers::lobby::join_lobby))
@@ -70,6 +73,7 @@ fn tournament_routes() -> Router<AppState> {
     Router::new()
         .route("/games", get(handlers::tournament::list_game_titles))
         .route("/rooms/{passcode}/standings", get(handlers::tournament::get_standings))
+        .route("/rooms/{passcode}/export", get(handlers::tournament::export_matches_page))
         .route("/matches/{match_id}/scores/report", post(handlers::tournament::report_score))
         .route("/matches/{match_id}/scores", get(handlers::tournament::list_scores))
         .route("/matches/{match_id}/approve", patch(handlers::tournament::approve_match))
@@ -79,6 +83,8 @@ fn tournament_routes() -> Router<AppState> {
 fn title_routes() -> Router<AppState> {
     Router::new()
         .route("/", get(handlers::tournament::list_titles).post(handlers::tournament::upsert_title))
+        .route("/holdings", get(handlers::tournament::list_title_holdings))
+        .route("/grant-batch", post(handlers::tournament::grant_titles_batch))
         .route("/{title_id}", delete(handlers::tournament::delete_title))
         .route("/{title_id}/discord_role", patch(handlers::tournament::update_discord_role))
         .route("/player/{user_id}", get(handlers::tournament::get_player_titles))
@@ -100,6 +106,7 @@ fn lounge_routes() -> Router<AppState> {
         .route("/sessions/{id}/final-scores/report", post(handlers::lounge::report_final_score))
         .route("/sessions/{id}/standings", get(handlers::lounge::get_standings))
         .route("/sessions/{id}/teams", post(handlers::lounge::create_team).get(handlers::lounge::list_teams))
+        .route("/players", get(handlers::lounge::list_players))
         .route("/players/{user_id}", get(handlers::lounge::get_player))
 }
 
@@ -108,19 +115,40 @@ fn event_routes() -> Router<AppState> {
     Router::new()
         .route("/", post(handlers::event::create_event))
         .route("/{id}", get(handlers::event::get_event).put(handlers::event::update_event))
+        .route("/{id}/acl", get(handlers::event::get_event_acl))
+        .route("/{id}/admin-bundle", get(handlers::event::get_event_admin_bundle))
         .route("/{id}/status", patch(handlers::event::update_event_status))
-        .route("/{id}/participants", post(handlers::event::upsert_participant).get(handlers::event::list_participants))
+        .route(
+            "/{id}/participants",
+            post(handlers::event::upsert_participant)
+                .get(handlers::event::list_participants)
+                .patch(handlers::event::bulk_update_participants),
+        )
         .route("/{id}/participants/by-user/{user_id}", get(handlers::event::get_participant_by_user))
         .route("/{id}/auto-assign", post(handlers::event::auto_assign))
+        .route("/{id}/assignments", post(handlers::event::apply_assignments))
         .route("/{id}/session-stats", get(handlers::event::get_session_stats))
         .route("/by-survey/{survey_id}", get(handlers::event::get_event_by_survey))
         .route("/pending-deadline", get(handlers::event::list_events_past_deadline))
+        .route("/upcoming-deadlines", get(handlers::event::list_upcoming_deadlines))
         .route("/participant/{participant_id}", patch(handlers::event::update_participant).delete(handlers::event::delete_participant))
         .route("/participant/{participant_id}/notified", patch(handlers::event::mark_participant_notified))
         .route("/participant/{participant_id}/checkin", patch(handlers::event::set_participant_checkin))
         .route("/participant/by-token/{token}", get(handlers::event::get_participant_by_token))
 }
 
+/// 通知 Outbox 関連のルーティング。
+fn outbox_routes() -> Router<AppState> {
+    Router::new()
+        .route("/", post(handlers::outbox::enqueue))
+        .route("/claim", post(handlers::outbox::claim))
+        .route("/stuck", get(handlers::outbox::list_stuck))
+        .route("/{id}/event", get(handlers::outbox::get_outbox_event))
+        .route("/{id}/sent", post(handlers::outbox::mark_sent))
+        .route("/{id}/failed", post(handlers::outbox::mark_failed))
+        .route("/{id}/requeue", post(handlers::outbox::requeue))
+}
+
 /// アンケート関連のルーティング。
 fn survey_routes() -> Router<AppState> {
     Router::new()
@@ -128,7 +156,10 @@ fn survey_routes() -> Router<AppState> {
         .route("/shared", get(handlers::list_shared_surveys))
         .route("/{id}", get(handlers::get_survey).patch(handlers::update_survey).delete(handlers::delete_survey))
         .route("/{id}/toggle", post(handlers::toggle_survey_status))
+        .route("/{id}/acl", get(handlers::get_survey_acl))
         .route("/{id}/responses", get(handlers::list_responses))
+        .route("/{id}/responses/page", get(handlers::list_responses_page))
+        .route("/{id}/responses/summary", get(handlers::summarize_responses))
         .route("/{id}/responses/{user_id}", get(handlers::get_user_answers))
         .route("/responses/upsert", post(handlers::upsert_response))
         .route("/responses/{id}/dm_sent", patch(handlers::mark_dm_sent))
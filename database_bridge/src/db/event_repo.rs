@@ -1,7 +1,10 @@
 // db/event_repo.rs
 // イベント参加フォーム機能の DB 操作を集約する。
 
-use serde_json;
+use std::collections::{HashMap, HashSet};
+
+use serde::{Deserialize, Deserializer};
+use serde_json::{self, json, Value};
 use sqlx::{mysql::MySqlPool, Row};
 use tracing::error;
 
@@ -72,6 +75,16 @@ pub async fn find_event_by_survey(pool: &MySqlPool, survey_id: i32) -> BridgeRes
     )
 }
 
+/// イベントに紐づく survey_id のみを返す（権限判定用の軽量クエリ）。
+pub async fn find_survey_id(pool: &MySqlPool, event_id: i32) -> BridgeResult<i32> {
+    let row = sqlx::query("SELECT survey_id FROM events WHERE id = ?")
+        .bind(event_id)
+        .fetch_optional(pool)
+        .await?
+        .ok_or_else(|| BridgeError::NotFound(format!("event_id={event_id}")))?;
+    Ok(row.try_get("survey_id").map_err(BridgeError::Sqlx)?)
+}
+
 pub async fn update_event(
     pool: &MySqlPool,
     event_id: i32,
@@ -120,6 +133,32 @@ pub async fn find_events_past_deadline(pool: &MySqlPool) -> BridgeResult<Vec<Eve
     .await?)
 }
 
+/// 締切が設定された draft/open イベントの「締切までの秒数」を返す（スケジューラー用）。
+/// Why: 締切は DB のローカル時刻の DATETIME のため、秒数への換算を DB の NOW() 基準で行い、
+///      呼び出し側はタイムゾーンを意識せず自分の単調時計に載せ替えられるようにする。
+///      締切を過ぎているものは 0 以下になる。
+pub async fn find_upcoming_deadlines(pool: &MySqlPool) -> BridgeResult<Vec<Value>> {
+    let rows = sqlx::query(
+        "SELECT id, CAST(application_deadline AS CHAR) AS application_deadline, \
+         TIMESTAMPDIFF(SECOND, NOW(), application_deadline) AS seconds_until \
+         FROM events \
+         WHERE status IN ('draft','open') AND application_deadline IS NOT NULL \
+         ORDER BY application_deadline",
+    )
+    .fetch_all(pool)
+    .await?;
+
+    Ok(rows
+        .iter()
+        .map(|row| {
+            let id: i32 = row.try_get("id").unwrap_or(0);
+            let deadline: Option<String> = row.try_get("application_deadline").ok();
+            let seconds_until: i64 = row.try_get("seconds_until").unwrap_or(0);
+            json!({"id": id, "application_deadline": deadline, "seconds_until": seconds_until})
+        })
+        .collect())
+}
+
 // ============================================================
 // event_sessions
 // ============================================================
@@ -262,6 +301,49 @@ pub async fn find_participants_by_event(
     .await?)
 }
 
+/// 参加者一覧に紐づくアンケート回答（回答者名・回答 JSON）を JOIN して返す（管理画面用）。
+/// Why: 管理画面・当日受付が参加者一覧と全回答一覧を別々に取得して突き合わせていたため、
+///      1 クエリで参加者ごとの回答を揃えて返す。
+pub async fn find_participants_with_answers(
+    pool: &MySqlPool,
+    event_id: i32,
+) -> BridgeResult<Vec<Value>> {
+    let rows = sqlx::query(
+        "SELECT p.id, p.event_id, p.user_id, p.response_id, p.session_id, \
+         p.preferred_session_ids, p.approval, p.personal_note, p.access_token, \
+         CAST(p.notified_at AS CHAR) AS notified_at, \
+         CAST(p.checked_in_at AS CHAR) AS checked_in_at, \
+         r.user_name AS username, CAST(r.answers AS CHAR) AS answers \
+         FROM event_participants p \
+         LEFT JOIN survey_responses r ON r.id = p.response_id \
+         WHERE p.event_id = ? ORDER BY p.id",
+    )
+    .bind(event_id)
+    .fetch_all(pool)
+    .await?;
+
+    Ok(rows
+        .iter()
+        .map(|row| {
+            json!({
+                "id": row.try_get::<i32, _>("id").unwrap_or(0),
+                "event_id": row.try_get::<i32, _>("event_id").unwrap_or(0),
+                "user_id": row.try_get::<i64, _>("user_id").unwrap_or(0),
+                "response_id": row.try_get::<Option<i32>, _>("response_id").unwrap_or(None),
+                "session_id": row.try_get::<Option<i32>, _>("session_id").unwrap_or(None),
+                "preferred_session_ids": row.try_get::<Option<String>, _>("preferred_session_ids").unwrap_or(None),
+                "approval": row.try_get::<String, _>("approval").unwrap_or_default(),
+                "personal_note": row.try_get::<Option<String>, _>("personal_note").unwrap_or(None),
+                "access_token": row.try_get::<Option<String>, _>("access_token").unwrap_or(None),
+                "notified_at": row.try_get::<Option<String>, _>("notified_at").unwrap_or(None),
+                "checked_in_at": row.try_get::<Option<String>, _>("checked_in_at").unwrap_or(None),
+                "username": row.try_get::<Option<String>, _>("username").unwrap_or(None),
+                "answers": row.try_get::<Option<String>, _>("answers").unwrap_or(None),
+            })
+        })
+        .collect())
+}
+
 pub async fn find_participant_by_token(
     pool: &MySqlPool,
     token: &str,
@@ -311,17 +393,45 @@ pub async fn mark_notified(pool: &MySqlPool, participant_id: i32) -> BridgeResul
 }
 
 /// 当日チェックイン状態を設定する（true=来場時刻を記録 / false=取消）。
-pub async fn set_checkin(pool: &MySqlPool, participant_id: i32, checked_in: bool) -> BridgeResult<()> {
+///
+/// `event_id` を指定した場合は、そのイベントの参加者でなければ NotFound にする
+/// （当日受付画面は自イベントの参加者しか操作できない）。
+/// 戻り値は (イベント ID, 記録後の checked_in_at)。受付画面への配信に使う。
+pub async fn set_checkin(
+    pool: &MySqlPool,
+    participant_id: i32,
+    event_id: Option<i32>,
+    checked_in: bool,
+) -> BridgeResult<(i32, Option<String>)> {
+    // 受付済みの参加者を再度受付しても来場時刻は最初の記録のまま残す
     let sql = if checked_in {
-        "UPDATE event_participants SET checked_in_at = NOW() WHERE id = ?"
+        "UPDATE event_participants SET checked_in_at = COALESCE(checked_in_at, NOW()) \
+         WHERE id = ? AND (? IS NULL OR event_id = ?)"
     } else {
-        "UPDATE event_participants SET checked_in_at = NULL WHERE id = ?"
+        "UPDATE event_participants SET checked_in_at = NULL \
+         WHERE id = ? AND (? IS NULL OR event_id = ?)"
     };
     sqlx::query(sql)
         .bind(participant_id)
+        .bind(event_id)
+        .bind(event_id)
         .execute(pool)
         .await?;
-    Ok(())
+
+    let row = sqlx::query(
+        "SELECT event_id, CAST(checked_in_at AS CHAR) as checked_in_at \
+         FROM event_participants WHERE id = ? AND (? IS NULL OR event_id = ?)",
+    )
+    .bind(participant_id)
+    .bind(event_id)
+    .bind(event_id)
+    .fetch_optional(pool)
+    .await?
+    .ok_or_else(|| BridgeError::NotFound(format!("participant_id={participant_id}")))?;
+    Ok((
+        row.try_get("event_id").map_err(BridgeError::Sqlx)?,
+        row.try_get("checked_in_at").map_err(BridgeError::Sqlx)?,
+    ))
 }
 
 /// アンケート回答 ID に紐づく参加者を削除する（回答削除時のクリーンアップ）。
@@ -374,6 +484,225 @@ pub async fn count_accepted_no_session(pool: &MySqlPool, event_id: i32) -> Bridg
     Ok(cnt as i32)
 }
 
+const APPROVALS: [&str; 4] = ["pending", "accepted", "rejected", "waitlist"];
+
+/// 値が null でも「指定あり」として受け取る（未指定 = None、null = Some(None)）。
+fn deserialize_present<'de, D, T>(deserializer: D) -> Result<Option<T>, D::Error>
+where
+    D: Deserializer<'de>,
+    T: Deserialize<'de>,
+{
+    T::deserialize(deserializer).map(Some)
+}
+
+/// 参加者の一括更新の 1 件。指定した項目だけを変更する。
+#[derive(Deserialize)]
+pub struct ParticipantUpdate {
+    pub participant_id: i32,
+    #[serde(default)]
+    pub approval: Option<String>,
+    /// null で部の割り当てを外す
+    #[serde(default, deserialize_with = "deserialize_present")]
+    pub session_id: Option<Option<i32>>,
+    /// null / 空文字でメモを消す
+    #[serde(default, deserialize_with = "deserialize_present")]
+    pub personal_note: Option<Option<String>>,
+}
+
+/// 参加者の承認状況・部・個人メモを 1 トランザクションで一括更新する。
+///
+/// 行ごとの結果（ok / not_found: このイベントの参加者でない / invalid: 不正な値）を
+/// 入力順に返す。all_or_nothing のときは 1 件でも ok 以外があれば何も変更しない。
+pub async fn bulk_update_participants(
+    pool: &MySqlPool,
+    event_id: i32,
+    updates: &[ParticipantUpdate],
+    all_or_nothing: bool,
+) -> BridgeResult<(u64, Vec<Value>)> {
+    let mut tx = pool.begin().await?;
+
+    let rows = sqlx::query("SELECT id FROM event_participants WHERE event_id = ? FOR UPDATE")
+        .bind(event_id)
+        .fetch_all(&mut *tx)
+        .await?;
+    let mut members = HashSet::with_capacity(rows.len());
+    for row in &rows {
+        members.insert(row.try_get::<i32, _>("id").map_err(BridgeError::Sqlx)?);
+    }
+    let session_rows = sqlx::query("SELECT id FROM event_sessions WHERE event_id = ?")
+        .bind(event_id)
+        .fetch_all(&mut *tx)
+        .await?;
+    let mut sessions = HashSet::with_capacity(session_rows.len());
+    for row in &session_rows {
+        sessions.insert(row.try_get::<i32, _>("id").map_err(BridgeError::Sqlx)?);
+    }
+
+    let statuses: Vec<&str> = updates
+        .iter()
+        .map(|u| {
+            if !members.contains(&u.participant_id) {
+                "not_found"
+            } else if u.approval.as_deref().is_some_and(|a| !APPROVALS.contains(&a))
+                || u.session_id.flatten().is_some_and(|sid| !sessions.contains(&sid))
+            {
+                "invalid"
+            } else {
+                "ok"
+            }
+        })
+        .collect();
+
+    let results: Vec<Value> = updates
+        .iter()
+        .zip(&statuses)
+        .map(|(u, status)| json!({"participant_id": u.participant_id, "status": status}))
+        .collect();
+    if all_or_nothing && statuses.iter().any(|s| *s != "ok") {
+        tx.rollback().await?;
+        return Ok((0, results));
+    }
+
+    let mut updated = 0;
+    for (u, status) in updates.iter().zip(&statuses) {
+        if *status != "ok" {
+            continue;
+        }
+        // 未指定の項目は現在の値のまま（IF(?, 新しい値, 現在の値)）
+        let note = u.personal_note.as_ref().map(|n| n.as_deref().filter(|s| !s.is_empty()));
+        let result = sqlx::query(
+            "UPDATE event_participants SET \
+             approval = COALESCE(?, approval), \
+             session_id = IF(?, ?, session_id), \
+             personal_note = IF(?, ?, personal_note) \
+             WHERE id = ?",
+        )
+        .bind(u.approval.as_deref())
+        .bind(u.session_id.is_some())
+        .bind(u.session_id.flatten())
+        .bind(note.is_some())
+        .bind(note.flatten())
+        .bind(u.participant_id)
+        .execute(&mut *tx)
+        .await?;
+        updated += result.rows_affected();
+    }
+    tx.commit().await?;
+    Ok((updated, results))
+}
+
+/// 一括割り当て（プレビュー済みの計画の確定）の 1 件。
+#[derive(Deserialize)]
+pub struct AssignmentItem {
+    pub participant_id: i32,
+    pub approval: String,
+    pub session_id: Option<i32>,
+    /// 計画を立てた時点の approval。確定時に変わっていれば計画全体を取り消す
+    pub expected_approval: String,
+}
+
+/// 一括割り当ての結果。
+pub enum AssignmentOutcome {
+    Applied(u64),
+    /// 計画後に他の操作で承認状況が変わった（またはイベントにいない）参加者
+    Stale(Vec<i32>),
+    /// 確定すると定員を超える部（部制なしは None）
+    OverCapacity(Vec<Option<i32>>),
+}
+
+/// プレビュー済みの割り当てを 1 トランザクションで確定する。
+/// 参加者の行をロックして計画時の状態と照合し、適用後に定員を確認する。
+/// どちらかに失敗したら何も変更しない。
+pub async fn apply_assignments(
+    pool: &MySqlPool,
+    event_id: i32,
+    items: &[AssignmentItem],
+) -> BridgeResult<AssignmentOutcome> {
+    let mut tx = pool.begin().await?;
+
+    let rows = sqlx::query("SELECT id, approval FROM event_participants WHERE event_id = ? FOR UPDATE")
+        .bind(event_id)
+        .fetch_all(&mut *tx)
+        .await?;
+    let mut current = HashMap::with_capacity(rows.len());
+    for row in &rows {
+        let id: i32 = row.try_get("id").map_err(BridgeError::Sqlx)?;
+        let approval: String = row.try_get("approval").map_err(BridgeError::Sqlx)?;
+        current.insert(id, approval);
+    }
+
+    let session_rows = sqlx::query("SELECT id, capacity FROM event_sessions WHERE event_id = ?")
+        .bind(event_id)
+        .fetch_all(&mut *tx)
+        .await?;
+    let mut capacities: HashMap<i32, Option<i32>> = HashMap::with_capacity(session_rows.len());
+    for row in &session_rows {
+        capacities.insert(
+            row.try_get("id").map_err(BridgeError::Sqlx)?,
+            row.try_get("capacity").map_err(BridgeError::Sqlx)?,
+        );
+    }
+
+    let stale: Vec<i32> = items
+        .iter()
+        .filter(|item| {
+            current.get(&item.participant_id) != Some(&item.expected_approval)
+                || item.session_id.is_some_and(|sid| !capacities.contains_key(&sid))
+        })
+        .map(|item| item.participant_id)
+        .collect();
+    if !stale.is_empty() {
+        tx.rollback().await?;
+        return Ok(AssignmentOutcome::Stale(stale));
+    }
+
+    let mut applied = 0;
+    for item in items {
+        let result = sqlx::query("UPDATE event_participants SET approval = ?, session_id = ? WHERE id = ?")
+            .bind(&item.approval)
+            .bind(item.session_id)
+            .bind(item.participant_id)
+            .execute(&mut *tx)
+            .await?;
+        applied += result.rows_affected();
+    }
+
+    // 確定後の承認数で定員を確認する（他の部の手動承認と合わせて超えていないか）
+    let count_rows = sqlx::query(
+        "SELECT session_id, COUNT(*) AS cnt FROM event_participants \
+         WHERE event_id = ? AND approval = 'accepted' GROUP BY session_id",
+    )
+    .bind(event_id)
+    .fetch_all(&mut *tx)
+    .await?;
+    let event_capacity: Option<i32> = sqlx::query("SELECT capacity FROM events WHERE id = ?")
+        .bind(event_id)
+        .fetch_optional(&mut *tx)
+        .await?
+        .and_then(|row| row.try_get::<Option<i32>, _>("capacity").ok().flatten());
+
+    let mut over = Vec::new();
+    for row in &count_rows {
+        let sid: Option<i32> = row.try_get("session_id").map_err(BridgeError::Sqlx)?;
+        let cnt: i64 = row.try_get("cnt").unwrap_or(0);
+        let cap = match sid {
+            Some(sid) => capacities.get(&sid).copied().flatten(),
+            None if capacities.is_empty() => event_capacity,
+            None => None,
+        };
+        if cap.is_some_and(|cap| cnt > cap as i64) {
+            over.push(sid);
+        }
+    }
+    if !over.is_empty() {
+        tx.rollback().await?;
+        return Ok(AssignmentOutcome::OverCapacity(over));
+    }
+
+    tx.commit().await?;
+    Ok(AssignmentOutcome::Applied(applied))
+}
+
 /// 応募者を希望部優先で自動割り当てする。
 /// 1. 「不参加」(preferred_session_ids が null or "[]") → スキップ
 /// 2. 第一希望の部に空きあり → accepted
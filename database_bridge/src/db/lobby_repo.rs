@@ -219,6 +219,24 @@ pub async fn update_member_status(pool: &MySqlPool, passcode: &str, user_id: i64
     Ok(())
 }
 
+/// メンバーのステータスをまとめて更新する（Webapp の書き込みバッファの一括反映用）。
+/// (passcode, user_id, status) を 1 トランザクションで適用し、更新した行数を返す。
+pub async fn update_member_statuses(pool: &MySqlPool, updates: &[(String, i64, String)]) -> BridgeResult<u64> {
+    let mut tx = pool.begin().await?;
+    let mut affected = 0;
+    for (passcode, user_id, status) in updates {
+        affected += sqlx::query("UPDATE lobby_members SET status = ? WHERE room_passcode = ? AND user_id = ?")
+            .bind(status)
+            .bind(passcode)
+            .bind(user_id)
+            .execute(&mut *tx)
+            .await?
+            .rows_affected();
+    }
+    tx.commit().await?;
+    Ok(affected)
+}
+
 pub async fn get_tournament_matches(pool: &MySqlPool, passcode: &str) -> BridgeResult<Vec<crate::db::models::TournamentMatch>> {
     let query = r#"
         SELECT * FROM tournament_matches WHERE room_passcode = ? ORDER BY round_num ASC, match_index ASC
@@ -255,7 +273,8 @@ pub async fn insert_tournament_match(
     Ok(result.last_insert_id() as i32)
 }
 
-pub async fn report_match_winner(pool: &MySqlPool, match_id: i32, winner_id: i64, score1: i32, score2: i32) -> BridgeResult<()> {
+/// 試合結果を記録し、試合の属するロビーの passcode を返す（配信イベントに載せるため）。
+pub async fn report_match_winner(pool: &MySqlPool, match_id: i32, winner_id: i64, score1: i32, score2: i32) -> BridgeResult<Option<String>> {
     // NOTE: Simplified logic. For full validation, we'd check if max(score1, score2) >= win_condition.
     let query = "UPDATE tournament_matches SET winner_id = ?, status = 'finished', score1 = ?, score2 = ? WHERE match_id = ?";
     sqlx::query(query)
@@ -265,5 +284,9 @@ pub async fn report_match_winner(pool: &MySqlPool, match_id: i32, winner_id: i64
         .bind(match_id)
         .execute(pool)
         .await?;
-    Ok(())
+    let passcode = sqlx::query_scalar::<_, Option<String>>("SELECT room_passcode FROM tournament_matches WHERE match_id = ?")
+        .bind(match_id)
+        .fetch_optional(pool)
+        .await?;
+    Ok(passcode.flatten())
 }
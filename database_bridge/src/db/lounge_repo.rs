@@ -64,6 +64,27 @@ pub async fn get_lounge_player(pool: &MySqlPool, user_id: i64) -> BridgeResult<L
     .map_err(BridgeError::Sqlx)
 }
 
+/// 全プレイヤーの MMR（Webapp のリーダーボード索引の初期読み込み用）。
+pub async fn list_players(pool: &MySqlPool) -> BridgeResult<Vec<serde_json::Value>> {
+    let rows = sqlx::query(
+        r#"SELECT lp.user_id, u.username, lp.mmr, lp.peak_mmr, lp.total_sessions
+           FROM lounge_players lp
+           LEFT JOIN user_networks u ON u.discord_id = lp.user_id
+           ORDER BY lp.user_id"#
+    )
+    .fetch_all(pool)
+    .await?;
+
+    use sqlx::Row;
+    Ok(rows.iter().map(|r| serde_json::json!({
+        "user_id":        r.get::<i64, _>("user_id").to_string(),
+        "username":       r.get::<Option<String>, _>("username"),
+        "mmr":            r.get::<i32, _>("mmr"),
+        "peak_mmr":       r.get::<i32, _>("peak_mmr"),
+        "total_sessions": r.get::<i32, _>("total_sessions"),
+    })).collect())
+}
+
 // ============================================================
 // lounge_sessions
 // ============================================================
@@ -12,3 +12,4 @@ pub mod reset_log_repo;
 pub mod tournament_repo;
 pub mod lounge_repo;
 pub mod event_repo;
+pub mod outbox_repo;
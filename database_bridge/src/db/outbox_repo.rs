@@ -0,0 +1,236 @@
+// db/outbox_repo.rs
+// 通知 Outbox（notification_outbox）の DB 操作。
+// Why: DM 送信の途中で Bot が落ちても未送信分を再送できるよう、送る前に記録し、
+//      複数のワーカー（Bot / webapp）が同じ行を同時に送らないようリース付きで取り出す。
+
+use serde::Deserialize;
+use serde_json::{json, Value};
+use sqlx::{mysql::MySqlPool, mysql::MySqlRow, Row};
+
+use super::models::BridgeResult;
+
+/// Outbox に積む通知 1 件。
+#[derive(Deserialize)]
+pub struct OutboxItem {
+    pub participant_id: i32,
+    pub kind: String,
+    pub event_id: i32,
+    pub user_id: i64,
+    pub content: String,
+}
+
+const OUTBOX_SELECT: &str =
+    "SELECT id, participant_id, kind, event_id, user_id, content, status, attempts, last_error, \
+     CAST(next_attempt_at AS CHAR) AS next_attempt_at, \
+     CAST(locked_until AS CHAR) AS locked_until, \
+     CAST(created_at AS CHAR) AS created_at \
+     FROM notification_outbox";
+
+fn row_to_json(row: &MySqlRow) -> Value {
+    let user_id: i64 = row.try_get("user_id").unwrap_or(0);
+    json!({
+        "id": row.try_get::<i64, _>("id").unwrap_or(0),
+        "participant_id": row.try_get::<i32, _>("participant_id").unwrap_or(0),
+        "kind": row.try_get::<String, _>("kind").unwrap_or_default(),
+        "event_id": row.try_get::<i32, _>("event_id").unwrap_or(0),
+        "user_id": user_id.to_string(),
+        "content": row.try_get::<String, _>("content").unwrap_or_default(),
+        "status": row.try_get::<String, _>("status").unwrap_or_default(),
+        "attempts": row.try_get::<i32, _>("attempts").unwrap_or(0),
+        "last_error": row.try_get::<Option<String>, _>("last_error").unwrap_or(None),
+        "next_attempt_at": row.try_get::<Option<String>, _>("next_attempt_at").unwrap_or(None),
+        "locked_until": row.try_get::<Option<String>, _>("locked_until").unwrap_or(None),
+        "created_at": row.try_get::<Option<String>, _>("created_at").unwrap_or(None),
+    })
+}
+
+/// 通知を積む。(participant_id, kind) が既にあり未送信（sent 以外）なら、本文・送信先を積み直して
+/// 再試行回数をリセットする（断念した通知は pending に戻す）。送信済みの通知には触れない（二重送信しない）。
+/// Why: 送信に失敗した後で承認やセッションが変わって通知し直した時に、古い本文のまま送らないため。
+///      送信中（sending）の行はリースを保ったまま本文だけ差し替え、送信に失敗すれば新しい本文で再試行される。
+/// 新しく積んだ・積み直した件数を返す。
+pub async fn enqueue(pool: &MySqlPool, items: &[OutboxItem]) -> BridgeResult<u64> {
+    let mut tx = pool.begin().await?;
+    let mut enqueued = 0;
+    for item in items {
+        let status = sqlx::query_scalar::<_, String>(
+            "SELECT status FROM notification_outbox WHERE participant_id = ? AND kind = ? FOR UPDATE",
+        )
+        .bind(item.participant_id)
+        .bind(&item.kind)
+        .fetch_optional(&mut *tx)
+        .await?;
+        if status.as_deref() == Some("sent") {
+            continue;
+        }
+        // ON DUPLICATE KEY UPDATE は左から順に評価されるため、status の書き換えは最後に置く
+        sqlx::query(
+            "INSERT INTO notification_outbox \
+             (participant_id, kind, event_id, user_id, content) VALUES (?, ?, ?, ?, ?) \
+             ON DUPLICATE KEY UPDATE \
+                 content = IF(status = 'sent', content, VALUES(content)), \
+                 user_id = IF(status = 'sent', user_id, VALUES(user_id)), \
+                 event_id = IF(status = 'sent', event_id, VALUES(event_id)), \
+                 attempts = IF(status = 'sent', attempts, 0), \
+                 next_attempt_at = IF(status = 'sent', next_attempt_at, NOW()), \
+                 last_error = IF(status = 'sent', last_error, NULL), \
+                 status = IF(status = 'dead', 'pending', status)",
+        )
+        .bind(item.participant_id)
+        .bind(&item.kind)
+        .bind(item.event_id)
+        .bind(item.user_id)
+        .bind(&item.content)
+        .execute(&mut *tx)
+        .await?;
+        enqueued += 1;
+    }
+    tx.commit().await?;
+    Ok(enqueued)
+}
+
+/// 送信可能な通知を最大 limit 件取り出し、lease_seconds 秒のリースを付けて sending にする。
+/// 対象: 再試行時刻を過ぎた pending と、リースが切れた sending（送信中にワーカーが落ちたもの）。
+/// SKIP LOCKED により、同時に取り出す別のワーカーとは別の行を受け取る。
+pub async fn claim(
+    pool: &MySqlPool,
+    limit: u32,
+    lease_seconds: u32,
+    event_id: Option<i32>,
+) -> BridgeResult<Vec<Value>> {
+    let mut tx = pool.begin().await?;
+
+    let event_filter = if event_id.is_some() { " AND event_id = ?" } else { "" };
+    let sql = format!(
+        "SELECT id FROM notification_outbox \
+         WHERE ((status = 'pending' AND next_attempt_at <= NOW()) \
+             OR (status = 'sending' AND locked_until < NOW())){event_filter} \
+         ORDER BY next_attempt_at, id LIMIT ? FOR UPDATE SKIP LOCKED"
+    );
+    let mut query = sqlx::query_scalar::<_, i64>(&sql);
+    if let Some(eid) = event_id {
+        query = query.bind(eid);
+    }
+    let ids: Vec<i64> = query.bind(limit).fetch_all(&mut *tx).await?;
+    if ids.is_empty() {
+        tx.commit().await?;
+        return Ok(vec![]);
+    }
+
+    let placeholders = vec!["?"; ids.len()].join(",");
+    let update = format!(
+        "UPDATE notification_outbox \
+         SET status = 'sending', attempts = attempts + 1, \
+             locked_until = NOW() + INTERVAL ? SECOND \
+         WHERE id IN ({placeholders})"
+    );
+    let mut query = sqlx::query(&update).bind(lease_seconds);
+    for id in &ids {
+        query = query.bind(id);
+    }
+    query.execute(&mut *tx).await?;
+
+    let select = format!("{OUTBOX_SELECT} WHERE id IN ({placeholders}) ORDER BY next_attempt_at, id");
+    let mut query = sqlx::query(&select);
+    for id in &ids {
+        query = query.bind(id);
+    }
+    let rows = query.fetch_all(&mut *tx).await?;
+    tx.commit().await?;
+
+    Ok(rows.iter().map(row_to_json).collect())
+}
+
+/// 送信成功を記録し、同じトランザクションで参加者の notified_at を立てる。
+/// Why: 「送信済み」と「通知済み」の間で落ちると、再送されないのに未通知のまま残るため。
+pub async fn mark_sent(pool: &MySqlPool, outbox_id: i64) -> BridgeResult<()> {
+    let mut tx = pool.begin().await?;
+    sqlx::query(
+        "UPDATE notification_outbox \
+         SET status = 'sent', sent_at = NOW(), locked_until = NULL, last_error = NULL \
+         WHERE id = ?",
+    )
+    .bind(outbox_id)
+    .execute(&mut *tx)
+    .await?;
+    sqlx::query(
+        "UPDATE event_participants p \
+         JOIN notification_outbox o ON o.participant_id = p.id \
+         SET p.notified_at = NOW() \
+         WHERE o.id = ?",
+    )
+    .bind(outbox_id)
+    .execute(&mut *tx)
+    .await?;
+    tx.commit().await?;
+    Ok(())
+}
+
+/// 送信失敗を記録する。give_up なら dead（以後は再送しない）、そうでなければ retry_in_seconds 後に再試行する。
+pub async fn mark_failed(
+    pool: &MySqlPool,
+    outbox_id: i64,
+    error: &str,
+    retry_in_seconds: u32,
+    give_up: bool,
+) -> BridgeResult<()> {
+    let status = if give_up { "dead" } else { "pending" };
+    sqlx::query(
+        "UPDATE notification_outbox \
+         SET status = ?, next_attempt_at = NOW() + INTERVAL ? SECOND, \
+             locked_until = NULL, last_error = LEFT(?, 500) \
+         WHERE id = ?",
+    )
+    .bind(status)
+    .bind(retry_in_seconds)
+    .bind(error)
+    .bind(outbox_id)
+    .execute(pool)
+    .await?;
+    Ok(())
+}
+
+/// 滞留している通知（断念 / 再試行待ち / リース切れ）の一覧。管理画面用。
+pub async fn find_stuck(pool: &MySqlPool, event_id: Option<i32>) -> BridgeResult<Vec<Value>> {
+    let event_filter = if event_id.is_some() { " AND event_id = ?" } else { "" };
+    let sql = format!(
+        "{OUTBOX_SELECT} \
+         WHERE (status = 'dead' \
+             OR (status = 'pending' AND attempts > 0) \
+             OR (status = 'sending' AND locked_until < NOW())){event_filter} \
+         ORDER BY created_at, id"
+    );
+    let mut query = sqlx::query(&sql);
+    if let Some(eid) = event_id {
+        query = query.bind(eid);
+    }
+    let rows = query.fetch_all(pool).await?;
+    Ok(rows.iter().map(row_to_json).collect())
+}
+
+/// 断念した通知を再送対象に戻す（管理画面の「再送」）。
+/// 本文・送信先は呼び出し側が参加者の現在の状態から描画し直したものに差し替える。
+pub async fn requeue(pool: &MySqlPool, outbox_id: i64, user_id: i64, content: &str) -> BridgeResult<bool> {
+    let result = sqlx::query(
+        "UPDATE notification_outbox \
+         SET status = 'pending', attempts = 0, next_attempt_at = NOW(), locked_until = NULL, \
+             last_error = NULL, user_id = ?, content = ? \
+         WHERE id = ? AND status IN ('dead', 'pending')",
+    )
+    .bind(user_id)
+    .bind(content)
+    .bind(outbox_id)
+    .execute(pool)
+    .await?;
+    Ok(result.rows_affected() > 0)
+}
+
+/// Outbox 1 件の (event_id, participant_id)（管理 API の権限確認と再送時の描画用）。
+pub async fn find_owner(pool: &MySqlPool, outbox_id: i64) -> BridgeResult<Option<(i32, i32)>> {
+    Ok(sqlx::query_as::<_, (i32, i32)>(
+        "SELECT event_id, participant_id FROM notification_outbox WHERE id = ?",
+    )
+    .bind(outbox_id)
+    .fetch_optional(pool)
+    .await?)
+}
@@ -1,6 +1,10 @@
 // db/response_repo.rs
 // Why: survey_responses テーブルへの操作を集約する。
 
+use std::collections::HashMap;
+
+use futures::TryStreamExt;
+use serde_json::{json, Map, Value};
 use sqlx::{mysql::MySqlPool, Row};
 
 use super::models::{BridgeError, BridgeResult, SurveyResponse};
@@ -19,6 +23,188 @@ pub async fn find_by_survey(pool: &MySqlPool, survey_id: i64) -> BridgeResult<Ve
     Ok(responses)
 }
 
+/// 回答一覧の 1 ページ分を取得する（submitted_at DESC, id DESC のキーセットページング）。
+///
+/// - `before`: 前ページ末尾の (submitted_at, id)。None なら先頭ページ。
+/// - `filters`: (質問 index, 値) の組。回答がその値を含むもの（単一回答の一致 / 複数回答の包含）に絞り込む。
+///   質問 index は数字のみ受け付ける（JSON パスに埋め込むため）。
+/// Why: 回答が数万件あるアンケートでも 1 ページ分の範囲走査で済ませる（OFFSET は使わない）。
+pub async fn find_page_by_survey(
+    pool: &MySqlPool,
+    survey_id: i64,
+    before: Option<(&str, i64)>,
+    filters: &[(String, String)],
+    limit: i64,
+) -> BridgeResult<Vec<SurveyResponse>> {
+    let filters = valid_filters(filters);
+    let mut sql = format!("SELECT {} FROM survey_responses WHERE survey_id = ?", SELECT_COLUMNS);
+    if before.is_some() {
+        sql.push_str(" AND (submitted_at < ? OR (submitted_at = ? AND id < ?))");
+    }
+    sql.push_str(&filter_clause(&filters));
+    sql.push_str(" ORDER BY submitted_at DESC, id DESC LIMIT ?");
+
+    let mut query = sqlx::query_as::<_, SurveyResponse>(&sql).bind(survey_id);
+    if let Some((at, id)) = before {
+        query = query.bind(at).bind(at).bind(id);
+    }
+    for (_, value) in filters.iter().copied() {
+        query = query.bind(value.as_str()).bind(value.as_str());
+    }
+    Ok(query.bind(limit).fetch_all(pool).await?)
+}
+
+/// フィルタ条件に一致する回答数を返す（先頭ページで総件数を表示するため）。
+pub async fn count_by_survey(
+    pool: &MySqlPool,
+    survey_id: i64,
+    filters: &[(String, String)],
+) -> BridgeResult<i64> {
+    let filters = valid_filters(filters);
+    let sql = format!(
+        "SELECT COUNT(*) AS cnt FROM survey_responses WHERE survey_id = ?{}",
+        filter_clause(&filters)
+    );
+    let mut query = sqlx::query(&sql).bind(survey_id);
+    for (_, value) in filters.iter().copied() {
+        query = query.bind(value.as_str()).bind(value.as_str());
+    }
+    let row = query.fetch_one(pool).await?;
+    Ok(row.try_get("cnt").map_err(BridgeError::Sqlx)?)
+}
+
+/// 結果画面の集計で 1 問分をどう数えるか。
+pub struct SummaryQuestion {
+    pub key: String,
+    /// 選択式なら値ごとの件数、そうでなければ新しい順の自由記述を text_limit 件まで返す
+    pub choice: bool,
+    /// 複数回答（旧形式の "0[]" キーも参照する）
+    pub multi: bool,
+}
+
+struct Tally {
+    total: i64,
+    counts: Vec<(String, i64)>,
+    index: HashMap<String, usize>,
+    texts: Vec<String>,
+}
+
+fn answer_text(v: &Value) -> String {
+    match v {
+        Value::String(s) => s.clone(),
+        other => other.to_string(),
+    }
+}
+
+/// 回答として空か（Python 側の `if not val` と同じ: null・空文字・空配列・false・0）。
+fn is_blank(v: &Value) -> bool {
+    match v {
+        Value::Null => true,
+        Value::String(s) => s.is_empty(),
+        Value::Array(a) => a.is_empty(),
+        Value::Bool(b) => !b,
+        Value::Number(n) => n.as_f64() == Some(0.0),
+        Value::Object(_) => false,
+    }
+}
+
+/// 結果画面の質問ごとの集計を返す（新しい順に 1 回だけ走査し、回答本文は Webapp に送らない）。
+/// Why: 結果画面を開くたびに全回答をページ単位で Webapp へ転送して集計していたため、
+///      回答数に比例した往復が発生していた。
+///
+/// 返り値: {"total": 回答数, "questions": {"<index>": {"total", "counts": [[値, 件数], ...] | "texts": [...]}}}
+///         counts は最初に現れた順（新しい回答から）。JSON として不正な回答は回答数にのみ含める。
+pub async fn summarize_by_survey(
+    pool: &MySqlPool,
+    survey_id: i64,
+    questions: &[SummaryQuestion],
+    text_limit: usize,
+) -> BridgeResult<Value> {
+    let mut tallies: Vec<Tally> = questions
+        .iter()
+        .map(|_| Tally { total: 0, counts: Vec::new(), index: HashMap::new(), texts: Vec::new() })
+        .collect();
+    let mut total: i64 = 0;
+
+    let mut rows = sqlx::query(
+        "SELECT answers FROM survey_responses WHERE survey_id = ? ORDER BY submitted_at DESC, id DESC",
+    )
+    .bind(survey_id)
+    .fetch(pool);
+    while let Some(row) = rows.try_next().await? {
+        total += 1;
+        let raw: Vec<u8> = row.try_get("answers").map_err(BridgeError::Sqlx)?;
+        let answers = match serde_json::from_slice::<Value>(&raw) {
+            Ok(Value::Object(m)) => m,
+            _ => continue,
+        };
+        for (q, tally) in questions.iter().zip(tallies.iter_mut()) {
+            let mut val = answers.get(&q.key);
+            if val.map_or(true, Value::is_null) && q.multi {
+                val = answers.get(&format!("{}[]", q.key));
+            }
+            let Some(val) = val.filter(|v| !is_blank(v)) else { continue };
+            let values: Vec<&Value> = match val {
+                Value::Array(items) => items.iter().collect(),
+                single => vec![single],
+            };
+            tally.total += values.len() as i64;
+            for v in values {
+                let text = answer_text(v);
+                if q.choice {
+                    match tally.index.get(&text) {
+                        Some(&i) => tally.counts[i].1 += 1,
+                        None => {
+                            tally.index.insert(text.clone(), tally.counts.len());
+                            tally.counts.push((text, 1));
+                        }
+                    }
+                } else if tally.texts.len() < text_limit {
+                    tally.texts.push(text);
+                }
+            }
+        }
+    }
+
+    let mut out = Map::new();
+    for (q, tally) in questions.iter().zip(tallies) {
+        let entry = if q.choice {
+            json!({"total": tally.total, "counts": tally.counts})
+        } else {
+            json!({"total": tally.total, "texts": tally.texts})
+        };
+        out.insert(q.key.clone(), entry);
+    }
+    Ok(json!({"total": total, "questions": out}))
+}
+
+/// 質問 index として妥当か（数字のみ）。JSON パスに埋め込むため呼び出し側でも検証する。
+pub fn is_valid_question_index(q_idx: &str) -> bool {
+    !q_idx.is_empty() && q_idx.len() <= 4 && q_idx.chars().all(|c| c.is_ascii_digit())
+}
+
+fn valid_filters(filters: &[(String, String)]) -> Vec<&(String, String)> {
+    filters.iter().filter(|(q_idx, _)| is_valid_question_index(q_idx)).collect()
+}
+
+/// 質問ごとのフィルタを WHERE 句の断片にする。
+/// Why: 旧形式では複数回答が "0[]" キーで保存されているため、両方のキーを見る。
+///      JSON として不正な answers が 1 件でもあると JSON_CONTAINS がクエリごとエラーにするため、
+///      先に JSON_VALID で除く（不正な回答はどの値にも一致しない扱い）。
+fn filter_clause(filters: &[&(String, String)]) -> String {
+    let mut clause = String::new();
+    if !filters.is_empty() {
+        clause.push_str(" AND JSON_VALID(answers)");
+    }
+    for (q_idx, _) in filters.iter().copied() {
+        clause.push_str(&format!(
+            " AND (JSON_CONTAINS(answers, JSON_QUOTE(?), '$.\"{q_idx}\"') \
+              OR JSON_CONTAINS(answers, JSON_QUOTE(?), '$.\"{q_idx}[]\"'))"
+        ));
+    }
+    clause
+}
+
 /// 特定のユーザーがそのアンケートに回答済みか確認し、回答を返す。
 pub async fn find_answers_by_user(
     pool: &MySqlPool,
@@ -216,6 +216,42 @@ pub async fn is_collaborator(pool: &MySqlPool, survey_id: i64, user_id: i64) ->
     Ok(row.is_some())
 }
 
+/// アンケートのアクセス制御情報（オーナー + スタッフ ID 一覧）を 1 クエリで返す。
+/// Why: Python 側の権限判定が get_survey → list_collaborators と往復していたため、
+///      判定に必要な最小限の情報だけをまとめて返す（webapp 側でキャッシュされる）。
+pub async fn find_acl(pool: &MySqlPool, survey_id: i64) -> BridgeResult<Value> {
+    let rows = sqlx::query(
+        "SELECT s.owner_id, o.username AS owner_name, c.user_id AS collaborator_id \
+         FROM surveys s \
+         LEFT JOIN user_networks o ON s.owner_id = o.discord_id \
+         LEFT JOIN survey_collaborators c ON s.id = c.survey_id \
+         WHERE s.id = ?",
+    )
+    .bind(survey_id)
+    .fetch_all(pool)
+    .await?;
+
+    let first = rows
+        .first()
+        .ok_or_else(|| BridgeError::NotFound(format!("survey_id={survey_id}")))?;
+    let owner_id: String = first.try_get("owner_id").unwrap_or_default();
+    let owner_name: Option<String> = first.try_get("owner_name").ok();
+
+    // スタッフ未登録の場合 LEFT JOIN の collaborator_id は NULL になる
+    let collaborator_ids: Vec<String> = rows
+        .iter()
+        .filter_map(|row| row.try_get::<Option<i64>, _>("collaborator_id").ok().flatten())
+        .map(|id| id.to_string())
+        .collect();
+
+    Ok(json!({
+        "survey_id": survey_id,
+        "owner_id": owner_id,
+        "owner_name": owner_name,
+        "collaborator_ids": collaborator_ids,
+    }))
+}
+
 /// ユーザー名（部分一致）でユーザーを検索する。スタッフ追加候補の提示に使用。
 pub async fn search_users_by_username(pool: &MySqlPool, q: &str) -> BridgeResult<Vec<Value>> {
     let pattern = format!("%{q}%");
@@ -238,3 +274,25 @@ pub async fn search_users_by_username(pool: &MySqlPool, q: &str) -> BridgeResult
         .collect();
     Ok(list)
 }
+
+/// ユーザー名が登録済みの全ユーザーを返す。
+/// Why: webapp 側でユーザーディレクトリ（前方一致 / n-gram 索引）を構築するための一括ロード用。
+///      キーストロークごとの LIKE 検索を置き換える。
+pub async fn list_usernames(pool: &MySqlPool) -> BridgeResult<Vec<Value>> {
+    let rows = sqlx::query(
+        "SELECT discord_id, username FROM user_networks \
+         WHERE username IS NOT NULL AND username <> ''",
+    )
+    .fetch_all(pool)
+    .await?;
+
+    let list = rows
+        .iter()
+        .map(|row| {
+            let discord_id: i64 = row.try_get("discord_id").unwrap_or(0);
+            let username: Option<String> = row.try_get("username").ok();
+            json!({"user_id": discord_id.to_string(), "username": username})
+        })
+        .collect();
+    Ok(list)
+}
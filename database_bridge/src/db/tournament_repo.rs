@@ -69,6 +69,78 @@ pub async fn list_match_scores(pool: &MySqlPool, match_id: i32) -> BridgeResult<
     Ok(scores)
 }
 
+/// 大会結果エクスポート用: ロビーの試合を match_id 順に after より後ろから limit 件と、
+/// それらの試合のスコアを 2 クエリで返す（試合ごとにスコアを取りに行かない）。
+/// 戻り値: (試合の配列（各要素に "scores" を含む）, 次ページのカーソル)
+pub async fn export_room_matches_page(
+    pool: &MySqlPool,
+    passcode: &str,
+    after: i32,
+    limit: i64,
+) -> BridgeResult<(Vec<serde_json::Value>, Option<i32>)> {
+    use sqlx::Row;
+    let rows = sqlx::query(
+        r#"SELECT match_id, round_num, match_index, player1_id, player2_id, winner_id,
+                  status, score1, score2, win_condition, next_match_id
+           FROM tournament_matches
+           WHERE room_passcode = ? AND match_id > ?
+           ORDER BY match_id
+           LIMIT ?"#
+    )
+    .bind(passcode)
+    .bind(after)
+    .bind(limit + 1)
+    .fetch_all(pool)
+    .await?;
+
+    let has_more = rows.len() as i64 > limit;
+    let rows = &rows[..rows.len().min(limit as usize)];
+    let ids: Vec<i32> = rows.iter().map(|r| r.get::<i32, _>("match_id")).collect();
+
+    let mut scores: std::collections::HashMap<i32, Vec<serde_json::Value>> = std::collections::HashMap::new();
+    if !ids.is_empty() {
+        let placeholders = vec!["?"; ids.len()].join(",");
+        let select = format!(
+            "SELECT match_id, user_id, position, points, status FROM match_scores \
+             WHERE match_id IN ({placeholders}) ORDER BY match_id, position"
+        );
+        let mut query = sqlx::query(&select);
+        for id in &ids {
+            query = query.bind(id);
+        }
+        for r in query.fetch_all(pool).await? {
+            scores.entry(r.get::<i32, _>("match_id")).or_default().push(serde_json::json!({
+                "user_id":  r.get::<i64, _>("user_id").to_string(),
+                "position": r.get::<i8, _>("position"),
+                "points":   r.get::<i32, _>("points"),
+                "status":   r.get::<String, _>("status"),
+            }));
+        }
+    }
+
+    let opt_id = |r: &sqlx::mysql::MySqlRow, col: &str| r.get::<Option<i64>, _>(col).map(|v| v.to_string());
+    let matches = rows.iter().map(|r| {
+        let match_id = r.get::<i32, _>("match_id");
+        serde_json::json!({
+            "match_id":      match_id,
+            "round_num":     r.get::<Option<i32>, _>("round_num"),
+            "match_index":   r.get::<Option<i32>, _>("match_index"),
+            "player1_id":    opt_id(r, "player1_id"),
+            "player2_id":    opt_id(r, "player2_id"),
+            "winner_id":     opt_id(r, "winner_id"),
+            "status":        r.get::<Option<String>, _>("status"),
+            "score1":        r.get::<Option<i32>, _>("score1"),
+            "score2":        r.get::<Option<i32>, _>("score2"),
+            "win_condition": r.get::<Option<i32>, _>("win_condition"),
+            "next_match_id": r.get::<Option<i32>, _>("next_match_id"),
+            "scores":        scores.remove(&match_id).unwrap_or_default(),
+        })
+    }).collect();
+
+    let next_after = if has_more { ids.last().copied() } else { None };
+    Ok((matches, next_after))
+}
+
 pub async fn get_tournament_standings(pool: &MySqlPool, passcode: &str) -> BridgeResult<Vec<serde_json::Value>> {
     let rows = sqlx::query(
         r#"SELECT ms.user_id, u.username, SUM(ms.points) as total_points
@@ -290,6 +362,24 @@ pub async fn get_active_title(
     Ok(title)
 }
 
+/// 全プレイヤーの獲得称号 (user_id, title_id) と装備中の称号 (user_id, title_id)。
+/// 称号ロールの整合（Python 側の reconciler）が全員分を 1 往復で読むために使う。
+pub async fn list_title_holdings(
+    pool: &MySqlPool,
+) -> BridgeResult<(Vec<(i64, i32)>, Vec<(i64, i32)>)> {
+    let earned = sqlx::query_as::<_, (i64, i32)>(
+        "SELECT user_id, title_id FROM player_titles ORDER BY user_id, title_id"
+    )
+    .fetch_all(pool)
+    .await?;
+    let active = sqlx::query_as::<_, (i64, i32)>(
+        "SELECT user_id, title_id FROM player_active_title ORDER BY user_id"
+    )
+    .fetch_all(pool)
+    .await?;
+    Ok((earned, active))
+}
+
 /// 大会優勝時に該当する称号を自動付与する
 pub async fn auto_grant_tournament_titles(
     pool: &MySqlPool,
@@ -351,3 +441,82 @@ pub async fn auto_grant_lounge_rank_title(
     }
     Ok(newly_granted)
 }
+
+/// ランク称号・優勝称号の一括付与（ラウンジセッション終了時）。
+/// Why: プレイヤーごとに grant-rank / grant-tournament / 装備確認 / 装備を呼ぶと
+///      12 人で数十往復になる。称号カタログを 1 回だけ読み、1 トランザクションで全員分を付与する。
+///      装備称号が無いプレイヤーには、新たに獲得した最初の称号を装備させる（従来の挙動と同じ）。
+///
+/// players: (user_id, 現在の MMR, セッション優勝者か)
+/// 戻り値: (user_id, 新規付与した title_id, 新たに装備した title_id)
+pub async fn grant_titles_batch(
+    pool: &MySqlPool,
+    players: &[(i64, i32, bool)],
+) -> BridgeResult<Vec<(i64, Vec<i32>, Option<i32>)>> {
+    let catalog = sqlx::query_as::<_, (i32, String, Option<i32>)>(
+        r#"SELECT id, unlock_type, unlock_threshold
+           FROM titles
+           WHERE unlock_type IN ('lounge_rank', 'tournament_win')
+             AND unlock_threshold IS NOT NULL
+             AND is_active = TRUE
+           ORDER BY display_order, id"#
+    )
+    .fetch_all(pool)
+    .await?;
+
+    let mut tx = pool.begin().await?;
+    let mut output = Vec::with_capacity(players.len());
+
+    for &(user_id, mmr, is_winner) in players {
+        let win_count: i64 = if is_winner {
+            sqlx::query_scalar(
+                r#"SELECT COUNT(*) FROM tournament_matches WHERE winner_id = ? AND status = 'finished'"#
+            )
+            .bind(user_id)
+            .fetch_one(&mut *tx)
+            .await?
+        } else {
+            0
+        };
+
+        let mut newly_granted = vec![];
+        for (title_id, unlock_type, threshold) in &catalog {
+            let threshold = threshold.unwrap_or(i32::MAX) as i64;
+            let eligible = match unlock_type.as_str() {
+                "lounge_rank" => threshold <= mmr as i64,
+                _ => is_winner && threshold <= win_count,
+            };
+            if !eligible {
+                continue;
+            }
+            let result = sqlx::query(
+                "INSERT IGNORE INTO player_titles (user_id, title_id) VALUES (?, ?)"
+            )
+            .bind(user_id)
+            .bind(title_id)
+            .execute(&mut *tx)
+            .await?;
+            if result.rows_affected() > 0 {
+                newly_granted.push(*title_id);
+            }
+        }
+
+        let mut activated = None;
+        if let Some(&first) = newly_granted.first() {
+            let result = sqlx::query(
+                "INSERT IGNORE INTO player_active_title (user_id, title_id) VALUES (?, ?)"
+            )
+            .bind(user_id)
+            .bind(first)
+            .execute(&mut *tx)
+            .await?;
+            if result.rows_affected() > 0 {
+                activated = Some(first);
+            }
+        }
+        output.push((user_id, newly_granted, activated));
+    }
+
+    tx.commit().await?;
+    Ok(output)
+}
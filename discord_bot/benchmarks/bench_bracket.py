@@ -0,0 +1,62 @@
+# benchmarks/bench_bracket.py
+# common/bracket.py のベンチマーク（256 人想定）
+# - 形式ごとの組み合わせ作成時間と、全試合の結果を 1 件ずつ反映する時間（1 件あたり）
+# - 反映後の優勝者と、tournament_matches の行から求めた優勝者（resolve_champion）の一致
+#
+# 実行: cd discord_bot && python benchmarks/bench_bracket.py [参加者数]
+import os
+import random
+import sys
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.bracket import BRACKET_FORMATS, build_bracket, resolve_champion
+
+
+def _play(bracket, rng: random.Random) -> int:
+    """結果待ちの試合を順に消化する（上位シードが 7 割で勝つ）。反映した件数を返す。"""
+    queue = deque(m.key for m in bracket.matches if m.ready)
+    reported = 0
+    while queue:
+        m = bracket.match(queue.popleft())
+        if not m.ready:
+            continue
+        a, b = m.players
+        strong, weak = (a, b) if a < b else (b, a)
+        winner = strong if rng.random() < 0.7 else weak
+        w = m.players.index(winner)
+        score = [0, 0]
+        score[w] = bracket.win_condition
+        for key in bracket.report(m.key, winner, *score):
+            if bracket.match(key).ready:
+                queue.append(key)
+        reported += 1
+    return reported
+
+
+def main(n: int = 256) -> None:
+    players = list(range(1, n + 1))
+    print(f"entrants={n}")
+    for fmt in BRACKET_FORMATS:
+        rng = random.Random(7)
+        t0 = time.perf_counter()
+        bracket = build_bracket(fmt, players, win_condition=2)
+        build_ms = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        reported = _play(bracket, rng)
+        play_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        resolved = resolve_champion(bracket.to_rows())
+        resolve_ms = (time.perf_counter() - t0) * 1000
+
+        print(f"{fmt:<20} matches={len(bracket.matches):6,}  build {build_ms:7.2f} ms  "
+              f"report {play_s * 1e6 / max(1, reported):6.2f} us/result  "
+              f"resolve {resolve_ms:6.2f} ms  champion={bracket.champion()} rows={resolved}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 256)
@@ -0,0 +1,59 @@
+# benchmarks/bench_leaderboard.py
+# common/leaderboard.py のベンチマーク（架空の 100,000 人）
+# - 索引の作成時間と、MMR 更新・順位・ページ取得の 1 件あたりの時間（桁違いの MMR への更新を含む）
+# - 比較: 順位を求めるたびに全員の MMR を数える / 並べ替える従来の方法
+#
+# 実行: cd discord_bot && python benchmarks/bench_leaderboard.py [人数]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.leaderboard import Leaderboard
+
+
+def _per_op_us(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(i)
+    return (time.perf_counter() - t0) * 1e6 / n
+
+
+def main(n: int = 100_000) -> None:
+    rng = random.Random(7)
+    # 初期値 1000 のままのプレイヤーが多い分布
+    mmrs = {str(10**17 + i): (1000 if rng.random() < 0.3 else int(rng.lognormvariate(8.3, 0.6))) for i in range(n)}
+    ids = list(mmrs)
+    print(f"players={n:,}")
+
+    t0 = time.perf_counter()
+    board = Leaderboard(mmrs.items())
+    print(f"build                 {(time.perf_counter() - t0) * 1000:8.1f} ms")
+
+    updates = [(rng.choice(ids), rng.randint(0, 40_000)) for _ in range(20_000)]
+    print(f"update                {_per_op_us(lambda i: board.update(*updates[i]), len(updates)):8.2f} us/op")
+    for uid, mmr in updates:
+        mmrs[uid] = mmr
+    outliers = [(rng.choice(ids), 5_000_000 + i) for i in range(100)]
+    print(f"update (outlier MMR)  {_per_op_us(lambda i: board.update(*outliers[i]), len(outliers)):8.2f} us/op")
+    for uid, mmr in outliers:
+        mmrs[uid] = mmr
+
+    probes = [rng.choice(ids) for _ in range(20_000)]
+    print(f"rank                  {_per_op_us(lambda i: board.rank(probes[i]), len(probes)):8.2f} us/op")
+    offsets = [rng.randrange(n) for _ in range(2_000)]
+    print(f"page(limit=50)        {_per_op_us(lambda i: board.page(offsets[i], 50), len(offsets)):8.2f} us/op")
+
+    values = list(mmrs.values())
+    print(f"baseline rank (count) {_per_op_us(lambda i: sum(1 for v in values if v > mmrs[probes[i]]), 20):8.0f} us/op")
+    print(f"baseline page (sort)  "
+          f"{_per_op_us(lambda i: sorted(mmrs.items(), key=lambda kv: (-kv[1], kv[0]))[offsets[i]:offsets[i] + 50], 5):8.0f} us/op")
+
+    check = sorted(mmrs.items(), key=lambda kv: (-kv[1], kv[0]))
+    assert [e["user_id"] for e in board.page(1234, 50)] == [u for u, _ in check[1234:1284]]
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,52 @@
+# benchmarks/bench_mmr_backtest.py
+# common/mmr_backtest.py のベンチマーク（架空の 20,000 セッション・参加者 2,000 人・1 セッション 12 人）
+# - 現行の固定テーブル式と多人数 Elo の再計算時間（1 セッションあたり）
+# - セッション前のレーティングによる順位の予測精度と最終的な分布
+#
+# 実行: cd discord_bot && python benchmarks/bench_mmr_backtest.py [セッション数]
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.mmr_backtest import FixedTableFormula, MultiplayerEloFormula, SessionTable, backtest
+
+_PLAYERS = 2_000
+_PER_SESSION = 12
+
+
+def _make_sessions(n: int, seed: int = 7):
+    """実力（正規分布）+ セッションごとの揺らぎで順位が決まるセッション列。"""
+    rng = np.random.default_rng(seed)
+    skill = rng.normal(0.0, 1.0, _PLAYERS)
+    # 参加頻度の偏り（常連ほど多く参加する）。Gumbel top-k で重み付きの非復元抽出をまとめて行う
+    log_w = np.log(rng.pareto(1.5, _PLAYERS) + 0.1)
+    for start in range(0, n, 500):
+        rows = min(500, n - start)
+        keys = log_w + rng.gumbel(size=(rows, _PLAYERS))
+        chosen = np.argpartition(-keys, _PER_SESSION, axis=1)[:, :_PER_SESSION]
+        perf = skill[chosen] + rng.normal(0.0, 1.0, chosen.shape)
+        ranks = np.argsort(np.argsort(-perf, axis=1), axis=1) + 1
+        for i in range(rows):
+            yield start + i, zip(chosen[i].tolist(), ranks[i].tolist())
+
+
+def main(n: int = 20_000) -> None:
+    t0 = time.perf_counter()
+    table = SessionTable.from_sessions(_make_sessions(n))
+    load_ms = (time.perf_counter() - t0) * 1000
+    print(f"sessions={len(table):,}  players={table.n_players:,}  generate+load {load_ms:.1f} ms")
+
+    for formula in (FixedTableFormula(), MultiplayerEloFormula()):
+        report = backtest(table, formula, min_games=3)
+        dist = report.distribution()
+        print(f"{formula.name:<12} {report.elapsed_ms:8.1f} ms ({report.elapsed_ms * 1000 / len(table):5.1f} us/session)  "
+              f"pairwise={report.pairwise_accuracy:.3f}  winner={report.winner_accuracy:.3f}  "
+              f"median={dist['percentiles']['50']:,.0f}  by_bin={dist['by_bin']}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
@@ -0,0 +1,70 @@
+# benchmarks/bench_notification_render.py
+# common/notification_templates.py のベンチマーク（参加者 5,000 人想定）
+# - 選考結果 DM をイベント 1 件分まとめて描画する時間
+# - 参考: 参加者ごとに本文を組み立ててカレンダー URL を生成していた従来方式
+#
+# 実行: cd discord_bot && python benchmarks/bench_notification_render.py [参加者数]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.calendar_utils import build_calendar_urls
+from common.notification_templates import render_event_notifications
+
+_EVENT = {"id": 1, "title": "淡路帝国 夏祭り", "fee": 1500,
+          "event_date": "2026-08-01 18:00:00", "end_date": None, "location": "淡路島"}
+_SESSIONS = [
+    {"id": 100 + i, "name": f"第{i + 1}部", "event_date": f"2026-08-0{i + 1} 10:00:00",
+     "end_date": None, "location": f"会場{i}"}
+    for i in range(4)
+]
+
+
+def _make_participants(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    approvals = ["accepted"] * 6 + ["rejected", "waitlist"]
+    return [
+        {"id": i, "user_id": 10**17 + i, "approval": rng.choice(approvals),
+         "session_id": rng.choice(_SESSIONS)["id"], "access_token": f"{i:032x}", "notified_at": None}
+        for i in range(n)
+    ]
+
+
+def _legacy(participants):
+    """参加者ごとに本文を組み立てる従来方式（部ありの承認通知のみ）。"""
+    sessions = {s["id"]: s for s in _SESSIONS}
+    out = []
+    for p in participants:
+        if p["approval"] != "accepted":
+            continue
+        sess = sessions[p["session_id"]]
+        cal = build_calendar_urls(title=f"{_EVENT['title']} {sess['name']}", start_str=sess["event_date"],
+                                  end_str=sess["end_date"], location=sess["location"])
+        lines = [f"【{_EVENT['title']}】参加確定のお知らせ", "━━━", f"✅ {sess['name']} 参加確定",
+                 f"📅 {sess['event_date']}", f"📍 {sess['location']}", f"💴 参加費: {_EVENT['fee']}円", "",
+                 f"・Google: <{cal['google']}>", f"・Outlook: <{cal['outlook']}>",
+                 f"詳細確認: https://dash.example/event/confirm/{p['access_token']}"]
+        out.append("\n".join(lines))
+    return out
+
+
+def _time_ms(fn, rounds: int = 20) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - t0) * 1000 / rounds
+
+
+def main(n: int = 5_000) -> None:
+    participants = _make_participants(n)
+    msgs = render_event_notifications(_EVENT, _SESSIONS, participants, "https://dash.example")
+    print(f"participants={n:,}  messages={len(msgs):,}")
+    print(f"render_event_notifications {_time_ms(lambda: render_event_notifications(_EVENT, _SESSIONS, participants, 'https://dash.example')):8.2f} ms")
+    print(f"legacy per-participant     {_time_ms(lambda: _legacy(participants)):8.2f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
@@ -0,0 +1,76 @@
+# benchmarks/bench_session_assignment.py
+# common/session_assignment.py のベンチマーク（応募 5,000 人・6 部想定）
+# - 最小費用流による割り当ての計算時間と結果（確定数・希望順位の内訳）
+# - 参考: 応募順に「希望順 → 空いている部」と埋める従来方式（Bridge の auto_assign 相当）
+#
+# 実行: cd discord_bot && python benchmarks/bench_session_assignment.py [応募者数]
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.session_assignment import parse_preferences, plan_assignment
+
+_N_SESSIONS = 6
+
+
+def _make_event(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    sessions = [{"id": 100 + i, "capacity": n // (_N_SESSIONS + 2)} for i in range(_N_SESSIONS)]
+    # 人気の偏り（前半の部ほど希望が多い）
+    weights = [2 ** (_N_SESSIONS - i) for i in range(_N_SESSIONS)]
+    participants = []
+    for i in range(n):
+        k = rng.randint(1, 3)
+        prefs = []
+        while len(prefs) < k:
+            sid = rng.choices(sessions, weights)[0]["id"]
+            if sid not in prefs:
+                prefs.append(sid)
+        participants.append({"id": i + 1, "approval": "pending", "session_id": None,
+                             "preferred_session_ids": json.dumps(prefs)})
+    return sessions, participants
+
+
+def _legacy(sessions, participants):
+    """応募順の貪欲割り当て。(確定数, 希望順位の内訳) を返す。"""
+    used = {s["id"]: 0 for s in sessions}
+    cap = {s["id"]: s["capacity"] for s in sessions}
+    by_rank = {}
+    accepted = 0
+    for p in participants:
+        prefs = parse_preferences(p["preferred_session_ids"])
+        chosen = next((sid for sid in prefs if used[sid] < cap[sid]), None)
+        rank = prefs.index(chosen) + 1 if chosen is not None else "other"
+        if chosen is None:
+            chosen = next((sid for sid in cap if used[sid] < cap[sid]), None)
+        if chosen is None:
+            continue
+        used[chosen] += 1
+        accepted += 1
+        by_rank[str(rank)] = by_rank.get(str(rank), 0) + 1
+    return accepted, by_rank
+
+
+def main(n: int = 5_000) -> None:
+    sessions, participants = _make_event(n)
+
+    t0 = time.perf_counter()
+    plan = plan_assignment(sessions, participants)
+    elapsed = (time.perf_counter() - t0) * 1000
+    summary = plan.summary()
+
+    t0 = time.perf_counter()
+    legacy_accepted, legacy_by_rank = _legacy(sessions, participants)
+    legacy_elapsed = (time.perf_counter() - t0) * 1000
+
+    print(f"applicants={n:,}  sessions={_N_SESSIONS}  seats={sum(s['capacity'] for s in sessions):,}")
+    print(f"min-cost flow  {elapsed:8.2f} ms  accepted={summary['accepted']:,}  by_rank={dict(sorted(summary['by_rank'].items()))}")
+    print(f"legacy greedy  {legacy_elapsed:8.2f} ms  accepted={legacy_accepted:,}  by_rank={dict(sorted(legacy_by_rank.items()))}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5_000)
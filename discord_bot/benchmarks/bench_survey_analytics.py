@@ -0,0 +1,63 @@
+# benchmarks/bench_survey_analytics.py
+# common/survey_analytics.py のベンチマーク（回答 50,000 件想定）
+# - 列指向テーブル（選択肢ごとのビットマップ）の構築時間
+# - 絞り込み・全問集計・クロス集計のレイテンシ
+#
+# 実行: cd discord_bot && python benchmarks/bench_survey_analytics.py [回答数]
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.survey_analytics import ResponseTable
+from common.survey_utils import compile_questions
+
+_QUESTIONS = [
+    {"text": "名前", "type": "text"},
+    {"text": "所属", "type": "radio", "options": [f"部署{i}" for i in range(8)], "has_other": True},
+    {"text": "参加回数", "type": "radio", "options": ["初めて", "2-3 回", "4 回以上"]},
+    {"text": "興味のある企画", "type": "checkbox", "options": [f"企画{i}" for i in range(12)]},
+    {"text": "満足度", "type": "radio", "options": ["1", "2", "3", "4", "5"]},
+]
+
+
+def _make_answers(n: int, seed: int = 7):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "0": f"user{i}",
+            "1": rng.choice(_QUESTIONS[1]["options"] + ["その他の部署"]),
+            "2": rng.choice(_QUESTIONS[2]["options"]),
+            "3": rng.sample(_QUESTIONS[3]["options"], rng.randint(0, 4)),
+            "4": rng.choice(_QUESTIONS[4]["options"]),
+        }
+
+
+def _time_ms(fn, rounds: int = 50) -> float:
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - t0) * 1000 / rounds
+
+
+def main(n: int = 50_000) -> None:
+    schema = compile_questions(json.dumps(_QUESTIONS, ensure_ascii=False))
+    answers = list(_make_answers(n))
+
+    t0 = time.perf_counter()
+    table = ResponseTable(schema, answers)
+    print(f"responses={table.size:,}  build={(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    filters = {"1": ["部署0", "部署3"], "3": ["企画5"]}
+    print(f"filter_mask         {_time_ms(lambda: table.filter_mask(filters)):8.3f} ms")
+    mask = table.filter_mask(filters)
+    print(f"counts (filtered)   {_time_ms(lambda: table.counts(mask)):8.3f} ms")
+    print(f"crosstab Q2 x Q4    {_time_ms(lambda: table.crosstab('1', '3')):8.3f} ms")
+    print(f"crosstab filtered   {_time_ms(lambda: table.crosstab('2', '4', mask)):8.3f} ms")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,64 @@
+# benchmarks/bench_tournament_export.py
+# common/tournament_export.py のベンチマーク（架空の 20,000 試合・1 試合 8 件のスコア）
+# - ページ（500 試合）ごとに変換して捨てる場合の変換速度と最大メモリ（tracemalloc。時間は計測を外して測る）
+# - 比較: 全試合を一度に持ってから 1 つの文字列に変換する場合の最大メモリ
+#
+# 実行: cd discord_bot && python benchmarks/bench_tournament_export.py [試合数]
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.tournament_export import EXPORT_FORMATS, encode_header, encode_records, match_records
+
+_PAGE = 500
+_PLAYERS = 4_000
+_SCORES = 8
+
+
+def _page(start: int, size: int):
+    return [{
+        "match_id": i, "round_num": i % 12 + 1, "match_index": i, "status": "finished",
+        "player1_id": str(10**17 + i % _PLAYERS), "player2_id": str(10**17 + (i * 7) % _PLAYERS),
+        "winner_id": str(10**17 + i % _PLAYERS), "score1": 2, "score2": 1,
+        "scores": [{"user_id": str(10**17 + (i + k) % _PLAYERS), "position": k + 1, "points": 10 - k,
+                    "status": "approved"} for k in range(_SCORES)],
+    } for i in range(start, start + size)]
+
+
+def main(n: int = 20_000) -> None:
+    names = {str(10**17 + i): f"player{i}" for i in range(_PLAYERS)}
+    print(f"matches={n:,} scores/match={_SCORES}")
+    for fmt in EXPORT_FORMATS:
+
+        def paged() -> int:
+            size = len(encode_header(fmt))
+            for start in range(0, n, _PAGE):
+                size += len(encode_records(fmt, match_records(_page(start, min(_PAGE, n - start)), names.get)))
+            return size
+
+        t0 = time.perf_counter()
+        size = paged()
+        elapsed = time.perf_counter() - t0
+
+        tracemalloc.start()
+        paged()
+        _, paged_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        everything = _page(0, n)
+        whole = encode_header(fmt) + encode_records(fmt, match_records(everything, names.get))
+        _, whole_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(whole) == size
+        del everything, whole
+
+        print(f"{fmt:<6} {size / 1e6:7.1f} MB out  {elapsed:6.2f} s  "
+              f"{n * (_SCORES + 1) / elapsed / 1e3:7.1f} k rows/s  "
+              f"peak paged {paged_peak / 1e6:6.1f} MB  vs all-at-once {whole_peak / 1e6:7.1f} MB")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
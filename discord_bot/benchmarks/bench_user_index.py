@@ -0,0 +1,57 @@
+# benchmarks/bench_user_index.py
+# common/user_index.py のベンチマーク（50,000 ユーザー想定）
+# - 索引構築時間
+# - 検索レイテンシ（ラテン文字 / ひらがな / カタカナ / 1 文字クエリ）
+#
+# 実行: cd discord_bot && python benchmarks/bench_user_index.py [ユーザー数]
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.user_index import UserIndex
+
+_LATIN = ["taro", "hanako", "ken", "yuki", "awaji", "shadow", "neo", "sakura", "ryu", "mika"]
+_KANA = ["たろう", "はなこ", "サクラ", "ユウキ", "あわじ", "ケン", "みか", "リュウ", "ﾀﾛｳ", "ひょういばな"]
+_KANJI = ["淡路", "太郎", "花子", "帝国", "技術部", "勇気", "桜"]
+_QUERIES = ["ta", "taro", "awaji_", "たろ", "タロウ", "ゆうき", "淡路", "帝国", "sh", "k", "zzzz"]
+
+
+def _make_users(n: int, seed: int = 42):
+    rng = random.Random(seed)
+    parts = _LATIN + _KANA + _KANJI
+    users = []
+    for i in range(n):
+        name = rng.choice(parts) + rng.choice(["", "_", " ", "・"]) + rng.choice(parts)
+        if rng.random() < 0.5:
+            name += str(rng.randint(0, 9999))
+        users.append((str(10**17 + i), name))
+    return users
+
+
+def main(n: int = 50_000, rounds: int = 200) -> None:
+    users = _make_users(n)
+
+    t0 = time.perf_counter()
+    index = UserIndex(users)
+    build_ms = (time.perf_counter() - t0) * 1000
+    print(f"users={len(index):,}  build={build_ms:.1f} ms")
+
+    print(f"{'query':<10} {'hits':>5} {'p50 (µs)':>10} {'p95 (µs)':>10}")
+    for q in _QUERIES:
+        samples = []
+        hits = 0
+        for _ in range(rounds):
+            t0 = time.perf_counter()
+            hits = len(index.search(q, limit=20))
+            samples.append((time.perf_counter() - t0) * 1_000_000)
+        samples.sort()
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(f"{q:<10} {hits:>5} {statistics.median(samples):>10.1f} {p95:>10.1f}")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
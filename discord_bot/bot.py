@@ -129,8 +129,13 @@ async def on_ready():
         if mass_mute_cog:
             asyncio.create_task(mass_mute_cog.execute_mute_logic("Startup/Reconnected"))
 
-    # --- 3. イベント締切スケジューラー起動 ---
-    asyncio.create_task(_event_deadline_scheduler())
+    # --- 3. イベント締切スケジューラー・通知 Outbox ワーカー・称号ロールの整合を起動（再接続時は起動し直さない） ---
+    global _event_tasks_started
+    if not _event_tasks_started:
+        _event_tasks_started = True
+        asyncio.create_task(_event_deadline_scheduler())
+        asyncio.create_task(_notification_outbox_worker())
+        asyncio.create_task(_title_role_reconciler())
 
     # --- 4. ギルドメンバーの氏名簿を一括同期（起動時1回） ---
     global _members_synced
@@ -141,6 +146,12 @@ async def on_ready():
 
 # 起動時のメンバー同期を一度だけ行うためのフラグ（on_ready は再接続でも発火するため）
 _members_synced = False
+# 締切スケジューラー・Outbox ワーカーも同様に一度だけ起動する
+_event_tasks_started = False
+# 通知 Outbox の再送確認の間隔（秒）。再試行の最短間隔（30 秒）に合わせる
+OUTBOX_POLL_SECONDS = 30
+# 称号ロールの整合（DB の称号とギルドのロールの差分同期）の間隔（秒）
+TITLE_ROLE_RECONCILE_SECONDS = 6 * 60 * 60
 
 
 async def _sync_guild_members() -> int:
@@ -198,102 +209,103 @@ async def sync_members(interaction: discord.Interaction):
 
 
 async def _event_deadline_scheduler():
-    """1分毎に締切済みイベントを処理する: auto_assign → closed → DM一斉送信。"""
+    """イベントの応募締切ちょうどに締切処理を実行する。
+    締切の待ち合わせは services/deadline_scheduler_service.py が担い、
+    Bridge からの変更通知（WebSocket）で締切の追加・変更に追随する。"""
     await bot.wait_until_ready()
+    from services.deadline_scheduler_service import DeadlineScheduler
+
+    scheduler = DeadlineScheduler(on_due=_process_deadline_events)
+    listener = asyncio.create_task(scheduler.listen_changes())
+    try:
+        await scheduler.run()
+    finally:
+        listener.cancel()
+
+
+async def _process_deadline_events(due_event_ids):
+    """締切済みイベントを処理する: auto_assign → closed → DM一斉送信。
+    締切を迎えたかどうかの最終判定は Bridge（/events/pending-deadline）に任せ、
+    取りこぼしていた締切済みイベントもまとめて処理する。"""
     from services.event_service import EventService
-    from services.notification_service import NotificationService
-    from common.calendar_utils import build_calendar_urls
+    from services.outbox_service import OutboxService
+    from common.notification_templates import render_event_notifications
 
     bot_token = os.getenv('DISCORD_TOKEN', '').strip() or None
+    print(f"[deadline_scheduler] Deadline reached: event_ids={due_event_ids}")
+
+    try:
+        events = await EventService.get_events_past_deadline()
+        for ev in events:
+            event_id = ev['id']
+            print(f"[deadline_scheduler] Processing event_id={event_id} title={ev['title']}")
+
+            await EventService.auto_assign(event_id)
+            await EventService.update_status(event_id, 'closed')
+
+            result   = await EventService.get_event(event_id)
+            sessions = result['sessions'] if result else []
+            participants = await EventService.list_participants(event_id)
+
+            # 締切で選考が確定するため、補欠のままの応募者にはお断りを通知する
+            messages = render_event_notifications(
+                ev, sessions, participants, DASHBOARD_URL, waitlist_as_rejected=True,
+            )
+
+            # Outbox に積んでから送る。送れなかった分は _notification_outbox_worker が再送する
+            await OutboxService.enqueue(event_id, messages)
+            report = await OutboxService.drain(bot_token, event_id=event_id)
+            print(
+                f"[deadline_scheduler] event_id={event_id} DM sent={report['sent']} "
+                f"failed={report['failed']}"
+            )
+
+    except Exception as e:
+        print(f"[deadline_scheduler] error: {e}")
 
+
+async def _notification_outbox_worker():
+    """通知 Outbox の未送信分（再試行待ち・送信中に停止したもの）を定期的に送る。"""
+    await bot.wait_until_ready()
+    from services.outbox_service import OutboxService
+
+    bot_token = os.getenv('DISCORD_TOKEN', '').strip() or None
     while not bot.is_closed():
         try:
-            events = await EventService.get_events_past_deadline()
-            for ev in events:
-                event_id = ev['id']
-                print(f"[deadline_scheduler] Processing event_id={event_id} title={ev['title']}")
-
-                await EventService.auto_assign(event_id)
-                await EventService.update_status(event_id, 'closed')
-
-                result   = await EventService.get_event(event_id)
-                sessions = {s['id']: s for s in result['sessions']} if result else {}
-                participants = await EventService.list_participants(event_id)
-
-                for p in participants:
-                    if p.get('notified_at'):
-                        continue
-
-                    sess = sessions.get(p.get('session_id'))
-                    confirm_url = f"{DASHBOARD_URL}/event/confirm/{p['access_token']}"
-
-                    if p['approval'] == 'accepted':
-                        if sess:
-                            cal = build_calendar_urls(
-                                title=f"{ev['title']} {sess['name']}",
-                                start_str=sess.get('event_date'),
-                                end_str=sess.get('end_date'),
-                                location=sess.get('location'),
-                            )
-                            lines = [
-                                f"【{ev['title']}】参加確定のお知らせ",
-                                '━━━━━━━━━━━━━━━',
-                                f"✅ {sess['name']} 参加確定",
-                            ]
-                            if sess.get('event_date'):
-                                lines.append(f"📅 {sess['event_date']}")
-                            if sess.get('location'):
-                                lines.append(f"📍 {sess['location']}")
-                        else:
-                            cal = build_calendar_urls(
-                                title=ev['title'],
-                                start_str=ev.get('event_date'),
-                                end_str=ev.get('end_date'),
-                                location=ev.get('location'),
-                            )
-                            lines = [
-                                f"【{ev['title']}】参加確定のお知らせ",
-                                '━━━━━━━━━━━━━━━',
-                                '✅ 参加確定',
-                            ]
-                            if ev.get('event_date'):
-                                lines.append(f"📅 {ev['event_date']}")
-                            if ev.get('location'):
-                                lines.append(f"📍 {ev['location']}")
-                        if ev.get('fee'):
-                            lines.append(f"💴 参加費: {ev['fee']}円")
-                        lines += [
-                            '',
-                            '📆 カレンダーに追加:',
-                            f"・Google: {cal['google']}",
-                            f"・Outlook: {cal['outlook']}",
-                            '━━━━━━━━━━━━━━━',
-                            f'詳細確認: {confirm_url}',
-                        ]
-                        message = '\n'.join(lines)
-
-                    elif p['approval'] in ('rejected', 'waitlist'):
-                        message = (
-                            f"【{ev['title']}】参加について\n"
-                            "申し訳ございませんが、今回は参加をお断りさせていただきます。\n"
-                            "またの機会にぜひご参加ください。"
-                        )
-                    else:
-                        continue
-
-                    if bot_token:
-                        ok = await NotificationService.send_dm_raw(
-                            bot_token=bot_token,
-                            user_id=str(p['user_id']),
-                            message=message,
-                        )
-                        if ok:
-                            await EventService.mark_notified(p['id'])
-
+            report = await OutboxService.drain(bot_token)
+            if report['claimed']:
+                print(f"[outbox_worker] sent={report['sent']} failed={report['failed']}")
         except Exception as e:
-            print(f"[deadline_scheduler] error: {e}")
+            print(f"[outbox_worker] error: {e}")
+        await asyncio.sleep(OUTBOX_POLL_SECONDS)
+
 
-        await asyncio.sleep(60)
+async def _title_role_reconciler():
+    """称号ロールを定期的に DB の状態（装備中の称号）に合わせる。
+    メンバーのロールはゲートウェイのキャッシュから渡すため、差分の付け外し以外の REST 呼び出しは
+    ロール一覧の取得のみ。"""
+    await bot.wait_until_ready()
+    from services.title_role_reconciler import TitleRoleReconciler
+
+    if not DISCORD_GUILD_ID:
+        print("[title_roles] DISCORD_GUILD_ID 未設定のためスキップ")
+        return
+    while not bot.is_closed():
+        try:
+            guild = bot.get_guild(int(DISCORD_GUILD_ID))
+            if guild is not None and not guild.chunked:
+                await guild.chunk()
+            if guild is not None:
+                members = {
+                    str(m.id): [str(r.id) for r in m.roles]
+                    for m in guild.members if not m.bot
+                }
+                report = await TitleRoleReconciler.reconcile(DISCORD_GUILD_ID, members=members)
+                if report and (report.get("applied") or report.get("failed")):
+                    print(f"[title_roles] {report['summary']} applied={report['applied']} failed={report['failed']}")
+        except Exception as e:
+            print(f"[title_roles] error: {e}")
+        await asyncio.sleep(TITLE_ROLE_RECONCILE_SECONDS)
 
 
 if __name__ == '__main__':
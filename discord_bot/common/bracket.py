@@ -0,0 +1,449 @@
+# common/bracket.py
+# Why: ロビーの大会は bracket_format / wins_required を受け付けるだけで、組み合わせを作る・
+#      勝ち上がりを進める処理が無く、最終承認では round_num で並べた最後の試合の勝者を
+#      優勝者と推測していた（総当たりや未決着の決勝では誤る）。
+#
+# 方式:
+#   - シングル / ダブルイリミネーション: 参加者数以上の 2 の冪の枠に標準シード順
+#     （1-8, 4-5, 2-7, 3-6 ...）で配置し、空き枠は上位シードの不戦勝にする。
+#     作成時に各試合の「勝者の行き先」「敗者の行き先」（試合, 枠）を決めておき、
+#     結果 1 件の反映は行き先の枠に書き込むだけの O(1)（不戦勝の連鎖のみ追加で進める）。
+#     ダブルイリミネーションは敗者側で直前の勝者側の対戦相手と当たりにくいよう逆順に落とし、
+#     グランドファイナルで敗者側の勝者が勝った場合のみリセット戦を行う。
+#   - 総当たり: サークル方式（奇数人数は毎回 1 人休み）。
+#   - スイス式: 1 回戦は上位半分と下位半分を当て、以降は勝数順に未対戦の相手と組む（貪欲）。
+#     ラウンドの最後の結果が入った時点で次のラウンドを組む。奇数人数は下位から未取得の人に不戦勝。
+#   to_rows() は tournament_matches の列の形で返す（match_id / next_match_id は
+#   この組み合わせ内の通し番号。保存時に DB の ID へ読み替える）。
+#   I/O を持たないため common/ に配置する。
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+SINGLE_ELIMINATION = 'single_elimination'
+DOUBLE_ELIMINATION = 'double_elimination'
+ROUND_ROBIN = 'round_robin'
+SWISS = 'swiss'
+BRACKET_FORMATS = (SINGLE_ELIMINATION, DOUBLE_ELIMINATION, ROUND_ROBIN, SWISS)
+
+# BracketMatch.bracket
+WINNERS = 'winners'
+LOSERS = 'losers'
+GRAND_FINAL = 'grand_final'
+
+# BracketMatch.status。skipped は不戦勝・不要になったリセット戦（DB 上は finished）
+WAITING = 'waiting'
+FINISHED = 'finished'
+SKIPPED = 'skipped'
+
+Slot = Tuple[int, int]  # (試合の key, 枠 0/1)
+
+
+@dataclass
+class BracketMatch:
+    """組み合わせ内の 1 試合。key は 1 始まりの通し番号。"""
+    key: int
+    bracket: str
+    round_num: int
+    match_index: int
+    win_condition: int = 1
+    players: List[Optional[int]] = field(default_factory=lambda: [None, None])
+    # 枠が前の試合の結果待ちか（False で players が None なら不戦勝の空き枠）
+    pending: List[bool] = field(default_factory=lambda: [False, False])
+    scores: List[int] = field(default_factory=lambda: [0, 0])
+    winner_id: Optional[int] = None
+    loser_id: Optional[int] = None
+    status: str = WAITING
+    next_win: Optional[Slot] = None
+    next_lose: Optional[Slot] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status != WAITING
+
+    @property
+    def ready(self) -> bool:
+        """両者が揃って結果を待っているか。"""
+        return self.status == WAITING and not any(self.pending) and None not in self.players
+
+
+def seed_order(size: int) -> List[int]:
+    """2 の冪 size の標準シード順（1 始まり）。上位シードほど決勝まで当たらない。"""
+    order = [1]
+    while len(order) < size:
+        n = len(order) * 2
+        order = [s for seed in order for s in (seed, n + 1 - seed)]
+    return order
+
+
+class Bracket:
+    """大会の組み合わせと進行状態。
+
+    players は強い順（シード順）の user_id。結果は report() で 1 件ずつ反映する。
+    """
+
+    def __init__(self, fmt: str, players: Sequence[int], *, win_condition: int = 1,
+                 swiss_rounds: Optional[int] = None):
+        if fmt not in BRACKET_FORMATS:
+            raise ValueError(f"unknown bracket format: {fmt}")
+        players = list(players)
+        if not players:
+            raise ValueError("bracket needs at least one player")
+        if len(set(players)) != len(players):
+            raise ValueError("duplicate player in bracket")
+        self.format = fmt
+        self.players = players
+        self.win_condition = max(1, int(win_condition))
+        self.matches: List[BracketMatch] = []
+        self._seed = {p: i for i, p in enumerate(players)}
+        self._open = 0
+        self._final_key: Optional[int] = None
+        self._grand_final_key: Optional[int] = None
+        # スイス式
+        self._round = 0
+        self._round_open = 0
+        self._total_rounds = 0
+        self._met: Dict[int, set] = {}
+        self._had_bye: set = set()
+
+        if fmt == SINGLE_ELIMINATION:
+            self._build_elimination(double=False)
+        elif fmt == DOUBLE_ELIMINATION:
+            self._build_elimination(double=True)
+        elif fmt == ROUND_ROBIN:
+            self._build_round_robin()
+        else:
+            n = len(players)
+            self._total_rounds = swiss_rounds or max(1, (n - 1).bit_length())
+            self._met = {p: set() for p in players}
+            self._pair_swiss_round()
+
+    # ------------------------------------------------------------
+    # 作成
+    # ------------------------------------------------------------
+
+    def _add(self, bracket: str, round_num: int, match_index: int) -> BracketMatch:
+        m = BracketMatch(len(self.matches) + 1, bracket, round_num, match_index, self.win_condition)
+        self.matches.append(m)
+        self._open += 1
+        return m
+
+    def _build_elimination(self, *, double: bool) -> None:
+        n = len(self.players)
+        size = 1 << max(1, (n - 1).bit_length())
+        k = size.bit_length() - 1
+        slots = [self.players[s - 1] if s <= n else None for s in seed_order(size)]
+
+        wb: List[List[BracketMatch]] = []
+        for r in range(1, k + 1):
+            wb.append([self._add(WINNERS, r, i + 1) for i in range(size >> r)])
+        for i, m in enumerate(wb[0]):
+            m.players = [slots[2 * i], slots[2 * i + 1]]
+        for r in range(1, k):
+            for i, m in enumerate(wb[r]):
+                m.pending = [True, True]
+            for i, m in enumerate(wb[r - 1]):
+                m.next_win = (wb[r][i // 2].key, i % 2)
+        self._final_key = wb[-1][0].key
+
+        if double:
+            self._build_losers(wb, size, k)
+
+        for m in wb[0]:
+            self._settle(m)
+
+    def _build_losers(self, wb: List[List[BracketMatch]], size: int, k: int) -> None:
+        lb: List[List[BracketMatch]] = []
+        for j in range(1, 2 * (k - 1) + 1):
+            count = size >> (j // 2 + 1) if j % 2 == 0 else size >> ((j + 1) // 2 + 1)
+            lb.append([self._add(LOSERS, j, i + 1) for i in range(count)])
+            for m in lb[-1]:
+                m.pending = [True, True]
+
+        if lb:
+            # 勝者側 1 回戦の敗者同士
+            for i, m in enumerate(wb[0]):
+                m.next_lose = (lb[0][i // 2].key, i % 2)
+            for j in range(1, len(lb)):
+                prev, cur = lb[j - 1], lb[j]
+                if j % 2 == 1:
+                    # 偶数ラウンド: 敗者側の勝者（枠 0）と勝者側から落ちてきた敗者（枠 1、逆順）
+                    for i, m in enumerate(prev):
+                        m.next_win = (cur[i].key, 0)
+                    drop = wb[(j + 1) // 2]
+                    for i, m in enumerate(drop):
+                        m.next_lose = (cur[len(cur) - 1 - i].key, 1)
+                else:
+                    for i, m in enumerate(prev):
+                        m.next_win = (cur[i // 2].key, i % 2)
+
+        gf1 = self._add(GRAND_FINAL, 1, 1)
+        gf2 = self._add(GRAND_FINAL, 2, 1)
+        gf1.pending = [True, True]
+        gf2.pending = [True, True]
+        wb[-1][0].next_win = (gf1.key, 0)
+        if lb:
+            lb[-1][0].next_win = (gf1.key, 1)
+        else:
+            wb[-1][0].next_lose = (gf1.key, 1)
+        # リセット戦への送り出しは _finish() で行う（next_win は to_rows() の next_match_id 用）
+        gf1.next_win = (gf2.key, 0)
+        self._grand_final_key = gf1.key
+        self._final_key = gf2.key
+
+    def _build_round_robin(self) -> None:
+        ps: List[Optional[int]] = list(self.players)
+        if len(ps) % 2:
+            ps.append(None)
+        m = len(ps)
+        for r in range(1, m):
+            index = 0
+            for i in range(m // 2):
+                a, b = ps[i], ps[m - 1 - i]
+                if a is None or b is None:
+                    continue
+                index += 1
+                match = self._add(ROUND_ROBIN, r, index)
+                match.players = [a, b] if self._seed[a] < self._seed[b] else [b, a]
+            ps = [ps[0], ps[-1]] + ps[1:-1]
+
+    def _pair_swiss_round(self) -> List[int]:
+        """スイス式の次のラウンドを組む。作成した試合の key を返す。"""
+        self._round += 1
+        r = self._round
+        if r == 1:
+            half = (len(self.players) + 1) // 2
+            order = list(self.players)
+            pairs = [(order[i], order[i + half]) for i in range(len(order) - half)]
+            bye = order[half - 1] if len(order) % 2 else None
+        else:
+            table = {row['player_id']: row for row in self.standings()}
+            order = sorted(self.players, key=lambda p: (-table[p]['wins'], -table[p]['score_diff'], self._seed[p]))
+            bye = None
+            if len(order) % 2:
+                bye = next((p for p in reversed(order) if p not in self._had_bye), order[-1])
+                order.remove(bye)
+            pairs = []
+            rest = order
+            while rest:
+                a = rest[0]
+                # 未対戦の相手のうち最上位。全員と対戦済みなら直下
+                b = next((p for p in rest[1:] if p not in self._met[a]), rest[1])
+                pairs.append((a, b))
+                rest = [p for p in rest[1:] if p != b]
+
+        created = []
+        for index, (a, b) in enumerate(pairs, start=1):
+            m = self._add(SWISS, r, index)
+            m.players = [a, b]
+            self._met[a].add(b)
+            self._met[b].add(a)
+            created.append(m.key)
+        self._round_open = len(pairs)
+        if bye is not None:
+            m = self._add(SWISS, r, len(pairs) + 1)
+            m.players = [bye, None]
+            self._had_bye.add(bye)
+            created.append(m.key)
+            self._settle(m)
+        return created
+
+    # ------------------------------------------------------------
+    # 進行
+    # ------------------------------------------------------------
+
+    def match(self, key: int) -> BracketMatch:
+        if not 1 <= key <= len(self.matches):
+            raise KeyError(key)
+        return self.matches[key - 1]
+
+    def report(self, key: int, winner_id: int, score1: Optional[int] = None,
+               score2: Optional[int] = None) -> List[int]:
+        """試合結果を反映する。変更・作成された試合の key を返す（保存対象）。
+
+        Raises:
+            ValueError: 対戦者が揃っていない / 決着済み / 勝者が対戦者でない / スコアが勝利条件に合わない
+        """
+        m = self.match(key)
+        if not m.ready:
+            raise ValueError(f"match {key} is not ready")
+        if winner_id not in m.players:
+            raise ValueError(f"{winner_id} is not a player of match {key}")
+        if score1 is not None or score2 is not None:
+            s = [int(score1 or 0), int(score2 or 0)]
+            w = m.players.index(winner_id)
+            if s[w] < self.win_condition or s[w] <= s[1 - w]:
+                raise ValueError(f"score {s[0]}-{s[1]} does not decide match {key}")
+            m.scores = s
+        loser_id = m.players[1 - m.players.index(winner_id)]
+        changed: List[int] = []
+        self._finish(m, winner_id, loser_id, FINISHED, changed)
+        return changed
+
+    def _finish(self, m: BracketMatch, winner: Optional[int], loser: Optional[int], status: str,
+                changed: List[int]) -> None:
+        m.winner_id, m.loser_id, m.status = winner, loser, status
+        self._open -= 1
+        changed.append(m.key)
+
+        if m.key == self._grand_final_key:
+            # グランドファイナル: 勝者側の勝者が勝てばリセット戦は行わない
+            reset = self.matches[self._final_key - 1]
+            reset.players = list(m.players)
+            reset.pending = [False, False]
+            if winner == m.players[0]:
+                self._finish(reset, winner, loser, SKIPPED, changed)
+            else:
+                changed.append(reset.key)
+            return
+
+        if m.next_win:
+            self._place(m.next_win, winner, changed)
+        if m.next_lose:
+            self._place(m.next_lose, loser, changed)
+
+        if m.bracket == SWISS and m.players[1] is not None:
+            self._round_open -= 1
+            if self._round_open == 0 and self._round < self._total_rounds:
+                changed.extend(self._pair_swiss_round())
+
+    def _place(self, slot: Slot, player: Optional[int], changed: List[int]) -> None:
+        target = self.matches[slot[0] - 1]
+        target.players[slot[1]] = player
+        target.pending[slot[1]] = False
+        changed.append(target.key)
+        self._settle(target, changed)
+
+    def _settle(self, m: BracketMatch, changed: Optional[List[int]] = None) -> None:
+        """空き枠のある試合を不戦勝で決着させる（両方空きなら「勝者なし」を先へ送る）。"""
+        if m.status != WAITING or any(m.pending) or None not in m.players:
+            return
+        present = [p for p in m.players if p is not None]
+        self._finish(m, present[0] if present else None, None, SKIPPED,
+                     changed if changed is not None else [])
+
+    # ------------------------------------------------------------
+    # 結果
+    # ------------------------------------------------------------
+
+    @property
+    def is_finished(self) -> bool:
+        if self.format == SWISS:
+            return self._open == 0 and self._round >= self._total_rounds
+        return self._open == 0
+
+    def standings(self) -> List[Dict[str, Any]]:
+        """勝数 → 得失点差 → シード順の順位表（総当たり・スイス式用。不戦勝は 1 勝）。"""
+        table = {p: {'player_id': p, 'wins': 0, 'losses': 0, 'score_diff': 0} for p in self.players}
+        for m in self.matches:
+            if not m.done or m.winner_id is None:
+                continue
+            table[m.winner_id]['wins'] += 1
+            if m.loser_id is not None:
+                table[m.loser_id]['losses'] += 1
+                w = m.players.index(m.winner_id)
+                diff = m.scores[w] - m.scores[1 - w]
+                table[m.winner_id]['score_diff'] += diff
+                table[m.loser_id]['score_diff'] -= diff
+        return sorted(table.values(), key=lambda r: (-r['wins'], -r['score_diff'], self._seed[r['player_id']]))
+
+    def champion(self) -> Optional[int]:
+        """優勝者。未確定なら None。"""
+        if not self.is_finished:
+            return None
+        if self._final_key is not None:
+            return self.matches[self._final_key - 1].winner_id
+        return self.standings()[0]['player_id']
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """tournament_matches の列の形（+ bracket）で返す。"""
+        return [{
+            'match_id': m.key,
+            'round_num': m.round_num,
+            'match_index': m.match_index,
+            'bracket': m.bracket,
+            'player1_id': m.players[0],
+            'player2_id': m.players[1],
+            'winner_id': m.winner_id,
+            'status': WAITING if m.status == WAITING else FINISHED,
+            'next_match_id': m.next_win[0] if m.next_win else None,
+            'score1': m.scores[0],
+            'score2': m.scores[1],
+            'win_condition': m.win_condition,
+        } for m in self.matches]
+
+
+def build_bracket(fmt: str, players: Sequence[int], *, win_condition: int = 1,
+                  swiss_rounds: Optional[int] = None) -> Bracket:
+    return Bracket(fmt, players, win_condition=win_condition, swiss_rounds=swiss_rounds)
+
+
+def _is_knockout(rows: List[Mapping[str, Any]]) -> bool:
+    """ラウンド 2 以降の対戦者が全員、前のラウンドの勝者か（勝ち上がり式の表か）。"""
+    winners: Dict[int, set] = {}
+    for r in rows:
+        if r.get('winner_id') is not None:
+            winners.setdefault(r.get('round_num') or 0, set()).add(r['winner_id'])
+    for r in rows:
+        round_num = r.get('round_num') or 0
+        if round_num <= 1:
+            continue
+        for p in (r.get('player1_id'), r.get('player2_id')):
+            if p is not None and p not in winners.get(round_num - 1, ()):
+                return False
+    return True
+
+
+def resolve_champion(rows: Iterable[Mapping[str, Any]]) -> Optional[int]:
+    """tournament_matches の行から優勝者を求める。未確定・判定できなければ None。
+
+    - next_match_id で繋がっていれば、行き先の無い唯一の試合（決勝 / リセット戦）の勝者
+    - 勝ち上がり式の表なら、最終ラウンドの唯一の試合の勝者
+    - 総当たり・スイス式は全試合の決着後に勝数 → 得失点差で単独首位の人
+    """
+    rows = list(rows)
+    if not rows:
+        return None
+    if any(r.get('next_match_id') for r in rows):
+        terminals = [r for r in rows if not r.get('next_match_id')]
+        if len(terminals) == 1:
+            t = terminals[0]
+            return t.get('winner_id') if t.get('status') == FINISHED else None
+
+    kinds = {r.get('bracket') for r in rows}
+    if kinds & {ROUND_ROBIN, SWISS}:
+        league = True
+    elif kinds <= {None}:
+        league = not _is_knockout(rows)
+    else:
+        league = False
+    if not league:
+        last_round = max(r.get('round_num') or 0 for r in rows)
+        finals = [r for r in rows if (r.get('round_num') or 0) == last_round]
+        if len(finals) != 1:
+            return None
+        return finals[0].get('winner_id') if finals[0].get('status') == FINISHED else None
+
+    if any(r.get('status') != FINISHED for r in rows):
+        return None
+    wins: Dict[int, int] = {}
+    diff: Dict[int, int] = {}
+    for r in rows:
+        p1, p2, w = r.get('player1_id'), r.get('player2_id'), r.get('winner_id')
+        for p in (p1, p2):
+            if p is not None:
+                wins.setdefault(p, 0)
+                diff.setdefault(p, 0)
+        if w is None:
+            continue
+        wins[w] = wins.get(w, 0) + 1
+        diff.setdefault(w, 0)
+        if p1 is not None and p2 is not None:
+            d = (r.get('score1') or 0) - (r.get('score2') or 0)
+            diff[p1] += d
+            diff[p2] -= d
+    if not wins:
+        return None
+    ranked = sorted(wins, key=lambda p: (-wins[p], -diff[p]))
+    if len(ranked) > 1 and (wins[ranked[0]], diff[ranked[0]]) == (wins[ranked[1]], diff[ranked[1]]):
+        return None
+    return ranked[0]
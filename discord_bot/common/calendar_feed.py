@@ -0,0 +1,179 @@
+# common/calendar_feed.py
+# Why: .ics のダウンロードは参加者・イベントを毎回 Bridge から取り直して組み立てていたが、
+#      カレンダーアプリは購読 URL を頻繁にポーリングする。イベント 1 件分の予定
+#      （部ごと + イベント本体）を内容のハッシュ（version）付きで保持し、
+#      (部, version) ごとに .ics 本文を一度だけ組み立てて使い回す。
+#      version は ETag に、version が変わった時刻は Last-Modified に使う。
+#      参加者の購読は承認・部の変更でも中身が変わるため、参加者の状態が変わった時刻が
+#      それより新しければ Last-Modified に使う（If-Modified-Since だけのクライアントが 304 のまま残らない）。
+#      UID は calendar_utils.event_uid で固定なので、変更はカレンダー側で上書きされる。
+#      I/O を持たないため common/ に配置し、取得とキャッシュは services/calendar_feed_service.py が担う。
+import hashlib
+import hmac
+import json
+from dataclasses import dataclass, replace
+from datetime import datetime
+from email.utils import format_datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .calendar_utils import build_ics_calendar, build_vevent, event_uid
+
+# 主催者向け（全部の予定）の本文キー
+ALL = 'all'
+
+
+@dataclass(frozen=True)
+class FeedEntry:
+    """予定 1 件（部 1 つ、または部制なしのイベント本体）。"""
+    uid: str
+    title: str
+    start: Optional[str]
+    end: Optional[str]
+    location: Optional[str]
+
+    def vevent(self, dtstamp: datetime) -> List[str]:
+        return build_vevent(
+            uid=self.uid,
+            title=self.title,
+            start_str=self.start,
+            end_str=self.end,
+            location=self.location,
+            dtstamp=dtstamp,
+        )
+
+
+@dataclass(frozen=True)
+class FeedDocument:
+    """配信する .ics 本文と条件付き GET 用のメタデータ。"""
+    body: str
+    etag: str
+    last_modified: datetime  # UTC（秒単位）
+
+    @property
+    def last_modified_http(self) -> str:
+        return format_datetime(self.last_modified, usegmt=True)
+
+    def is_not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[datetime]) -> bool:
+        """304 を返してよいか。If-None-Match があればそちらを優先する（RFC 9110）。"""
+        if if_none_match:
+            tags = {t.strip().removeprefix('W/') for t in if_none_match.split(',')}
+            return '*' in tags or self.etag in tags
+        if if_modified_since is not None:
+            return self.last_modified <= if_modified_since.replace(tzinfo=self.last_modified.tzinfo)
+        return False
+
+
+def feed_entries(event: Mapping[str, Any], sessions: Iterable[Mapping[str, Any]]) -> Dict[Optional[int], FeedEntry]:
+    """部 ID → 予定。部制なし / 部が未割り当ての参加者向けに None キーでイベント本体も持つ。"""
+    event_id = int(event['id'])
+    entries: Dict[Optional[int], FeedEntry] = {
+        None: FeedEntry(
+            uid=event_uid(event_id),
+            title=event['title'],
+            start=event.get('event_date'),
+            end=event.get('end_date'),
+            location=event.get('location'),
+        ),
+    }
+    for s in sessions:
+        entries[int(s['id'])] = FeedEntry(
+            uid=event_uid(event_id, s['id']),
+            title=f"{event['title']} {s['name']}",
+            start=s.get('event_date'),
+            end=s.get('end_date'),
+            location=s.get('location'),
+        )
+    return entries
+
+
+def feed_version(entries: Mapping[Optional[int], FeedEntry]) -> str:
+    """予定の内容のハッシュ。予定に関係しない項目（締切・定員等）の変更では変わらない。"""
+    payload = sorted(
+        ((-1 if k is None else k, e.uid, e.title, e.start, e.end, e.location) for k, e in entries.items()),
+        key=lambda t: t[0],
+    )
+    return hashlib.sha1(json.dumps(payload, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+
+class EventCalendar:
+    """イベント 1 件分の予定と、組み立て済みの .ics 本文。"""
+
+    __slots__ = ('event_id', 'title', 'entries', 'version', 'modified_at', 'checked_at', '_bodies')
+
+    def __init__(
+        self,
+        event: Mapping[str, Any],
+        sessions: Iterable[Mapping[str, Any]],
+        modified_at: datetime,
+        checked_at: float = 0.0,
+    ):
+        self.event_id = int(event['id'])
+        self.title = event['title']
+        self.entries = feed_entries(event, sessions)
+        self.version = feed_version(self.entries)
+        self.modified_at = modified_at.replace(microsecond=0)
+        self.checked_at = checked_at
+        self._bodies: Dict[Tuple[str, Any], FeedDocument] = {}
+
+    @property
+    def has_sessions(self) -> bool:
+        return len(self.entries) > 1
+
+    def _document(self, key: Tuple[str, Any], entries: List[FeedEntry]) -> FeedDocument:
+        doc = self._bodies.get(key)
+        if doc is None:
+            # DTSTAMP も version の時刻に固定し、同じ version なら本文をバイト単位で同じにする
+            stamp = self.modified_at.replace(tzinfo=None)
+            body = build_ics_calendar([e.vevent(stamp) for e in entries if e.start], name=self.title)
+            doc = FeedDocument(
+                body=body,
+                etag=f'"{self.version}-{key[0]}-{key[1]}"',
+                last_modified=self.modified_at,
+            )
+            self._bodies[key] = doc
+        return doc
+
+    def participant_document(
+        self, approval: str, session_id: Optional[int], changed_at: Optional[datetime] = None,
+    ) -> FeedDocument:
+        """参加者の購読用。承認済みなら割り当て部（なければイベント本体）、それ以外は予定なし。
+
+        changed_at（参加者の承認・部が変わった時刻）が予定の更新より新しければ Last-Modified をそちらにする。
+        """
+        if approval != 'accepted':
+            key: Tuple[str, Any] = ('none', None)
+            doc = self._document(key, [])
+        else:
+            entry = self.entries.get(session_id) or self.entries[None]
+            key = ('p', None if entry is self.entries[None] else session_id)
+            doc = self._document(key, [entry])
+        if changed_at is None:
+            return doc
+        changed_at = changed_at.replace(microsecond=0)
+        if changed_at <= doc.last_modified:
+            return doc
+        # 本文・ETag は共有のまま、Last-Modified だけ差し替えた版を (本文キー, 時刻) ごとに使い回す
+        stamped_key = (key[0], (key[1], changed_at))
+        stamped = self._bodies.get(stamped_key)
+        if stamped is None:
+            stamped = replace(doc, last_modified=changed_at)
+            self._bodies[stamped_key] = stamped
+        return stamped
+
+    def organizer_document(self) -> FeedDocument:
+        """主催者の購読用。部制ならすべての部、部制なしならイベント本体。"""
+        if self.has_sessions:
+            entries = [e for k, e in self.entries.items() if k is not None]
+        else:
+            entries = [self.entries[None]]
+        return self._document((ALL, None), entries)
+
+
+def organizer_feed_token(secret: str, event_id: int) -> str:
+    """主催者の購読 URL に載せる署名（ログイン不要で読めるため推測できない値にする）。"""
+    msg = f"event-calendar:{int(event_id)}".encode('utf-8')
+    return hmac.new(secret.encode('utf-8'), msg, hashlib.sha256).hexdigest()[:32]
+
+
+def verify_organizer_feed_token(secret: str, event_id: int, token: str) -> bool:
+    return hmac.compare_digest(organizer_feed_token(secret, event_id), token or '')
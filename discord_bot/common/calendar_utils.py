@@ -1,6 +1,7 @@
 # common/calendar_utils.py
 # カレンダー登録URL生成ユーティリティ。OAuthなし・URLパラメータのみで実現する。
 
+import hashlib
 from datetime import datetime, timedelta
 from urllib.parse import quote
 
@@ -92,35 +93,121 @@ def build_calendar_urls(
     }
 
 
-def build_ics(
+# ---- .ics（RFC 5545） ----
+
+_UID_DOMAIN = "awajiempire.net"
+_ICS_LINE_OCTETS = 75
+
+
+def event_uid(event_id: int, session_id: int | None = None) -> str:
+    """イベント（部）ごとに固定の UID。
+
+    同じ UID で配信し直すとカレンダー側は予定を重複させずに更新する。
+    """
+    part = f"session-{session_id}" if session_id is not None else "main"
+    return f"event-{event_id}-{part}@{_UID_DOMAIN}"
+
+
+def _ics_escape(text: str | None) -> str:
+    return (
+        (text or "")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """75 オクテットを超える行を折り返す（マルチバイト文字の途中では切らない）。"""
+    if len(line.encode("utf-8")) <= _ICS_LINE_OCTETS:
+        return line
+    parts, current, size = [], "", 0
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        # 継続行は先頭の空白 1 オクテットを含めて 75 オクテット以内
+        if size + n > (_ICS_LINE_OCTETS if not parts else _ICS_LINE_OCTETS - 1):
+            parts.append(current)
+            current, size = "", 0
+        current += ch
+        size += n
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def build_vevent(
+    *,
+    uid: str,
     title: str,
     start_str: str | None,
     end_str: str | None,
     location: str | None = None,
     description: str | None = None,
-) -> str:
-    """Apple Calendar / その他向けの .ics テキストを返す。"""
-    import uuid
-
+    dtstamp: datetime | None = None,
+) -> list[str]:
+    """VEVENT 1 件分の行（未折り返し）を返す。dtstamp は UTC。"""
     start_dt = _parse_dt(start_str)
     end_dt   = _parse_dt(end_str) if end_str else (start_dt + timedelta(hours=2) if start_dt else None)
 
-    now_str   = datetime.utcnow().strftime(_DT_FMT_GCL)
+    stamp      = dtstamp or datetime.utcnow()
+    now_str    = stamp.strftime(_DT_FMT_GCL)
     start_str_ = _gcal_fmt(start_dt) if start_dt else now_str
     end_str_   = _gcal_fmt(end_dt)   if end_dt   else now_str
 
-    return "\r\n".join([
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//Awaji Empire//Event//JA",
+    return [
         "BEGIN:VEVENT",
-        f"UID:{uuid.uuid4()}",
-        f"DTSTAMP:{now_str}",
+        f"UID:{uid}",
+        f"DTSTAMP:{now_str}Z",
         f"DTSTART:{start_str_}",
         f"DTEND:{end_str_}",
-        f"SUMMARY:{title}",
-        f"LOCATION:{location or ''}",
-        f"DESCRIPTION:{description or ''}",
+        f"SUMMARY:{_ics_escape(title)}",
+        f"LOCATION:{_ics_escape(location)}",
+        f"DESCRIPTION:{_ics_escape(description)}",
         "END:VEVENT",
-        "END:VCALENDAR",
-    ])
+    ]
+
+
+def build_ics_calendar(vevents: list[list[str]], name: str | None = None) -> str:
+    """VEVENT の行リストを VCALENDAR にまとめた .ics テキストを返す。
+
+    name を指定すると購読用のカレンダー名（X-WR-CALNAME）を付ける。
+    """
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Awaji Empire//Event//JA",
+        "CALSCALE:GREGORIAN",
+    ]
+    if name:
+        lines.append(f"X-WR-CALNAME:{_ics_escape(name)}")
+    for vevent in vevents:
+        lines.extend(vevent)
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+def build_ics(
+    title: str,
+    start_str: str | None,
+    end_str: str | None,
+    location: str | None = None,
+    description: str | None = None,
+    uid: str | None = None,
+) -> str:
+    """Apple Calendar / その他向けの .ics テキストを返す。
+
+    uid を省略した場合もタイトルと開始日時から固定の UID を作るため、
+    同じ予定を取り込み直してもカレンダー側で重複しない。
+    """
+    if uid is None:
+        digest = hashlib.sha1(f"{title}\x00{start_str or ''}".encode("utf-8")).hexdigest()[:20]
+        uid = f"{digest}@{_UID_DOMAIN}"
+    return build_ics_calendar([build_vevent(
+        uid=uid,
+        title=title,
+        start_str=start_str,
+        end_str=end_str,
+        location=location,
+        description=description,
+    )])
@@ -0,0 +1,94 @@
+# common/checkin_index.py
+# Why: 受付でスタッフが名前で検索して探すのは大人数のイベントで遅い。参加者ごとの
+#      access_token（参加確認ページ /event/confirm/<token> の QR に載る）から参加者を
+#      引けるよう、イベント単位の token → 参加者の索引を持つ。
+#      読み取り時に Bridge を呼ばないよう、チェックイン状態は索引の中で更新する。
+#      I/O を持たないため common/ に配置し、読み込みとキャッシュは
+#      services/checkin_index_service.py が担う。
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+_CONFIRM_PATH = re.compile(r'/event/confirm/([^/?#\s]+)')
+
+
+def extract_token(scanned: str) -> str:
+    """読み取った文字列から access_token を取り出す。
+
+    QR には参加確認ページの URL が入っているため、URL ならパスの token 部分を、
+    それ以外（バーコードリーダーで token だけ入力された場合等）は前後の空白を除いた値を返す。
+    """
+    text = (scanned or '').strip()
+    m = _CONFIRM_PATH.search(text)
+    return m.group(1) if m else text
+
+
+@dataclass
+class CheckinEntry:
+    """索引の 1 件。checked_in_at はチェックインのたびに更新する。"""
+    participant_id: int
+    user_id: str
+    username: str
+    session_id: Optional[int]
+    session_name: Optional[str]
+    approval: str
+    checked_in_at: Optional[str]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'participant_id': self.participant_id,
+            'username': self.username,
+            'session_id': self.session_id,
+            'session_name': self.session_name,
+            'approval': self.approval,
+            'checked_in_at': self.checked_in_at,
+        }
+
+
+class CheckinIndex:
+    """イベント 1 件分の access_token → 参加者の索引。"""
+
+    __slots__ = ('event_id', 'loaded_at', '_by_token', '_by_id')
+
+    def __init__(
+        self,
+        event_id: int,
+        participants: Iterable[Mapping[str, Any]],
+        session_map: Mapping[int, Mapping[str, Any]],
+        loaded_at: float = 0.0,
+    ):
+        self.event_id = int(event_id)
+        self.loaded_at = loaded_at
+        self._by_token: Dict[str, CheckinEntry] = {}
+        self._by_id: Dict[int, CheckinEntry] = {}
+        for p in participants:
+            session = session_map.get(p.get('session_id'))
+            entry = CheckinEntry(
+                participant_id=int(p['id']),
+                user_id=str(p['user_id']),
+                username=p.get('username') or f"ID:{p['user_id']}",
+                session_id=p.get('session_id'),
+                session_name=session['name'] if session else None,
+                approval=p.get('approval') or 'pending',
+                checked_in_at=p.get('checked_in_at'),
+            )
+            self._by_id[entry.participant_id] = entry
+            if p.get('access_token'):
+                self._by_token[str(p['access_token'])] = entry
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, participant_id: int) -> bool:
+        return participant_id in self._by_id
+
+    def lookup(self, token: str) -> Optional[CheckinEntry]:
+        return self._by_token.get(token)
+
+    def set_checked_in(self, participant_id: int, checked_in_at: Optional[str]) -> bool:
+        """チェックイン状態を更新する。索引にない参加者なら False。"""
+        entry = self._by_id.get(int(participant_id))
+        if entry is None:
+            return False
+        entry.checked_in_at = checked_in_at
+        return True
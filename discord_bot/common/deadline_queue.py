@@ -0,0 +1,62 @@
+# common/deadline_queue.py
+# Why: 締切スケジューラーが「次の締切」まで正確に眠れるよう、イベントごとの締切時刻を
+#      最小ヒープで管理する。締切の変更・取り消しは遅延削除（古いエントリは pop 時に捨てる）で扱う。
+#      時刻は呼び出し側の時計（単調時計 or テスト用の仮想時計）の値をそのまま使う純粋なデータ構造。
+import heapq
+import itertools
+from typing import Dict, List, Mapping, Optional, Tuple
+
+
+class DeadlineQueue:
+    """イベント ID → 締切時刻の最小ヒープ。"""
+
+    __slots__ = ('_heap', '_due', '_seq')
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, int]] = []
+        self._due: Dict[int, float] = {}
+        # 同時刻の締切は登録順に取り出す
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def __contains__(self, event_id: int) -> bool:
+        return event_id in self._due
+
+    def schedule(self, event_id: int, due: float) -> None:
+        """締切を登録 / 変更する。"""
+        if self._due.get(event_id) == due:
+            return
+        self._due[event_id] = due
+        heapq.heappush(self._heap, (due, next(self._seq), event_id))
+
+    def cancel(self, event_id: int) -> None:
+        self._due.pop(event_id, None)
+
+    def replace_all(self, deadlines: Mapping[int, float]) -> None:
+        """登録内容を丸ごと置き換える（Bridge から一覧を取り直した時）。"""
+        self._due = dict(deadlines)
+        self._heap = [(due, next(self._seq), eid) for eid, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def _discard_stale(self) -> None:
+        heap = self._heap
+        while heap and self._due.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def next_due(self) -> Optional[float]:
+        """最も早い締切時刻。登録がなければ None。"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[int]:
+        """now までに締切を迎えたイベント ID を締切順に取り出す。"""
+        due_ids = []
+        while True:
+            self._discard_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return due_ids
+            _, _, event_id = heapq.heappop(self._heap)
+            del self._due[event_id]
+            due_ids.append(event_id)
@@ -0,0 +1,95 @@
+# common/discord_ratelimit.py
+# Why: Discord REST API のレート制限はルート（メジャーパラメータ単位）ごとのバケットで管理され、
+#      レスポンスヘッダー（X-RateLimit-*）で残量とリセットまでの秒数が通知される。
+#      DM 一斉送信を並列化しても 429 を踏まないよう、送信前に残量を予約して必要なら待つ。
+#      時刻は呼び出し側の時計の値をそのまま受け取る純粋なデータ構造のため common/ に配置し、
+#      HTTP 送信は services/discord_rest.py が担う。
+import re
+from typing import Mapping, Optional, Tuple
+
+# バケットを分けるメジャーパラメータ（この ID ごとに別の残量を持つ）
+_MAJOR_PARAM = re.compile(r'^(channels|guilds|webhooks)/(\d+)')
+# それ以外の ID（ユーザー・メッセージ・ロール等）は同じバケットにまとめる
+_MINOR_ID = re.compile(r'/\d{5,}')
+
+
+def route_key(method: str, path: str) -> Tuple[str, str]:
+    """(ルートテンプレート, メジャーパラメータ) を返す。
+
+    例: ("PUT", "/guilds/1/members/2/roles/3") → ("PUT guilds/{id}/members/{id}/roles/{id}", "guilds/1")
+    """
+    path = path.split('?', 1)[0].strip('/')
+    m = _MAJOR_PARAM.match(path)
+    if m:
+        major = m.group(0)
+        template = m.group(1) + '/{id}' + _MINOR_ID.sub('/{id}', path[len(major):])
+    else:
+        major = ''
+        template = _MINOR_ID.sub('/{id}', '/' + path).lstrip('/')
+    return f"{method.upper()} {template}", major
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitBucket:
+    """1 バケット分の残量。残量が分かるまでは制限しない（最初の応答で学習する）。
+
+    応答待ちのリクエスト数（pending）を数えておき、ヘッダーの残量から差し引く。
+    並列送信中に届いた古い応答で残量を多く見積もらないため。
+    """
+
+    __slots__ = ('limit', 'remaining', 'reset_at', 'pending')
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.pending = 0
+
+    def reserve(self, now: float) -> float:
+        """1 リクエスト分の枠を予約する。
+
+        Returns:
+            0: 予約できた（すぐ送信してよい）
+            正の値: その秒数待ってから再度 reserve() すること
+        """
+        if self.remaining is not None and now >= self.reset_at:
+            # リセット時刻を過ぎたので満タンに戻ったとみなす（次の応答で正確な値に更新される）
+            self.remaining = self.limit
+        if self.remaining is not None:
+            if self.remaining <= 0:
+                return max(self.reset_at - now, 0.001)
+            self.remaining -= 1
+        self.pending += 1
+        return 0.0
+
+    def release(self) -> None:
+        """応答を受け取れなかった（通信エラー）予約を取り消す。"""
+        self.pending = max(self.pending - 1, 0)
+
+    def update(self, headers: Mapping[str, str], now: float) -> None:
+        """レスポンスヘッダーから残量とリセット時刻を取り込む。"""
+        self.release()
+        limit = _header_float(headers, 'x-ratelimit-limit')
+        remaining = _header_float(headers, 'x-ratelimit-remaining')
+        reset_after = _header_float(headers, 'x-ratelimit-reset-after')
+        if limit is not None:
+            self.limit = int(limit)
+        if remaining is not None:
+            self.remaining = max(int(remaining) - self.pending, 0)
+        if reset_after is not None:
+            self.reset_at = now + reset_after
+
+    def exhaust(self, retry_after: float, now: float) -> None:
+        """429 を受けた時に、retry_after 秒後まで枠を使い切った状態にする。"""
+        self.release()
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, now + retry_after)
@@ -0,0 +1,86 @@
+# common/event_admin_view.py
+# Why: イベント管理画面と当日受付画面が、イベント・参加者・アンケート・全回答を別々に取得して
+#      参加者と回答を突き合わせ、部ごとの承認数を「部 × 参加者」の二重ループで数えていた。
+#      Bridge の /events/{id}/admin-bundle の結果から、両画面の描画に必要な値を
+#      参加者 1 パスでまとめて組み立てる。I/O を持たないため common/ に配置し、
+#      取得とキャッシュは services/event_admin_service.py が担う。
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional
+
+from .survey_utils import compile_questions, decode_answers
+
+
+@dataclass(frozen=True)
+class EventAdminView:
+    """イベント管理画面・当日受付画面の描画用データ（キャッシュされるため読み取り専用で扱う）。"""
+    event: Dict[str, Any]
+    sessions: List[Dict[str, Any]]
+    session_map: Dict[int, Dict[str, Any]]
+    # 回答（質問 index の文字列 → 回答）と回答者名を補完済みの参加者
+    participants: List[Dict[str, Any]]
+    survey_questions: List[Dict[str, Any]]
+    # 部 ID → {"accepted", "capacity", "remaining"}
+    session_stats: Dict[int, Dict[str, Any]]
+    # 当日受付: 承認済み参加者を部ごとに（部なしは None キー）
+    checkin_groups: Dict[Optional[int], List[Dict[str, Any]]]
+    accepted_total: int
+    checked_in_count: int
+    participant_ids: FrozenSet[int]
+    # Bridge の ACL（survey_id, owner_id, owner_name, collaborator_ids）
+    acl: Optional[Dict[str, Any]] = None
+
+
+def build_event_admin_view(bundle: Mapping[str, Any]) -> EventAdminView:
+    """admin-bundle の応答から EventAdminView を組み立てる。"""
+    event = dict(bundle['event'])
+    sessions = [dict(s) for s in bundle.get('sessions') or []]
+    session_map = {s['id']: s for s in sessions}
+    survey = bundle.get('survey') or {}
+    schema = compile_questions(survey.get('questions'))
+
+    accepted_per_session: Dict[Optional[int], int] = {}
+    checkin_groups: Dict[Optional[int], List[Dict[str, Any]]] = {}
+    checked_in_count = 0
+    participants: List[Dict[str, Any]] = []
+
+    for raw in bundle.get('participants') or []:
+        p = dict(raw)
+        stored = decode_answers(p.get('answers'))
+        # 旧形式のキー（"0[]"）もスキーマで読み替えて質問 index をキーに揃える
+        p['answers'] = {
+            q.key: val for q in schema
+            if (val := q.answer_of(stored)) is not None
+        }
+        if not p.get('username'):
+            p['username'] = f"ID:{p['user_id']}"
+        participants.append(p)
+
+        if p.get('approval') == 'accepted':
+            sid = p.get('session_id')
+            accepted_per_session[sid] = accepted_per_session.get(sid, 0) + 1
+            checkin_groups.setdefault(sid, []).append(p)
+            if p.get('checked_in_at'):
+                checked_in_count += 1
+
+    session_stats = {}
+    for s in sessions:
+        accepted = accepted_per_session.get(s['id'], 0)
+        session_stats[s['id']] = {
+            'accepted': accepted,
+            'capacity': s.get('capacity'),
+            'remaining': (s['capacity'] - accepted) if s.get('capacity') else None,
+        }
+
+    return EventAdminView(
+        event=event,
+        sessions=sessions,
+        session_map=session_map,
+        participants=participants,
+        survey_questions=schema.as_dicts(),
+        session_stats=session_stats,
+        checkin_groups=checkin_groups,
+        accepted_total=sum(accepted_per_session.values()),
+        checked_in_count=checked_in_count,
+        participant_ids=frozenset(p['id'] for p in participants),
+        acl=bundle.get('acl'),
+    )
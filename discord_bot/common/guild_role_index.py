@@ -0,0 +1,59 @@
+# common/guild_role_index.py
+# Why: 優勝ロールの付与のたびにギルドのロール一覧を丸ごと取得して名前で探しており、
+#      称号ロールは DB の discord_role_id が無いと同名のロールを作り直していた。
+#      ギルド単位に 名前 → ロール / ID → ロール の索引を持ち、検索を O(1) にする。
+#      作成・編集の結果は索引に直接反映する。
+#      I/O を持たないため common/ に配置し、読み込みと更新は services/discord_role_service.py が担う。
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+
+class GuildRoleIndex:
+    """ギルド 1 つ分のロール索引。同名のロールが複数ある場合は ID の小さい（古い）方を引く。"""
+
+    __slots__ = ('guild_id', 'loaded_at', '_by_id', '_by_name')
+
+    def __init__(self, guild_id: str, roles: Iterable[Mapping[str, Any]], loaded_at: float = 0.0):
+        self.guild_id = str(guild_id)
+        self.loaded_at = loaded_at
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_name: Dict[str, str] = {}
+        for role in sorted(roles, key=lambda r: int(r['id'])):
+            self.upsert(role)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, role_id: Any) -> bool:
+        return str(role_id) in self._by_id
+
+    def get(self, role_id: Any) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(str(role_id))
+
+    def find_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        role_id = self._by_name.get(name)
+        return self._by_id.get(role_id) if role_id is not None else None
+
+    def upsert(self, role: Mapping[str, Any]) -> None:
+        """作成・編集後のロールを反映する（名前が変わった場合は旧名の索引を外す）。"""
+        role_id = str(role['id'])
+        old = self._by_id.get(role_id)
+        self._by_id[role_id] = dict(role, id=role_id)
+        if old is not None and old.get('name') != role.get('name') and self._by_name.get(old.get('name')) == role_id:
+            del self._by_name[old['name']]
+            self._reindex_name(old['name'])
+        name = role.get('name')
+        current = self._by_name.get(name)
+        if current is None or int(role_id) < int(current):
+            self._by_name[name] = role_id
+
+    def remove(self, role_id: Any) -> None:
+        role = self._by_id.pop(str(role_id), None)
+        if role is not None and self._by_name.get(role.get('name')) == str(role_id):
+            del self._by_name[role['name']]
+            self._reindex_name(role['name'])
+
+    def _reindex_name(self, name: str) -> None:
+        """同名の別ロールが残っていれば名前索引を付け直す。"""
+        ids = [rid for rid, r in self._by_id.items() if r.get('name') == name]
+        if ids:
+            self._by_name[name] = min(ids, key=int)
@@ -0,0 +1,161 @@
+# common/leaderboard.py
+# Why: ラウンジには全体のランキングが無く、「N 人中何位か」を出すには全プレイヤーを並べ替える必要があった。
+#      全プレイヤーを (-MMR, user_id) の順に並べた列を、長さ _LOAD 前後のブロックに分けて持つ
+#      （平方分割の整列リスト）。挿入・削除はブロック内の bisect / insort、順位（自分より MMR が
+#      高い人数 + 1）と上位からの位置は「手前のブロックの長さの合計 + ブロック内の位置」で求める。
+#      ブロック長の累積和は更新後の最初の参照で作り直す（参照のほうが更新よりはるかに多い）。
+#      MMR の値そのものを添字にする索引（値ごとの人数の Fenwick 木など）は、MMR に上限が無いため
+#      外れ値 1 人（例: 5,000,000）で数百万要素の配列を抱えることになる。この形ならメモリ・計算量は
+#      プレイヤー数だけで決まる。
+#      I/O を持たないため common/ に配置し、読み込みと更新は services/leaderboard_service.py が担う。
+from bisect import bisect_left, bisect_right, insort
+from itertools import accumulate, islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# ブロックの基準長。2 倍を超えたら分割する
+_LOAD = 512
+
+_Key = Tuple[int, str]
+
+
+class Leaderboard:
+    """user_id → MMR の順位索引。同じ MMR は同順位（1, 2, 2, 4 …）。"""
+
+    __slots__ = ('_mmr', '_blocks', '_maxes', '_starts')
+
+    def __init__(self, players: Iterable[Tuple[Any, int]] = ()):
+        self._mmr: Dict[str, int] = {}
+        for user_id, mmr in players:
+            self._mmr[str(user_id)] = max(0, int(mmr))
+        keys = sorted((-value, uid) for uid, value in self._mmr.items())
+        self._blocks: List[List[_Key]] = [keys[i:i + _LOAD] for i in range(0, len(keys), _LOAD)]
+        self._maxes: List[_Key] = [b[-1] for b in self._blocks]
+        # _starts[i] = ブロック i より手前の要素数（None なら次の参照で作り直す）
+        self._starts: Optional[List[int]] = None
+
+    def __len__(self) -> int:
+        return len(self._mmr)
+
+    def __contains__(self, user_id: Any) -> bool:
+        return str(user_id) in self._mmr
+
+    def mmr(self, user_id: Any) -> Optional[int]:
+        return self._mmr.get(str(user_id))
+
+    # ---- 更新 ----
+
+    def update(self, user_id: Any, mmr: int) -> bool:
+        """MMR を登録・変更する。変わらなければ False。"""
+        uid, value = str(user_id), max(0, int(mmr))
+        old = self._mmr.get(uid)
+        if old == value:
+            return False
+        if old is not None:
+            self._discard((-old, uid))
+        self._mmr[uid] = value
+        self._insert((-value, uid))
+        return True
+
+    def remove(self, user_id: Any) -> bool:
+        uid = str(user_id)
+        old = self._mmr.pop(uid, None)
+        if old is None:
+            return False
+        self._discard((-old, uid))
+        return True
+
+    # ---- 参照 ----
+
+    def count_above(self, mmr: int) -> int:
+        """MMR が mmr より高いプレイヤー数。"""
+        # (-mmr, '') はどの user_id よりも手前なので、その位置 = MMR が mmr を超える人数
+        return self._index((-int(mmr), ''))
+
+    def rank_of_mmr(self, mmr: int) -> int:
+        return self.count_above(mmr) + 1
+
+    def rank(self, user_id: Any) -> Optional[Dict[str, Any]]:
+        """{rank, total, mmr, top_percent}。未登録なら None。"""
+        mmr = self._mmr.get(str(user_id))
+        if mmr is None:
+            return None
+        total = len(self._mmr)
+        rank = self.count_above(mmr) + 1
+        return {
+            'rank': rank,
+            'total': total,
+            'mmr': mmr,
+            'top_percent': round(rank * 100.0 / total, 1),
+        }
+
+    def position(self, user_id: Any) -> Optional[int]:
+        """page() の並びでの位置（0 始まり）。未登録なら None。"""
+        uid = str(user_id)
+        mmr = self._mmr.get(uid)
+        if mmr is None:
+            return None
+        return self._index((-mmr, uid))
+
+    def page(self, offset: int = 0, limit: int = 50) -> List[Dict[str, Any]]:
+        """MMR の高い順（同 MMR は user_id 順）に offset 番目から limit 件。"""
+        total = len(self._mmr)
+        offset = max(0, int(offset))
+        if limit <= 0 or offset >= total:
+            return []
+        # offset を含むブロックから読み始める
+        starts = self._block_starts()
+        i = bisect_right(starts, offset) - 1
+        keys = islice((k for b in self._blocks[i:] for k in b), offset - starts[i], offset - starts[i] + limit)
+
+        entries: List[Dict[str, Any]] = []
+        prev: Optional[int] = None
+        rank = 0
+        for pos, (neg, uid) in enumerate(keys, offset):
+            if neg != prev:
+                # 並びの中で MMR が変わった位置がそのまま順位（先頭だけは手前に同 MMR がいる場合がある）
+                rank = pos + 1 if prev is not None else self.count_above(-neg) + 1
+                prev = neg
+            entries.append({'rank': rank, 'user_id': uid, 'mmr': -neg})
+        return entries
+
+    # ---- 整列リスト ----
+
+    def _block_starts(self) -> List[int]:
+        starts = self._starts
+        if starts is None:
+            starts = self._starts = [0, *accumulate(len(b) for b in self._blocks)]
+        return starts
+
+    def _index(self, key: _Key) -> int:
+        """key より手前にある要素の数。"""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._blocks):
+            return len(self._mmr)
+        return self._block_starts()[i] + bisect_left(self._blocks[i], key)
+
+    def _insert(self, key: _Key) -> None:
+        self._starts = None
+        blocks, maxes = self._blocks, self._maxes
+        if not blocks:
+            blocks.append([key])
+            maxes.append(key)
+            return
+        i = min(bisect_left(maxes, key), len(blocks) - 1)
+        block = blocks[i]
+        insort(block, key)
+        maxes[i] = block[-1]
+        if len(block) > 2 * _LOAD:
+            blocks[i:i + 1] = [block[:_LOAD], block[_LOAD:]]
+            maxes[i:i + 1] = [block[_LOAD - 1], block[-1]]
+
+    def _discard(self, key: _Key) -> None:
+        self._starts = None
+        blocks, maxes = self._blocks, self._maxes
+        i = bisect_left(maxes, key)
+        block = blocks[i]
+        del block[bisect_left(block, key)]
+        if block:
+            maxes[i] = block[-1]
+        else:
+            del blocks[i]
+            del maxes[i]
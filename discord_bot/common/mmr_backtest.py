@@ -0,0 +1,248 @@
+# common/mmr_backtest.py
+# Why: ラウンジの MMR 変動は Bridge の finish_session（lounge_repo.rs の MMR_DELTA）で決まり、
+#      式を変えたときの影響を出荷前に確かめる手段が無かった。
+#      過去のセッションの最終順位を時系列に並べ直し、差し替え可能なレーティング式で再計算して
+#      「セッション前のレーティングで順位をどれだけ当てられたか」と最終的な分布を比べる。
+#
+# 方式:
+#   - セッションは CSR 形式（offsets / player_idx / ranks の NumPy 配列）に 1 回だけ変換する
+#   - レーティングの更新はセッション単位で参加者全員分をベクトル演算で行う
+#     （セッション間は前の結果に依存するため逐次、1 セッションは最大 24 人の小さな行列演算）
+#   - 予測精度: 順位の異なる 2 人のうち、セッション前のレーティングが高い方が上位だった割合
+#     （レーティングが同じなら 0.5）と、レーティング最上位が 1 位だった割合
+#   I/O を持たないため common/ に配置し、Bridge からの取得は services/lounge_backtest_service.py が担う。
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# database_bridge/src/db/lounge_repo.rs の MMR_DELTA と同じ値（index 0 は未使用）。変更時は両方を更新する
+LOUNGE_MMR_DELTA = (
+    0, 9500, 8500, 8000, 7500, 7000, 6500, 6200, 5500, 5000, 4500, 4200, 4000,
+    3600, 3300, 3000, 2500, 2200, 2000, 1000, 800, 600, 400, 200, 100,
+)
+INITIAL_MMR = 1000
+# ランク称号の閾値（Iron / Bronze / Silver / Gold / Platinum / Diamond）
+DEFAULT_RANK_BINS = (0, 2000, 4000, 6000, 8000, 10000)
+
+
+class SessionTable:
+    """時系列順のセッションと最終順位（CSR 形式）。
+
+    セッション s の参加者は player_idx[offsets[s]:offsets[s+1]]、順位は ranks の同じ範囲。
+    """
+
+    __slots__ = ('session_ids', 'user_ids', 'offsets', 'player_idx', 'ranks')
+
+    def __init__(self, session_ids: Sequence[Any], user_ids: Sequence[str],
+                 offsets: np.ndarray, player_idx: np.ndarray, ranks: np.ndarray):
+        self.session_ids = list(session_ids)
+        self.user_ids = list(user_ids)
+        self.offsets = offsets
+        self.player_idx = player_idx
+        self.ranks = ranks
+
+    def __len__(self) -> int:
+        return len(self.session_ids)
+
+    @property
+    def n_players(self) -> int:
+        return len(self.user_ids)
+
+    @classmethod
+    def from_sessions(cls, sessions: Iterable[Tuple[Any, Iterable[Tuple[Any, int]]]]) -> 'SessionTable':
+        """[(session_id, [(user_id, final_rank), ...]), ...]（時系列順）から作る。
+
+        参加者が 2 人未満のセッションは順位の比較ができないため除く。
+        """
+        index: Dict[str, int] = {}
+        session_ids: List[Any] = []
+        offsets = [0]
+        players: List[int] = []
+        ranks: List[int] = []
+        for session_id, entries in sessions:
+            entries = [(str(uid), int(rank)) for uid, rank in entries]
+            if len(entries) < 2:
+                continue
+            for uid, rank in entries:
+                players.append(index.setdefault(uid, len(index)))
+                ranks.append(rank)
+            session_ids.append(session_id)
+            offsets.append(len(players))
+        return cls(
+            session_ids, list(index),
+            np.asarray(offsets, dtype=np.int64),
+            np.asarray(players, dtype=np.int32),
+            np.asarray(ranks, dtype=np.int16),
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> 'SessionTable':
+        """{session_id, user_id, final_rank[, excluded, submitted]} の行（エクスポート / get_final_scores）から作る。
+
+        セッションの順序は行に最初に現れた順。除外・未申告・順位なしの行は使わない。
+        """
+        grouped: Dict[Any, List[Tuple[Any, int]]] = {}
+        for r in rows:
+            if r.get('excluded') or r.get('submitted') is False or r.get('final_rank') in (None, ''):
+                continue
+            grouped.setdefault(r['session_id'], []).append((r['user_id'], int(r['final_rank'])))
+        return cls.from_sessions(grouped.items())
+
+
+class RatingFormula(ABC):
+    """レーティング式。サブクラスは deltas() でセッション 1 件分の変動量を返す。"""
+
+    name = 'formula'
+    initial: float = INITIAL_MMR
+    floor: Optional[float] = 0.0  # 下限（None なら無し）
+
+    @abstractmethod
+    def deltas(self, ratings: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+        """セッション前のレーティングと最終順位（1 始まり）から変動量を返す。"""
+
+
+class FixedTableFormula(RatingFormula):
+    """順位ごとの固定の増加量（現行の Bridge の式）。"""
+
+    name = 'fixed_table'
+
+    def __init__(self, table: Sequence[int] = LOUNGE_MMR_DELTA, name: Optional[str] = None):
+        self.table = np.asarray(table, dtype=np.float64)
+        if name:
+            self.name = name
+
+    def deltas(self, ratings: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+        return self.table[np.clip(ranks.astype(np.intp), 1, len(self.table) - 1)]
+
+
+class MultiplayerEloFormula(RatingFormula):
+    """多人数 Elo。全ての 2 人組を 1 対 1 の対戦とみなし、期待勝率との差の平均に k を掛ける。"""
+
+    name = 'elo'
+
+    def __init__(self, k: float = 400.0, scale: float = 2000.0, name: Optional[str] = None):
+        self.k = k
+        self.scale = scale
+        if name:
+            self.name = name
+
+    def deltas(self, ratings: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+        n = len(ratings)
+        expected = 1.0 / (1.0 + np.power(10.0, (ratings[None, :] - ratings[:, None]) / self.scale))
+        actual = (ranks[:, None] < ranks[None, :]) + 0.5 * (ranks[:, None] == ranks[None, :])
+        diff = actual - expected
+        np.fill_diagonal(diff, 0.0)
+        return self.k * diff.sum(axis=1) / (n - 1)
+
+
+@dataclass
+class BacktestReport:
+    """再計算の結果。"""
+    formula: str
+    sessions: int
+    evaluated_pairs: int
+    pairwise_accuracy: Optional[float]
+    winner_accuracy: Optional[float]
+    ratings: np.ndarray
+    games: np.ndarray
+    bins: Tuple[float, ...]
+    elapsed_ms: float
+    history: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def distribution(self) -> Dict[str, Any]:
+        played = self.ratings[self.games > 0]
+        if played.size == 0:
+            return {'players': 0}
+        edges = np.asarray(self.bins + (np.inf,), dtype=np.float64)
+        counts, _ = np.histogram(played, bins=np.concatenate(([-np.inf], edges[1:])))
+        return {
+            'players': int(played.size),
+            'mean': float(played.mean()),
+            'std': float(played.std()),
+            'percentiles': {str(p): float(v) for p, v in zip((10, 25, 50, 75, 90), np.percentile(played, (10, 25, 50, 75, 90)))},
+            'by_bin': {str(int(lo)): int(c) for lo, c in zip(self.bins, counts)},
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'formula': self.formula,
+            'sessions': self.sessions,
+            'evaluated_pairs': self.evaluated_pairs,
+            'pairwise_accuracy': self.pairwise_accuracy,
+            'winner_accuracy': self.winner_accuracy,
+            'elapsed_ms': round(self.elapsed_ms, 1),
+            'distribution': self.distribution(),
+        }
+
+
+def backtest(
+    table: SessionTable,
+    formula: RatingFormula,
+    *,
+    min_games: int = 1,
+    bins: Sequence[float] = DEFAULT_RANK_BINS,
+    keep_history: bool = False,
+) -> BacktestReport:
+    """セッションを時系列に再生し、予測精度と最終的なレーティング分布を返す。
+
+    Args:
+        min_games: 予測精度の集計対象にする 2 人組の、セッション前の最少参加数（初参加同士の比較を除く）
+        keep_history: True なら各セッション後の参加者のレーティングを history（ranks と同じ並び）に残す
+    """
+    started = time.perf_counter()
+    ratings = np.full(table.n_players, float(formula.initial))
+    games = np.zeros(table.n_players, dtype=np.int32)
+    history = np.empty(len(table.ranks)) if keep_history else None
+
+    correct = 0.0
+    pairs = 0
+    winner_hits = 0
+    winner_sessions = 0
+    offsets, player_idx, all_ranks = table.offsets, table.player_idx, table.ranks
+    for s in range(len(table)):
+        lo, hi = offsets[s], offsets[s + 1]
+        idx = player_idx[lo:hi]
+        ranks = all_ranks[lo:hi]
+        before = ratings[idx]
+
+        experienced = games[idx] >= min_games
+        if experienced.sum() >= 2:
+            sub_r = before[experienced]
+            sub_k = ranks[experienced]
+            rank_gt = sub_k[:, None] < sub_k[None, :]           # i が j より上位
+            rating_cmp = np.sign(sub_r[:, None] - sub_r[None, :])
+            decided = rank_gt.sum()
+            if decided:
+                correct += float((rating_cmp[rank_gt] > 0).sum() + 0.5 * (rating_cmp[rank_gt] == 0).sum())
+                pairs += int(decided)
+            winner_sessions += 1
+            winner_hits += int(sub_k[int(np.argmax(sub_r))] == sub_k.min())
+
+        after = before + formula.deltas(before, ranks)
+        if formula.floor is not None:
+            np.maximum(after, formula.floor, out=after)
+        ratings[idx] = after
+        games[idx] += 1
+        if history is not None:
+            history[lo:hi] = after
+
+    return BacktestReport(
+        formula=formula.name,
+        sessions=len(table),
+        evaluated_pairs=pairs,
+        pairwise_accuracy=correct / pairs if pairs else None,
+        winner_accuracy=winner_hits / winner_sessions if winner_sessions else None,
+        ratings=ratings,
+        games=games,
+        bins=tuple(float(b) for b in bins),
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+        history=history,
+    )
+
+
+def compare(table: SessionTable, formulas: Iterable[RatingFormula], **kwargs: Any) -> List[Dict[str, Any]]:
+    """複数の式を同じセッション列で比較し、summary() の一覧を返す。"""
+    return [backtest(table, f, **kwargs).summary() for f in formulas]
@@ -0,0 +1,184 @@
+# common/notification_templates.py
+# Why: イベントの選考結果 DM（承認 / 否認 / 補欠）の本文を bot.py の締切処理と
+#      routes/event.py の一斉通知がそれぞれ文字列連結で組み立てており、
+#      参加者ごとに build_calendar_urls を呼んでいた（同じ部の参加者は全員同じ URL）。
+#
+# 方式:
+#   - 本文のテンプレートは一度だけ分解（コンパイル）して LRU キャッシュする
+#   - イベント・部ごとに共通の値（タイトル・日時・場所・参加費・カレンダー URL）を先に埋め込み、
+#     参加者ごとに異なる確認 URL だけを最後に差し込む
+#   - render_event_notifications() がイベント 1 件分を 1 パスで描画する
+#   埋め込んだ値は再解析しないため、タイトル等に "{" "}" が含まれていても壊れない。
+from functools import lru_cache
+from string import Formatter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .calendar_utils import build_calendar_urls
+
+_SEPARATOR = '━━━━━━━━━━━━━━━'
+_FORMATTER = Formatter()
+
+# (参加者 ID, 送信先ユーザー ID, 本文)。services/outbox_service.py の enqueue にそのまま渡せる形
+RenderedMessage = Tuple[int, str, str]
+
+
+class MessageTemplate:
+    """"{name}" 形式のプレースホルダーを持つ、分解済みのテンプレート。
+
+    parts はリテラル（str）とプレースホルダー名（1 要素のタプル）の並び。
+    """
+
+    __slots__ = ('_parts',)
+
+    def __init__(self, parts: Tuple[Any, ...]):
+        self._parts = parts
+
+    @classmethod
+    def compile(cls, text: str) -> 'MessageTemplate':
+        return _compile(text)
+
+    @property
+    def fields(self) -> List[str]:
+        return [p[0] for p in self._parts if isinstance(p, tuple)]
+
+    def bind(self, **values: Any) -> 'MessageTemplate':
+        """一部のプレースホルダーを埋めた新しいテンプレートを返す（隣接するリテラルは結合する）。"""
+        parts: List[Any] = []
+        for p in self._parts:
+            if isinstance(p, tuple) and p[0] in values:
+                p = str(values[p[0]])
+            if isinstance(p, str) and parts and isinstance(parts[-1], str):
+                parts[-1] += p
+            elif p != '':
+                parts.append(p)
+        return MessageTemplate(tuple(parts))
+
+    def render(self, **values: Any) -> str:
+        """すべてのプレースホルダーを埋めて文字列にする。未指定のものがあれば KeyError。"""
+        return ''.join(p if isinstance(p, str) else str(values[p[0]]) for p in self._parts)
+
+
+@lru_cache(maxsize=64)
+def _compile(text: str) -> MessageTemplate:
+    parts: List[Any] = []
+    for literal, field, _spec, _conv in _FORMATTER.parse(text):
+        if literal:
+            parts.append(literal)
+        if field is not None:
+            parts.append((field,))
+    return MessageTemplate(tuple(parts))
+
+
+# ============================================================
+# 選考結果の通知
+# ============================================================
+
+REJECTED_TEXT = (
+    "【{title}】参加について\n"
+    "申し訳ございませんが、今回は参加をお断りさせていただきます。\n"
+    "またの機会にぜひご参加ください。"
+)
+
+WAITLIST_TEXT = (
+    "【{title}】補欠登録のお知らせ\n"
+    "現在補欠となっています。キャンセルが出た場合にご連絡します。\n"
+    "詳細確認: {confirm_url}"
+)
+
+
+def _accepted_text(has_session: bool, has_date: bool, has_location: bool, has_fee: bool) -> str:
+    """承認通知のテンプレート。部・日時・場所・参加費の有無で行構成が変わる。"""
+    lines = ['【{title}】参加確定のお知らせ', _SEPARATOR]
+    lines.append('✅ {session_name} 参加確定' if has_session else '✅ 参加確定')
+    if has_date:
+        lines.append('📅 {event_date}')
+    if has_location:
+        lines.append('📍 {location}')
+    if has_fee:
+        lines.append('💴 参加費: {fee}円')
+    lines += [
+        '',
+        '📆 カレンダーに追加:',
+        '・Google: <{google_url}>',
+        '・Outlook: <{outlook_url}>',
+        _SEPARATOR,
+        '詳細確認: {confirm_url}',
+    ]
+    return '\n'.join(lines)
+
+
+def accepted_template(event: Mapping[str, Any], session: Optional[Mapping[str, Any]]) -> MessageTemplate:
+    """イベント（と部）の値を埋め込んだ承認通知のテンプレート。残りは {confirm_url} のみ。
+
+    カレンダー URL は部の日時・場所（部制なしはイベント全体）から 1 回だけ生成する。
+    """
+    src = session if session else event
+    title = event['title']
+    cal = build_calendar_urls(
+        title=f"{title} {session['name']}" if session else title,
+        start_str=src.get('event_date'),
+        end_str=src.get('end_date'),
+        location=src.get('location'),
+    )
+    text = _accepted_text(
+        has_session=bool(session),
+        has_date=bool(src.get('event_date')),
+        has_location=bool(src.get('location')),
+        has_fee=bool(event.get('fee')),
+    )
+    return MessageTemplate.compile(text).bind(
+        title=title,
+        session_name=session['name'] if session else '',
+        event_date=src.get('event_date') or '',
+        location=src.get('location') or '',
+        fee=event.get('fee') or '',
+        google_url=cal['google'],
+        outlook_url=cal['outlook'],
+    )
+
+
+def render_event_notifications(
+    event: Mapping[str, Any],
+    sessions: Iterable[Mapping[str, Any]],
+    participants: Iterable[Mapping[str, Any]],
+    dashboard_url: str,
+    *,
+    waitlist_as_rejected: bool = False,
+) -> List[RenderedMessage]:
+    """イベント 1 件分の選考結果 DM を描画する。送信済み（notified_at あり）と未選考は除く。
+
+    Args:
+        waitlist_as_rejected: 補欠をお断りとして通知する（締切処理で補欠のまま確定する場合）
+    Returns:
+        [(参加者 ID, ユーザー ID, 本文), ...]（participants の順）
+    """
+    session_map = {s['id']: s for s in sessions}
+    title = event['title']
+    rejected = MessageTemplate.compile(REJECTED_TEXT).render(title=title)
+    waitlist = MessageTemplate.compile(WAITLIST_TEXT).bind(title=title)
+    accepted: Dict[Optional[int], MessageTemplate] = {}
+    confirm_base = f"{dashboard_url.rstrip('/')}/event/confirm/"
+
+    messages: List[RenderedMessage] = []
+    for p in participants:
+        if p.get('notified_at'):
+            continue
+        approval = p.get('approval')
+        if approval == 'waitlist' and waitlist_as_rejected:
+            approval = 'rejected'
+
+        if approval == 'accepted':
+            session = session_map.get(p.get('session_id'))
+            key = session['id'] if session else None
+            tpl = accepted.get(key)
+            if tpl is None:
+                tpl = accepted[key] = accepted_template(event, session)
+            message = tpl.render(confirm_url=confirm_base + str(p['access_token']))
+        elif approval == 'rejected':
+            message = rejected
+        elif approval == 'waitlist':
+            message = waitlist.render(confirm_url=confirm_base + str(p['access_token']))
+        else:
+            continue
+        messages.append((p['id'], str(p['user_id']), message))
+    return messages
@@ -0,0 +1,293 @@
+# common/session_assignment.py
+# Why: Bridge の自動割り当ては応募順に「第一希望 → 空いている部」と貪欲に埋めるため、
+#      先に応募した人が他の人の唯一の希望部を埋めてしまい、全体の確定数・希望順位が悪くなる。
+#      また主催者は結果を確定前に確認できなかった。
+#
+# 方式（最小費用流）:
+#   - 希望の並び（preferred_session_ids）が同じ応募者は入れ替え可能なので 1 グループにまとめる
+#     （数千人でも グループ数 × 部数 の小さなグラフになる）
+#   - source → グループ（容量 = 人数）→ 部（費用 = 希望順位）→ sink（容量 = 残席）に流し、
+#     「確定数の最大化」→「希望順位の合計の最小化」の順で最適化する
+#   - 同じ条件ならグループ内の最先の応募が早いグループを優先し、グループ内では応募順に
+#     良い順位の部から割り当てる
+#   - 希望外の部は希望順位より大きい費用で使う（旧仕様の「希望部が満席なら空いている部へ」）
+#   既に承認/否認済みの参加者は動かさず、承認済みの人数を残席から差し引く。
+#   I/O を持たないため common/ に配置し、取得と確定は services/event_service.py が行う。
+import heapq
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+FIXED_APPROVALS = frozenset({'accepted', 'rejected'})
+
+_INF = float('inf')
+
+
+@dataclass(frozen=True)
+class PlannedAssignment:
+    """参加者 1 人分の割り当て結果。rank は希望順位（0 始まり、希望外は None）。"""
+    participant_id: int
+    approval: str
+    session_id: Optional[int]
+    rank: Optional[int]
+    previous_approval: str
+    previous_session_id: Optional[int]
+
+    @property
+    def changed(self) -> bool:
+        return (self.approval, self.session_id) != (self.previous_approval, self.previous_session_id)
+
+    def as_item(self) -> Dict[str, Any]:
+        """Bridge の POST /events/{id}/assignments に渡す 1 件。"""
+        return {
+            'participant_id': self.participant_id,
+            'approval': self.approval,
+            'session_id': self.session_id,
+            'expected_approval': self.previous_approval,
+        }
+
+
+@dataclass(frozen=True)
+class AssignmentPlan:
+    assignments: Tuple[PlannedAssignment, ...]
+    # 部 ID（部制なしは None）→ {"accepted": 確定後の承認数, "capacity": 定員}
+    session_load: Dict[Optional[int], Dict[str, Optional[int]]]
+
+    def items(self) -> List[Dict[str, Any]]:
+        """確定が必要な（現在と異なる）割り当てのみ。"""
+        return [a.as_item() for a in self.assignments if a.changed]
+
+    def summary(self) -> Dict[str, Any]:
+        by_rank: Dict[str, int] = {}
+        accepted = waitlist = 0
+        for a in self.assignments:
+            if a.approval == 'accepted':
+                accepted += 1
+                key = str(a.rank + 1) if a.rank is not None else 'other'
+                by_rank[key] = by_rank.get(key, 0) + 1
+            else:
+                waitlist += 1
+        return {
+            'accepted': accepted,
+            'waitlist': waitlist,
+            'by_rank': by_rank,
+            'changed': sum(1 for a in self.assignments if a.changed),
+        }
+
+
+def parse_preferences(raw: Any) -> Optional[List[int]]:
+    """preferred_session_ids（JSON 文字列 or リスト）を読む。None は不参加。"""
+    if raw is None:
+        return None
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except ValueError:
+            return []
+    if not isinstance(raw, list):
+        return []
+    prefs: List[int] = []
+    for v in raw:
+        try:
+            sid = int(v)
+        except (TypeError, ValueError):
+            continue
+        if sid not in prefs:
+            prefs.append(sid)
+    return prefs
+
+
+# ============================================================
+# 最小費用流
+# ============================================================
+
+class _MinCostFlow:
+    """逐次最短路（ポテンシャル付き Dijkstra）による最小費用流。費用は非負の整数。"""
+
+    def __init__(self, n: int):
+        self.n = n
+        # 辺: [行き先, 残容量, 費用, 逆辺の index]
+        self.graph: List[List[List[int]]] = [[] for _ in range(n)]
+
+    def add_edge(self, u: int, v: int, cap: int, cost: int) -> List[int]:
+        fwd = [v, cap, cost, len(self.graph[v])]
+        self.graph[u].append(fwd)
+        self.graph[v].append([u, 0, -cost, len(self.graph[u]) - 1])
+        return fwd
+
+    def flow(self, s: int, t: int) -> Tuple[int, int]:
+        """s から t へ流せるだけ流す（最大流の中で費用最小）。(流量, 費用) を返す。"""
+        n, graph = self.n, self.graph
+        potential = [0] * n
+        total_flow = total_cost = 0
+        while True:
+            dist = [_INF] * n
+            prev: List[Optional[Tuple[int, int]]] = [None] * n
+            dist[s] = 0
+            heap = [(0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                for i, (v, cap, cost, _) in enumerate(graph[u]):
+                    if cap <= 0:
+                        continue
+                    nd = d + cost + potential[u] - potential[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = (u, i)
+                        heapq.heappush(heap, (nd, v))
+            if dist[t] == _INF:
+                return total_flow, total_cost
+            for v in range(n):
+                if dist[v] < _INF:
+                    potential[v] += dist[v]
+
+            push = _INF
+            v = t
+            while v != s:
+                u, i = prev[v]
+                push = min(push, graph[u][i][1])
+                v = u
+            v = t
+            while v != s:
+                u, i = prev[v]
+                edge = graph[u][i]
+                edge[1] -= push
+                graph[v][edge[3]][1] += push
+                v = u
+            total_flow += push
+            total_cost += push * (potential[t] - potential[s])
+
+
+# ============================================================
+# 割り当て
+# ============================================================
+
+def plan_assignment(
+    sessions: Sequence[Mapping[str, Any]],
+    participants: Iterable[Mapping[str, Any]],
+    *,
+    event_capacity: Optional[int] = None,
+    allow_unpreferred: bool = True,
+) -> AssignmentPlan:
+    """未確定（承認/否認以外）かつ参加希望の応募者の割り当てを計算する。
+
+    Args:
+        sessions: イベントの部（id, capacity）。空なら部制なし（event_capacity が定員）
+        participants: 参加者（id, approval, session_id, preferred_session_ids）
+        allow_unpreferred: 希望部が満席の場合に希望外の空いている部へ回す
+    """
+    session_ids = [int(s['id']) for s in sessions]
+    capacity = {int(s['id']): s.get('capacity') for s in sessions}
+    plist = sorted(participants, key=lambda p: int(p['id']))
+
+    # 確定済みの承認数（残席から差し引く）
+    used: Dict[Optional[int], int] = {}
+    candidates: List[Tuple[Mapping[str, Any], List[int]]] = []
+    for p in plist:
+        if p.get('approval') in FIXED_APPROVALS:
+            if p.get('approval') == 'accepted':
+                sid = p.get('session_id') if session_ids else None
+                used[sid] = used.get(sid, 0) + 1
+            continue
+        prefs = parse_preferences(p.get('preferred_session_ids'))
+        if prefs is None:
+            continue  # 不参加
+        candidates.append((p, [sid for sid in prefs if sid in capacity]))
+
+    if not session_ids:
+        assignments, load = _plan_without_sessions(candidates, used, event_capacity)
+    else:
+        assignments, load = _plan_with_sessions(
+            session_ids, capacity, candidates, used, allow_unpreferred,
+        )
+    return AssignmentPlan(assignments=tuple(assignments), session_load=load)
+
+
+def _planned(p: Mapping[str, Any], approval: str, session_id: Optional[int], rank: Optional[int]) -> PlannedAssignment:
+    return PlannedAssignment(
+        participant_id=int(p['id']),
+        approval=approval,
+        session_id=session_id,
+        rank=rank,
+        previous_approval=p.get('approval') or 'pending',
+        previous_session_id=p.get('session_id'),
+    )
+
+
+def _plan_without_sessions(candidates, used, event_capacity):
+    """部制なし: 定員まで応募順に承認し、残りは補欠。"""
+    remaining = None if event_capacity is None else max(int(event_capacity) - used.get(None, 0), 0)
+    assignments = []
+    for p, _ in candidates:
+        if remaining is None or remaining > 0:
+            assignments.append(_planned(p, 'accepted', None, 0))
+            if remaining is not None:
+                remaining -= 1
+        else:
+            assignments.append(_planned(p, 'waitlist', None, None))
+    accepted = used.get(None, 0) + sum(1 for a in assignments if a.approval == 'accepted')
+    return assignments, {None: {'accepted': accepted, 'capacity': event_capacity}}
+
+
+def _plan_with_sessions(session_ids, capacity, candidates, used, allow_unpreferred):
+    # 希望の並びが同じ応募者をまとめる（dict は挿入順 = グループ内の最先の応募順）
+    groups: Dict[Tuple[int, ...], List[Mapping[str, Any]]] = {}
+    for p, prefs in candidates:
+        groups.setdefault(tuple(prefs), []).append(p)
+    signatures = list(groups)
+
+    n_groups, n_sessions = len(signatures), len(session_ids)
+    source, sink = 0, n_groups + n_sessions + 1
+    mcf = _MinCostFlow(sink + 1)
+    unpreferred_rank = n_sessions
+    # 総希望順位が最小の割り当ての中から、グループ順（先着）の和が最小のものを選ぶ。
+    # 順位の重みをグループ順の項の合計の上限（全員がグループ順の最後）より大きくし、
+    # 何人を入れ替えても総希望順位の 1 の差をグループ順が覆さないようにする
+    weight = n_groups * len(candidates) + 1
+
+    for j, sid in enumerate(session_ids):
+        cap = capacity[sid]
+        remaining = len(candidates) if cap is None else max(int(cap) - used.get(sid, 0), 0)
+        if remaining:
+            mcf.add_edge(1 + n_groups + j, sink, remaining, 0)
+
+    group_edges: List[List[Tuple[int, Optional[int], List[int]]]] = []
+    for g, sig in enumerate(signatures):
+        node = 1 + g
+        mcf.add_edge(source, node, len(groups[sig]), 0)
+        rank_of = {sid: r for r, sid in enumerate(sig)}
+        edges = []
+        for j, sid in enumerate(session_ids):
+            rank = rank_of.get(sid)
+            if rank is None and not allow_unpreferred and sig:
+                continue
+            cost = (rank if rank is not None else unpreferred_rank) * weight + g
+            edges.append((sid, rank, mcf.add_edge(node, 1 + n_groups + j, len(groups[sig]), cost)))
+        group_edges.append(edges)
+
+    mcf.flow(source, sink)
+
+    assignments = []
+    accepted_per_session = dict(used)
+    for g, sig in enumerate(signatures):
+        members = groups[sig]
+        # 流した量 = 元の容量 - 残容量。良い順位の部から応募順に割り当てる
+        seats = []
+        for sid, rank, edge in sorted(group_edges[g], key=lambda e: e[2][2]):
+            seats.extend([(sid, rank)] * (len(members) - edge[1]))
+        for i, p in enumerate(members):
+            if i < len(seats):
+                sid, rank = seats[i]
+                assignments.append(_planned(p, 'accepted', sid, rank))
+                accepted_per_session[sid] = accepted_per_session.get(sid, 0) + 1
+            else:
+                assignments.append(_planned(p, 'waitlist', None, None))
+
+    assignments.sort(key=lambda a: a.participant_id)
+    load = {
+        sid: {'accepted': accepted_per_session.get(sid, 0), 'capacity': capacity[sid]}
+        for sid in session_ids
+    }
+    return assignments, load
@@ -0,0 +1,156 @@
+# common/survey_analytics.py
+# Why: 「Q2 で A を選んだ人は Q5 に何と答えたか」を調べるために主催者が CSV を
+#      書き出して表計算ソフトで集計していたため、結果画面から直接クロス集計・絞り込みを行う。
+#
+# 列指向の表現:
+#   回答 n 件に 0〜n-1 の行番号を振り、選択式の質問は「選択肢 → 行ビットマップ（Python int）」で持つ。
+#   行 i がその選択肢を選んでいれば bit i が立つ。
+#   - 絞り込み: 同じ質問内の値は OR、質問間は AND（ビット演算のみ）
+#   - 件数: (bitmap & mask).bit_count()
+#   - クロス集計: 行側・列側の選択肢ビットマップの AND の popcount
+#   Python の int は任意長のため、数万件でも 1 回の演算は数マイクロ秒で済む。
+#
+# I/O を持たない純粋なデータ構造のため common/ に配置。回答の取得とキャッシュは
+# services/survey_analytics_service.py が担う。
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+from .survey_utils import QuestionSchema
+
+
+def _bitmap(rows: List[int], size: int) -> int:
+    """行番号リストからビットマップを作る。
+
+    Why: int への |= は毎回 int 全体をコピーするため、1 件ずつ立てると O(n^2) になる。
+         bytearray に立ててから 1 回で int に変換する。
+    """
+    buf = bytearray((size + 7) // 8)
+    for r in rows:
+        buf[r >> 3] |= 1 << (r & 7)
+    return int.from_bytes(buf, 'little')
+
+
+class ChoiceColumn:
+    """選択式の質問 1 問分のビットマップ列。"""
+
+    __slots__ = ('key', 'text', 'labels', 'bitmaps', 'answered', '_rows', '_answered_rows')
+
+    def __init__(self, key: str, text: str, options: Sequence[str]):
+        self.key = key
+        self.text = text
+        # 表示順: スキーマの選択肢 → 選択肢外の値（「その他」の自由記述等）は出現順
+        self.labels: List[str] = [o for o in dict.fromkeys(options) if isinstance(o, str)]
+        self.bitmaps: Dict[str, int] = {}
+        # 1 つ以上回答した行
+        self.answered = 0
+        # 構築中のみ使う行番号リスト
+        self._rows: Dict[str, List[int]] = {opt: [] for opt in self.labels}
+        self._answered_rows: List[int] = []
+
+    def add(self, row: int, values: Iterable[Any]) -> None:
+        hit = False
+        for v in values:
+            if not isinstance(v, str) or not v:
+                continue
+            rows = self._rows.get(v)
+            if rows is None:
+                rows = self._rows[v] = []
+                self.labels.append(v)
+            if not rows or rows[-1] != row:
+                rows.append(row)
+            hit = True
+        if hit:
+            self._answered_rows.append(row)
+
+    def freeze(self, size: int) -> None:
+        """行番号リストをビットマップに変換する。"""
+        self.bitmaps = {label: _bitmap(rows, size) for label, rows in self._rows.items()}
+        self.answered = _bitmap(self._answered_rows, size)
+        self._rows = {}
+        self._answered_rows = []
+
+    def select(self, values: Iterable[str]) -> int:
+        """いずれかの値を選んだ行のビットマップ（OR）。"""
+        mask = 0
+        for v in values:
+            mask |= self.bitmaps.get(v, 0)
+        return mask
+
+    def counts(self, mask: int) -> Dict[str, int]:
+        return {label: (self.bitmaps[label] & mask).bit_count() for label in self.labels}
+
+
+class ResponseTable:
+    """アンケート回答の列指向テーブル（選択式の質問のみ索引化する）。"""
+
+    __slots__ = ('size', 'all_rows', 'columns')
+
+    def __init__(self, schema: QuestionSchema, answers: Iterable[Mapping[str, Any]]):
+        self.columns: Dict[str, ChoiceColumn] = {
+            q.key: ChoiceColumn(q.key, q.text, q.options) for q in schema if q.is_choice
+        }
+        choice_questions = [q for q in schema if q.is_choice]
+
+        size = 0
+        for row, ans in enumerate(answers):
+            size = row + 1
+            for q in choice_questions:
+                val = q.answer_of(ans)
+                if val:
+                    self.columns[q.key].add(row, val if isinstance(val, list) else [val])
+        for col in self.columns.values():
+            col.freeze(size)
+        self.size = size
+        self.all_rows = (1 << size) - 1
+
+    def column(self, key: str) -> ChoiceColumn:
+        col = self.columns.get(str(key))
+        if col is None:
+            raise KeyError(f"question {key} is not a choice question")
+        return col
+
+    def filter_mask(self, filters: Optional[Mapping[str, Iterable[str]]] = None) -> int:
+        """{"<質問index>": [値, ...]} に一致する行のビットマップ。
+
+        同じ質問内の値は OR、質問間は AND。選択式でない質問を指定すると KeyError。
+        """
+        mask = self.all_rows
+        for key, values in (filters or {}).items():
+            mask &= self.column(key).select(values)
+            if not mask:
+                break
+        return mask
+
+    def counts(self, mask: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """絞り込み後の各質問の選択肢ごとの件数と回答者数。"""
+        mask = self.all_rows if mask is None else mask
+        return {
+            key: {
+                'question': col.text,
+                'answered': (col.answered & mask).bit_count(),
+                'counts': col.counts(mask),
+            }
+            for key, col in self.columns.items()
+        }
+
+    def crosstab(self, row_key: str, col_key: str, mask: Optional[int] = None) -> Dict[str, Any]:
+        """2 問のクロス集計表。cells[i][j] は「行側 i 番目 かつ 列側 j 番目」を選んだ人数。
+
+        複数回答の質問では 1 人が複数のセルに数えられる。
+        row_totals / col_totals は各選択肢を選んだ人数（相手側の未回答者も含む）。
+        """
+        mask = self.all_rows if mask is None else mask
+        row_col = self.column(row_key)
+        col_col = self.column(col_key)
+
+        row_maps = [row_col.bitmaps[label] & mask for label in row_col.labels]
+        col_maps = [col_col.bitmaps[label] for label in col_col.labels]
+        cells = [[(rm & cm).bit_count() for cm in col_maps] for rm in row_maps]
+
+        return {
+            'row': {'key': row_col.key, 'question': row_col.text, 'labels': list(row_col.labels)},
+            'col': {'key': col_col.key, 'question': col_col.text, 'labels': list(col_col.labels)},
+            'cells': cells,
+            'row_totals': [rm.bit_count() for rm in row_maps],
+            'col_totals': [(cm & mask).bit_count() for cm in col_maps],
+            'both_answered': (row_col.answered & col_col.answered & mask).bit_count(),
+        }
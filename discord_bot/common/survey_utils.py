@@ -2,30 +2,321 @@
 # Why: parse_questions は JSON パース + データ整形のみの純粋関数。
 #      import discord を使用せず、副作用もないため common/ に配置。
 #      routes/survey.py と cogs/survey/logic.py の両方から利用される。
+#
+# コンパイル済みスキーマ（QuestionSchema）:
+#   フォーム表示・集計・CSV 出力・イベント管理画面のたびに同じ質問 JSON を
+#   デコード + 整形し直していたため、質問 JSON 文字列の内容ハッシュをキーに
+#   不変のスキーマオブジェクトをメモ化する。選択肢は frozenset として事前計算し、
+#   回答の検証・正規化（submit_response）は質問タイプごとの関数に振り分ける。
+import base64
+import binascii
+import hashlib
 import json
-from typing import Any, Dict, List
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+DEFAULT_QUESTION_TEXT = '(無題の質問)'
+DEFAULT_QUESTION_TYPE = 'text'
+
+# 集計で選択肢ごとに件数を数える質問タイプ
+CHOICE_TYPES: FrozenSet[str] = frozenset({'radio', 'checkbox', 'select'})
+# 複数回答を受け付ける質問タイプ（フォーム上は q_<idx>[] で送信される）
+MULTI_TYPES: FrozenSet[str] = frozenset({'checkbox'})
+
+# 「その他」選択時のフォーム値と、自由記述が空だった場合の保存値
+OTHER_VALUE = '__other__'
+OTHER_FALLBACK = 'その他'
+
+# メモ化するスキーマ数の上限（稼働中のアンケート数に対して十分な値）
+_SCHEMA_CACHE_SIZE = 256
+
+
+class CompiledQuestion:
+    """コンパイル済みの質問 1 件。生成後は変更できない。"""
+
+    __slots__ = (
+        'index', 'key', 'text', 'type', 'options', 'option_set',
+        'has_other', 'is_choice', 'is_multi', '_raw',
+    )
+
+    def __init__(self, index: int, raw: Dict[str, Any]):
+        text = raw.get('text', DEFAULT_QUESTION_TEXT)
+        q_type = raw.get('type', DEFAULT_QUESTION_TYPE)
+        options = raw.get('options', [])
+        options = tuple(options) if isinstance(options, list) else ()
+
+        _set = object.__setattr__
+        _set(self, 'index', index)
+        _set(self, 'key', str(index))
+        _set(self, 'text', text)
+        _set(self, 'type', q_type)
+        _set(self, 'options', options)
+        _set(self, 'option_set', frozenset(o for o in options if isinstance(o, str)))
+        _set(self, 'has_other', bool(raw.get('has_other')))
+        _set(self, 'is_choice', q_type in CHOICE_TYPES)
+        _set(self, 'is_multi', q_type in MULTI_TYPES)
+        # テンプレート（logic 等）向けに元のキーも保持する。as_dict() で都度コピーして返す。
+        _set(self, '_raw', raw)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """テンプレート / JSON 向けの dict を新しく生成して返す（呼び出し側で変更してよい）。"""
+        d = {k: (v.copy() if isinstance(v, (dict, list)) else v) for k, v in self._raw.items()}
+        d['text'] = self.text
+        d['type'] = self.type
+        d['options'] = list(self.options) if isinstance(self._raw.get('options', []), list) else self._raw['options']
+        return d
+
+    def answer_of(self, answers: Dict[str, Any]) -> Any:
+        """保存済み回答 dict からこの質問の回答を取り出す。
+
+        Why: 旧実装では複数回答が "0[]" のようにフォームのキー名のまま保存されていたため、
+             正規化後のキーが無い場合はそちらも参照する。
+        """
+        val = answers.get(self.key)
+        if val is None and self.is_multi:
+            val = answers.get(self.key + '[]')
+        return val
+
+    def __repr__(self) -> str:
+        return f"CompiledQuestion(index={self.index}, type={self.type!r}, text={self.text!r})"
+
+
+# ------------------------------------------------------------
+# 回答の正規化（質問タイプごとに振り分け）
+# ------------------------------------------------------------
+
+def _other_text(form: Any, q: CompiledQuestion) -> str:
+    other = form.get(f'q_{q.key}_other', '') or ''
+    return other.strip() or OTHER_FALLBACK
+
+
+def _normalize_text(q: CompiledQuestion, form: Any, values: List[str]) -> Any:
+    return values[0] if values else None
+
+
+def _normalize_single(q: CompiledQuestion, form: Any, values: List[str]) -> Any:
+    if not values:
+        return None
+    val = values[0]
+    if val == OTHER_VALUE and q.has_other:
+        return _other_text(form, q)
+    # 選択肢に無い値（改ざん・編集で消えた選択肢）は保存しない
+    return val if val in q.option_set else None
+
+
+def _normalize_multi(q: CompiledQuestion, form: Any, values: List[str]) -> Any:
+    selected = []
+    seen = set()
+    for val in values:
+        if val in seen:
+            continue
+        seen.add(val)
+        if val == OTHER_VALUE:
+            if q.has_other:
+                selected.append(_other_text(form, q))
+        elif val in q.option_set:
+            selected.append(val)
+    return selected
+
+
+_NORMALIZERS: Dict[str, Callable[[CompiledQuestion, Any, List[str]], Any]] = {
+    'text': _normalize_text,
+    'radio': _normalize_single,
+    'select': _normalize_single,
+    'checkbox': _normalize_multi,
+}
+
+
+class QuestionSchema:
+    """アンケート 1 件分のコンパイル済み質問スキーマ。生成後は変更できない。"""
+
+    __slots__ = ('questions', 'digest')
+
+    def __init__(self, questions: Tuple[CompiledQuestion, ...], digest: str):
+        object.__setattr__(self, 'questions', questions)
+        object.__setattr__(self, 'digest', digest)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def __iter__(self) -> Iterator[CompiledQuestion]:
+        return iter(self.questions)
+
+    def __getitem__(self, index: int) -> CompiledQuestion:
+        return self.questions[index]
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        """parse_questions 互換の dict リストを新しく生成して返す。"""
+        return [q.as_dict() for q in self.questions]
+
+    def normalize_answers(self, form: Any) -> Dict[str, Any]:
+        """フォーム送信値を検証・正規化し、{"<質問index>": 回答} を返す。
+
+        Args:
+            form: get(key) / getlist(key) を持つ MultiDict 互換オブジェクト
+        Returns:
+            スキーマに存在する質問の回答のみを含む dict。
+            単一回答は文字列、複数回答はリスト。「その他」は自由記述（空なら 'その他'）に置き換える。
+        """
+        answers: Dict[str, Any] = {}
+        for q in self.questions:
+            if q.is_multi:
+                values = form.getlist(f'q_{q.key}[]')
+                if not values:
+                    continue
+            else:
+                val = form.get(f'q_{q.key}')
+                if val is None:
+                    continue
+                values = [val]
+            normalizer = _NORMALIZERS.get(q.type, _normalize_text)
+            normalized = normalizer(q, form, values)
+            if normalized is not None:
+                answers[q.key] = normalized
+        return answers
+
+
+_EMPTY_SCHEMA = QuestionSchema((), '')
+_schema_cache: 'OrderedDict[str, QuestionSchema]' = OrderedDict()
+
+
+def _compile(json_str: Any, digest: str) -> QuestionSchema:
+    try:
+        data = json.loads(json_str)
+    except (json.JSONDecodeError, TypeError):
+        return QuestionSchema((), digest)
+    if not isinstance(data, list):
+        return QuestionSchema((), digest)
+    raws = [q for q in data if isinstance(q, dict)]
+    return QuestionSchema(tuple(CompiledQuestion(i, q) for i, q in enumerate(raws)), digest)
+
+
+def compile_questions(json_str: Optional[str]) -> QuestionSchema:
+    """質問 JSON 文字列をコンパイルする。同じ内容の文字列は 2 回目以降キャッシュから返す。
+
+    Args:
+        json_str: 質問データの JSON 文字列
+    Returns:
+        QuestionSchema。パース失敗時は質問 0 件のスキーマ。
+    """
+    if not isinstance(json_str, (str, bytes)) or not json_str:
+        return _EMPTY_SCHEMA
+    raw = json_str.encode('utf-8') if isinstance(json_str, str) else json_str
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+    schema = _schema_cache.get(digest)
+    if schema is not None:
+        _schema_cache.move_to_end(digest)
+        return schema
+
+    schema = _compile(json_str, digest)
+    _schema_cache[digest] = schema
+    if len(_schema_cache) > _SCHEMA_CACHE_SIZE:
+        _schema_cache.popitem(last=False)
+    return schema
+
+
+def clear_schema_cache() -> None:
+    """メモ化したスキーマを破棄する（テスト用）。"""
+    _schema_cache.clear()
 
 
 def parse_questions(json_str: str) -> List[Dict[str, Any]]:
     """アンケートの質問JSON文字列をパースし、安全なデータ構造にサニタイズする。
 
+    コンパイル済みスキーマから毎回新しい dict を生成するため、戻り値を変更しても
+    キャッシュには影響しない。
+
     Args:
         json_str: 質問データのJSON文字列
     Returns:
         サニタイズ済みの質問リスト。パース失敗時は空リスト。
     """
+    return compile_questions(json_str).as_dicts()
+
+
+def decode_answers(raw: Any) -> Dict[str, Any]:
+    """Bridge から返る回答（JSON 文字列 or dict）を dict にする。不正な値は空 dict。"""
+    if isinstance(raw, dict):
+        return raw
+    if isinstance(raw, (str, bytes)):
+        try:
+            data = json.loads(raw)
+        except (json.JSONDecodeError, TypeError):
+            return {}
+        return data if isinstance(data, dict) else {}
+    return {}
+
+
+# ------------------------------------------------------------
+# 回答一覧ページングのカーソル
+# ------------------------------------------------------------
+# Bridge のキーセットページング（submitted_at DESC, id DESC）の位置を
+# URL に載せられる不透明な文字列として受け渡す。
+
+def encode_cursor(submitted_at: str, response_id: int) -> str:
+    """(submitted_at, id) をカーソル文字列にする。"""
+    raw = json.dumps([submitted_at, int(response_id)], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[str, int]]:
+    """カーソル文字列を (submitted_at, id) に戻す。不正な値は None（先頭ページ扱い）。"""
+    if not cursor:
+        return None
     try:
-        data = json.loads(json_str)
-        if not isinstance(data, list):
-            return []
-        sanitized = []
-        for q in data:
-            if not isinstance(q, dict):
-                continue
-            q['text'] = q.get('text', '(無題の質問)')
-            q['type'] = q.get('type', 'text')
-            q['options'] = q.get('options', [])
-            sanitized.append(q)
-        return sanitized
-    except (json.JSONDecodeError, TypeError):
-        return []
+        padded = cursor + '=' * (-len(cursor) % 4)
+        submitted_at, response_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if not isinstance(submitted_at, str):
+            return None
+        return submitted_at, int(response_id)
+    except (ValueError, TypeError, UnicodeError, binascii.Error):
+        return None
+
+
+# ------------------------------------------------------------
+# 結果画面の集計
+# ------------------------------------------------------------
+# 集計そのものは Bridge（GET /surveys/{id}/responses/summary）が行い、ここでは結果画面の形に整える。
+
+# 自由記述の回答を結果画面に直接表示する件数（新しい順）。それ以上は回答ブラウザで閲覧する。
+TEXT_PREVIEW_LIMIT = 20
+
+
+def new_results_stats(schema: QuestionSchema) -> Dict[str, Dict[str, Any]]:
+    """結果画面用の空の集計 dict を作る。"""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for q in schema:
+        entry: Dict[str, Any] = {'question': q.text, 'type': q.type, 'data': [], 'total': 0}
+        if q.is_choice:
+            entry['counts'] = {}
+        else:
+            entry['texts'] = []
+        stats[q.key] = entry
+    return stats
+
+
+def results_stats_from_summary(schema: QuestionSchema, summary: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Bridge の集計（{"questions": {"<index>": {"total", "counts" | "texts"}}}）を結果画面用の dict にする。"""
+    stats = new_results_stats(schema)
+    questions = summary.get('questions') or {}
+    for q in schema:
+        tally = questions.get(q.key)
+        if not tally:
+            continue
+        entry = stats[q.key]
+        entry['total'] = int(tally.get('total') or 0)
+        if q.is_choice:
+            entry['counts'] = {value: count for value, count in tally.get('counts') or []}
+        else:
+            entry['texts'] = list(tally.get('texts') or [])[:TEXT_PREVIEW_LIMIT]
+    return stats
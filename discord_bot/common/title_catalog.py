@@ -0,0 +1,49 @@
+# common/title_catalog.py
+# Why: /lounge/api/me・my-result は呼び出しのたびに全称号（またはプレイヤーの称号一覧）を取得し、
+#      unlock_threshold で並べ替えてランク名を探していた。
+#      称号マスタから unlock_type ごとに閾値の昇順に並べた称号の配列を一度だけ作る。
+#      表示するランク称号は MMR ではなく保有している称号から求める（スタッフによる付与や、
+#      最高 MMR に達した後に追加された称号があるため）。保有 ID を閾値の高い順に照合する。
+#      I/O を持たないため common/ に配置し、読み込みと破棄は TitleService が担う。
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+
+class TitleCatalog:
+    """称号マスタの索引（有効な称号のみ）。"""
+
+    __slots__ = ('loaded_at', '_by_id', '_ranked')
+
+    def __init__(self, titles: Iterable[Mapping[str, Any]], loaded_at: float = 0.0):
+        self.loaded_at = loaded_at
+        self._by_id: Dict[int, Dict[str, Any]] = {}
+        ranked: Dict[str, List[Dict[str, Any]]] = {}
+        for t in titles:
+            if not t.get('is_active', True):
+                continue
+            title = dict(t)
+            self._by_id[int(title['id'])] = title
+            if title.get('unlock_threshold') is not None:
+                ranked.setdefault(title.get('unlock_type') or 'manual', []).append(title)
+        # 同じ閾値の称号は並び順（display_order, id）の先頭を採用する
+        self._ranked: Dict[str, List[Dict[str, Any]]] = {}
+        for unlock_type, items in ranked.items():
+            items.sort(key=lambda x: (int(x['unlock_threshold']), -int(x.get('display_order') or 0), -int(x['id'])))
+            self._ranked[unlock_type] = items
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, title_id: Any) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(int(title_id))
+
+    def highest_held(self, unlock_type: str, title_ids: Iterable[Any]) -> Optional[Dict[str, Any]]:
+        """title_ids（保有している称号）のうち閾値が最も高いもの。無ければ None。"""
+        held = {int(i) for i in title_ids}
+        for title in reversed(self._ranked.get(unlock_type, ())):
+            if int(title['id']) in held:
+                return title
+        return None
+
+    def held_rank_title(self, title_ids: Iterable[Any]) -> Optional[Dict[str, Any]]:
+        """保有している称号のうち最上位のラウンジのランク称号。"""
+        return self.highest_held('lounge_rank', title_ids)
@@ -0,0 +1,124 @@
+# common/title_role_reconcile.py
+# Why: 称号ロールは付与・装備切替のたびに個別に付け外ししているため、Discord 側での手動操作や
+#      API の失敗で DB とずれていく。また全体の同期は称号ロールを 1 件ずつ PATCH するだけで遅い。
+#      DB（player_titles / player_active_title）から「あるべきロールの持ち方」を計算し、
+#      ギルドの実際の状態との差分（付与・解除・ロール名の修正）だけを操作として返す。
+#
+# あるべき状態（ADR-015: Discord ロールは装備中の称号 1 つにのみ紐づける）:
+#   - 称号を装備中: その称号のロールだけを持つ（他の称号ロールは外す）
+#   - 装備なし: 新たには付けない。獲得済みの称号のロールは残し、未獲得の称号ロールは外す
+#     （獲得時の即時付与 _assign_title_role と食い違わないようにするため）
+#   - 称号ロールの名前は DB の称号名に合わせる
+#   称号に紐づかないロール（Server Boost 等）は一切触らない。
+#   I/O を持たないため common/ に配置し、取得と適用は services/title_role_reconciler.py が担う。
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+
+@dataclass(frozen=True)
+class RoleOp:
+    """Discord への操作 1 件。kind: add / remove（メンバーへの付け外し）/ patch（ロールの編集）。"""
+    kind: str
+    role_id: str
+    user_id: Optional[str] = None
+    fields: Tuple[Tuple[str, Any], ...] = ()
+
+    def as_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {'kind': self.kind, 'role_id': self.role_id}
+        if self.user_id is not None:
+            d['user_id'] = self.user_id
+        if self.fields:
+            d['fields'] = dict(self.fields)
+        return d
+
+
+@dataclass
+class ReconcilePlan:
+    """差分の操作一覧。ロール名の修正 → 解除 → 付与の順に適用する。"""
+    patches: List[RoleOp] = field(default_factory=list)
+    removes: List[RoleOp] = field(default_factory=list)
+    adds: List[RoleOp] = field(default_factory=list)
+    # 装備中だがギルドにいない / ロールが存在しない等で反映できないもの
+    skipped: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def operations(self) -> List[RoleOp]:
+        return self.patches + self.removes + self.adds
+
+    def __len__(self) -> int:
+        return len(self.patches) + len(self.removes) + len(self.adds)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            'patch': len(self.patches),
+            'remove': len(self.removes),
+            'add': len(self.adds),
+            'skipped': len(self.skipped),
+        }
+
+    def report(self, limit: int = 200) -> Dict[str, Any]:
+        """dry-run 用の報告（操作は先頭 limit 件まで）。"""
+        return {
+            'summary': self.summary(),
+            'operations': [op.as_dict() for op in self.operations[:limit]],
+            'skipped': self.skipped[:limit],
+        }
+
+
+def plan_title_roles(
+    titles: Iterable[Mapping[str, Any]],
+    earned: Iterable[Mapping[str, Any]],
+    active: Iterable[Mapping[str, Any]],
+    members: Mapping[str, Iterable[Any]],
+    guild_roles: Mapping[str, Mapping[str, Any]],
+) -> ReconcilePlan:
+    """あるべき称号ロールと実際の状態の差分を計算する。
+
+    Args:
+        titles: 称号（id, name, discord_role_id）
+        earned / active: {"user_id", "title_id"} の一覧
+        members: ギルドメンバーの user_id → 持っているロール ID
+        guild_roles: ギルドのロール ID → ロール（name 等）
+    """
+    plan = ReconcilePlan()
+
+    role_of: Dict[int, str] = {}
+    for t in titles:
+        role_id = t.get('discord_role_id')
+        if not role_id:
+            continue
+        role_id = str(role_id)
+        role = guild_roles.get(role_id)
+        if role is None:
+            plan.skipped.append({'reason': 'role_missing', 'title_id': int(t['id']), 'role_id': role_id})
+            continue
+        role_of[int(t['id'])] = role_id
+        if role.get('name') != t['name']:
+            plan.patches.append(RoleOp('patch', role_id, fields=(('name', t['name']),)))
+    managed: Set[str] = set(role_of.values())
+
+    earned_roles: Dict[str, Set[str]] = {}
+    for row in earned:
+        role_id = role_of.get(int(row['title_id']))
+        if role_id:
+            earned_roles.setdefault(str(row['user_id']), set()).add(role_id)
+    active_role: Dict[str, Optional[str]] = {
+        str(row['user_id']): role_of.get(int(row['title_id'])) for row in active
+    }
+
+    for user_id in sorted(set(active_role) - set(members), key=int):
+        if active_role[user_id]:
+            plan.skipped.append({'reason': 'not_in_guild', 'user_id': user_id, 'role_id': active_role[user_id]})
+
+    for user_id in sorted(members, key=int):
+        current = {str(r) for r in members[user_id]} & managed
+        if user_id in active_role and active_role[user_id]:
+            desired = {active_role[user_id]}
+        else:
+            # 装備なし（または装備中の称号にロールがない）: 付けず、未獲得の分だけ外す
+            desired = current & earned_roles.get(user_id, set())
+        for role_id in sorted(current - desired):
+            plan.removes.append(RoleOp('remove', role_id, user_id=user_id))
+        for role_id in sorted(desired - current):
+            plan.adds.append(RoleOp('add', role_id, user_id=user_id))
+    return plan
@@ -0,0 +1,98 @@
+# common/tournament_export.py
+# Why: ロビーの大会結果のエクスポート（/lobby/<passcode>/export_csv）は参加者の
+#      パスコード・ユーザーID・ロールしか出しておらず、試合・スコア・順位が無かった。
+#      参加者 / 試合 / スコア / 順位 を共通の列を持つレコードにし、CSV または JSON Lines の
+#      行に変換する。取得済みの一部（1 ページ分の試合など）ずつ変換できるようにして、
+#      ブラケットの大きさによらず一度に全体を持たずに書き出せるようにする。
+#      I/O を持たないため common/ に配置し、取得と書き出しは services/tournament_export_service.py が担う。
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_JSONL)
+
+# section: member（参加者）/ match（試合）/ score（試合内の順位申告）/ standing（総合順位）
+EXPORT_COLUMNS = (
+    "section",
+    "match_id", "round_num", "match_index", "status",
+    "player1_id", "player1_name", "player2_id", "player2_name",
+    "score1", "score2", "winner_id", "winner_name",
+    "user_id", "username", "role", "position", "points", "rank", "total_points",
+)
+
+NameOf = Callable[[Any], Optional[str]]
+
+
+def _uid(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def member_records(members: Iterable[Mapping[str, Any]], name_of: NameOf) -> Iterator[Dict[str, Any]]:
+    for m in members:
+        uid = _uid(m.get("user_id"))
+        yield {
+            "section": "member", "user_id": uid, "username": name_of(uid),
+            "role": m.get("role"), "status": m.get("status"),
+        }
+
+
+def match_records(matches: Iterable[Mapping[str, Any]], name_of: NameOf) -> Iterator[Dict[str, Any]]:
+    """試合ごとに match のレコードと、続けてその試合の score のレコードを返す。"""
+    for m in matches:
+        p1, p2, winner = _uid(m.get("player1_id")), _uid(m.get("player2_id")), _uid(m.get("winner_id"))
+        yield {
+            "section": "match", "match_id": m.get("match_id"),
+            "round_num": m.get("round_num"), "match_index": m.get("match_index"), "status": m.get("status"),
+            "player1_id": p1, "player1_name": name_of(p1),
+            "player2_id": p2, "player2_name": name_of(p2),
+            "score1": m.get("score1"), "score2": m.get("score2"),
+            "winner_id": winner, "winner_name": name_of(winner),
+        }
+        for s in m.get("scores") or ():
+            uid = _uid(s.get("user_id"))
+            yield {
+                "section": "score", "match_id": m.get("match_id"), "status": s.get("status"),
+                "user_id": uid, "username": name_of(uid),
+                "position": s.get("position"), "points": s.get("points"),
+            }
+
+
+def standing_records(standings: Iterable[Mapping[str, Any]], name_of: NameOf) -> Iterator[Dict[str, Any]]:
+    """合計ポイントの高い順（Bridge の並び）に順位を付ける。同点は同順位。"""
+    rank = 0
+    prev = None
+    for i, s in enumerate(standings, start=1):
+        points = s.get("total_points")
+        if points != prev:
+            rank, prev = i, points
+        uid = _uid(s.get("user_id"))
+        yield {
+            "section": "standing", "rank": rank, "user_id": uid,
+            "username": s.get("username") or name_of(uid), "total_points": points,
+        }
+
+
+def encode_header(fmt: str) -> str:
+    """ファイル先頭。CSV は Excel で開けるよう BOM + 見出し行、JSON Lines は無し。"""
+    if fmt != FORMAT_CSV:
+        return ""
+    buf = io.StringIO()
+    csv.writer(buf).writerow(EXPORT_COLUMNS)
+    return "\ufeff" + buf.getvalue()
+
+
+def encode_records(fmt: str, records: Iterable[Dict[str, Any]]) -> str:
+    """レコードの並びを CSV（EXPORT_COLUMNS の順）または JSON Lines（値のある列のみ）の文字列にする。"""
+    if fmt == FORMAT_CSV:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        for r in records:
+            writer.writerow(["" if r.get(c) is None else r.get(c) for c in EXPORT_COLUMNS])
+        return buf.getvalue()
+    lines: List[str] = [
+        json.dumps({k: v for k, v in r.items() if v is not None}, ensure_ascii=False) for r in records
+    ]
+    return "".join(line + "\n" for line in lines)
@@ -0,0 +1,220 @@
+# common/user_index.py
+# Why: スタッフ追加のインクリメンタル検索がキーストロークごとに Bridge の LIKE 検索を
+#      叩いていたため、ユーザー名をメモリ上の索引に載せて即時に候補を返す。
+#      索引自体は I/O を持たない純粋なデータ構造のため common/ に配置し、
+#      ロードと鮮度管理は services/user_directory_service.py が担う。
+#
+# 正規化:
+#   NFKC（全角英数・半角カナの統一）→ casefold（大文字小文字）→ カタカナをひらがなに寄せる。
+#   「タロウ」「たろう」「ﾀﾛｳ」、「Taro」「ｔａｒｏ」がそれぞれ同一視される。
+# 索引:
+#   - 前方一致: 名前の先頭 / 各単語の先頭から 1〜3 文字をキーにしたバケット。
+#     バケット内は (名前の長さ, 名前) 順に保持するため、先頭から走査して
+#     limit 件集まった時点で打ち切れる。
+#   - 部分一致: 2-gram → ユーザー ID 集合。前方一致だけで limit 件に満たない場合のみ使う。
+import bisect
+import heapq
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# カタカナ（ァ〜ヶ）→ ひらがな（ぁ〜ゖ）
+_KATA_TO_HIRA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+# 単語境界とみなす文字（この直後からの一致を「単語の先頭一致」として扱う）
+_WORD_SEPARATORS = frozenset(' _-.・　')
+
+# 前方一致バケットのキー長の上限
+_PREFIX_LEN = 3
+
+# (名前の長さ, 正規化済み名前, ユーザー ID)。この順で並べたものが同ランク内の表示順になる。
+_Entry = Tuple[int, str, str]
+
+
+def normalize_name(text: str) -> str:
+    """検索用にユーザー名を正規化する。"""
+    return unicodedata.normalize('NFKC', text).casefold().translate(_KATA_TO_HIRA).strip()
+
+
+def _word_starts(norm: str) -> List[int]:
+    """2 語目以降の単語の開始位置。"""
+    return [
+        i for i in range(1, len(norm))
+        if norm[i - 1] in _WORD_SEPARATORS and norm[i] not in _WORD_SEPARATORS
+    ]
+
+
+def _prefix_keys(text: str) -> List[str]:
+    return [text[:n] for n in range(1, min(len(text), _PREFIX_LEN) + 1)]
+
+
+def _bigrams(text: str) -> Set[str]:
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+class UserIndex:
+    """ユーザー名の前方一致 / 2-gram 索引。
+
+    ランキング: 完全一致 → 前方一致 → 単語の先頭一致 → 部分一致。
+    同ランク内は名前の短い順 → 名前順。
+    """
+
+    __slots__ = ('_names', '_entries', '_prefix', '_word_prefix', '_bigrams')
+
+    def __init__(self, users: Optional[Iterable[Tuple[str, str]]] = None):
+        self._names: Dict[str, str] = {}
+        self._entries: Dict[str, _Entry] = {}
+        self._prefix: Dict[str, List[_Entry]] = {}
+        self._word_prefix: Dict[str, List[_Entry]] = {}
+        self._bigrams: Dict[str, Set[str]] = {}
+        if users:
+            self._bulk_load(users)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, user_id) -> bool:
+        return str(user_id) in self._names
+
+    def name(self, user_id) -> Optional[str]:
+        return self._names.get(str(user_id))
+
+    # ------------------------------------------------------------
+    # 構築・更新
+    # ------------------------------------------------------------
+
+    def _bulk_load(self, users: Iterable[Tuple[str, str]]) -> None:
+        """初期ロード。バケットはまとめて追加してから 1 回だけソートする。"""
+        latest = {str(user_id): username for user_id, username in users if username}
+        for uid, username in latest.items():
+            norm = normalize_name(username)
+            entry = (len(norm), norm, uid)
+            self._names[uid] = username
+            self._entries[uid] = entry
+            for key in _prefix_keys(norm):
+                self._prefix.setdefault(key, []).append(entry)
+            for key in self._word_keys(norm):
+                self._word_prefix.setdefault(key, []).append(entry)
+            for gram in _bigrams(norm):
+                self._bigrams.setdefault(gram, set()).add(uid)
+        for bucket in self._prefix.values():
+            bucket.sort()
+        for bucket in self._word_prefix.values():
+            bucket.sort()
+
+    @staticmethod
+    def _word_keys(norm: str) -> Set[str]:
+        keys = set()
+        for start in _word_starts(norm):
+            keys.update(_prefix_keys(norm[start:]))
+        return keys
+
+    def upsert(self, user_id, username: Optional[str]) -> None:
+        """ユーザーを追加 / 更新する。username が空なら索引から外す。"""
+        uid = str(user_id)
+        if not username:
+            self.remove(uid)
+            return
+        if self._names.get(uid) == username:
+            return
+        self.remove(uid)
+        norm = normalize_name(username)
+        entry = (len(norm), norm, uid)
+        self._names[uid] = username
+        self._entries[uid] = entry
+        for key in _prefix_keys(norm):
+            bisect.insort(self._prefix.setdefault(key, []), entry)
+        for key in self._word_keys(norm):
+            bisect.insort(self._word_prefix.setdefault(key, []), entry)
+        for gram in _bigrams(norm):
+            self._bigrams.setdefault(gram, set()).add(uid)
+
+    @staticmethod
+    def _discard(buckets: Dict[str, List[_Entry]], key: str, entry: _Entry) -> None:
+        bucket = buckets.get(key)
+        if not bucket:
+            return
+        i = bisect.bisect_left(bucket, entry)
+        if i < len(bucket) and bucket[i] == entry:
+            del bucket[i]
+        if not bucket:
+            del buckets[key]
+
+    def remove(self, user_id) -> None:
+        uid = str(user_id)
+        entry = self._entries.pop(uid, None)
+        if entry is None:
+            return
+        del self._names[uid]
+        norm = entry[1]
+        for key in _prefix_keys(norm):
+            self._discard(self._prefix, key, entry)
+        for key in self._word_keys(norm):
+            self._discard(self._word_prefix, key, entry)
+        for gram in _bigrams(norm):
+            ids = self._bigrams.get(gram)
+            if ids is not None:
+                ids.discard(uid)
+                if not ids:
+                    del self._bigrams[gram]
+
+    # ------------------------------------------------------------
+    # 検索
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def _is_word_prefix(norm: str, query: str) -> bool:
+        return any(norm.startswith(query, i) for i in _word_starts(norm))
+
+    def search(self, query: str, limit: int = 20, exclude: Optional[Iterable] = None) -> List[Dict[str, str]]:
+        """ユーザー名でユーザーを検索する。
+
+        1 文字のクエリは前方一致 / 単語の先頭一致のみを対象とする。
+
+        Returns:
+            [{"user_id": str, "username": str}, ...]（Bridge の /users/search と同じ形）
+        """
+        q = normalize_name(query or '')
+        if not q or limit <= 0:
+            return []
+
+        excluded = {str(e) for e in exclude} if exclude else set()
+        hits: List[str] = []
+        seen: Set[str] = set(excluded)
+        key = q[:_PREFIX_LEN]
+
+        # 1. 前方一致（完全一致は最短なのでバケットの先頭に来る）
+        for _, norm, uid in self._prefix.get(key, ()):
+            if len(hits) >= limit:
+                break
+            if uid not in seen and norm.startswith(q):
+                hits.append(uid)
+                seen.add(uid)
+
+        # 2. 単語の先頭一致
+        if len(hits) < limit:
+            for _, norm, uid in self._word_prefix.get(key, ()):
+                if len(hits) >= limit:
+                    break
+                if uid not in seen and self._is_word_prefix(norm, q):
+                    hits.append(uid)
+                    seen.add(uid)
+
+        # 3. 部分一致（2-gram の積集合で候補を絞り込む）
+        if len(hits) < limit and len(q) >= 2:
+            postings = []
+            for gram in _bigrams(q):
+                ids = self._bigrams.get(gram)
+                if not ids:
+                    postings = []
+                    break
+                postings.append(ids)
+            if postings:
+                postings.sort(key=len)
+                candidates = postings[0].intersection(*postings[1:])
+                entries = (
+                    self._entries[uid] for uid in candidates
+                    if uid not in seen and q in self._entries[uid][1]
+                )
+                hits.extend(e[2] for e in heapq.nsmallest(limit - len(hits), entries))
+
+        return [{"user_id": uid, "username": self._names[uid]} for uid in hits]
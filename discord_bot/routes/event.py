@@ -1,45 +1,47 @@
 # routes/event.py
 # イベント参加フォーム機能のルート層。
 
+import asyncio
 import json
 import os
 
-from quart import Blueprint, redirect, render_template, request, session, url_for, jsonify, current_app, Response
+from quart import Blueprint, redirect, render_template, request, session, url_for, jsonify, current_app, Response, websocket
 
-from common.calendar_utils import build_calendar_urls, build_ics
+from common.calendar_feed import organizer_feed_token, verify_organizer_feed_token
+from common.calendar_utils import build_calendar_urls
+from common.checkin_index import extract_token
+from common.notification_templates import render_event_notifications
+from services.access_control_service import AccessControlService
 from services.bridge_client import BridgeUnavailableError
+from services.calendar_feed_service import CalendarFeedService
+from services.checkin_hub import checkin_hub
+from services.checkin_index_service import CheckinIndexService
+from services.discord_rest import load_bot_token
+from services.event_admin_service import EventAdminService
 from services.event_service import EventService
-from services.survey_service import SurveyService
-from services.notification_service import NotificationService
+from services.outbox_service import OutboxService
 
 event_bp = Blueprint('event', __name__, url_prefix='/event')
 
 DASHBOARD_URL = os.getenv('DASHBOARD_URL', 'https://dashboard.awajiempire.net')
 
-# ADR-023 以降、トークンは .env の DISCORD_TOKEN で管理する（token.txt はフォールバック）。
-DISCORD_BOT_TOKEN = os.getenv('DISCORD_TOKEN', '').strip() or None
-if not DISCORD_BOT_TOKEN:
-    try:
-        with open('token.txt', 'r', encoding='utf-8') as f:
-            DISCORD_BOT_TOKEN = f.read().strip()
-    except FileNotFoundError:
-        DISCORD_BOT_TOKEN = None
+# ADR-023 以降、トークンは .env の DISCORD_TOKEN で管理する（読み込みは services/discord_rest.py）。
+DISCORD_BOT_TOKEN = load_bot_token()
 
 
 def _current_user():
     return session.get('discord_user')
 
 
+def _webcal_url(path: str) -> str:
+    """カレンダーアプリで購読として開く webcal:// URL。"""
+    base = DASHBOARD_URL.rstrip('/').split('://', 1)[-1]
+    return f"webcal://{base}{path}"
+
+
 async def _can_manage_event(event_id: int, user_id) -> bool:
     """イベント（紐づくアンケート）のオーナー or スタッフなら True。"""
-    result = await EventService.get_event(event_id)
-    if not result:
-        return False
-    survey_id = result['event']['survey_id']
-    owner_id = await SurveyService.get_owner_id(None, survey_id)
-    if owner_id and str(owner_id) == str(user_id):
-        return True
-    return await SurveyService.is_collaborator(survey_id, user_id)
+    return await AccessControlService.can_manage_event(user_id, event_id)
 
 
 # ============================================================
@@ -61,8 +63,7 @@ async def api_create_event():
     sessions  = data.get('sessions', [])
 
     # オーナー確認
-    owner_id = await SurveyService.get_owner_id(None, int(survey_id))
-    if not owner_id or owner_id != str(user['id']):
+    if not await AccessControlService.is_owner(user['id'], int(survey_id)):
         return jsonify({'status': 'error', 'message': 'forbidden'}), 403
 
     event_id = await EventService.create_event(
@@ -117,58 +118,29 @@ async def admin(event_id: int):
         return redirect(url_for('login'))
 
     try:
-        result = await EventService.get_event(event_id)
-        if not result:
+        view = await EventAdminService.get_view(event_id)
+        if not view:
             return 'Not Found', 404
 
-        event    = result['event']
-        sessions = result['sessions']
-
         # 権限確認（アンケートのオーナー or スタッフ）
-        owner_id = await SurveyService.get_owner_id(None, event['survey_id'])
-        if not owner_id:
-            return 'Forbidden', 403
-        if owner_id != str(user['id']) and not await SurveyService.is_collaborator(event['survey_id'], user['id']):
+        if not await _can_manage_event(event_id, user['id']):
             return 'Forbidden', 403
 
-        participants = await EventService.list_participants(event_id)
-
-        # survey responses から username と回答内容を補完
-        survey      = await SurveyService.get_survey(None, event['survey_id'])
-        responses   = await SurveyService.get_responses(None, event['survey_id'])
-        resp_map    = {str(r['id']): r for r in responses}
-        for p in participants:
-            resp = resp_map.get(str(p.get('response_id', '')), {})
-            if not p.get('username'):
-                p['username'] = resp.get('user_name', f"ID:{p['user_id']}")
-            import json as _json
-            raw_answers = resp.get('answers', '{}')
-            p['answers'] = _json.loads(raw_answers) if isinstance(raw_answers, str) else (raw_answers or {})
-
-        from common.survey_utils import parse_questions
-        survey_questions = parse_questions(survey['questions']) if survey else []
-
-        # 部ごとの残席計算
-        session_stats = {}
-        for s in sessions:
-            accepted = sum(1 for p in participants if p.get('session_id') == s['id'] and p['approval'] == 'accepted')
-            session_stats[s['id']] = {
-                'accepted': accepted,
-                'capacity': s['capacity'],
-                'remaining': (s['capacity'] - accepted) if s['capacity'] else None,
-            }
-
     except BridgeUnavailableError:
         return await render_template('maintenance.html'), 503
 
     return await render_template(
         'event_admin.html',
         user=user,
-        event=event,
-        sessions=sessions,
-        participants=participants,
-        session_stats=session_stats,
-        survey_questions=survey_questions,
+        event=view.event,
+        sessions=view.sessions,
+        participants=view.participants,
+        session_stats=view.session_stats,
+        survey_questions=view.survey_questions,
+        calendar_feed_url=_webcal_url(url_for(
+            'event.organizer_calendar_feed', event_id=event_id,
+            sig=organizer_feed_token(current_app.secret_key, event_id),
+        )),
     )
 
 
@@ -184,65 +156,186 @@ async def checkin_page(event_id: int):
         return redirect(url_for('login'))
 
     try:
-        result = await EventService.get_event(event_id)
-        if not result:
+        view = await EventAdminService.get_view(event_id)
+        if not view:
             return 'Not Found', 404
 
-        event    = result['event']
-        sessions = result['sessions']
-
         if not await _can_manage_event(event_id, user['id']):
             return 'Forbidden', 403
 
-        participants = await EventService.list_participants(event_id)
-
-        # 回答者名を survey responses から補完
-        survey    = await SurveyService.get_survey(None, event['survey_id'])
-        responses = await SurveyService.get_responses(None, event['survey_id'])
-        resp_map  = {str(r['id']): r for r in responses}
-        for p in participants:
-            resp = resp_map.get(str(p.get('response_id', '')), {})
-            if not p.get('username'):
-                p['username'] = resp.get('user_name', f"ID:{p['user_id']}")
-
-        # 承認済みのみ対象。部ごとにグルーピング（部なしは None キー）
-        accepted = [p for p in participants if p.get('approval') == 'accepted']
-        session_map = {s['id']: s for s in sessions}
-        grouped = {}
-        for p in accepted:
-            sid = p.get('session_id')
-            grouped.setdefault(sid, []).append(p)
-
-        checked_in_count = sum(1 for p in accepted if p.get('checked_in_at'))
-
     except BridgeUnavailableError:
         return await render_template('maintenance.html'), 503
 
+    # 承認済みのみ対象。部ごとにグルーピング（部なしは None キー）
     return await render_template(
         'event_checkin.html',
         user=user,
-        event=event,
-        sessions=sessions,
-        session_map=session_map,
-        grouped=grouped,
-        accepted_total=len(accepted),
-        checked_in_count=checked_in_count,
+        event=view.event,
+        sessions=view.sessions,
+        session_map=view.session_map,
+        grouped=view.checkin_groups,
+        accepted_total=view.accepted_total,
+        checked_in_count=view.checked_in_count,
     )
 
 
+async def _apply_checkin(event_id: int, user_id, participant_id, checked_in) -> dict:
+    """受付画面からのチェックイン操作を 1 件適用する（HTTP / WebSocket 共通）。
+
+    権限は ACL キャッシュで判定するため、通常は Bridge への書き込み 1 回で済む。
+    """
+    try:
+        if not await _can_manage_event(event_id, user_id):
+            return {'status': 'forbidden'}
+        res = await EventService.set_checkin(int(participant_id), bool(checked_in), event_id=event_id)
+    except BridgeUnavailableError:
+        return {'status': 'unavailable'}
+    except (TypeError, ValueError):
+        return {'status': 'error'}
+    if res is None:
+        return {'status': 'error'}
+    return {
+        'status': 'ok',
+        'participant_id': res['participant_id'],
+        'checked_in_at': res.get('checked_in_at'),
+    }
+
+
 @event_bp.route('/<int:event_id>/api/participant/<int:participant_id>/checkin', methods=['POST'])
 async def api_checkin(event_id: int, participant_id: int):
-    """参加者のチェックイン状態を切り替える。"""
+    """参加者のチェックイン状態を設定する（WebSocket が使えない場合の経路）。"""
     user = _current_user()
     if not user:
         return jsonify({'status': 'error'}), 401
-    if not await _can_manage_event(event_id, user['id']):
-        return jsonify({'status': 'forbidden'}), 403
 
     data = await request.get_json()
-    checked_in = bool(data.get('checked_in'))
-    ok = await EventService.set_checkin(participant_id, checked_in)
-    return jsonify({'status': 'ok' if ok else 'error'})
+    result = await _apply_checkin(event_id, user['id'], participant_id, data.get('checked_in'))
+    if result['status'] == 'forbidden':
+        return jsonify(result), 403
+    if result['status'] == 'unavailable':
+        return jsonify(result), 503
+    return jsonify(result)
+
+
+@event_bp.route('/<int:event_id>/api/checkin/state')
+async def api_checkin_state(event_id: int):
+    """承認済み参加者のチェックイン状態（再接続・取りこぼし時の取り直し用）。"""
+    user = _current_user()
+    if not user:
+        return jsonify({'status': 'error'}), 401
+    try:
+        if not await _can_manage_event(event_id, user['id']):
+            return jsonify({'status': 'forbidden'}), 403
+        participants = await EventService.list_participants(event_id)
+    except BridgeUnavailableError:
+        return jsonify({'status': 'unavailable'}), 503
+
+    return jsonify({
+        'status': 'ok',
+        'checked_in': {
+            str(p['id']): p.get('checked_in_at')
+            for p in participants if p.get('approval') == 'accepted'
+        },
+    })
+
+
+@event_bp.route('/<int:event_id>/checkin/scan')
+async def checkin_scan_page(event_id: int):
+    """QR 受付（キオスク）モード。参加確認ページの QR を読み取って受付する。"""
+    user = _current_user()
+    if not user:
+        return redirect(url_for('login'))
+
+    try:
+        view = await EventAdminService.get_view(event_id)
+        if not view:
+            return 'Not Found', 404
+        if not await _can_manage_event(event_id, user['id']):
+            return 'Forbidden', 403
+        # 最初の読み取りを待たせないよう索引を先に読み込んでおく
+        await CheckinIndexService.get_index(event_id)
+    except BridgeUnavailableError:
+        return await render_template('maintenance.html'), 503
+
+    return await render_template('event_checkin_scan.html', user=user, event=view.event)
+
+
+@event_bp.route('/<int:event_id>/api/checkin/scan', methods=['POST'])
+async def api_checkin_scan(event_id: int):
+    """読み取った QR（参加確認ページの URL または access_token）で受付する。
+
+    token の解決は索引から行い、Bridge への書き込みは未受付の承認済み参加者のみ 1 回。
+    status: ok（受付した）/ already（受付済み）/ not_accepted / not_found / forbidden / unavailable / error
+    """
+    user = _current_user()
+    if not user:
+        return jsonify({'status': 'error'}), 401
+
+    data = await request.get_json()
+    token = extract_token(str(data.get('code', '')))
+    try:
+        if not await _can_manage_event(event_id, user['id']):
+            return jsonify({'status': 'forbidden'}), 403
+        entry = await CheckinIndexService.resolve(event_id, token)
+    except BridgeUnavailableError:
+        return jsonify({'status': 'unavailable'}), 503
+
+    if entry is None:
+        return jsonify({'status': 'not_found'})
+    if entry.approval != 'accepted':
+        return jsonify({'status': 'not_accepted', **entry.as_dict()})
+    if entry.checked_in_at:
+        return jsonify({'status': 'already', **entry.as_dict()})
+
+    result = await _apply_checkin(event_id, user['id'], entry.participant_id, True)
+    if result['status'] == 'unavailable':
+        return jsonify(result), 503
+    if result['status'] != 'ok':
+        return jsonify(result)
+    return jsonify({**entry.as_dict(), **result})
+
+
+@event_bp.websocket('/<int:event_id>/ws/checkin')
+async def ws_checkin(event_id: int):
+    """当日受付画面の同期チャネル。
+
+    サーバー → 端末: event.checkin（他端末を含む変更）/ checkin.resync（状態の取り直し指示）
+    端末 → サーバー: {"type": "checkin", "op_id", "participant_id", "checked_in"}
+                     → {"type": "checkin.ack", "op_id", "status", ...} を返す
+    """
+    user = _current_user()
+    if not user:
+        return 'Unauthorized', 401
+    try:
+        if not await _can_manage_event(event_id, user['id']):
+            return 'Forbidden', 403
+    except BridgeUnavailableError:
+        return 'Service Unavailable', 503
+
+    await websocket.accept()
+    async with checkin_hub.subscribe(event_id) as queue:
+
+        async def push():
+            while True:
+                msg = await queue.get()
+                await websocket.send(json.dumps(msg, ensure_ascii=False))
+
+        async def receive():
+            while True:
+                raw = await websocket.receive()
+                try:
+                    op = json.loads(raw)
+                except ValueError:
+                    continue
+                if not isinstance(op, dict) or op.get('type') != 'checkin':
+                    continue
+                result = await _apply_checkin(event_id, user['id'], op.get('participant_id'), op.get('checked_in'))
+                result.setdefault('participant_id', op.get('participant_id'))
+                await websocket.send(json.dumps(
+                    {'type': 'checkin.ack', 'op_id': op.get('op_id'), **result}, ensure_ascii=False,
+                ))
+
+        await asyncio.gather(push(), receive())
 
 
 @event_bp.route('/<int:event_id>/api/participant/<int:participant_id>', methods=['DELETE'])
@@ -282,19 +375,144 @@ async def api_update_participant(participant_id: int):
     return jsonify({'status': 'ok' if ok else 'error'})
 
 
+_BULK_UPDATE_LIMIT = 1000
+_BULK_UPDATE_FIELDS = ('approval', 'session_id', 'personal_note')
+
+
+@event_bp.route('/api/<int:event_id>/participants', methods=['PATCH'])
+async def api_bulk_update_participants(event_id: int):
+    """複数の参加者の承認状況・部・個人メモをまとめて更新する。
+
+    body: {"items": [{"participant_id", "approval"?, "session_id"?, "personal_note"?}, ...],
+           "all_or_nothing": false}
+    """
+    user = _current_user()
+    if not user:
+        return jsonify({'status': 'error'}), 401
+    if not await _can_manage_event(event_id, user['id']):
+        return jsonify({'status': 'forbidden'}), 403
+
+    data = await request.get_json()
+    raw_items = data.get('items') or []
+    if len(raw_items) > _BULK_UPDATE_LIMIT:
+        return jsonify({'status': 'error', 'message': f'too many items (max {_BULK_UPDATE_LIMIT})'}), 400
+    try:
+        items = []
+        for item in raw_items:
+            update = {'participant_id': int(item['participant_id'])}
+            for key in _BULK_UPDATE_FIELDS:
+                if key in item:
+                    update[key] = item[key]
+            if update.get('session_id') is not None:
+                update['session_id'] = int(update['session_id'])
+            items.append(update)
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'invalid items'}), 400
+
+    res = await EventService.bulk_update_participants(
+        event_id, items, all_or_nothing=bool(data.get('all_or_nothing')),
+    )
+    if res is None:
+        return jsonify({'status': 'error'}), 500
+    return jsonify(res)
+
+
 # ============================================================
 # Admin API: 自動割り当て
 # ============================================================
 
+_ASSIGN_APPROVALS = frozenset({'accepted', 'waitlist', 'pending'})
+
+
 @event_bp.route('/api/<int:event_id>/auto-assign', methods=['POST'])
 async def api_auto_assign(event_id: int):
+    """割り当てを計算してそのまま確定する（プレビューを挟まない場合）。"""
     user = _current_user()
     if not user:
         return jsonify({'status': 'error'}), 401
+    if not await _can_manage_event(event_id, user['id']):
+        return jsonify({'status': 'forbidden'}), 403
 
     ok = await EventService.auto_assign(event_id)
     current_app.logger.info(f"[auto_assign] event_id={event_id} result={ok}")
-    return jsonify({'status': 'ok' if ok else 'error'})
+    participants = await EventService.list_participants(event_id) if ok else []
+    return jsonify({'status': 'ok' if ok else 'error', 'participants': participants})
+
+
+@event_bp.route('/api/<int:event_id>/auto-assign/preview', methods=['POST'])
+async def api_auto_assign_preview(event_id: int):
+    """割り当ての計算結果を返す（DB は変更しない）。確定は返した items を commit へ送る。"""
+    user = _current_user()
+    if not user:
+        return jsonify({'status': 'error'}), 401
+    try:
+        if not await _can_manage_event(event_id, user['id']):
+            return jsonify({'status': 'forbidden'}), 403
+        plan = await EventService.plan_assignment(event_id)
+    except BridgeUnavailableError:
+        return jsonify({'status': 'unavailable'}), 503
+    if plan is None:
+        return jsonify({'status': 'not_found'}), 404
+
+    return jsonify({
+        'status': 'ok',
+        'summary': plan.summary(),
+        'session_load': {
+            ('none' if sid is None else str(sid)): load for sid, load in plan.session_load.items()
+        },
+        'assignments': [
+            {
+                'participant_id': a.participant_id,
+                'approval': a.approval,
+                'session_id': a.session_id,
+                'rank': a.rank,
+                'changed': a.changed,
+            }
+            for a in plan.assignments
+        ],
+        'items': plan.items(),
+    })
+
+
+@event_bp.route('/api/<int:event_id>/auto-assign/commit', methods=['POST'])
+async def api_auto_assign_commit(event_id: int):
+    """プレビューした割り当てを一括で確定する。
+
+    プレビュー後に承認状況が変わった参加者や定員超過があれば何も変更せず 409 を返す。
+    """
+    user = _current_user()
+    if not user:
+        return jsonify({'status': 'error'}), 401
+    if not await _can_manage_event(event_id, user['id']):
+        return jsonify({'status': 'forbidden'}), 403
+
+    data = await request.get_json()
+    items = []
+    try:
+        for item in data.get('items') or []:
+            approval = item['approval']
+            if approval not in _ASSIGN_APPROVALS or item['expected_approval'] not in _ASSIGN_APPROVALS:
+                raise ValueError(approval)
+            session_id = item.get('session_id')
+            items.append({
+                'participant_id': int(item['participant_id']),
+                'approval': approval,
+                'session_id': int(session_id) if session_id is not None else None,
+                'expected_approval': item['expected_approval'],
+            })
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'invalid items'}), 400
+
+    res = await EventService.apply_assignments(event_id, items)
+    current_app.logger.info(
+        f"[auto_assign] commit event_id={event_id} items={len(items)} "
+        f"result={res.get('status') if res else None}"
+    )
+    if res is None:
+        return jsonify({'status': 'error'}), 500
+    if res.get('status') == 'conflict':
+        return jsonify(res), 409
+    return jsonify(res)
 
 
 # ============================================================
@@ -310,84 +528,75 @@ async def api_notify(event_id: int):
     try:
         result   = await EventService.get_event(event_id)
         event    = result['event']
-        sessions = {s['id']: s for s in result['sessions']}
         participants = await EventService.list_participants(event_id)
     except Exception as e:
         current_app.logger.error(f'api_notify error: {e}')
         return jsonify({'status': 'error'}), 500
 
-    sent = 0
-    for p in participants:
-        if p.get('notified_at'):
-            continue  # 送信済みはスキップ
-
-        sess = sessions.get(p.get('session_id'))
-        confirm_url = f"{DASHBOARD_URL}/event/confirm/{p['access_token']}"
-
-        if p['approval'] == 'accepted':
-            lines = [
-                f"【{event['title']}】参加確定のお知らせ",
-                '━━━━━━━━━━━━━━━',
-            ]
-            if sess:
-                lines.append(f"✅ {sess['name']} 参加確定")
-                if sess.get('event_date'):
-                    lines.append(f"📅 {sess['event_date']}")
-                if sess.get('location'):
-                    lines.append(f"📍 {sess['location']}")
-                # カレンダーURL（部の日時）
-                cal = build_calendar_urls(
-                    title=f"{event['title']} {sess['name']}",
-                    start_str=sess.get('event_date'),
-                    end_str=sess.get('end_date'),
-                    location=sess.get('location'),
-                )
-            else:
-                # 部制なし: イベント全体の日時
-                cal = build_calendar_urls(
-                    title=event['title'],
-                    start_str=event.get('event_date'),
-                    end_str=event.get('end_date'),
-                    location=event.get('location'),
-                )
-            if event.get('fee'):
-                lines.append(f"💴 参加費: {event['fee']}円")
-            lines += [
-                '',
-                '📆 カレンダーに追加:',
-                f"・Google: <{cal['google']}>",
-                f"・Outlook: <{cal['outlook']}>",
-                '━━━━━━━━━━━━━━━',
-                f'詳細確認: {confirm_url}',
-            ]
-            message = '\n'.join(lines)
-
-        elif p['approval'] == 'rejected':
-            message = (
-                f"【{event['title']}】参加について\n"
-                "申し訳ございませんが、今回は参加をお断りさせていただきます。\n"
-                "またの機会にぜひご参加ください。"
-            )
+    messages = render_event_notifications(event, result['sessions'], participants, DASHBOARD_URL)
 
-        elif p['approval'] == 'waitlist':
-            message = (
-                f"【{event['title']}】補欠登録のお知らせ\n"
-                "現在補欠となっています。キャンセルが出た場合にご連絡します。\n"
-                f"詳細確認: {confirm_url}"
-            )
-        else:
-            continue
+    # 先に Outbox へ積んでから送る。途中で止まっても Bot のワーカーが残りを再送する
+    enqueued = await OutboxService.enqueue(event_id, messages)
+    report = await OutboxService.drain(DISCORD_BOT_TOKEN, event_id=event_id)
+    return jsonify({
+        'status': 'ok',
+        'enqueued': enqueued,
+        'sent': report['sent'],
+        'failed': report['failed'],
+        'elapsed': report['elapsed'],
+    })
+
+
+@event_bp.route('/api/<int:event_id>/outbox/stuck')
+async def api_outbox_stuck(event_id: int):
+    """送信できずに滞留している通知（断念 / 再試行待ち）の一覧。"""
+    user = _current_user()
+    if not user:
+        return jsonify({'status': 'error'}), 401
+    if not await _can_manage_event(event_id, user['id']):
+        return jsonify({'status': 'forbidden'}), 403
+
+    items = await OutboxService.list_stuck(event_id)
+    return jsonify({'status': 'ok', 'items': items})
+
+
+@event_bp.route('/api/<int:event_id>/outbox/<int:outbox_id>/requeue', methods=['POST'])
+async def api_outbox_requeue(event_id: int, outbox_id: int):
+    """滞留している通知を再送対象に戻し、すぐに送信を試みる。
+
+    本文は積んだ時のものではなく、参加者の現在の承認・セッションから描画し直す。
+    通知の対象でなくなった（未選考に戻った・通知済み）場合は 409。
+    """
+    user = _current_user()
+    if not user:
+        return jsonify({'status': 'error'}), 401
+    if not await _can_manage_event(event_id, user['id']):
+        return jsonify({'status': 'forbidden'}), 403
+    owner = await OutboxService.get_owner(outbox_id)
+    if not owner or owner['event_id'] != event_id:
+        return jsonify({'status': 'error'}), 404
 
-        ok = await NotificationService.send_dm_raw(
-            bot_token=DISCORD_BOT_TOKEN,
-            user_id=str(p['user_id']),
-            message=message,
-        )
-        if ok:
-            await EventService.mark_notified(p['id'])
-            sent += 1
+    try:
+        result = await EventService.get_event(event_id)
+        event = result['event']
+        participants = await EventService.list_participants(event_id)
+    except Exception as e:
+        current_app.logger.error(f'api_outbox_requeue error: {e}')
+        return jsonify({'status': 'error'}), 500
+    participant = [p for p in participants if p['id'] == owner['participant_id']]
+    # 締切後（closed）は補欠のまま確定しているため、締切処理と同じくお断りとして描画する
+    messages = render_event_notifications(
+        event, result['sessions'], participant, DASHBOARD_URL,
+        waitlist_as_rejected=event.get('status') == 'closed',
+    )
+    if not messages:
+        return jsonify({'status': 'error', 'message': 'not notifiable'}), 409
+    (_, user_id, content), = messages
 
-    return jsonify({'status': 'ok', 'sent': sent})
+    if not await OutboxService.requeue(outbox_id, user_id, content):
+        return jsonify({'status': 'error'}), 409
+    report = await OutboxService.drain(DISCORD_BOT_TOKEN, event_id=event_id)
+    return jsonify({'status': 'ok', 'sent': report['sent'], 'failed': report['failed']})
 
 
 # ============================================================
@@ -432,40 +641,60 @@ async def confirm(token: str):
         participant=participant,
         assigned_session=assigned,
         cal_urls=cal_urls,
+        # 当日受付の QR（受付側は URL から token を取り出す）
+        confirm_url=f"{DASHBOARD_URL.rstrip('/')}/event/confirm/{token}",
+        calendar_feed_url=_webcal_url(url_for('event.participant_calendar_feed', token=token)),
     )
 
 
+def _ics_response(doc, *, filename=None):
+    """組み立て済みの .ics を返す。ETag / Last-Modified が一致すれば 304。"""
+    headers = {
+        'ETag': doc.etag,
+        'Last-Modified': doc.last_modified_http,
+        'Cache-Control': 'private, max-age=300',
+    }
+    if doc.is_not_modified(request.headers.get('If-None-Match'), request.if_modified_since):
+        return Response('', status=304, headers=headers)
+    if filename:
+        headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return Response(doc.body, mimetype='text/calendar', headers=headers)
+
+
 @event_bp.route('/confirm/<token>/calendar.ics')
 async def download_ics(token: str):
-    participant = await EventService.get_participant_by_token(token)
-    if not participant or participant['approval'] != 'accepted':
+    try:
+        if await CalendarFeedService.participant_approval(token) != 'accepted':
+            return 'Not Found', 404
+        doc = await CalendarFeedService.participant_feed(token)
+    except BridgeUnavailableError:
+        return 'Service Unavailable', 503
+    if doc is None:
         return 'Not Found', 404
+    return _ics_response(doc, filename='event.ics')
 
-    result = await EventService.get_event(participant['event_id'])
-    if not result:
+
+@event_bp.route('/confirm/<token>/feed.ics')
+async def participant_calendar_feed(token: str):
+    """参加者のカレンダー購読 URL。承認・部の変更は同じ UID の予定の更新として届く。"""
+    try:
+        doc = await CalendarFeedService.participant_feed(token)
+    except BridgeUnavailableError:
+        return 'Service Unavailable', 503
+    if doc is None:
         return 'Not Found', 404
+    return _ics_response(doc)
 
-    event    = result['event']
-    sessions = {s['id']: s for s in result['sessions']}
-    assigned = sessions.get(participant.get('session_id'))
 
-    if assigned:
-        ics = build_ics(
-            title=f"{event['title']} {assigned['name']}",
-            start_str=assigned.get('event_date'),
-            end_str=assigned.get('end_date'),
-            location=assigned.get('location'),
-        )
-    else:
-        ics = build_ics(
-            title=event['title'],
-            start_str=event.get('event_date'),
-            end_str=event.get('end_date'),
-            location=event.get('location'),
-        )
-
-    return Response(
-        ics,
-        mimetype='text/calendar',
-        headers={'Content-Disposition': 'attachment; filename="event.ics"'},
-    )
+@event_bp.route('/<int:event_id>/calendar/<sig>.ics')
+async def organizer_calendar_feed(event_id: int, sig: str):
+    """主催者のカレンダー購読 URL（全部の予定）。URL の署名で認可する。"""
+    if not verify_organizer_feed_token(current_app.secret_key, event_id, sig):
+        return 'Not Found', 404
+    try:
+        doc = await CalendarFeedService.organizer_feed(event_id)
+    except BridgeUnavailableError:
+        return 'Service Unavailable', 503
+    if doc is None:
+        return 'Not Found', 404
+    return _ics_response(doc)
@@ -1,63 +1,31 @@
-import csv
-import io
+import asyncio
+import json
 import time
-import httpx
 import os
-from quart import Blueprint, current_app, redirect, render_template, request, session, url_for, flash, make_response, jsonify
+from quart import Blueprint, Response, current_app, redirect, render_template, request, session, url_for, flash, jsonify, websocket
 from services.lobby_service import LobbyService
+from services.lobby_hub import lobby_hub
+from services.lobby_status_buffer import LOBBY_MEMBER_STATUSES, lobby_status_buffer
+from services.tournament_export_service import TournamentExportService
 from services.bridge_client import BridgeUnavailableError
-
-def get_bot_token():
-    try:
-        with open('token.txt', 'r') as f:
-            return f.read().strip()
-    except Exception:
-        return None
+from services.discord_role_service import DiscordRoleService
+from common.bracket import BRACKET_FORMATS, SINGLE_ELIMINATION, resolve_champion
+from common.tournament_export import EXPORT_FORMATS, FORMAT_CSV
 
 async def assign_winner_role_via_api(user_id: str, tournament_name: str, guild_id: str):
-    token = get_bot_token()
-    if not token or not guild_id: return False
-    
-    headers = {
-        "Authorization": f"Bot {token}",
-        "Content-Type": "application/json"
-    }
-    
+    if not guild_id:
+        return False
+
     role_name = f"{tournament_name} 優勝"
-    
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # 1. Fetch roles
-            res = await client.get(f"https://discord.com/api/v10/guilds/{guild_id}/roles", headers=headers)
-            if res.status_code != 200: return False
-            roles = res.json()
-            
-            target_role_id = None
-            for r in roles:
-                if r["name"] == role_name:
-                    target_role_id = r["id"]
-                    break
-                    
-            # 2. Create role if not exists
-            if not target_role_id:
-                payload = {
-                    "name": role_name, 
-                    "color": 0xFFD700, 
-                    "hoist": True 
-                }
-                res = await client.post(f"https://discord.com/api/v10/guilds/{guild_id}/roles", json=payload, headers=headers)
-                if res.status_code in (200, 201):
-                    target_role_id = res.json()["id"]
-                else:
-                    return False
-                    
-            # 3. Assign role
-            res = await client.put(f"https://discord.com/api/v10/guilds/{guild_id}/members/{user_id}/roles/{target_role_id}", headers=headers)
-            return res.status_code == 204
-    except Exception as e:
-        current_app.logger.error(f"Failed to assign role via REST API: {e}")
+
+    # 1. 同名のロールを索引から引き、無ければ作成（同時の承認でも 1 つだけ作る）
+    target_role_id = await DiscordRoleService.ensure_role(guild_id, role_name, color=0xFFD700, hoist=True)
+    if not target_role_id:
         return False
 
+    # 2. Assign role
+    return await DiscordRoleService.add_member_role(guild_id, user_id, target_role_id)
+
 lobby_bp = Blueprint('lobby', __name__, url_prefix='/lobby')
 
 @lobby_bp.route('/create', methods=['POST'])
@@ -72,7 +40,9 @@ async def create_lobby():
     title = form.get('title', '新対戦ロビー')
     description = form.get('description', '').strip() or None
     game_title_id = form.get('game_title_id')
-    bracket_format = form.get('bracket_format', 'single_elimination')
+    bracket_format = form.get('bracket_format', SINGLE_ELIMINATION)
+    if bracket_format not in BRACKET_FORMATS:
+        bracket_format = SINGLE_ELIMINATION
     wins_required = form.get('wins_required', '1')
 
     if not passcode:
@@ -112,7 +82,8 @@ async def view_lobby(passcode):
             await flash("指定されたロビーは存在しないか、期限切れです", "error")
             return redirect(url_for('index'))
 
-        members = await LobbyService.get_members(passcode)
+        # Bridge へ未反映のステータス切り替えを重ねる
+        members = lobby_status_buffer.overlay(passcode, await LobbyService.get_members(passcode))
         # 現在のユーザーがどのロールで参加しているかを判定
         my_role = None
         for m in members:
@@ -210,22 +181,12 @@ async def approve_winner(passcode):
             guild_id = os.getenv('DISCORD_GUILD_ID')
             title = room.get('title', '新対戦ロビー')
             
-            # Since the backend doesn't yet explicitly compute the winner here,
-            # this assumes the logic for fetching winner_id exists or will exist soon.
-            # For now, if the API starts returning a specific tournament winner from the match tree,
-            # we'd use it. Since the DB matches handle winner_id, ideally we fetch the final match winner.
-            # Since this is a simple implementation, if we can't get the winner right away, we just flash success.
-            # In a full tournament flow, the room data should contain the known final winner.
-            
-            # To simulate, if LobbyService provides a get_tournament_winner
+            # 試合の繋がり（next_match_id）/ 勝ち上がり / 総当たりの勝数から優勝者を求める。
+            # 決勝が未決着・首位が並んでいる場合は None（ロール付与はしない）
             winner_id = None
             try:
-                matches = await LobbyService._fetch_tournament_matches(passcode) # Using internal logic
-                # For Bracketry format, finding the final match
-                # Let's say if it exists, grab winner_id
-                if matches and len(matches) > 0:
-                    final_match = sorted(matches, key=lambda m: m.get('round_num', 0))[-1]
-                    winner_id = final_match.get('winner_id')
+                matches = await LobbyService._fetch_tournament_matches(passcode)
+                winner_id = resolve_champion(matches)
             except Exception:
                 pass
 
@@ -260,15 +221,43 @@ async def update_my_status():
     
     if not passcode or not status:
         return jsonify({"status": "error", "message": "missing params"}), 400
-        
+    if status not in LOBBY_MEMBER_STATUSES:
+        return jsonify({"status": "error", "message": "invalid status"}), 400
+
+    # 参加していないロビーのステータスは受け付けない（バッファは受付時にロビーの購読者へ配信するため）
     try:
-        success = await LobbyService.update_member_status(passcode, int(user['id']), status)
-        if success:
-            return jsonify({"status": "ok"})
-        else:
-            return jsonify({"status": "error", "message": "failed to update"})
-    except Exception as e:
-        return jsonify({"status": "error", "message": str(e)}), 500
+        if not await LobbyService.is_member(passcode, user['id']):
+            return jsonify({"status": "error", "message": "forbidden"}), 403
+    except BridgeUnavailableError:
+        return jsonify({"status": "error", "message": "service unavailable"}), 503
+
+    # ロビーの購読者へはすぐに配信し、Bridge へはバッファがまとめて書き込む
+    lobby_status_buffer.set(passcode, int(user['id']), status)
+    return jsonify({"status": "ok"})
+
+@lobby_bp.websocket('/<passcode>/ws')
+async def ws_lobby(passcode):
+    """ロビー画面の更新チャネル（サーバー → 端末のみ）。
+
+    member_status_updated などロビーのイベントと、取りこぼし時の lobby.resync を送る。
+    """
+    if not session.get('discord_user'):
+        return 'Unauthorized', 401
+
+    await websocket.accept()
+    async with lobby_hub.subscribe(passcode) as queue:
+
+        async def push():
+            while True:
+                msg = await queue.get()
+                await websocket.send(json.dumps(msg, ensure_ascii=False))
+
+        async def receive():
+            # 端末からのメッセージ（購読の挨拶など）は使わないが、切断を検知するために読み続ける
+            while True:
+                await websocket.receive()
+
+        await asyncio.gather(push(), receive())
 
 @lobby_bp.route('/<passcode>/start', methods=['POST'])
 async def start_tournament(passcode):
@@ -294,41 +283,50 @@ async def start_tournament(passcode):
 
 @lobby_bp.route('/<passcode>/export_csv')
 async def export_csv(passcode):
-    # 大会結果CSVエクスポート（モック実装: 実運用には試合情報が含まれる）
+    """大会結果（参加者・試合・スコア・総合順位）のエクスポート。?format=jsonl で JSON Lines。"""
     user = session.get('discord_user')
     if not user:
         return redirect(url_for('login'))
-        
+
+    fmt = request.args.get('format', FORMAT_CSV)
+    if fmt not in EXPORT_FORMATS:
+        return "Unsupported format", 400
+
     try:
         room = await LobbyService.get_room(passcode)
         if not room:
             return "Room not found", 404
-            
+
         is_staff = False
         members = await LobbyService.get_members(passcode)
         for m in members:
             if str(m.get('user_id')) == str(user['id']) and m.get('role') == 'staff':
                 is_staff = True
                 break
-                
+
         is_host = str(room.get('host_id')) == str(user['id'])
-        
+
         if not (is_host or is_staff):
             return "Forbidden: Requires Host or Staff privileges", 403
 
-        si = io.StringIO()
-        writer = csv.writer(si)
-        writer.writerow(['パスコード', 'ユーザーID', 'ロール'])
-        for m in members:
-            writer.writerow([passcode, m.get('user_id'), m.get('role')])
-            
-        output = await make_response(si.getvalue())
-        output.headers["Content-Disposition"] = f"attachment; filename=lobby_{passcode}_export.csv"
-        output.headers["Content-Type"] = "text/csv; charset=utf-8-sig"
-        return output
+        chunks = await TournamentExportService.open_stream(
+            passcode, fmt, members=lobby_status_buffer.overlay(passcode, members),
+        )
+        if chunks is None:
+            return "Failed to load tournament results", 503
     except BridgeUnavailableError:
         return await render_template('maintenance.html'), 503
 
+    # 試合はページ単位で取得しながら書き出す（ブラケットの大きさによらずメモリを一定に保つ）
+    if fmt == FORMAT_CSV:
+        mimetype, ext = "text/csv; charset=utf-8-sig", "csv"
+    else:
+        mimetype, ext = "application/x-ndjson; charset=utf-8", "jsonl"
+    return Response(chunks, headers={
+        "Content-Type": mimetype,
+        "Content-Disposition": f"attachment; filename=lobby_{passcode}_results.{ext}",
+    })
+
 @lobby_bp.route('/<passcode>/delete', methods=['POST'])
 async def delete_lobby(passcode):
     user = session.get('discord_user')
@@ -1,9 +1,13 @@
 # routes/lounge.py
+import asyncio
+
 from quart import Blueprint, current_app, render_template, request, session, redirect, url_for, jsonify
 from services.lounge_service import LoungeService
 from services.tournament_service import TitleService
+from services.lounge_finish_service import LoungeFinishService
+from services.leaderboard_service import LeaderboardService
 from services.bridge_client import BridgeUnavailableError
-from routes.tournament import _ensure_discord_role, _assign_title_role
+from routes.tournament import GUILD_ID, _ensure_discord_role
 
 lounge_bp = Blueprint("lounge", __name__, url_prefix="/lounge")
 
@@ -23,6 +27,14 @@ def _is_host(user, session_data) -> bool:
     return str(user["id"]) == str(session_data.get("host_id", ""))
 
 
+def _rank_name(catalog, player_titles):
+    """保有している最上位のランク称号の名前（スタッフが付与した称号も含む）。"""
+    if catalog is None:
+        return None
+    title = catalog.held_rank_title(t["id"] for t in player_titles if t.get("earned"))
+    return title["name"] if title else None
+
+
 # ============================================================
 # ラウンジ画面
 # ============================================================
@@ -132,44 +144,28 @@ async def api_exclude_player(session_id: int):
 
 
 async def _do_finish_session(session_id: int):
-    """セッション終了フロー（MMR計算 + 称号付与 + Discordロール同期）。"""
+    """セッション終了フロー。MMR の確定までを待ち、称号付与・Discordロール付与はバックグラウンドで行う。"""
     res = await LoungeService.finish_session(session_id)
     if not res or res.get("status") != "ok":
         return False
 
     # Bridge が MMR 計算済みの結果を返す
     results = res.get("results", [])
-    all_titles = await TitleService.list_all()
+    LeaderboardService.record_results(results)
+    current_app.add_background_task(_grant_titles_after_finish, session_id, results)
+    return True
 
-    # 1位（セッション優勝者）を特定
-    winner_uid = next(
-        (e.get("user_id") for e in results if e.get("final_rank") == 1),
-        None,
-    )
 
-    for entry in results:
-        uid = entry.get("user_id")
-        new_mmr = entry.get("new_mmr", 0)
-        if not uid:
-            continue
-
-        # MMR ベースのランク称号付与
-        newly_granted_ids = await TitleService.grant_rank(uid, new_mmr)
-
-        # 1位ならセッション優勝称号（tournament_win タイプ）も付与
-        if uid == winner_uid:
-            win_ids = await TitleService.grant_tournament_win(uid)
-            newly_granted_ids = list(set(newly_granted_ids + win_ids))
-
-        for title_id in newly_granted_ids:
-            active = await TitleService.get_active(uid)
-            granted_title = next((t for t in all_titles if t["id"] == title_id), None)
-            if granted_title:
-                await _ensure_discord_role(granted_title)
-                if active is None:
-                    await TitleService.set_active(uid, title_id)
-                await _assign_title_role(str(uid), granted_title)
-    return True
+async def _grant_titles_after_finish(session_id: int, results: list):
+    report = await LoungeFinishService.run_title_pipeline(results, GUILD_ID, _ensure_discord_role)
+    if report is None:
+        current_app.logger.error(f"Lounge session {session_id}: title grant failed")
+        return
+    current_app.logger.info(
+        f"Lounge session {session_id}: titles granted to "
+        f"{sum(1 for g in report['grants'] if g.get('newly_granted'))} players, "
+        f"roles assigned={report['assigned']} failed={report['failed']}"
+    )
 
 
 @lounge_bp.route("/api/sessions/<int:session_id>/finish", methods=["POST"])
@@ -192,24 +188,19 @@ async def api_my_result(session_id: int):
         return jsonify({}), 401
     uid_str = str(user["id"])
 
-    final_scores = await LoungeService.get_final_scores(session_id)
+    final_scores, player, catalog, player_titles = await asyncio.gather(
+        LoungeService.get_final_scores(session_id),
+        LoungeService.get_player(int(user["id"])),
+        TitleService.get_catalog(),
+        TitleService.get_player_titles(int(user["id"])),
+    )
     my_entry = next((s for s in final_scores if str(s.get("user_id")) == uid_str), None)
 
     final_rank = my_entry.get("final_rank") if my_entry else None
     mmr_delta = my_entry.get("mmr_delta", 0) if my_entry else 0
     total_submitted = sum(1 for s in final_scores if s.get("submitted"))
-
-    player = await LoungeService.get_player(int(user["id"]))
     current_mmr = player.get("mmr", 1000) if player else 1000
-
-    all_titles = await TitleService.list_all()
-    player_titles = await TitleService.get_player_titles(int(user["id"]))
-    earned_ids = {t["id"] for t in player_titles if t.get("earned")}
-    active_title_name = None
-    for t in sorted(all_titles, key=lambda x: x.get("unlock_threshold") or 0, reverse=True):
-        if t["id"] in earned_ids and t.get("unlock_type") == "lounge_rank":
-            active_title_name = t["name"]
-            break
+    active_title_name = _rank_name(catalog, player_titles)
 
     return jsonify({
         "final_rank":      final_rank,
@@ -245,18 +236,44 @@ async def api_me():
     user = _current_user()
     if not user:
         return jsonify({}), 401
-    uid = int(user["id"])
-    player = await LoungeService.get_player(uid)
-    titles = await TitleService.get_player_titles(uid)
-    rank_title = None
-    for t in sorted(titles, key=lambda x: x.get("unlock_threshold") or 0, reverse=True):
-        if t.get("unlock_type") == "lounge_rank" and t.get("earned"):
-            rank_title = t.get("name")
-            break
+    player, catalog, player_titles = await asyncio.gather(
+        LoungeService.get_player(int(user["id"])),
+        TitleService.get_catalog(),
+        TitleService.get_player_titles(int(user["id"])),
+    )
+    rank_title = _rank_name(catalog, player_titles)
     mmr = player.get("mmr", 1000) if player else 1000
     return jsonify({"mmr": mmr, "rank_name": rank_title or "—"})
 
 
+@lounge_bp.route("/api/leaderboard")
+async def api_leaderboard():
+    """MMR の高い順のランキング（?offset=&limit=、limit は最大 100）。"""
+    if not _current_user():
+        return jsonify({}), 401
+    page = await LeaderboardService.get_page(
+        request.args.get("offset", 0, type=int), request.args.get("limit", 50, type=int),
+    )
+    if page is None:
+        return jsonify({"status": "error"}), 503
+    return jsonify(page)
+
+
+@lounge_bp.route("/api/me/rank")
+async def api_my_rank():
+    """ログインユーザーの順位（rank / total / top_percent）と、自分が載るページの offset（?limit= ごと）。"""
+    user = _current_user()
+    if not user:
+        return jsonify({}), 401
+    # 索引を読み込んでから get_player を呼び、最新の MMR（未登録なら初期値）を索引に反映させる
+    await LeaderboardService.ensure_loaded()
+    await LoungeService.get_player(int(user["id"]))
+    rank = await LeaderboardService.get_rank(user["id"], request.args.get("limit", 50, type=int))
+    if rank is None:
+        return jsonify({"status": "error"}), 503
+    return jsonify(rank)
+
+
 @lounge_bp.route("/api/sessions/<int:session_id>/teams", methods=["GET", "POST"])
 async def api_teams(session_id: int):
     user = _current_user()
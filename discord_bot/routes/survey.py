@@ -7,7 +7,6 @@ import csv
 import io
 import json
 import os
-from collections import Counter
 
 from quart import (
     Blueprint,
@@ -22,12 +21,22 @@ from quart import (
     url_for,
 )
 
-from common.survey_utils import parse_questions
+from common.survey_utils import (
+    TEXT_PREVIEW_LIMIT,
+    compile_questions,
+    decode_answers,
+    parse_questions,
+    results_stats_from_summary,
+)
+from services.access_control_service import AccessControlService
 from services.bridge_client import BridgeUnavailableError
+from services.discord_rest import load_bot_token
 from services.event_service import EventService
 from services.log_service import LogService
 from services.notification_service import NotificationService
-from services.survey_service import SurveyService
+from services.survey_analytics_service import SurveyAnalyticsService
+from services.survey_service import SurveyResponsesError, SurveyService
+from services.user_directory_service import UserDirectoryService
 
 # Blueprintの定義
 survey_bp = Blueprint('survey', __name__)
@@ -36,14 +45,8 @@ survey_bp = Blueprint('survey', __name__)
 # Why: DM送信時にBot Tokenが必要。routes 層では読み込みのみ行い、
 #      実際の送信処理は NotificationService に委譲する。
 # ADR-023 以降、トークンは .env の DISCORD_TOKEN で管理する。
-#      旧 token.txt はフォールバックとしてのみ残す。
-DISCORD_BOT_TOKEN = os.getenv('DISCORD_TOKEN', '').strip() or None
-if not DISCORD_BOT_TOKEN:
-    try:
-        with open('token.txt', 'r', encoding='utf-8') as f:
-            DISCORD_BOT_TOKEN = f.read().strip()
-    except FileNotFoundError:
-        DISCORD_BOT_TOKEN = None
+#      読み込み（token.txt へのフォールバック含む）は services/discord_rest.py に集約。
+DISCORD_BOT_TOKEN = load_bot_token()
 
 DASHBOARD_URL = os.getenv('DASHBOARD_URL', 'https://dashboard.awajiempire.net')
 
@@ -79,6 +82,9 @@ async def edit_survey(survey_id):
         return redirect(url_for('login'))
 
     try:
+        acl = await AccessControlService.get_survey_acl(survey_id)
+        if not acl or not acl.can_edit(user['id']):
+            return "Forbidden", 403
         survey = await SurveyService.get_survey(None, survey_id)
     except BridgeUnavailableError:
         return await render_template('maintenance.html'), 503
@@ -88,15 +94,9 @@ async def edit_survey(survey_id):
     if not survey:
         return "Forbidden", 403
 
-    is_owner = str(survey['owner_id']) == str(user['id'])
-    shared_by = None
-    if not is_owner:
-        # スタッフ自身がアクセスした場合、共有元の名前を解決して表示する
-        shared = await SurveyService.get_shared_surveys(user['id'])
-        match = next((s for s in shared if str(s.get('id')) == str(survey_id)), None)
-        if not match:
-            return "Forbidden", 403
-        shared_by = match.get('shared_by')
+    is_owner = acl.is_owner(user['id'])
+    # スタッフ自身がアクセスした場合は共有元（オーナー）の名前を表示する
+    shared_by = None if is_owner else acl.owner_name
 
     questions = parse_questions(survey['questions'])
     event_info = await EventService.get_event_by_survey(survey_id)
@@ -128,10 +128,7 @@ async def save_survey():
 
     try:
         # 権限チェック（オーナー or スタッフ）
-        owner_id = await SurveyService.get_owner_id(None, int(sid))
-        if not owner_id:
-            return "Forbidden", 403
-        if owner_id != str(user['id']) and not await SurveyService.is_collaborator(int(sid), user['id']):
+        if not await AccessControlService.can_edit(user['id'], int(sid)):
             return "Forbidden", 403
 
         success = await SurveyService.update_survey(None, int(sid), title, q_json)
@@ -311,28 +308,20 @@ async def submit_response():
     u_id = user['id']
     u_name = user['name']
 
-    # フォームデータからの回答抽出
-    answers = {}
-    for key in form:
-        if key.startswith('q_') and not key.endswith('_other'):
-            q_idx = key.split('_')[1]
-            val = form.getlist(key) if key.endswith('[]') else form.get(key)
-
-            if val == '__other__':
-                other_text = form.get(f'q_{q_idx}_other', '').strip()
-                val = other_text if other_text else 'その他'
-            elif isinstance(val, list) and '__other__' in val:
-                val.remove('__other__')
-                other_text = form.get(f'q_{q_idx}_other', '').strip()
-                val.append(other_text if other_text else 'その他')
-
-            answers[q_idx] = val
+    # フォームデータからの回答抽出（質問スキーマで検証・正規化）
+    # Why: 選択肢に無い値やスキーマ外のキーを保存しないよう、コンパイル済みスキーマに委ねる。
+    try:
+        survey = await SurveyService.get_survey(None, int(survey_id))
+    except BridgeUnavailableError:
+        return await render_template('maintenance.html'), 503
+    if not survey:
+        return "<h3>Not Found</h3>", 404
+    answers = compile_questions(survey['questions']).normalize_answers(form)
 
     response_id = await SurveyService.save_response(None, int(survey_id), u_id, u_name, answers)
 
     if response_id is not None:
-        survey = await SurveyService.get_survey(None, int(survey_id))
-        survey_title = survey['title'] if survey else "アンケート"
+        survey_title = survey['title'] or "アンケート"
 
         event_info = await EventService.get_event_by_survey(int(survey_id))
 
@@ -413,9 +402,8 @@ async def api_search_users():
     q = request.args.get('q', '').strip()
     if len(q) < 2:
         return jsonify([])
-    results = await SurveyService.search_users(q)
     # 自分自身は候補から除外
-    results = [r for r in results if str(r.get('user_id')) != str(user['id'])]
+    results = await UserDirectoryService.search(q, exclude=[user['id']])
     return jsonify(results)
 
 
@@ -426,8 +414,7 @@ async def api_collaborators(survey_id):
     if not user:
         return jsonify({'status': 'error'}), 401
 
-    owner_id = await SurveyService.get_owner_id(None, survey_id)
-    if not owner_id or owner_id != str(user['id']):
+    if not await AccessControlService.is_owner(user['id'], survey_id):
         return jsonify({'status': 'forbidden'}), 403
 
     if request.method == 'GET':
@@ -467,8 +454,7 @@ async def api_remove_collaborator(survey_id, target_id):
     if not user:
         return jsonify({'status': 'error'}), 401
 
-    owner_id = await SurveyService.get_owner_id(None, survey_id)
-    if not owner_id or owner_id != str(user['id']):
+    if not await AccessControlService.is_owner(user['id'], survey_id):
         return jsonify({'status': 'forbidden'}), 403
 
     ok = await SurveyService.remove_collaborator(survey_id, target_id)
@@ -484,56 +470,127 @@ async def view_results(survey_id):
         return redirect(url_for('login'))
 
     try:
+        if not await AccessControlService.can_edit(user['id'], survey_id):
+            return "Forbidden", 403
         survey = await SurveyService.get_survey(None, survey_id)
         if not survey:
             return "Forbidden", 403
-        if str(survey['owner_id']) != str(user['id']) and not await SurveyService.is_collaborator(survey_id, user['id']):
-            return "Forbidden", 403
 
         # イベントフォームの場合はイベント管理画面へリダイレクト
         event_info = await EventService.get_event_by_survey(survey_id)
         if event_info:
             return redirect(url_for('event.admin', event_id=event_info['event']['id']))
 
-        responses = await SurveyService.get_responses(None, survey_id)
+        # 集計は Bridge 側で行い 1 往復で受け取る。回答本文は回答一覧（/api/<id>/responses）が 1 ページずつ読み込む
+        schema = compile_questions(survey['questions'])
+        summary = await SurveyService.get_results_summary(survey_id, schema)
+        if summary is None:
+            return "回答の集計を取得できませんでした。時間をおいて再読み込みしてください。", 503
+        stats = results_stats_from_summary(schema, summary)
+        response_count = int(summary.get('total') or 0)
     except BridgeUnavailableError:
         return await render_template('maintenance.html'), 503
     except Exception:
         return "System Error", 503
 
-    questions = parse_questions(survey['questions'])
-    stats = {}
+    filterable = [
+        {'key': q.key, 'text': q.text, 'options': list(q.options)}
+        for q in schema if q.is_choice
+    ]
+    return await render_template(
+        'results.html', survey=survey, stats=stats, response_count=response_count,
+        filterable_questions=filterable, text_preview_limit=TEXT_PREVIEW_LIMIT,
+    )
 
-    for i, q in enumerate(questions):
-        q_idx = str(i)
-        q_text = q.get('text', '(無題の質問)')
-        q_type = q.get('type', 'text')
-        stats[q_idx] = {'question': q_text, 'type': q_type, 'data': [], 'total': 0}
 
-        raw_values = []
-        for r in responses:
-            try:
-                # Rust Bridge からは既に dict/list にパースされて返ってくる想定
-                # (BridgeError マッピングで JSON パースエラーはハンドリング済み)
-                ans_json = r['answers']
-                if isinstance(ans_json, str):
-                    ans_json = json.loads(ans_json)
-            except Exception:
-                continue
-            val = ans_json.get(q_idx)
-            if val:
-                if isinstance(val, list):
-                    raw_values.extend(val)
-                else:
-                    raw_values.append(val)
+@survey_bp.route('/api/<int:survey_id>/responses')
+async def api_responses(survey_id):
+    """回答一覧を 1 ページ分返す（結果画面の回答ブラウザ用）。
 
-        stats[q_idx]['total'] = len(raw_values)
-        if q_type in ['radio', 'checkbox', 'select']:
-            stats[q_idx]['counts'] = dict(Counter(raw_values))
-        else:
-            stats[q_idx]['texts'] = raw_values
+    Query:
+        cursor: 前ページの next_cursor
+        limit: 1 ページの件数（最大 200）
+        f.<質問index>: 選択肢での絞り込み
+    """
+    user = session.get('discord_user')
+    if not user:
+        return jsonify({'status': 'error'}), 401
+    if not await AccessControlService.can_edit(user['id'], survey_id):
+        return jsonify({'status': 'forbidden'}), 403
 
-    return await render_template('results.html', survey=survey, stats=stats, response_count=len(responses))
+    try:
+        limit = max(1, min(int(request.args.get('limit', 50)), 200))
+    except ValueError:
+        limit = 50
+    filters = {
+        key[2:]: value for key, value in request.args.items()
+        if key.startswith('f.') and key[2:].isdigit() and value
+    }
+
+    try:
+        page = await SurveyService.get_responses_page(
+            survey_id, cursor=request.args.get('cursor'), limit=limit, filters=filters or None,
+        )
+    except SurveyResponsesError:
+        return jsonify({'status': 'error', 'message': 'failed to fetch responses'}), 500
+    items = [
+        {
+            'id': r.get('id'),
+            'user_name': r.get('user_name'),
+            'submitted_at': r.get('submitted_at'),
+            'answers': decode_answers(r.get('answers')),
+        }
+        for r in page['items']
+    ]
+    return jsonify({'items': items, 'next_cursor': page['next_cursor'], 'total': page['total']})
+
+
+@survey_bp.route('/api/<int:survey_id>/analytics')
+async def api_analytics(survey_id):
+    """選択式の質問の絞り込み集計とクロス集計を返す（結果画面の分析パネル用）。
+
+    Query:
+        f.<質問index>: 絞り込む値（同じ質問で複数指定すると OR、質問間は AND）
+        row, col: クロス集計する質問 index（両方指定時のみ crosstab を返す）
+    """
+    user = session.get('discord_user')
+    if not user:
+        return jsonify({'status': 'error'}), 401
+
+    try:
+        if not await AccessControlService.can_edit(user['id'], survey_id):
+            return jsonify({'status': 'forbidden'}), 403
+        survey = await SurveyService.get_survey(None, survey_id)
+        if not survey:
+            return jsonify({'status': 'not_found'}), 404
+        table = await SurveyAnalyticsService.get_table(survey_id, compile_questions(survey['questions']))
+    except BridgeUnavailableError:
+        return jsonify({'status': 'error', 'message': 'bridge unavailable'}), 503
+    except SurveyResponsesError:
+        return jsonify({'status': 'error', 'message': 'failed to fetch responses'}), 500
+
+    filters = {}
+    for key in request.args:
+        if key.startswith('f.'):
+            values = [v for v in request.args.getlist(key) if v]
+            if values:
+                filters[key[2:]] = values
+    row_key = request.args.get('row')
+    col_key = request.args.get('col')
+
+    try:
+        mask = table.filter_mask(filters)
+        result = {
+            'status': 'ok',
+            'total': table.size,
+            'matched': mask.bit_count(),
+            'questions': table.counts(mask),
+        }
+        if row_key and col_key:
+            result['crosstab'] = table.crosstab(row_key, col_key, mask)
+    except KeyError as e:
+        return jsonify({'status': 'error', 'message': e.args[0]}), 400
+    return jsonify(result)
 
 
 @survey_bp.route('/download_csv/<int:survey_id>')
@@ -543,11 +600,11 @@ async def download_csv(survey_id):
         return redirect(url_for('login'))
 
     try:
+        if not await AccessControlService.can_edit(user['id'], survey_id):
+            return "Forbidden", 403
         survey = await SurveyService.get_survey(None, survey_id)
         if not survey:
             return "Forbidden", 403
-        if str(survey['owner_id']) != str(user['id']) and not await SurveyService.is_collaborator(survey_id, user['id']):
-            return "Forbidden", 403
 
         responses = await SurveyService.get_responses(None, survey_id)
         event_info = await EventService.get_event_by_survey(survey_id)
@@ -556,7 +613,7 @@ async def download_csv(survey_id):
     except Exception:
         return "System Error", 503
 
-    questions = parse_questions(survey['questions'])
+    schema = compile_questions(survey['questions'])
     si = io.StringIO()
     writer = csv.writer(si)
 
@@ -573,9 +630,8 @@ async def download_csv(survey_id):
     header = ['回答日時', '回答者']
     if event_info:
         header += ['参加意思', '状態', '割り当て部', '希望部', '来場']
-    for i, q in enumerate(questions):
-        q_text = q.get('text', f'Q{i+1}')
-        header.append(f"Q{i+1}: {q_text}")
+    for q in schema:
+        header.append(f"Q{q.index + 1}: {q.text}")
     writer.writerow(header)
 
     APPROVAL_LABELS = {'pending': '確認中', 'accepted': '承認', 'rejected': '否認', 'waitlist': '補欠'}
@@ -608,9 +664,11 @@ async def download_csv(survey_id):
         except Exception:
             ans_json = {}
 
-        for i in range(len(questions)):
-            val = ans_json.get(str(i), '')
-            if isinstance(val, list):
+        for q in schema:
+            val = q.answer_of(ans_json)
+            if val is None:
+                val = ''
+            elif isinstance(val, list):
                 val = ", ".join(val)
             row.append(val)
         writer.writerow(row)
@@ -1,10 +1,12 @@
 # routes/tournament.py
 import os
-import httpx
 from quart import Blueprint, current_app, render_template, request, session, redirect, url_for, flash, jsonify
 from services.tournament_service import TournamentService, TitleService
 from services.lobby_service import LobbyService
 from services.bridge_client import BridgeUnavailableError
+from services.discord_rest import load_bot_token
+from services.discord_role_service import DiscordRoleService
+from services.title_role_reconciler import TitleRoleReconciler
 
 tournament_bp = Blueprint("tournament", __name__, url_prefix="/tournament")
 
@@ -24,14 +26,6 @@ _LOUNGE_RANK_COLORS = {
 _TOURNAMENT_WIN_COLOR = 0xFFD700  # 大会優勝系: ゴールド
 
 
-def _get_bot_token() -> str:
-    try:
-        with open("token.txt") as f:
-            return f.read().strip()
-    except Exception:
-        return ""
-
-
 def _current_user():
     return session.get("discord_user")
 
@@ -49,39 +43,25 @@ def _is_admin(user: dict) -> bool:
 
 async def _sync_discord_title_role(user_id: str, new_title: dict, old_role_id: str | None):
     """装備称号変更時にDiscordロールを付け替える（旧ロール外し → 新ロール付与）"""
-    token = _get_bot_token()
-    if not token or not GUILD_ID:
+    if not GUILD_ID:
         return
-    headers = {"Authorization": f"Bot {token}", "Content-Type": "application/json"}
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            if old_role_id:
-                await client.delete(
-                    f"https://discord.com/api/v10/guilds/{GUILD_ID}/members/{user_id}/roles/{old_role_id}",
-                    headers=headers,
-                )
-            new_role_id = new_title.get("discord_role_id")
-            if new_role_id:
-                await client.put(
-                    f"https://discord.com/api/v10/guilds/{GUILD_ID}/members/{user_id}/roles/{new_role_id}",
-                    headers=headers,
-                )
-    except Exception as e:
-        current_app.logger.warning(f"Discord role sync failed: {e}")
+    if old_role_id:
+        await DiscordRoleService.remove_member_role(GUILD_ID, user_id, old_role_id)
+    new_role_id = new_title.get("discord_role_id")
+    if new_role_id:
+        await DiscordRoleService.add_member_role(GUILD_ID, user_id, new_role_id)
 
 
 async def _ensure_discord_role(title: dict) -> str | None:
     """称号に紐づくDiscordロールを確保する。
-    - discord_role_id が設定済みならそのまま返す
-    - 未設定なら新規作成してDBに書き戻してから返す
+    - discord_role_id が設定済みでギルドに存在すればそのまま返す
+    - 未設定（またはロールが削除済み）なら同名のロールを探し、無ければ新規作成してDBに書き戻してから返す
     """
     role_id = title.get("discord_role_id")
-    if role_id:
+    if not GUILD_ID:
+        return role_id
+    if role_id and await DiscordRoleService.role_exists(GUILD_ID, role_id) is not False:
         return role_id
-
-    token = _get_bot_token()
-    if not token or not GUILD_ID:
-        return None
 
     unlock_type = title.get("unlock_type", "manual")
     threshold = title.get("unlock_threshold")
@@ -93,44 +73,24 @@ async def _ensure_discord_role(title: dict) -> str | None:
     else:
         color = 0x95A5A6
 
-    headers = {"Authorization": f"Bot {token}", "Content-Type": "application/json"}
+    new_role_id = await DiscordRoleService.ensure_role(GUILD_ID, title["name"], color=color)
+    if not new_role_id:
+        return None
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            res = await client.post(
-                f"https://discord.com/api/v10/guilds/{GUILD_ID}/roles",
-                headers=headers,
-                json={"name": title["name"], "color": color, "hoist": False, "mentionable": False},
-            )
-            if res.status_code not in (200, 201):
-                current_app.logger.warning(f"Role create failed: {res.status_code} {res.text}")
-                return None
-            new_role_id = res.json()["id"]
-
         await TitleService.update_discord_role_id(title["id"], new_role_id)
-        current_app.logger.info(f"Created Discord role '{title['name']}' → {new_role_id}")
-        return new_role_id
     except Exception as e:
         current_app.logger.warning(f"ensure_discord_role failed: {e}")
         return None
+    current_app.logger.info(f"Linked Discord role '{title['name']}' → {new_role_id}")
+    return new_role_id
 
 
 async def _assign_title_role(discord_user_id: str, title: dict):
     """ロールを確保してそのユーザーに付与する（装備称号切替ではなく獲得時の付与）"""
     role_id = await _ensure_discord_role(title)
-    if not role_id:
+    if not role_id or not GUILD_ID:
         return
-    token = _get_bot_token()
-    if not token or not GUILD_ID:
-        return
-    headers = {"Authorization": f"Bot {token}", "Content-Type": "application/json"}
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            await client.put(
-                f"https://discord.com/api/v10/guilds/{GUILD_ID}/members/{discord_user_id}/roles/{role_id}",
-                headers=headers,
-            )
-    except Exception as e:
-        current_app.logger.warning(f"assign_title_role failed: {e}")
+    await DiscordRoleService.add_member_role(GUILD_ID, discord_user_id, role_id)
 
 
 # ============================================================
@@ -340,18 +300,8 @@ async def api_clear_active_title():
     ok = await TitleService.clear_active(int(user["id"]))
     if ok and old_role_id:
         # 旧ロールだけ外す（他のロールは一切触らない）
-        token = _get_bot_token()
-        if token and GUILD_ID:
-            import httpx as _httpx
-            headers = {"Authorization": f"Bot {token}"}
-            try:
-                async with _httpx.AsyncClient(timeout=10.0) as client:
-                    await client.delete(
-                        f"https://discord.com/api/v10/guilds/{GUILD_ID}/members/{user['id']}/roles/{old_role_id}",
-                        headers=headers,
-                    )
-            except Exception as e:
-                current_app.logger.warning(f"Role remove failed: {e}")
+        if GUILD_ID:
+            await DiscordRoleService.remove_member_role(GUILD_ID, str(user["id"]), old_role_id)
 
     return jsonify({"status": "ok" if ok else "error"})
 
@@ -403,36 +353,17 @@ async def api_staff_grant():
 
 @tournament_bp.route("/api/titles/sync-discord-roles", methods=["POST"])
 async def api_sync_discord_roles():
-    """管理者用: 全称号のDiscordロール名をDB上の称号名に同期する。"""
+    """管理者用: 称号ロールを DB の状態に合わせる（ロール名の修正・装備称号ロールの付け外し）。
+    body の dry_run が true なら差分の報告のみ行い、Discord には書き込まない。"""
     user = _current_user()
     if not user or not _is_admin(user):
         return jsonify({"status": "error", "message": "forbidden"}), 403
 
-    token = _get_bot_token()
-    if not token or not GUILD_ID:
+    if not load_bot_token() or not GUILD_ID:
         return jsonify({"status": "error", "message": "bot token or guild id not configured"}), 500
 
-    titles = await TitleService.list_all()
-    results = []
-    headers = {"Authorization": f"Bot {token}", "Content-Type": "application/json"}
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for title in titles:
-            role_id = title.get("discord_role_id")
-            if not role_id:
-                results.append({"id": title["id"], "name": title["name"], "status": "skipped (no role_id)"})
-                continue
-            try:
-                res = await client.patch(
-                    f"https://discord.com/api/v10/guilds/{GUILD_ID}/roles/{role_id}",
-                    headers=headers,
-                    json={"name": title["name"]},
-                )
-                if res.status_code == 200:
-                    results.append({"id": title["id"], "name": title["name"], "status": "updated"})
-                else:
-                    results.append({"id": title["id"], "name": title["name"], "status": f"error {res.status_code}"})
-            except Exception as e:
-                results.append({"id": title["id"], "name": title["name"], "status": f"exception: {e}"})
-
-    return jsonify({"status": "ok", "results": results})
+    data = await request.get_json(silent=True) or {}
+    report = await TitleRoleReconciler.reconcile(GUILD_ID, dry_run=bool(data.get("dry_run")))
+    if report is None:
+        return jsonify({"status": "error", "message": "failed to load titles or guild state"}), 502
+    return jsonify({"status": "ok", **report})
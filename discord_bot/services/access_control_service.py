@@ -0,0 +1,135 @@
+# services/access_control_service.py
+# Why: 「オーナー or スタッフか」の判定がルートごとに get_survey → list_collaborators と
+#      Bridge を往復しており、当日受付のタップ毎に 3 往復していた。
+#      アンケート単位の ACL（オーナー + スタッフ ID の集合）を Bridge の単一エンドポイントから
+#      取得してプロセス内にキャッシュし、判定を O(1) の集合参照にする。
+#      スタッフの追加/削除時は SurveyService から invalidate_survey() で即時破棄する。
+#      ただし破棄はそのプロセス内だけで、別の Webapp プロセス・Bot では TTL（_ACL_TTL_SECONDS）が
+#      切れるまで古い ACL が残る。削除したスタッフの管理権限は最大でその秒数だけ他プロセスに残る。
+import logging
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
+from cachetools import TTLCache
+
+from .bridge_client import bridge_client
+
+logger = logging.getLogger(__name__)
+
+# Why: スタッフ追加/削除は同一プロセス内で invalidate されるが、別プロセス（Bot 等）からの
+#      変更や手動の DB 修正に追随できるよう TTL で鮮度の上限を設ける。
+#      権限の剥奪が遅れる上限になるため短くし、当日受付の連続タップ程度の間だけ再利用する。
+_ACL_TTL_SECONDS = 30
+# イベント → アンケートの対応は作成後に変わらないため長めに保持する。
+_EVENT_TTL_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class SurveyAcl:
+    """アンケート 1 件分のアクセス制御情報。ID はすべて文字列で保持する。"""
+    survey_id: int
+    owner_id: str
+    owner_name: Optional[str]
+    collaborator_ids: FrozenSet[str]
+
+    def is_owner(self, user_id) -> bool:
+        return self.owner_id == str(user_id)
+
+    def is_collaborator(self, user_id) -> bool:
+        return str(user_id) in self.collaborator_ids
+
+    def can_edit(self, user_id) -> bool:
+        uid = str(user_id)
+        return uid == self.owner_id or uid in self.collaborator_ids
+
+
+class AccessControlService:
+    """アンケート / イベントの編集権限判定。
+
+    キャッシュ（プロセス内）:
+    - survey_id → SurveyAcl
+    - event_id  → survey_id
+    """
+
+    _survey_acls: TTLCache = TTLCache(maxsize=2048, ttl=_ACL_TTL_SECONDS)
+    _event_surveys: TTLCache = TTLCache(maxsize=4096, ttl=_EVENT_TTL_SECONDS)
+
+    @staticmethod
+    def _build_acl(res: dict) -> SurveyAcl:
+        return SurveyAcl(
+            survey_id=int(res["survey_id"]),
+            owner_id=str(res.get("owner_id", "")),
+            owner_name=res.get("owner_name"),
+            collaborator_ids=frozenset(str(c) for c in res.get("collaborator_ids") or []),
+        )
+
+    @staticmethod
+    async def get_survey_acl(survey_id: int) -> Optional[SurveyAcl]:
+        """アンケートの ACL を返す。存在しなければ None（None はキャッシュしない）。"""
+        survey_id = int(survey_id)
+        acl = AccessControlService._survey_acls.get(survey_id)
+        if acl is not None:
+            return acl
+        res = await bridge_client.request("GET", f"/surveys/{survey_id}/acl")
+        if not isinstance(res, dict) or "owner_id" not in res:
+            return None
+        acl = AccessControlService._build_acl(res)
+        AccessControlService._survey_acls[survey_id] = acl
+        return acl
+
+    @staticmethod
+    async def get_event_acl(event_id: int) -> Optional[SurveyAcl]:
+        """イベントに紐づくアンケートの ACL を返す。イベントが存在しなければ None。"""
+        event_id = int(event_id)
+        survey_id = AccessControlService._event_surveys.get(event_id)
+        if survey_id is not None:
+            return await AccessControlService.get_survey_acl(survey_id)
+
+        # 未解決のイベントは Bridge の /events/:id/acl で対応付けと ACL を 1 往復で取得する
+        res = await bridge_client.request("GET", f"/events/{event_id}/acl")
+        if not isinstance(res, dict) or "owner_id" not in res:
+            return None
+        acl = AccessControlService._build_acl(res)
+        AccessControlService._event_surveys[event_id] = acl.survey_id
+        AccessControlService._survey_acls[acl.survey_id] = acl
+        return acl
+
+    @staticmethod
+    async def is_owner(user_id, survey_id: int) -> bool:
+        acl = await AccessControlService.get_survey_acl(survey_id)
+        return acl is not None and acl.is_owner(user_id)
+
+    @staticmethod
+    async def can_edit(user_id, survey_id: int) -> bool:
+        """アンケートのオーナー or スタッフなら True。"""
+        acl = await AccessControlService.get_survey_acl(survey_id)
+        return acl is not None and acl.can_edit(user_id)
+
+    @staticmethod
+    async def can_manage_event(user_id, event_id: int) -> bool:
+        """イベント（紐づくアンケート）のオーナー or スタッフなら True。"""
+        acl = await AccessControlService.get_event_acl(event_id)
+        return acl is not None and acl.can_edit(user_id)
+
+    @staticmethod
+    def remember_event(event_id: int, survey_id: int) -> None:
+        """既に取得済みのイベント情報から event → survey の対応を登録する（Bridge 呼び出しなし）。"""
+        AccessControlService._event_surveys[int(event_id)] = int(survey_id)
+
+    @staticmethod
+    def remember_acl(event_id: int, res: dict) -> None:
+        """他の呼び出しで一緒に取得した ACL（/events/:id/admin-bundle 等）をキャッシュに載せる。"""
+        acl = AccessControlService._build_acl(res)
+        AccessControlService._event_surveys[int(event_id)] = acl.survey_id
+        AccessControlService._survey_acls[acl.survey_id] = acl
+
+    @staticmethod
+    def invalidate_survey(survey_id: int) -> None:
+        """スタッフ追加/削除・アンケート削除時に ACL キャッシュを破棄する。"""
+        AccessControlService._survey_acls.pop(int(survey_id), None)
+
+    @staticmethod
+    def clear() -> None:
+        """全キャッシュを破棄する（テスト用）。"""
+        AccessControlService._survey_acls.clear()
+        AccessControlService._event_surveys.clear()
@@ -0,0 +1,189 @@
+# services/bridge_event_hub.py
+# Why: Bridge の /ws/hyouibana を購読して画面へ中継する処理が、当日受付（checkin_hub.py）と
+#      ロビー（lobby_hub.py）でほぼ同じ形で重複し、締切の監視（deadline_scheduler_service.py）も
+#      同じ再接続ループを別に持っていた。再接続・バックオフのループ（listen_bridge_events）と、
+#      トピック単位の購読者キューへの配信（BridgeEventHub）をここにまとめる。
+#      各ハブはトピックのキー（イベント ID・passcode）と受け取るメッセージの条件だけを渡す。
+#
+# 方式:
+#   - 購読者ごとに上限付きの asyncio.Queue を持ち、遅い端末が他の端末を止めないようにする
+#   - キューが溢れた端末・Bridge との再接続時は取りこぼしがあり得るため resync を送り、
+#     画面側で状態を取り直させる
+#   - Bridge の購読は購読者がいる間だけ張る（最初の購読で開始し、最後の購読解除で止める）
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Generic, Hashable, Optional, Set, TypeVar
+
+import aiohttp
+
+from .bridge_client import bridge_client
+
+logger = logging.getLogger(__name__)
+
+_QUEUE_SIZE = 256
+_WS_RECONNECT_MAX_SECONDS = 30
+
+K = TypeVar("K", bound=Hashable)
+Message = Dict[str, Any]
+
+
+def bridge_ws_url() -> str:
+    return bridge_client.base_url.replace("http", "ws", 1) + "/ws/hyouibana"
+
+
+async def listen_bridge_events(
+    on_message: Callable[[str], None],
+    *,
+    ws_url: Optional[str] = None,
+    on_connect: Optional[Callable[[bool], None]] = None,
+    stopped: Callable[[], bool] = lambda: False,
+    max_backoff: float = _WS_RECONNECT_MAX_SECONDS,
+    name: str = "bridge",
+) -> None:
+    """Bridge の WebSocket を購読し、テキストメッセージごとに on_message を呼ぶ。
+
+    切断時は 1 秒から倍々（最大 max_backoff 秒）で再接続する。on_connect は接続のたびに
+    「再接続か（2 回目以降の接続か）」を引数に呼ばれる。stopped() が真になるか、
+    タスクがキャンセルされるまで戻らない。
+    """
+    ws_url = ws_url or bridge_ws_url()
+    backoff = 1
+    connected_before = False
+    while not stopped():
+        try:
+            async with aiohttp.ClientSession() as sess:
+                async with sess.ws_connect(ws_url, heartbeat=30) as ws:
+                    backoff = 1
+                    if on_connect is not None:
+                        on_connect(connected_before)
+                    connected_before = True
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            on_message(msg.data)
+                        elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                            break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("%s: websocket error: %s", name, e)
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, max_backoff)
+
+
+class BridgeEventHub(Generic[K]):
+    """Bridge の配信をトピック（K）単位の購読者へ配る。
+
+    Args:
+        topic_key: メッセージの配信先トピック。None なら特定のトピックに属さない
+        accepts: Bridge から受け取ったメッセージのうち、このハブが扱うものか
+        broadcasts: トピックに属さないメッセージのうち、全購読者へ配るものか
+        resync_type: 状態の取り直しを指示するメッセージの type
+    """
+
+    def __init__(
+        self,
+        ws_url: Optional[str] = None,
+        *,
+        topic_key: Callable[[Message], Optional[K]],
+        accepts: Callable[[Message], bool],
+        broadcasts: Callable[[Message], bool] = lambda message: False,
+        resync_type: str,
+        queue_size: int = _QUEUE_SIZE,
+    ):
+        self._ws_url = ws_url
+        self._queue_size = queue_size
+        self._topic_key = topic_key
+        self._accepts = accepts
+        self._broadcasts = broadcasts
+        self._resync_type = resync_type
+        self._subscribers: Dict[K, Set[asyncio.Queue]] = {}
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscriber_count(self, topic: Optional[K] = None) -> int:
+        if topic is None:
+            return sum(len(s) for s in self._subscribers.values())
+        return len(self._subscribers.get(topic, ()))
+
+    @asynccontextmanager
+    async def subscribe(self, topic: K) -> AsyncIterator[asyncio.Queue]:
+        """トピックのメッセージを受け取るキューを返す。ブロックを抜けると購読を解除する。"""
+        queue: asyncio.Queue = asyncio.Queue(self._queue_size)
+        self._subscribers.setdefault(topic, set()).add(queue)
+        self._ensure_listener()
+        try:
+            yield queue
+        finally:
+            subs = self._subscribers.get(topic)
+            if subs is not None:
+                subs.discard(queue)
+                if not subs:
+                    del self._subscribers[topic]
+            if not self._subscribers and self._listener is not None:
+                self._listener.cancel()
+                self._listener = None
+
+    def publish(self, message: Message) -> int:
+        """メッセージを同じトピックの購読者へ配る。配った購読者数を返す。"""
+        topic = self._topic_key(message)
+        subs = self._subscribers.get(topic, ()) if topic is not None else ()
+        for queue in subs:
+            self._offer(queue, message)
+        return len(subs)
+
+    def broadcast(self, message: Message) -> int:
+        """メッセージを全トピックの購読者へ配る。配った購読者数を返す。"""
+        count = 0
+        for subs in self._subscribers.values():
+            for queue in subs:
+                self._offer(queue, message)
+                count += 1
+        return count
+
+    def resync_all(self) -> None:
+        """全購読者に状態の取り直しを指示する（Bridge との再接続時）。"""
+        self.broadcast({"type": self._resync_type})
+
+    def handle_message(self, raw: str) -> None:
+        """Bridge の WebSocket から受け取った 1 件を処理する（扱わないメッセージは無視）。"""
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+        if not isinstance(data, dict) or not self._accepts(data):
+            return
+        if self._topic_key(data) is not None:
+            self.publish(data)
+        elif self._broadcasts(data):
+            self.broadcast(data)
+
+    def _offer(self, queue: asyncio.Queue, message: Message) -> None:
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # 溢れた端末は途中経過を捨てて、状態を丸ごと取り直させる
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": self._resync_type})
+
+    # ------------------------------------------------------------
+    # Bridge WebSocket の購読
+    # ------------------------------------------------------------
+
+    def _ensure_listener(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    def _on_connect(self, reconnected: bool) -> None:
+        # 切断中の変更を取りこぼしている可能性があるため、再接続時は取り直させる
+        if reconnected:
+            self.resync_all()
+
+    async def _listen(self) -> None:
+        await listen_bridge_events(
+            self.handle_message,
+            ws_url=self._ws_url,
+            on_connect=self._on_connect,
+            name=type(self).__name__,
+        )
@@ -0,0 +1,147 @@
+# services/calendar_feed_service.py
+# Why: カレンダーの購読 URL はクライアントが定期的に取りに来るため、リクエストごとに
+#      Bridge から参加者・イベントを取り直して .ics を組み立てない。
+#      イベントの予定（common/calendar_feed.py の EventCalendar）と access_token → 参加者の
+#      承認状況・部をキャッシュし、本文は (イベント, 部, version) ごとに一度だけ組み立てる。
+#      イベントの更新・参加者の承認/部の変更は EventService から invalidate() で反映し、
+#      Bot プロセス側の変更（締切時の自動割り当て等）は再確認間隔で追随する。
+#      再確認で予定の内容が変わっていなければ version・Last-Modified・組み立て済みの本文を引き継ぐ。
+#      参加者の状態も同様に、承認・部が変わったときだけ changed_at を進め、Last-Modified に反映する。
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from cachetools import TTLCache
+
+from common.calendar_feed import EventCalendar, FeedDocument
+
+from .bridge_client import bridge_client
+
+logger = logging.getLogger(__name__)
+
+_RECHECK_SECONDS = 300
+
+
+class CalendarFeedService:
+    """カレンダー購読フィードの取得（キャッシュ付き）。"""
+
+    _calendars: TTLCache = TTLCache(maxsize=256, ttl=86400)
+    # access_token → {"participant_id", "event_id", "approval", "session_id", "changed_at", "checked_at"}
+    # 再確認は checked_at で判定し、changed_at を引き継ぐためにエントリ自体は長めに保持する
+    _participants: TTLCache = TTLCache(maxsize=20_000, ttl=86400)
+    _locks: Dict[int, asyncio.Lock] = {}
+
+    @staticmethod
+    async def get_calendar(event_id: int) -> Optional[EventCalendar]:
+        """イベントの予定を返す。イベントが存在しなければ None。
+
+        Raises:
+            BridgeUnavailableError: Bridge に接続できない場合
+        """
+        event_id = int(event_id)
+        cal = CalendarFeedService._calendars.get(event_id)
+        if cal is not None and time.monotonic() - cal.checked_at < _RECHECK_SECONDS:
+            return cal
+
+        lock = CalendarFeedService._locks.setdefault(event_id, asyncio.Lock())
+        async with lock:
+            current = CalendarFeedService._calendars.get(event_id)
+            if current is not None and time.monotonic() - current.checked_at < _RECHECK_SECONDS:
+                return current
+
+            result = await bridge_client.request("GET", f"/events/{event_id}")
+            if not result or result.get("status") == "not_found" or not result.get("event"):
+                CalendarFeedService._calendars.pop(event_id, None)
+                return None
+
+            now = time.monotonic()
+            fresh = EventCalendar(
+                result["event"], result.get("sessions") or [],
+                modified_at=datetime.now(timezone.utc), checked_at=now,
+            )
+            if current is not None and current.version == fresh.version:
+                # 予定に変更なし: 組み立て済みの本文と Last-Modified をそのまま使う
+                current.checked_at = now
+                CalendarFeedService._calendars[event_id] = current
+                return current
+            CalendarFeedService._calendars[event_id] = fresh
+            logger.debug("CalendarFeedService: event=%s version=%s", event_id, fresh.version)
+            return fresh
+
+    @staticmethod
+    async def _get_participant(token: str) -> Optional[Dict[str, Any]]:
+        cached = CalendarFeedService._participants.get(token)
+        if cached is not None and time.monotonic() - cached["checked_at"] < _RECHECK_SECONDS:
+            return cached
+        res = await bridge_client.request("GET", f"/events/participant/by-token/{token}")
+        if not res or res.get("status") == "not_found":
+            CalendarFeedService._participants.pop(token, None)
+            return None
+        state = {
+            "participant_id": int(res["id"]),
+            "event_id": int(res["event_id"]),
+            "approval": res.get("approval") or "pending",
+            "session_id": res.get("session_id"),
+            "changed_at": datetime.now(timezone.utc),
+            "checked_at": time.monotonic(),
+        }
+        if cached is not None and all(
+            cached[k] == state[k] for k in ("participant_id", "event_id", "approval", "session_id")
+        ):
+            # 承認・部に変更なし: 変更時刻を引き継ぎ、Last-Modified を動かさない
+            state["changed_at"] = cached["changed_at"]
+        CalendarFeedService._participants[token] = state
+        return state
+
+    @staticmethod
+    async def participant_feed(token: str) -> Optional[FeedDocument]:
+        """参加者の購読フィード。token が無効なら None。
+
+        承認済みでない間は予定なしのカレンダーを返す（購読済みの予定は取り消される）。
+        """
+        state = await CalendarFeedService._get_participant(token)
+        if state is None:
+            return None
+        cal = await CalendarFeedService.get_calendar(state["event_id"])
+        if cal is None:
+            return None
+        return cal.participant_document(state["approval"], state["session_id"], state["changed_at"])
+
+    @staticmethod
+    async def participant_approval(token: str) -> Optional[str]:
+        """token の参加者の承認状況（.ics ダウンロードの可否判定用）。"""
+        state = await CalendarFeedService._get_participant(token)
+        return state["approval"] if state else None
+
+    @staticmethod
+    async def organizer_feed(event_id: int) -> Optional[FeedDocument]:
+        """主催者の購読フィード（全部の予定）。イベントが存在しなければ None。"""
+        cal = await CalendarFeedService.get_calendar(event_id)
+        return cal.organizer_document() if cal else None
+
+    @staticmethod
+    def invalidate(event_id: int) -> None:
+        """イベントの予定と参加者の状態を次回のリクエストで取り直す。"""
+        event_id = int(event_id)
+        cal = CalendarFeedService._calendars.get(event_id)
+        if cal is not None:
+            cal.checked_at = float("-inf")
+        for state in list(CalendarFeedService._participants.values()):
+            if state["event_id"] == event_id:
+                state["checked_at"] = float("-inf")
+
+    @staticmethod
+    def invalidate_participant(participant_id: int) -> None:
+        pid = int(participant_id)
+        for state in list(CalendarFeedService._participants.values()):
+            if state["participant_id"] == pid:
+                state["checked_at"] = float("-inf")
+
+    @staticmethod
+    def clear() -> None:
+        """全キャッシュを破棄する（テスト用）。"""
+        CalendarFeedService._calendars.clear()
+        CalendarFeedService._participants.clear()
+        CalendarFeedService._locks.clear()
@@ -0,0 +1,60 @@
+# services/checkin_hub.py
+# Why: イベント当日は複数のスタッフ端末で同じ当日受付画面を開くが、他端末の受付は
+#      再読み込みするまで反映されなかった。Bridge がチェックインの変更時に配信する
+#      `event.checkin` を Webapp プロセスで 1 本の WebSocket で購読し、
+#      イベント単位で購読中の受付画面（routes/event.py の /event/<id>/ws/checkin）へ配る。
+#
+# 方式:
+#   - 購読・配信・再接続は services/bridge_event_hub.py の BridgeEventHub（トピックはイベント ID）。
+#     取りこぼし時は `checkin.resync` を送り、画面側で状態を取り直させる
+#   - 別プロセス（Bot 等）や別ワーカーからの変更にも追随できるよう、受信時に管理画面の
+#     キャッシュを破棄し、QR 受付の索引（CheckinIndexService）のチェックイン状態も更新する
+import asyncio
+from typing import Any, AsyncContextManager, Dict, Optional
+
+from .bridge_event_hub import BridgeEventHub
+from .checkin_index_service import CheckinIndexService
+from .event_admin_service import EventAdminService
+
+CHECKIN_CHANGED = "event.checkin"
+RESYNC = "checkin.resync"
+
+
+def _event_id(message: Dict[str, Any]) -> Optional[int]:
+    try:
+        return int(message["event_id"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class CheckinHub(BridgeEventHub[int]):
+    """イベント単位のチェックイン変更の配信。"""
+
+    def __init__(self, ws_url: Optional[str] = None, **kwargs: Any):
+        super().__init__(
+            ws_url,
+            topic_key=_event_id,
+            accepts=lambda message: message.get("type") == CHECKIN_CHANGED,
+            resync_type=RESYNC,
+            **kwargs,
+        )
+
+    def subscriber_count(self, event_id: Optional[int] = None) -> int:
+        return super().subscriber_count(None if event_id is None else int(event_id))
+
+    def subscribe(self, event_id: int) -> AsyncContextManager[asyncio.Queue]:
+        """イベントの変更を受け取るキューを返す（async with で使う）。"""
+        return super().subscribe(int(event_id))
+
+    def publish(self, message: Dict[str, Any]) -> int:
+        """変更を同じイベントの購読者へ配る。配った購読者数を返す。"""
+        event_id = _event_id(message)
+        if event_id is None:
+            return 0
+        EventAdminService.invalidate(event_id)
+        if message.get("participant_id") is not None:
+            CheckinIndexService.record_checkin(event_id, message["participant_id"], message.get("checked_in_at"))
+        return super().publish(message)
+
+
+checkin_hub = CheckinHub()
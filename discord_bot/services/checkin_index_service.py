@@ -0,0 +1,97 @@
+# services/checkin_index_service.py
+# Why: QR 受付では 1 秒に数件の読み取りが続くため、読み取りのたびに Bridge へ
+#      token で問い合わせず、イベント単位の common/checkin_index.py の索引から引く。
+#      索引は EventAdminService の管理画面データ（キャッシュ済みなら Bridge 呼び出しなし）から
+#      作り、チェックインは索引の中で更新する。
+#      参加者の登録・承認/部の変更・削除では EventService から破棄し、
+#      索引にない token は一定間隔でのみ読み直す（無効な QR の連続読み取りで Bridge を叩かない）。
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from cachetools import TTLCache
+
+from common.checkin_index import CheckinEntry, CheckinIndex
+
+from .event_admin_service import EventAdminService
+
+logger = logging.getLogger(__name__)
+
+_INDEX_TTL_SECONDS = 3600
+_MISS_RELOAD_SECONDS = 10
+
+
+class CheckinIndexService:
+    """当日受付の access_token 索引（イベント単位、プロセス内）。"""
+
+    _indexes: TTLCache = TTLCache(maxsize=32, ttl=_INDEX_TTL_SECONDS)
+    _locks: Dict[int, asyncio.Lock] = {}
+
+    @staticmethod
+    async def get_index(event_id: int, *, reload: bool = False) -> Optional[CheckinIndex]:
+        """イベントの索引を返す。イベントが存在しなければ None。
+
+        同時に読み取りが来ても Bridge からの読み込みはイベントごとに 1 回にまとめる。
+
+        Raises:
+            BridgeUnavailableError: Bridge に接続できない場合
+        """
+        event_id = int(event_id)
+        index = CheckinIndexService._indexes.get(event_id)
+        if index is not None and not reload:
+            return index
+
+        lock = CheckinIndexService._locks.setdefault(event_id, asyncio.Lock())
+        async with lock:
+            current = CheckinIndexService._indexes.get(event_id)
+            # 待っている間に他の読み取りが読み込み直していればそれを使う
+            if current is not None and (not reload or current is not index):
+                return current
+            if reload:
+                EventAdminService.invalidate(event_id)
+            view = await EventAdminService.get_view(event_id)
+            if view is None:
+                return None
+            index = CheckinIndex(event_id, view.participants, view.session_map, loaded_at=time.monotonic())
+            CheckinIndexService._indexes[event_id] = index
+            logger.debug("CheckinIndexService: loaded event=%s participants=%d", event_id, len(index))
+            return index
+
+    @staticmethod
+    async def resolve(event_id: int, token: str) -> Optional[CheckinEntry]:
+        """access_token から参加者を引く。見つからなければ None。"""
+        index = await CheckinIndexService.get_index(event_id)
+        if index is None or not token:
+            return None
+        entry = index.lookup(token)
+        if entry is None and time.monotonic() - index.loaded_at >= _MISS_RELOAD_SECONDS:
+            # 索引の読み込み後に登録された参加者の可能性があるため読み直す
+            index = await CheckinIndexService.get_index(event_id, reload=True)
+            entry = index.lookup(token) if index else None
+        return entry
+
+    @staticmethod
+    def record_checkin(event_id: int, participant_id: int, checked_in_at: Optional[str]) -> None:
+        """チェックインの変更を索引に反映する（Bridge 呼び出しなし）。"""
+        index = CheckinIndexService._indexes.get(int(event_id))
+        if index is not None:
+            index.set_checked_in(participant_id, checked_in_at)
+
+    @staticmethod
+    def invalidate(event_id: int) -> None:
+        CheckinIndexService._indexes.pop(int(event_id), None)
+
+    @staticmethod
+    def invalidate_participant(participant_id: int) -> None:
+        """参加者を含む索引を破棄する（承認・部の変更、削除時）。"""
+        pid = int(participant_id)
+        for event_id, index in list(CheckinIndexService._indexes.items()):
+            if pid in index:
+                CheckinIndexService.invalidate(event_id)
+
+    @staticmethod
+    def clear() -> None:
+        """全キャッシュを破棄する（テスト用）。"""
+        CheckinIndexService._indexes.clear()
+        CheckinIndexService._locks.clear()
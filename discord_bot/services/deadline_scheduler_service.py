@@ -0,0 +1,171 @@
+# services/deadline_scheduler_service.py
+# Why: Bot の締切処理は 60 秒ごとに /events/pending-deadline をポーリングしていたため、
+#      締切から最大 1 分遅れ、1 日 1440 回の空振りクエリが発生していた。
+#      締切待ちイベントを Bridge の /events/upcoming-deadlines から読み込んで
+#      common/deadline_queue.py のヒープに載せ、次の締切ちょうどまで眠る。
+#
+# 鮮度:
+#   - Bridge はイベントの作成・更新・ステータス変更時に WebSocket（/ws/hyouibana）へ
+#     {"type": "event.deadline_changed"} を配信する。listen_changes() がそれを受けて取り直す。
+#   - WebSocket の取りこぼしに備え、safety_interval（既定 15 分）ごとにも取り直す。
+#
+# 時計: clock / sleep を差し替えられるため、テストでは仮想時計で時間を進めて検証できる。
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from common.deadline_queue import DeadlineQueue
+
+from .bridge_client import bridge_client
+from .bridge_event_hub import listen_bridge_events
+
+logger = logging.getLogger(__name__)
+
+# WebSocket 取りこぼし時の安全網としての再取得間隔
+SAFETY_INTERVAL_SECONDS = 15 * 60
+# 締切後も処理が完了しなかった（DM 失敗等で open のまま）イベントの再試行間隔
+RETRY_DELAY_SECONDS = 60
+# WebSocket 再接続の待ち時間の上限
+_WS_RECONNECT_MAX_SECONDS = 60
+
+DEADLINE_CHANGED = "event.deadline_changed"
+
+
+class DeadlineScheduler:
+    """イベント応募締切のタイマー。締切を迎えたイベント ID を on_due に渡す。"""
+
+    def __init__(
+        self,
+        on_due: Callable[[List[int]], Awaitable[None]],
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        safety_interval: float = SAFETY_INTERVAL_SECONDS,
+        retry_delay: float = RETRY_DELAY_SECONDS,
+    ):
+        self._on_due = on_due
+        self._clock = clock
+        self._sleep = sleep
+        self._safety_interval = safety_interval
+        self._retry_delay = retry_delay
+
+        self.queue = DeadlineQueue()
+        self._attempted_at: Dict[int, float] = {}
+        self._last_refresh: Optional[float] = None
+        self._refresh_requested = False
+        self._wake = asyncio.Event()
+        self._stopped = False
+
+    # ------------------------------------------------------------
+    # 締切一覧の取得
+    # ------------------------------------------------------------
+
+    async def refresh(self) -> bool:
+        """Bridge から締切待ちイベントを取り直してヒープを作り直す。"""
+        self._refresh_requested = False
+        now = self._clock()
+        try:
+            res = await bridge_client.request("GET", "/events/upcoming-deadlines")
+        except Exception as e:
+            logger.warning("DeadlineScheduler.refresh failed: %s", e)
+            res = None
+        if not isinstance(res, list):
+            # 取得できなければ既存のヒープを維持し、次の安全網で再試行する
+            self._last_refresh = now
+            return False
+
+        deadlines = {}
+        for ev in res:
+            event_id = int(ev["id"])
+            # seconds_until は DB の NOW()（秒切り捨て）基準のため、ここで待っても締切より早く起きることはない
+            due = now + max(0.0, float(ev.get("seconds_until") or 0))
+            # 締切済みなのに残っている（前回の処理が失敗した）イベントは間隔を空けて再試行する
+            attempted = self._attempted_at.get(event_id)
+            if attempted is not None:
+                due = max(due, attempted + self._retry_delay)
+            deadlines[event_id] = due
+        self._attempted_at = {k: v for k, v in self._attempted_at.items() if k in deadlines}
+        self.queue.replace_all(deadlines)
+        self._last_refresh = now
+        return True
+
+    def request_refresh(self) -> None:
+        """締切の変更通知を受けた時に呼ぶ。眠っているループを起こして取り直させる。"""
+        self._refresh_requested = True
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+
+    # ------------------------------------------------------------
+    # メインループ
+    # ------------------------------------------------------------
+
+    async def _wait(self, delay: float) -> None:
+        """delay 秒眠る。request_refresh() / stop() で中断される。"""
+        if self._wake.is_set():
+            self._wake.clear()
+            return
+        sleeper = asyncio.ensure_future(self._sleep(delay))
+        waker = asyncio.ensure_future(self._wake.wait())
+        try:
+            await asyncio.wait({sleeper, waker}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in (sleeper, waker):
+                task.cancel()
+            self._wake.clear()
+
+    async def run(self) -> None:
+        """締切ごとに on_due を呼ぶ。stop() されるまで戻らない。"""
+        await self.refresh()
+        while not self._stopped:
+            now = self._clock()
+            due_ids = self.queue.pop_due(now)
+            if due_ids:
+                for event_id in due_ids:
+                    self._attempted_at[event_id] = now
+                try:
+                    await self._on_due(due_ids)
+                except Exception as e:
+                    logger.error("DeadlineScheduler: on_due failed for %s: %s", due_ids, e)
+                # 処理済みのイベントは一覧から外れ、未処理のものは再試行間隔付きで戻る
+                await self.refresh()
+                continue
+
+            next_poll = self._last_refresh + self._safety_interval
+            next_due = self.queue.next_due()
+            wake_at = next_poll if next_due is None else min(next_due, next_poll)
+            await self._wait(max(0.0, wake_at - now))
+
+            if self._stopped:
+                break
+            if self._refresh_requested or self._clock() >= self._last_refresh + self._safety_interval:
+                await self.refresh()
+
+    # ------------------------------------------------------------
+    # 変更通知（Bridge WebSocket）
+    # ------------------------------------------------------------
+
+    async def listen_changes(self, ws_url: Optional[str] = None) -> None:
+        """Bridge の WebSocket を購読し、締切の変更通知で取り直す。切断時は再接続する。"""
+        await listen_bridge_events(
+            self.handle_message,
+            ws_url=ws_url,
+            # 切断中の変更を取りこぼしている可能性があるため、接続のたびに取り直す
+            on_connect=lambda reconnected: self.request_refresh(),
+            stopped=lambda: self._stopped,
+            max_backoff=_WS_RECONNECT_MAX_SECONDS,
+            name="DeadlineScheduler",
+        )
+
+    def handle_message(self, raw: str) -> None:
+        """Bridge の WebSocket から受け取った 1 件を処理する（締切の変更通知以外は無視）。"""
+        try:
+            data = json.loads(raw)
+        except ValueError:
+            return
+        if isinstance(data, dict) and data.get("type") == DEADLINE_CHANGED:
+            self.request_refresh()
@@ -0,0 +1,244 @@
+# services/discord_rest.py
+# Why: Discord REST API の呼び出しがリクエストのたびに httpx.AsyncClient を作り直しており、
+#      毎回 TLS ハンドシェイクからやり直していた。また DM の一斉送信を並列化すると
+#      レート制限（ルートごとのバケット / グローバル 50 req/s）で 429 を受ける。
+#      プロセス内で 1 つの接続プールを共有し、送信前にバケットの残量を予約して必要なら待ち、
+#      429 を受けた場合は Retry-After に従って再送する。
+#
+# バケットの管理（残量・リセット時刻）は common/discord_ratelimit.py の純粋なデータ構造が担う。
+# Bot トークンはプロセス起動後に一度だけ読み込む（load_bot_token）。呼び出しのたびに
+# token.txt を開き直さない。
+# 時計: clock / sleep を差し替えられるため、テストでは実時間を待たずに待機を検証できる。
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import quote
+
+import httpx
+
+from common.discord_ratelimit import RateLimitBucket, route_key
+
+logger = logging.getLogger(__name__)
+
+DISCORD_API_BASE = "https://discord.com/api/v10"
+
+# グローバルレート制限（Bot 全体で 1 秒あたりのリクエスト数）
+GLOBAL_REQUESTS_PER_SECOND = 50
+# 429 / 5xx を受けた時の再送回数の上限
+_MAX_RETRIES = 3
+_RETRYABLE_STATUS = (502, 503, 504)
+# 5xx で再送してよいメソッド。POST / PATCH は Discord 側で処理済みのことがあり、
+# 再送すると DM やロールが重複するため、5xx でも応答をそのまま返す（429 は未処理なので常に再送する）
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE"})
+
+_TOKEN_UNSET = object()
+_bot_token: Any = _TOKEN_UNSET
+
+
+def load_bot_token() -> Optional[str]:
+    """Bot トークンを返す（初回のみ読み込み、以降はキャッシュ）。
+
+    ADR-023 以降、トークンは .env の DISCORD_TOKEN で管理する。旧 token.txt はフォールバックとしてのみ残す。
+    """
+    global _bot_token
+    if _bot_token is _TOKEN_UNSET:
+        token = os.getenv("DISCORD_TOKEN", "").strip() or None
+        if not token:
+            try:
+                with open("token.txt", "r", encoding="utf-8") as f:
+                    token = f.read().strip() or None
+            except FileNotFoundError:
+                token = None
+        if not token:
+            logger.warning("Discord bot token is not configured (DISCORD_TOKEN / token.txt)")
+        _bot_token = token
+    return _bot_token
+
+
+class DiscordRestClient:
+    """レート制限を考慮した Discord REST API クライアント（接続プール共有）。"""
+
+    def __init__(
+        self,
+        base_url: str = DISCORD_API_BASE,
+        *,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        max_connections: int = 20,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self._transport = transport
+        self._clock = clock
+        self._sleep = sleep
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        )
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # (バケット識別子, メジャーパラメータ) → 残量。
+        # バケット識別子は X-RateLimit-Bucket を学習するまではルートテンプレートで代用する。
+        self._buckets: Dict[Tuple[str, str], RateLimitBucket] = {}
+        self._route_hash: Dict[str, str] = {}
+        self._global_reset_at = 0.0
+        self._window_start = 0.0
+        self._window_count = 0
+
+    # ------------------------------------------------------------
+    # 接続プール
+    # ------------------------------------------------------------
+
+    def _http(self) -> httpx.AsyncClient:
+        """共有の AsyncClient。イベントループが変わった場合（テスト等）は作り直す。"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=20.0,
+                limits=self._limits,
+                transport=self._transport,
+            )
+            self._client_loop = loop
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+    # ------------------------------------------------------------
+    # レート制限
+    # ------------------------------------------------------------
+
+    def _bucket(self, route: str, major: str) -> RateLimitBucket:
+        key = (self._route_hash.get(route, route), major)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = RateLimitBucket()
+        return bucket
+
+    def _global_wait(self, now: float) -> float:
+        if now < self._global_reset_at:
+            return self._global_reset_at - now
+        if now - self._window_start >= 1.0:
+            self._window_start = now
+            self._window_count = 0
+        if self._window_count >= GLOBAL_REQUESTS_PER_SECOND:
+            return self._window_start + 1.0 - now
+        return 0.0
+
+    async def _acquire(self, bucket: RateLimitBucket) -> None:
+        """グローバル制限とバケットの残量の両方に空きができるまで待って枠を予約する。"""
+        while True:
+            now = self._clock()
+            wait = self._global_wait(now)
+            if wait <= 0:
+                wait = bucket.reserve(now)
+                if wait <= 0:
+                    self._window_count += 1
+                    return
+            await self._sleep(wait)
+
+    def _learn_bucket(self, route: str, major: str, bucket: RateLimitBucket, bucket_hash: Optional[str]) -> RateLimitBucket:
+        """X-RateLimit-Bucket を学習し、同じバケットを共有するルートを 1 つの残量にまとめる。"""
+        if not bucket_hash or self._route_hash.get(route) == bucket_hash:
+            return bucket
+        self._route_hash[route] = bucket_hash
+        target = self._buckets.setdefault((bucket_hash, major), bucket)
+        if target is not bucket:
+            bucket.release()
+            target.pending += 1
+        return target
+
+    @staticmethod
+    def _retry_after(resp: httpx.Response) -> Tuple[float, bool]:
+        """429 応答から (待機秒数, グローバル制限か) を取り出す。"""
+        try:
+            body = resp.json()
+        except ValueError:
+            body = {}
+        retry_after = body.get("retry_after") if isinstance(body, dict) else None
+        if retry_after is None:
+            retry_after = resp.headers.get("retry-after", 1)
+        is_global = bool(body.get("global")) if isinstance(body, dict) else False
+        is_global = is_global or resp.headers.get("x-ratelimit-global", "").lower() == "true"
+        return float(retry_after), is_global
+
+    # ------------------------------------------------------------
+    # リクエスト
+    # ------------------------------------------------------------
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        bot_token: Optional[str] = None,
+        *,
+        json: Optional[Any] = None,
+        reason: Optional[str] = None,
+    ) -> Optional[httpx.Response]:
+        """Discord REST API にリクエストを送る。
+
+        Args:
+            path: API のパス（例: "/channels/123/messages"）
+            bot_token: 省略時は load_bot_token() の値
+            reason: 監査ログに残す理由（X-Audit-Log-Reason）
+        Returns:
+            httpx.Response: 最終的な応答（再送を使い切った 429 / 5xx、再送しない POST・PATCH の 5xx も含む）
+            None: 通信エラー、または Bot トークン未設定
+        """
+        bot_token = bot_token or load_bot_token()
+        if not bot_token:
+            return None
+        route, major = route_key(method, path)
+        headers = {"Authorization": f"Bot {bot_token}"}
+        if reason:
+            headers["X-Audit-Log-Reason"] = quote(reason)
+
+        resp: Optional[httpx.Response] = None
+        for attempt in range(_MAX_RETRIES + 1):
+            bucket = self._bucket(route, major)
+            await self._acquire(bucket)
+            try:
+                resp = await self._http().request(method, path, json=json, headers=headers)
+            except httpx.RequestError as e:
+                bucket.release()
+                logger.warning("Discord API request failed (%s %s): %s", method, path, e)
+                return None
+
+            now = self._clock()
+            bucket = self._learn_bucket(route, major, bucket, resp.headers.get("x-ratelimit-bucket"))
+
+            if resp.status_code == 429:
+                retry_after, is_global = self._retry_after(resp)
+                if is_global:
+                    bucket.release()
+                    self._global_reset_at = max(self._global_reset_at, now + retry_after)
+                else:
+                    bucket.exhaust(retry_after, now)
+                logger.warning(
+                    "Discord API rate limited (%s %s): retry_after=%.2fs global=%s",
+                    method, route, retry_after, is_global,
+                )
+                if attempt < _MAX_RETRIES:
+                    continue
+                return resp
+
+            bucket.update(resp.headers, now)
+            if (
+                resp.status_code in _RETRYABLE_STATUS
+                and method.upper() in _IDEMPOTENT_METHODS
+                and attempt < _MAX_RETRIES
+            ):
+                await self._sleep(attempt + 1)
+                continue
+            return resp
+        return resp
+
+
+# シングルトンインスタンス（プロセス内で接続プールとレート制限の状態を共有する）
+discord_rest = DiscordRestClient()
@@ -0,0 +1,219 @@
+# services/discord_role_service.py
+# Why: 称号ロール・優勝ロールの操作が routes/tournament.py / routes/lobby.py の各所で
+#      httpx.AsyncClient を作り直し、呼び出しのたびに token.txt を読んでいた。
+#      Webapp のロール操作はすべてこのサービスを通し、接続プールとレート制限
+#      （ギルド単位のバケット / グローバル制限）は services/discord_rest.py の共有クライアントに任せる。
+#      Bot トークンは discord_rest.load_bot_token() が一度だけ読み込む。
+#
+# ロールの名前検索は common/guild_role_index.py の索引（ギルド単位、一定時間で読み直し）から引き、
+# 作成・編集の結果は索引に直接反映する。ensure_role() は (ギルド, 名前) 単位のロックで
+# 同時に呼ばれても同名のロールを 1 つしか作らない。
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from common.guild_role_index import GuildRoleIndex
+
+from .discord_rest import discord_rest
+
+logger = logging.getLogger(__name__)
+
+# 索引を読み直す間隔（Discord 側で直接作成・削除されたロールへの追随）
+_INDEX_REFRESH_SECONDS = 600
+# 索引に無い名前で作成する前に読み直す最短間隔
+_MISS_RELOAD_SECONDS = 30
+
+
+class DiscordRoleService:
+    """Discord ギルドのロール操作（Webapp 用、REST API 経由）。
+
+    失敗（トークン未設定・通信エラー・Discord のエラー応答）は例外ではなく
+    False / None で返す。
+    """
+
+    _indexes: Dict[str, GuildRoleIndex] = {}
+    _index_locks: Dict[str, asyncio.Lock] = {}
+    _name_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    # ------------------------------------------------------------
+    # ロール索引
+    # ------------------------------------------------------------
+
+    @staticmethod
+    async def get_index(guild_id: str, *, reload: bool = False) -> Optional[GuildRoleIndex]:
+        """ギルドのロール索引。読み込めなければ（古い索引も無ければ）None。
+
+        同時に呼ばれてもロール一覧の取得はギルドごとに 1 回にまとめる。
+        """
+        guild_id = str(guild_id)
+        index = DiscordRoleService._indexes.get(guild_id)
+        if index is not None and not reload and time.monotonic() - index.loaded_at < _INDEX_REFRESH_SECONDS:
+            return index
+
+        lock = DiscordRoleService._index_locks.setdefault(guild_id, asyncio.Lock())
+        async with lock:
+            current = DiscordRoleService._indexes.get(guild_id)
+            # 待っている間に他の呼び出しが読み込み直していればそれを使う
+            if current is not None and current is not index:
+                return current
+            roles = await DiscordRoleService.list_roles(guild_id)
+            if roles is None:
+                return current  # 取得できなければ古い索引で続ける
+            index = GuildRoleIndex(guild_id, roles, loaded_at=time.monotonic())
+            DiscordRoleService._indexes[guild_id] = index
+            logger.debug("DiscordRoleService: loaded guild=%s roles=%d", guild_id, len(index))
+            return index
+
+    @staticmethod
+    async def find_role(guild_id: str, name: str) -> Optional[Dict[str, Any]]:
+        """名前でロールを引く（索引から、Discord への問い合わせなし）。"""
+        index = await DiscordRoleService.get_index(guild_id)
+        return index.find_by_name(name) if index else None
+
+    @staticmethod
+    async def role_exists(guild_id: str, role_id: str) -> Optional[bool]:
+        """ロールが存在するか。索引を読み込めなければ None（不明）。"""
+        index = await DiscordRoleService.get_index(guild_id)
+        return (role_id in index) if index else None
+
+    @staticmethod
+    async def ensure_role(
+        guild_id: str,
+        name: str,
+        *,
+        color: int = 0,
+        hoist: bool = False,
+        mentionable: bool = False,
+        reason: Optional[str] = None,
+    ) -> Optional[str]:
+        """同名のロールがあればその ID を、無ければ作成して ID を返す。失敗時は None。
+
+        同じ (ギルド, 名前) の呼び出しは直列化するため、同時に呼ばれても重複作成しない。
+        """
+        guild_id = str(guild_id)
+        lock = DiscordRoleService._name_locks.setdefault((guild_id, name), asyncio.Lock())
+        async with lock:
+            index = await DiscordRoleService.get_index(guild_id)
+            if index is None:
+                # 既存ロールを確認できない状態では作らない（重複作成の防止）
+                return None
+            role = index.find_by_name(name)
+            if role is None and time.monotonic() - index.loaded_at >= _MISS_RELOAD_SECONDS:
+                # Discord 側で作成された直後の可能性があるため読み直して確かめる
+                index = await DiscordRoleService.get_index(guild_id, reload=True)
+                role = index.find_by_name(name) if index else None
+            if role is not None:
+                return role["id"]
+            return await DiscordRoleService.create_role(
+                guild_id, name, color=color, hoist=hoist, mentionable=mentionable, reason=reason,
+            )
+
+    @staticmethod
+    def clear() -> None:
+        """全キャッシュを破棄する（テスト用）。"""
+        DiscordRoleService._indexes.clear()
+        DiscordRoleService._index_locks.clear()
+        DiscordRoleService._name_locks.clear()
+
+    # ------------------------------------------------------------
+    # REST
+    # ------------------------------------------------------------
+
+    @staticmethod
+    async def list_roles(guild_id: str) -> Optional[List[Dict[str, Any]]]:
+        """ギルドのロール一覧。取得できなければ None。"""
+        r = await discord_rest.request("GET", f"/guilds/{guild_id}/roles")
+        if r is None or r.status_code != 200:
+            if r is not None:
+                logger.warning("List roles failed: guild=%s status=%s", guild_id, r.status_code)
+            return None
+        return r.json()
+
+    @staticmethod
+    async def list_members(guild_id: str, *, page_size: int = 1000) -> Optional[Dict[str, List[str]]]:
+        """ギルドメンバーの user_id → ロール ID 一覧（Bot を除く）。取得できなければ None。
+
+        GET /guilds/{id}/members を after でページングする（Server Members Intent が必要）。
+        """
+        members: Dict[str, List[str]] = {}
+        after = "0"
+        while True:
+            r = await discord_rest.request("GET", f"/guilds/{guild_id}/members?limit={page_size}&after={after}")
+            if r is None or r.status_code != 200:
+                if r is not None:
+                    logger.warning("List members failed: guild=%s status=%s", guild_id, r.status_code)
+                return None
+            page = r.json()
+            for m in page:
+                user = m.get("user") or {}
+                if not user.get("bot"):
+                    members[str(user["id"])] = [str(rid) for rid in m.get("roles", [])]
+            if len(page) < page_size:
+                return members
+            after = str(page[-1]["user"]["id"])
+
+    @staticmethod
+    async def create_role(
+        guild_id: str,
+        name: str,
+        *,
+        color: int = 0,
+        hoist: bool = False,
+        mentionable: bool = False,
+        reason: Optional[str] = None,
+    ) -> Optional[str]:
+        """ロールを作成して ID を返す。失敗時は None。"""
+        r = await discord_rest.request(
+            "POST",
+            f"/guilds/{guild_id}/roles",
+            json={"name": name, "color": color, "hoist": hoist, "mentionable": mentionable},
+            reason=reason,
+        )
+        if r is None or r.status_code not in (200, 201):
+            if r is not None:
+                logger.warning("Role create failed: %s %s", r.status_code, r.text)
+            return None
+        role = r.json()
+        index = DiscordRoleService._indexes.get(str(guild_id))
+        if index is not None:
+            index.upsert(role)
+        return str(role["id"])
+
+    @staticmethod
+    async def edit_role(guild_id: str, role_id: str, *, reason: Optional[str] = None, **fields: Any) -> Optional[int]:
+        """ロールを編集する（name / color 等）。HTTP ステータスを返し、通信失敗時は None。"""
+        r = await discord_rest.request(
+            "PATCH", f"/guilds/{guild_id}/roles/{role_id}", json=fields, reason=reason,
+        )
+        if r is None:
+            return None
+        index = DiscordRoleService._indexes.get(str(guild_id))
+        if index is not None:
+            if r.status_code == 200:
+                index.upsert(r.json())
+            elif r.status_code == 404:
+                index.remove(role_id)
+        return r.status_code
+
+    @staticmethod
+    async def add_member_role(guild_id: str, user_id: str, role_id: str, *, reason: Optional[str] = None) -> bool:
+        r = await discord_rest.request(
+            "PUT", f"/guilds/{guild_id}/members/{user_id}/roles/{role_id}", reason=reason,
+        )
+        if r is None or r.status_code != 204:
+            if r is not None:
+                logger.warning("Role add failed: user=%s role=%s status=%s", user_id, role_id, r.status_code)
+            return False
+        return True
+
+    @staticmethod
+    async def remove_member_role(guild_id: str, user_id: str, role_id: str, *, reason: Optional[str] = None) -> bool:
+        r = await discord_rest.request(
+            "DELETE", f"/guilds/{guild_id}/members/{user_id}/roles/{role_id}", reason=reason,
+        )
+        if r is None or r.status_code != 204:
+            if r is not None:
+                logger.warning("Role remove failed: user=%s role=%s status=%s", user_id, role_id, r.status_code)
+            return False
+        return True
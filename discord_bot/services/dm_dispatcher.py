@@ -0,0 +1,182 @@
+# services/dm_dispatcher.py
+# Why: イベント通知の DM を 1 件ずつ直列に、しかも毎回 DM チャンネルを作り直して
+#      （POST /users/@me/channels）送っていたため、300 人規模のイベントで数分かかっていた。
+#      共有クライアント（services/discord_rest.py）の上で、
+#      - ユーザーごとの DM チャンネル ID をキャッシュし 2 回目以降は作成を省く
+#      - 同時送信数を制限して並列に送る（レート制限の待ち合わせは discord_rest 側が行う）
+#      - 進捗とスループットをログ / コールバックで報告する
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from .discord_rest import discord_rest
+
+logger = logging.getLogger(__name__)
+
+# DM チャンネル ID のキャッシュ件数の上限（LRU）
+_CHANNEL_CACHE_SIZE = 10_000
+# 一斉送信の同時送信数の既定値
+DEFAULT_CONCURRENCY = 8
+# 進捗ログの間隔（件）
+_PROGRESS_LOG_EVERY = 25
+
+# Discord のエラーコード: Unknown Channel（キャッシュした DM チャンネルが無効になった）
+_UNKNOWN_CHANNEL = 10003
+
+# (呼び出し元のキー, 送信先ユーザー ID, 本文)
+DMMessage = Tuple[Hashable, str, str]
+
+
+class DMDispatcher:
+    """Discord DM の送信（単発 / 一斉送信）。"""
+
+    _channels: "OrderedDict[str, str]" = OrderedDict()
+
+    # ------------------------------------------------------------
+    # DM チャンネル
+    # ------------------------------------------------------------
+
+    @staticmethod
+    async def open_channel(bot_token: str, user_id: str, *, refresh: bool = False) -> Optional[str]:
+        """ユーザーとの DM チャンネル ID を返す（キャッシュ優先）。"""
+        uid = str(user_id)
+        cache = DMDispatcher._channels
+        if not refresh and uid in cache:
+            cache.move_to_end(uid)
+            return cache[uid]
+
+        r = await discord_rest.request(
+            "POST", "/users/@me/channels", bot_token, json={"recipient_id": uid},
+        )
+        if r is None or r.status_code not in (200, 201):
+            logger.warning("Failed to create DM channel for %s: %s", uid, r.text if r is not None else "no response")
+            return None
+        channel_id = r.json().get("id")
+        if not channel_id:
+            return None
+        cache[uid] = channel_id
+        cache.move_to_end(uid)
+        while len(cache) > _CHANNEL_CACHE_SIZE:
+            cache.popitem(last=False)
+        return channel_id
+
+    @staticmethod
+    def clear_cache() -> None:
+        DMDispatcher._channels.clear()
+
+    # ------------------------------------------------------------
+    # 送信
+    # ------------------------------------------------------------
+
+    @staticmethod
+    def _is_unknown_channel(r) -> bool:
+        if r.status_code != 404:
+            return False
+        try:
+            return r.json().get("code") == _UNKNOWN_CHANNEL
+        except ValueError:
+            return False
+
+    @staticmethod
+    async def send(bot_token: str, user_id: str, content: str) -> bool:
+        """1 人に DM を送る。キャッシュした DM チャンネルが無効なら作り直して 1 回だけ再送する。"""
+        if not bot_token:
+            logger.warning("Bot token missing, cannot send DM.")
+            return False
+        uid = str(user_id)
+        cached = uid in DMDispatcher._channels
+        try:
+            channel_id = await DMDispatcher.open_channel(bot_token, uid)
+            if not channel_id:
+                return False
+            r = await discord_rest.request(
+                "POST", f"/channels/{channel_id}/messages", bot_token, json={"content": content},
+            )
+            if r is not None and cached and DMDispatcher._is_unknown_channel(r):
+                DMDispatcher._channels.pop(uid, None)
+                channel_id = await DMDispatcher.open_channel(bot_token, uid, refresh=True)
+                if not channel_id:
+                    return False
+                r = await discord_rest.request(
+                    "POST", f"/channels/{channel_id}/messages", bot_token, json={"content": content},
+                )
+            if r is not None and r.status_code in (200, 201):
+                return True
+            logger.warning("Failed to send DM to %s: %s", uid, r.text if r is not None else "no response")
+            return False
+        except Exception as e:
+            logger.error("Exception in DMDispatcher.send: %s", e)
+            return False
+
+    @staticmethod
+    async def send_many(
+        bot_token: str,
+        messages: Iterable[DMMessage],
+        *,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        on_sent: Optional[Callable[[Any], Awaitable[Any]]] = None,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """DM を並列に一斉送信する。
+
+        Args:
+            messages: (キー, ユーザー ID, 本文) の列。キーは on_sent / 結果に渡される（参加者 ID 等）
+            concurrency: 同時送信数
+            on_sent: 送信成功ごとに await される（送信済みフラグの記録等）。例外は記録して続行
+            on_progress: 1 件終わるごとに (完了件数, 総件数) で呼ばれる
+        Returns:
+            {"total", "sent", "failed", "failed_keys", "elapsed", "per_second"}
+        """
+        queue = list(messages)
+        total = len(queue)
+        report: Dict[str, Any] = {
+            "total": total, "sent": 0, "failed": 0, "failed_keys": [], "elapsed": 0.0, "per_second": 0.0,
+        }
+        if not total:
+            return report
+        if not bot_token:
+            logger.warning("Bot token missing, cannot send %d DMs.", total)
+            report["failed"] = total
+            report["failed_keys"] = [key for key, _, _ in queue]
+            return report
+
+        started = time.perf_counter()
+        done = 0
+        pending = iter(queue)
+
+        async def worker():
+            nonlocal done
+            for key, user_id, content in pending:
+                ok = await DMDispatcher.send(bot_token, user_id, content)
+                if ok:
+                    report["sent"] += 1
+                    if on_sent is not None:
+                        try:
+                            await on_sent(key)
+                        except Exception as e:
+                            logger.error("DMDispatcher: on_sent failed for %s: %s", key, e)
+                else:
+                    report["failed"] += 1
+                    report["failed_keys"].append(key)
+                done += 1
+                if on_progress is not None:
+                    on_progress(done, total)
+                if done % _PROGRESS_LOG_EVERY == 0 and done < total:
+                    logger.info(
+                        "DMDispatcher: %d/%d sent=%d failed=%d (%.1f msg/s)",
+                        done, total, report["sent"], report["failed"],
+                        done / max(time.perf_counter() - started, 1e-9),
+                    )
+
+        await asyncio.gather(*(worker() for _ in range(max(1, min(concurrency, total)))))
+
+        elapsed = time.perf_counter() - started
+        report["elapsed"] = round(elapsed, 3)
+        report["per_second"] = round(total / elapsed, 2) if elapsed > 0 else float(total)
+        logger.info(
+            "DMDispatcher: finished %d DMs in %.2fs (sent=%d failed=%d, %.1f msg/s)",
+            total, elapsed, report["sent"], report["failed"], report["per_second"],
+        )
+        return report
@@ -0,0 +1,72 @@
+# services/event_admin_service.py
+# Why: イベント管理画面・当日受付画面の表示のたびに Bridge を 5〜6 往復していたため、
+#      /events/{id}/admin-bundle の 1 往復で取得した結果を common/event_admin_view.py で
+#      組み立て、イベント単位で短時間キャッシュする。
+#      参加者の登録・更新・チェックイン・削除・通知済み化は EventService / OutboxService から
+#      invalidate() / invalidate_participant() で即時破棄する。
+#      Bot プロセス側の変更（締切時の自動割り当て等）は TTL で追随する。
+import logging
+from typing import Optional
+
+from cachetools import TTLCache
+
+from common.event_admin_view import EventAdminView, build_event_admin_view
+
+from .access_control_service import AccessControlService
+from .bridge_client import bridge_client
+
+logger = logging.getLogger(__name__)
+
+_VIEW_TTL_SECONDS = 30
+
+
+class EventAdminService:
+    """イベント管理画面の描画用データの取得（キャッシュ付き）。"""
+
+    _views: TTLCache = TTLCache(maxsize=64, ttl=_VIEW_TTL_SECONDS)
+    # 参加者 ID → イベント ID（参加者単位の更新からイベントのキャッシュを破棄するため）
+    _participant_events: TTLCache = TTLCache(maxsize=100_000, ttl=3600)
+
+    @staticmethod
+    async def get_view(event_id: int) -> Optional[EventAdminView]:
+        """イベントの管理画面用データを返す。イベントが存在しなければ None。
+
+        Raises:
+            BridgeUnavailableError: Bridge に接続できない場合
+        """
+        event_id = int(event_id)
+        view = EventAdminService._views.get(event_id)
+        if view is not None:
+            return view
+
+        res = await bridge_client.request("GET", f"/events/{event_id}/admin-bundle")
+        if not isinstance(res, dict) or "event" not in res:
+            return None
+        view = build_event_admin_view(res)
+
+        if view.acl:
+            AccessControlService.remember_acl(event_id, view.acl)
+        for pid in view.participant_ids:
+            EventAdminService._participant_events[pid] = event_id
+        EventAdminService._views[event_id] = view
+        logger.debug(
+            "EventAdminService: built view event=%s participants=%d", event_id, len(view.participants),
+        )
+        return view
+
+    @staticmethod
+    def invalidate(event_id: int) -> None:
+        EventAdminService._views.pop(int(event_id), None)
+
+    @staticmethod
+    def invalidate_participant(participant_id: int) -> None:
+        """参加者の所属イベントのキャッシュを破棄する（所属が不明ならキャッシュもない）。"""
+        event_id = EventAdminService._participant_events.get(int(participant_id))
+        if event_id is not None:
+            EventAdminService.invalidate(event_id)
+
+    @staticmethod
+    def clear() -> None:
+        """全キャッシュを破棄する（テスト用）。"""
+        EventAdminService._views.clear()
+        EventAdminService._participant_events.clear()
@@ -1,10 +1,21 @@
 # services/event_service.py
 # イベント参加フォーム機能のエントリポイント。bridge_client 経由で Rust と通信する。
 
+import logging
 import secrets
 from typing import Any, Dict, List, Optional
 
+from common.session_assignment import AssignmentPlan, plan_assignment
+
 from .bridge_client import bridge_client
+from .calendar_feed_service import CalendarFeedService
+from .checkin_index_service import CheckinIndexService
+from .event_admin_service import EventAdminService
+
+logger = logging.getLogger(__name__)
+
+# 締切処理の自動割り当てで、計算中の変更による衝突を何回まで計算し直すか
+_ASSIGN_ATTEMPTS = 3
 
 
 class EventService:
@@ -87,6 +98,9 @@ class EventService:
                 "sessions": sessions or [],
             },
         )
+        EventAdminService.invalidate(event_id)
+        CheckinIndexService.invalidate(event_id)
+        CalendarFeedService.invalidate(event_id)
         return res is not None and res.get("status") == "ok"
 
     @staticmethod
@@ -95,6 +109,7 @@ class EventService:
         res = await bridge_client.request(
             "PATCH", f"/events/{event_id}/status", json={"status": status}
         )
+        EventAdminService.invalidate(event_id)
         return res is not None
 
     # ============================================================
@@ -123,6 +138,8 @@ class EventService:
                 "access_token": token,
             },
         )
+        EventAdminService.invalidate(event_id)
+        CheckinIndexService.invalidate(event_id)
         return token if res and res.get("status") == "ok" else None
 
     @staticmethod
@@ -164,25 +181,76 @@ class EventService:
                 "personal_note": personal_note,
             },
         )
+        EventAdminService.invalidate_participant(participant_id)
+        CheckinIndexService.invalidate_participant(participant_id)
+        CalendarFeedService.invalidate_participant(participant_id)
         return res is not None
 
+    @staticmethod
+    async def bulk_update_participants(
+        event_id: int,
+        updates: List[Dict[str, Any]],
+        *,
+        all_or_nothing: bool = False,
+    ) -> Optional[Dict[str, Any]]:
+        """参加者の承認状況・部・個人メモを 1 回の Bridge 呼び出しで一括更新する。
+
+        Args:
+            updates: [{"participant_id", "approval"?, "session_id"?, "personal_note"?}, ...]
+                     指定したキーだけを変更する（session_id / personal_note は None で解除）
+            all_or_nothing: 1 件でも更新できない行があれば何も変更しない
+        Returns:
+            {"status": "ok", "updated", "results": [{"participant_id", "status"}, ...]}
+            results の status は ok / not_found（このイベントの参加者でない）/ invalid。通信失敗時は None
+        """
+        res = await bridge_client.request(
+            "PATCH",
+            f"/events/{event_id}/participants",
+            json={"items": updates, "all_or_nothing": all_or_nothing},
+        )
+        if not isinstance(res, dict):
+            return None
+        if res.get("updated"):
+            EventAdminService.invalidate(event_id)
+            CheckinIndexService.invalidate(event_id)
+            CalendarFeedService.invalidate(event_id)
+        return res
+
     @staticmethod
     async def mark_notified(participant_id: int) -> bool:
         """DM送信済みフラグを立てる。"""
         res = await bridge_client.request(
             "PATCH", f"/events/participant/{participant_id}/notified"
         )
+        EventAdminService.invalidate_participant(participant_id)
         return res is not None
 
     @staticmethod
-    async def set_checkin(participant_id: int, checked_in: bool) -> bool:
-        """当日チェックイン状態を設定する（来場/取消）。"""
+    async def set_checkin(
+        participant_id: int, checked_in: bool, event_id: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """当日チェックイン状態を設定する（来場/取消）。
+
+        event_id を指定すると、そのイベントの参加者以外は更新しない（None を返す）。
+        Bridge が同じイベントの受付画面へ変更を配信する。
+
+        Returns:
+            {"event_id", "participant_id", "checked_in_at"}。失敗時は None
+        """
+        body: Dict[str, Any] = {"checked_in": checked_in}
+        if event_id is not None:
+            body["event_id"] = int(event_id)
         res = await bridge_client.request(
             "PATCH",
             f"/events/participant/{participant_id}/checkin",
-            json={"checked_in": checked_in},
+            json=body,
         )
-        return res is not None
+        if not isinstance(res, dict):
+            return None
+        if res.get("event_id") is not None:
+            EventAdminService.invalidate(res["event_id"])
+            CheckinIndexService.record_checkin(res["event_id"], participant_id, res.get("checked_in_at"))
+        return res
 
     @staticmethod
     async def delete_participant(participant_id: int) -> bool:
@@ -190,17 +258,63 @@ class EventService:
         res = await bridge_client.request(
             "DELETE", f"/events/participant/{participant_id}"
         )
+        EventAdminService.invalidate_participant(participant_id)
+        CheckinIndexService.invalidate_participant(participant_id)
+        CalendarFeedService.invalidate_participant(participant_id)
         return res is not None
 
     # ============================================================
     # 自動割り当て
     # ============================================================
 
+    @staticmethod
+    async def plan_assignment(event_id: int) -> Optional[AssignmentPlan]:
+        """未確定の応募者の割り当てを計算する（確定はしない）。イベントがなければ None。"""
+        result = await EventService.get_event(event_id)
+        if not result or "event" not in result:
+            return None
+        participants = await EventService.list_participants(event_id)
+        return plan_assignment(
+            result.get("sessions") or [],
+            participants,
+            event_capacity=result["event"].get("capacity"),
+        )
+
+    @staticmethod
+    async def apply_assignments(event_id: int, items: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """割り当て計画を 1 トランザクションで確定する。
+
+        Returns:
+            {"status": "ok", "updated", "participants"} または
+            {"status": "conflict", "reason": "stale" | "capacity", ...}。通信失敗時は None
+        """
+        res = await bridge_client.request("POST", f"/events/{event_id}/assignments", json={"items": items})
+        if isinstance(res, dict) and res.get("status") == "ok":
+            EventAdminService.invalidate(event_id)
+            CheckinIndexService.invalidate(event_id)
+            CalendarFeedService.invalidate(event_id)
+        return res if isinstance(res, dict) else None
+
     @staticmethod
     async def auto_assign(event_id: int) -> bool:
-        """希望部優先の自動割り当てを実行する。"""
-        res = await bridge_client.request("POST", f"/events/{event_id}/auto-assign")
-        return res is not None and res.get("status") == "ok"
+        """割り当てを計算してそのまま確定する（締切処理用）。
+
+        計算中に他の操作で状態が変わった場合は計算し直す。
+        """
+        for _ in range(_ASSIGN_ATTEMPTS):
+            plan = await EventService.plan_assignment(event_id)
+            if plan is None:
+                return False
+            items = plan.items()
+            if not items:
+                return True
+            res = await EventService.apply_assignments(event_id, items)
+            if res is None:
+                return False
+            if res.get("status") == "ok":
+                return True
+            logger.info("EventService: auto_assign conflict event=%s res=%s", event_id, res)
+        return False
 
     @staticmethod
     async def get_session_stats(event_id: int) -> Optional[Dict[str, Any]]:
@@ -0,0 +1,116 @@
+# services/leaderboard_service.py
+# Why: ラウンジの全体ランキングと「自分は N 人中何位か」を、リクエストのたびに全プレイヤーを
+#      並べ替えずに返すため、Bridge の GET /lounge/players を一度だけ読み込んで
+#      common/leaderboard.py の順位索引に載せる。
+#      webapp 内で分かる MMR（セッション終了時の new_mmr・LoungeService.get_player の結果）は即時反映し、
+#      Bot など別経路での変更には TTL での再ロードで追随する。
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from common.leaderboard import Leaderboard
+
+from .bridge_client import bridge_client
+
+logger = logging.getLogger(__name__)
+
+_RELOAD_INTERVAL_SECONDS = 600
+MAX_PAGE_SIZE = 100
+
+
+class LeaderboardService:
+    """ラウンジ MMR のリーダーボード（プロセス内シングルトン）"""
+
+    _board: Optional[Leaderboard] = None
+    _names: Dict[str, Optional[str]] = {}
+    _loaded_at: float = 0.0
+    _lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def _get_lock() -> asyncio.Lock:
+        if LeaderboardService._lock is None:
+            LeaderboardService._lock = asyncio.Lock()
+        return LeaderboardService._lock
+
+    @staticmethod
+    def _is_fresh() -> bool:
+        return (
+            LeaderboardService._board is not None
+            and time.monotonic() - LeaderboardService._loaded_at < _RELOAD_INTERVAL_SECONDS
+        )
+
+    @staticmethod
+    async def load() -> bool:
+        """Bridge から全プレイヤーを読み込み、索引を作り直す。失敗時は既存の索引を維持する。"""
+        res = await bridge_client.request("GET", "/lounge/players")
+        if not isinstance(res, list):
+            logger.warning("LeaderboardService.load: unexpected response from /lounge/players")
+            return False
+        players = [p for p in res if p.get("user_id") is not None]
+        LeaderboardService._board = Leaderboard((p["user_id"], p.get("mmr") or 0) for p in players)
+        LeaderboardService._names = {str(p["user_id"]): p.get("username") for p in players}
+        LeaderboardService._loaded_at = time.monotonic()
+        logger.info("LeaderboardService: loaded %d players", len(LeaderboardService._board))
+        return True
+
+    @staticmethod
+    async def ensure_loaded() -> Optional[Leaderboard]:
+        """索引が未ロードまたは古ければ再ロードする。使える索引が無ければ None。"""
+        if LeaderboardService._is_fresh():
+            return LeaderboardService._board
+        async with LeaderboardService._get_lock():
+            if not LeaderboardService._is_fresh():
+                await LeaderboardService.load()
+        return LeaderboardService._board
+
+    @staticmethod
+    def record_results(results: Iterable[Dict[str, Any]]) -> None:
+        """セッション終了の結果（user_id, new_mmr）を反映する。未ロードなら次の読み込みに任せる。"""
+        board = LeaderboardService._board
+        if board is None:
+            return
+        for r in results:
+            if r.get("user_id") is not None and r.get("new_mmr") is not None:
+                board.update(r["user_id"], r["new_mmr"])
+
+    @staticmethod
+    def observe(player: Optional[Dict[str, Any]]) -> None:
+        """GET /lounge/players/{id} の結果を反映する（初参加のプレイヤーもここで載る）。"""
+        board = LeaderboardService._board
+        if board is None or not player or player.get("user_id") is None or player.get("mmr") is None:
+            return
+        board.update(player["user_id"], player["mmr"])
+
+    @staticmethod
+    async def get_page(offset: int = 0, limit: int = 50) -> Optional[Dict[str, Any]]:
+        """MMR の高い順のページ。索引が使えなければ None。"""
+        board = await LeaderboardService.ensure_loaded()
+        if board is None:
+            return None
+        offset = max(0, offset)
+        limit = min(max(1, limit), MAX_PAGE_SIZE)
+        names = LeaderboardService._names
+        entries = [dict(e, username=names.get(e["user_id"])) for e in board.page(offset, limit)]
+        return {"total": len(board), "offset": offset, "limit": limit, "entries": entries}
+
+    @staticmethod
+    async def get_rank(user_id: Any, page_size: int = 50) -> Optional[Dict[str, Any]]:
+        """{rank, total, mmr, top_percent, offset}。offset は自分が載るページの先頭（page_size 件ごと）。
+
+        索引が使えない・未登録なら None。
+        """
+        board = await LeaderboardService.ensure_loaded()
+        if board is None:
+            return None
+        info = board.rank(user_id)
+        if info is None:
+            return None
+        page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+        return dict(info, offset=board.position(user_id) // page_size * page_size)
+
+    @staticmethod
+    def clear() -> None:
+        LeaderboardService._board = None
+        LeaderboardService._names = {}
+        LeaderboardService._loaded_at = 0.0
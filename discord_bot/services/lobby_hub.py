@@ -0,0 +1,49 @@
+# services/lobby_hub.py
+# Why: ロビー画面はブラウザから Bridge の /ws/hyouibana を直接購読しており、
+#      Webapp の書き込みバッファ（services/lobby_status_buffer.py）が受け付けたステータスは
+#      Bridge へ反映されるまで他の参加者に届かなかった。
+#      ロビー（passcode）単位の購読を Webapp に持ち、受け付けた変更はその場で配り、
+#      Bridge が配信するロビーのイベント（大会開始・試合結果など）も 1 本の WebSocket で中継する。
+#
+# 方式:
+#   - 購読・配信・再接続は services/bridge_event_hub.py の BridgeEventHub（トピックは passcode）。
+#     取りこぼし時は `lobby.resync` を送り、画面側で状態を取り直させる
+#   - passcode を持たないロビーのイベント（user_synced など）は全ロビーの購読者へ配る。
+#     画面側は自分のロビー以外の passcode のイベントを無視する
+#   - バッファの一括反映には source_id を付けて送り、Bridge から戻ってくる自分の反映分は配り直さない
+#     （受付時に配信済みで、その後の変更より古いことがあるため）。別プロセスの変更はそのまま中継する
+import uuid
+from typing import Any, Dict, Optional
+
+from .bridge_event_hub import BridgeEventHub
+
+MEMBER_STATUS_UPDATED = "member_status_updated"
+RESYNC = "lobby.resync"
+
+# passcode を付けずに配信されるロビー画面向けのイベント（全ロビーへ中継する）。
+# match_winner_reported は passcode を付ける前の Bridge からの配信を取りこぼさないため
+LOBBY_BROADCAST_EVENTS = frozenset({"user_synced", "match_winner_reported"})
+
+
+def _passcode(message: Dict[str, Any]) -> Optional[str]:
+    passcode = message.get("passcode")
+    return passcode if isinstance(passcode, str) else None
+
+
+class LobbyHub(BridgeEventHub[str]):
+    """ロビー単位のイベント配信。"""
+
+    def __init__(self, ws_url: Optional[str] = None, **kwargs: Any):
+        # このプロセスから Bridge へ書き込んだ変更の目印（Bridge の配信に source として戻る）
+        self.source_id = uuid.uuid4().hex
+        super().__init__(
+            ws_url,
+            topic_key=_passcode,
+            accepts=lambda message: message.get("source") != self.source_id,
+            broadcasts=lambda message: message.get("type") in LOBBY_BROADCAST_EVENTS,
+            resync_type=RESYNC,
+            **kwargs,
+        )
+
+
+lobby_hub = LobbyHub()
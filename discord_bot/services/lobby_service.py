@@ -1,8 +1,21 @@
 # services/lobby_service.py
 from typing import List, Dict, Any, Optional
+
+from cachetools import TTLCache
+
 from services.bridge_client import bridge_client
+from services.user_directory_service import UserDirectoryService
+
+# Why: ステータス切り替え（/lobby/api/status）は頻繁に呼ばれ、Bridge への書き込みもバッファでまとめている。
+#      参加者かどうかの確認のたびに参加者一覧を取りに行かないよう、ロビーごとの参加者 ID を短時間キャッシュする。
+#      参加・ロビー削除はこのプロセスで破棄し、他プロセスでの変更は TTL で追随する。
+_MEMBER_TTL_SECONDS = 30
+
 
 class LobbyService:
+    # passcode → 参加者の user_id（文字列）の集合
+    _member_ids: TTLCache = TTLCache(maxsize=1024, ttl=_MEMBER_TTL_SECONDS)
+
     @staticmethod
     async def get_active_rooms() -> List[Dict[str, Any]]:
         """有効な対戦ロビー一覧を取得する"""
@@ -25,7 +38,10 @@ class LobbyService:
             "virtual_ip": virtual_ip
         }
         res = await bridge_client.request("POST", "/lobby/sync_user", json=payload)
-        return res is not None and res.get("status") == "ok"
+        ok = res is not None and res.get("status") == "ok"
+        if ok:
+            UserDirectoryService.upsert(discord_id, username)
+        return ok
 
     @staticmethod
     async def bulk_sync_users(members: List[Dict[str, Any]]) -> int:
@@ -35,6 +51,8 @@ class LobbyService:
         res = await bridge_client.request(
             "POST", "/lobby/bulk_sync_users", json={"members": members}
         )
+        if res:
+            UserDirectoryService.upsert_many(members)
         return res.get("affected", 0) if res else 0
 
     @staticmethod
@@ -72,6 +90,7 @@ class LobbyService:
     async def delete_room(passcode: str) -> bool:
         """ロビーを削除する"""
         res = await bridge_client.request("DELETE", f"/lobby/rooms/{passcode}")
+        LobbyService._member_ids.pop(passcode, None)
         return res is not None and res.get("status") == "ok"
 
     @staticmethod
@@ -84,8 +103,23 @@ class LobbyService:
     async def get_members(passcode: str) -> List[Dict[str, Any]]:
         """ロビーの参加者一覧を取得する"""
         res = await bridge_client.request("GET", f"/lobby/join/{passcode}")
+        if isinstance(res, list):
+            LobbyService._member_ids[passcode] = frozenset(str(m.get("user_id")) for m in res)
         return res if res else []
 
+    @staticmethod
+    async def is_member(passcode: str, user_id: Any) -> bool:
+        """ユーザーがロビーの参加者か（参加者一覧をキャッシュして判定）。一覧を取得できなければ False。
+
+        Raises:
+            BridgeUnavailableError: Bridge に接続できない場合
+        """
+        member_ids = LobbyService._member_ids.get(passcode)
+        if member_ids is None:
+            await LobbyService.get_members(passcode)
+            member_ids = LobbyService._member_ids.get(passcode, frozenset())
+        return str(user_id) in member_ids
+
     @staticmethod
     async def join_lobby(passcode: str, user_id: int, role: str) -> bool:
         """ロビーに参加する（役割を設定）"""
@@ -95,6 +129,7 @@ class LobbyService:
             "role": role
         }
         res = await bridge_client.request("POST", "/lobby/join", json=payload)
+        LobbyService._member_ids.pop(passcode, None)
         return res is not None and res.get("status") == "ok"
 
     @staticmethod
@@ -110,6 +145,19 @@ class LobbyService:
         res = await bridge_client.request("PATCH", f"/lobby/rooms/{passcode}/members/{user_id}/status", json=payload)
         return res is not None and res.get("status") == "ok"
 
+    @staticmethod
+    async def update_member_statuses(updates: List[Dict[str, Any]], source: Optional[str] = None) -> Optional[int]:
+        """メンバーのステータスを一括更新する。
+        updates: [{"passcode": str, "user_id": int, "status": str}, ...]
+        戻り値: 更新した行数。API エラー時は None。"""
+        payload: Dict[str, Any] = {"updates": updates}
+        if source:
+            payload["source"] = source
+        res = await bridge_client.request("PATCH", "/lobby/members/status", json=payload)
+        if not res or res.get("status") != "ok":
+            return None
+        return res.get("affected", 0)
+
     @staticmethod
     async def report_match_winner(match_id: int, winner_id: int, score1: int, score2: int) -> bool:
         """試合の勝者を報告する"""
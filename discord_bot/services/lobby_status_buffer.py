@@ -0,0 +1,127 @@
+# services/lobby_status_buffer.py
+# Why: ロビー画面のステータス切り替え（/lobby/api/status）は 1 回ごとに Bridge へ
+#      PATCH /lobby/rooms/{passcode}/members/{user_id}/status を同期で送っており、
+#      混雑時に受付中 ⇄ 対戦中 の連続切り替えがそのまま Bridge への書き込みになっていた。
+#      (passcode, user_id) ごとの最新ステータスだけをメモリに持ち、受け付けた時点で
+#      ロビーの購読者（services/lobby_hub.py）へ配信して応答し、Bridge へは
+#      一定間隔（既定 300 ms）でまとめて PATCH /lobby/members/status に書き込む。
+#
+# 方式:
+#   - 反映待ち（pending）と送信中（in-flight）の 2 段。送信中に来た変更は pending に積み、次の回で送る
+#   - 参照（get / overlay）は pending → in-flight の順に引き、DB より新しい値を返す
+#   - Bridge に接続できなければ再送する（送信中より新しい変更があればそちらを優先）。
+#     API エラー（Bridge は稼働中）は再送しても同じ結果になるため捨ててログに残す
+#   - 書き込みタスクは反映待ちがある間だけ動く。終了時は flush() で残りを書き込む
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .bridge_client import BridgeUnavailableError
+from .lobby_hub import MEMBER_STATUS_UPDATED, LobbyHub, lobby_hub
+from .lobby_service import LobbyService
+
+logger = logging.getLogger(__name__)
+
+# ロビー参加者のステータス（lobby_members.status）
+LOBBY_MEMBER_STATUSES = ("offline", "online", "waiting", "playing")
+
+FLUSH_INTERVAL_SECONDS = 0.3
+MAX_BATCH = 500
+_RETRY_MAX_SECONDS = 30
+
+_Key = Tuple[str, int]
+
+
+class LobbyStatusBuffer:
+    """ロビー参加者ステータスの書き込みバッファ。"""
+
+    def __init__(self, hub: Optional[LobbyHub] = None, *,
+                 interval: float = FLUSH_INTERVAL_SECONDS, max_batch: int = MAX_BATCH):
+        self._hub = hub
+        self._interval = interval
+        self._max_batch = max_batch
+        self._pending: Dict[_Key, str] = {}
+        self._inflight: Dict[_Key, str] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._unavailable = False
+
+    def pending_count(self) -> int:
+        return len(self._pending) + len(self._inflight)
+
+    def set(self, passcode: str, user_id: int, status: str) -> None:
+        """ステータスを受け付ける。購読者へはすぐに配信し、Bridge へは次の書き込みでまとめて送る。"""
+        key = (passcode, int(user_id))
+        if self.get(passcode, user_id) != status:
+            if self._hub is not None:
+                self._hub.publish({
+                    "type": MEMBER_STATUS_UPDATED, "passcode": passcode,
+                    "user_id": key[1], "status": status,
+                })
+        self._pending[key] = status
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._run())
+
+    def get(self, passcode: str, user_id: int) -> Optional[str]:
+        """Bridge へ未反映のステータス。無ければ None（DB の値が最新）。"""
+        key = (passcode, int(user_id))
+        status = self._pending.get(key)
+        return status if status is not None else self._inflight.get(key)
+
+    def overlay(self, passcode: str, members: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Bridge から取得したメンバー一覧に、未反映のステータスを重ねる。"""
+        result = []
+        for m in members:
+            status = self.get(passcode, m["user_id"]) if m.get("user_id") is not None else None
+            result.append(dict(m, status=status) if status is not None else m)
+        return result
+
+    async def flush(self) -> int:
+        """反映待ちをすべて Bridge へ書き込む。書き込んだ件数を返す（失敗分は反映待ちに戻る）。"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        written = 0
+        async with self._flush_lock:
+            self._unavailable = False
+            while self._pending:
+                batch = dict(list(self._pending.items())[:self._max_batch])
+                for key in batch:
+                    del self._pending[key]
+                self._inflight = batch
+                try:
+                    ok = await self._write(batch)
+                finally:
+                    self._inflight = {}
+                if ok is None:
+                    # 接続できない: 新しい変更が来ていなければ再送する
+                    for key, status in batch.items():
+                        self._pending.setdefault(key, status)
+                    self._unavailable = True
+                    break
+                written += len(batch) if ok else 0
+        return written
+
+    async def _write(self, batch: Dict[_Key, str]) -> Optional[bool]:
+        """True: 書き込み済み / False: API エラーで破棄 / None: 接続できず再送が必要"""
+        updates = [{"passcode": p, "user_id": u, "status": s} for (p, u), s in batch.items()]
+        source = self._hub.source_id if self._hub is not None else None
+        try:
+            affected = await LobbyService.update_member_statuses(updates, source=source)
+        except BridgeUnavailableError:
+            logger.warning("LobbyStatusBuffer: bridge unavailable, %d updates kept", len(batch))
+            return None
+        if affected is None:
+            logger.error("LobbyStatusBuffer: bulk status update failed, %d updates dropped", len(batch))
+            return False
+        return True
+
+    async def _run(self) -> None:
+        backoff = self._interval
+        while self._pending:
+            # 間隔内の切り替えをまとめてから書き込む
+            await asyncio.sleep(backoff)
+            await self.flush()
+            backoff = min(max(backoff * 2, 1.0), _RETRY_MAX_SECONDS) if self._unavailable else self._interval
+
+
+lobby_status_buffer = LobbyStatusBuffer(lobby_hub)
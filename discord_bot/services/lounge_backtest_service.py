@@ -0,0 +1,41 @@
+# services/lounge_backtest_service.py
+# Why: common/mmr_backtest.py は過去セッションの最終順位を入力にとるため、
+#      Bridge の GET /lounge/sessions/{id}/final-scores から指定のセッション列を取得して
+#      SessionTable に変換する（同時取得数を制限して並行に取得する）。
+#      エクスポート（CSV / JSONL）からの読み込みは SessionTable.from_rows() を直接使う。
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Sequence
+
+from common.mmr_backtest import RatingFormula, SessionTable, compare
+
+from .lounge_service import LoungeService
+
+logger = logging.getLogger(__name__)
+
+_FETCH_CONCURRENCY = 8
+
+
+class LoungeBacktestService:
+    """ラウンジ MMR 式のオフライン検証（管理者の手元実行用）。"""
+
+    @staticmethod
+    async def load_table(session_ids: Sequence[int], *, concurrency: int = _FETCH_CONCURRENCY) -> SessionTable:
+        """セッションの最終順位を取得して SessionTable にする。session_ids は時系列順に渡す。"""
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(session_id: int) -> List[Dict[str, Any]]:
+            async with sem:
+                rows = await LoungeService.get_final_scores(session_id)
+            return [dict(r, session_id=session_id) for r in rows]
+
+        results = await asyncio.gather(*(fetch(sid) for sid in session_ids))
+        table = SessionTable.from_rows(row for rows in results for row in rows)
+        logger.info("LoungeBacktest: loaded sessions=%d players=%d", len(table), table.n_players)
+        return table
+
+    @staticmethod
+    async def run(session_ids: Sequence[int], formulas: Iterable[RatingFormula], **kwargs: Any) -> List[Dict[str, Any]]:
+        """取得したセッション列で各式を比較する（common.mmr_backtest.compare の結果）。"""
+        table = await LoungeBacktestService.load_table(session_ids)
+        return compare(table, formulas, **kwargs)
@@ -0,0 +1,115 @@
+# services/lounge_finish_service.py
+# Why: セッション終了時、プレイヤーごとに grant-rank → grant-tournament → 装備確認 → 装備 →
+#      ロール確保 → ロール付与を順番に待っていたため、12 人のセッションで数十往復かかり、
+#      その間ホストの「終了」が返らなかった。
+#      称号の付与と初回装備は Bridge の一括 API（POST /titles/grant-batch）で 1 往復にまとめ、
+#      称号は TitleService の称号マスタ索引から引く。Discord ロールの付与は同時実行数を制限して並行に送る。
+#      ルート側は MMR の確定（LoungeService.finish_session）だけを待って応答し、
+#      称号付与以降はバックグラウンドで run_title_pipeline() を実行する。
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional
+
+from .discord_role_service import DiscordRoleService
+from .tournament_service import TitleService
+
+logger = logging.getLogger(__name__)
+
+# 同時に送るロール付与の上限
+ROLE_ASSIGN_CONCURRENCY = 4
+
+
+class LoungeFinishService:
+    """ラウンジセッション終了後の称号付与・Discord ロール付与。"""
+
+    @staticmethod
+    def build_grant_players(results: List[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+        """Bridge の MMR 計算結果から一括付与の入力を作る（1 位はセッション優勝者）。"""
+        players = []
+        for entry in results:
+            uid = entry.get("user_id")
+            if not uid:
+                continue
+            players.append({
+                "user_id": int(uid),
+                "mmr": int(entry.get("new_mmr") or 0),
+                "session_winner": entry.get("final_rank") == 1,
+            })
+        return players
+
+    @staticmethod
+    def group_by_title(grants: List[Mapping[str, Any]]) -> Dict[int, List[str]]:
+        """新規付与を title_id → user_id 一覧にまとめる（ロールの確保を称号ごとに 1 回にするため）。"""
+        by_title: Dict[int, List[str]] = {}
+        for g in grants:
+            for title_id in g.get("newly_granted") or []:
+                by_title.setdefault(int(title_id), []).append(str(g["user_id"]))
+        return by_title
+
+    @staticmethod
+    async def assign_roles(
+        guild_id: str,
+        by_title: Mapping[int, List[str]],
+        role_ids: Mapping[int, Optional[str]],
+        *,
+        concurrency: int = ROLE_ASSIGN_CONCURRENCY,
+    ) -> Dict[str, int]:
+        """称号ロールをまとめて付与する。1 件の失敗で他を止めない。
+
+        Returns:
+            {"assigned": 成功数, "failed": 失敗数}
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+
+        async def add(user_id: str, role_id: str) -> bool:
+            async with sem:
+                try:
+                    return await DiscordRoleService.add_member_role(guild_id, user_id, role_id)
+                except Exception as e:
+                    logger.warning("LoungeFinish: role add failed user=%s role=%s: %s", user_id, role_id, e)
+                    return False
+
+        jobs = [
+            add(user_id, role_ids[title_id])
+            for title_id, user_ids in by_title.items()
+            if role_ids.get(title_id)
+            for user_id in user_ids
+        ]
+        results = await asyncio.gather(*jobs)
+        assigned = sum(1 for ok in results if ok)
+        return {"assigned": assigned, "failed": len(results) - assigned}
+
+    @staticmethod
+    async def run_title_pipeline(
+        results: List[Mapping[str, Any]],
+        guild_id: str,
+        ensure_role: Callable[[Dict[str, Any]], Awaitable[Optional[str]]],
+    ) -> Optional[Dict[str, Any]]:
+        """称号の一括付与 → 称号ごとのロール確保 → ロールの並行付与。
+
+        Args:
+            results: LoungeService.finish_session() の results
+            ensure_role: 称号 → Discord ロール ID（routes/tournament.py の _ensure_discord_role）
+        Returns:
+            {"grants": [...], "assigned": n, "failed": n}。一括付与に失敗した場合は None。
+        """
+        players = LoungeFinishService.build_grant_players(results)
+        if not players:
+            return {"grants": [], "assigned": 0, "failed": 0}
+        grants = await TitleService.grant_batch(players)
+        if grants is None:
+            logger.error("LoungeFinish: grant-batch failed (players=%d)", len(players))
+            return None
+
+        by_title = LoungeFinishService.group_by_title(grants)
+        report: Dict[str, Any] = {"grants": grants, "assigned": 0, "failed": 0}
+        if not by_title or not guild_id:
+            return report
+
+        catalog = await TitleService.get_catalog()
+        role_ids: Dict[int, Optional[str]] = {}
+        for title_id in by_title:
+            title = catalog.get(title_id) if catalog else None
+            role_ids[title_id] = await ensure_role(title) if title else None
+        report.update(await LoungeFinishService.assign_roles(guild_id, by_title, role_ids))
+        return report
@@ -1,6 +1,7 @@
 # services/lounge_service.py
 from typing import Any, Dict, List, Optional
 from services.bridge_client import bridge_client
+from services.leaderboard_service import LeaderboardService
 
 
 class LoungeService:
@@ -65,7 +66,9 @@ class LoungeService:
 
     @staticmethod
     async def get_player(user_id: int) -> Optional[Dict[str, Any]]:
-        return await bridge_client.request("GET", f"/lounge/players/{user_id}")
+        player = await bridge_client.request("GET", f"/lounge/players/{user_id}")
+        LeaderboardService.observe(player)
+        return player
 
     @staticmethod
     async def create_team(session_id: int, tag: str, member_ids: List[int]) -> Optional[int]:
@@ -1,10 +1,11 @@
 # services/notification_service.py
 # Why: Discord API 経由のDM送信は副作用を伴うI/O処理のため services/ に配置。
 #      旧 routes/survey.py の send_dm_notification を移動。
+#      送信は services/dm_dispatcher.py（接続プール共有・DM チャンネルのキャッシュ）に委譲する。
+#      多人数への一斉送信は DMDispatcher.send_many を直接使うこと。
 import logging
-from typing import Optional
 
-import httpx
+from .dm_dispatcher import DMDispatcher
 
 logger = logging.getLogger(__name__)
 
@@ -40,53 +41,13 @@ class NotificationService:
             logger.warning("Bot token missing, cannot send DM.")
             return False
 
-        headers = {
-            "Authorization": f"Bot {bot_token}",
-            "Content-Type": "application/json",
-        }
-
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            try:
-                # 1. DMチャンネルを作成/取得
-                dm_channel_url = "https://discord.com/api/v10/users/@me/channels"
-                r = await client.post(
-                    dm_channel_url,
-                    json={"recipient_id": user_id},
-                    headers=headers,
-                )
-                if r.status_code not in (200, 201):
-                    logger.warning("Failed to create DM channel: %s", r.text)
-                    return False
-
-                channel_id = r.json().get("id")
-
-                # 2. メッセージ送信
-                msg_url = f"https://discord.com/api/v10/channels/{channel_id}/messages"
-                edit_url = f"{dashboard_base_url}/form/{survey_id}"
-
-                content = (
-                    f"**アンケート回答ありがとうございます**\n"
-                    f"「{survey_title}」への回答を受け付けました。\n\n"
-                    f"**回答の修正はこちらから:**\n{edit_url}\n"
-                )
-
-                r_msg = await client.post(
-                    msg_url,
-                    json={"content": content},
-                    headers=headers,
-                )
-                if r_msg.status_code in (200, 201):
-                    return True
-                else:
-                    logger.warning("Failed to send DM: %s", r_msg.text)
-                    return False
-
-            except httpx.TimeoutException:
-                logger.error("DM send timed out for user %s", user_id)
-                return False
-            except Exception as e:
-                logger.error("Exception in send_dm: %s", e)
-                return False
+        edit_url = f"{dashboard_base_url}/form/{survey_id}"
+        content = (
+            f"**アンケート回答ありがとうございます**\n"
+            f"「{survey_title}」への回答を受け付けました。\n\n"
+            f"**回答の修正はこちらから:**\n{edit_url}\n"
+        )
+        return await DMDispatcher.send(bot_token, user_id, content)
 
     @staticmethod
     async def send_dm_raw(
@@ -99,36 +60,4 @@ class NotificationService:
             logger.warning("Bot token missing, cannot send DM.")
             return False
 
-        headers = {
-            "Authorization": f"Bot {bot_token}",
-            "Content-Type": "application/json",
-        }
-
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            try:
-                r = await client.post(
-                    "https://discord.com/api/v10/users/@me/channels",
-                    json={"recipient_id": user_id},
-                    headers=headers,
-                )
-                if r.status_code not in (200, 201):
-                    logger.warning("Failed to create DM channel: %s", r.text)
-                    return False
-
-                channel_id = r.json().get("id")
-                r_msg = await client.post(
-                    f"https://discord.com/api/v10/channels/{channel_id}/messages",
-                    json={"content": message},
-                    headers=headers,
-                )
-                if r_msg.status_code in (200, 201):
-                    return True
-                logger.warning("Failed to send DM: %s", r_msg.text)
-                return False
-
-            except httpx.TimeoutException:
-                logger.error("DM send timed out for user %s", user_id)
-                return False
-            except Exception as e:
-                logger.error("Exception in send_dm_raw: %s", e)
-                return False
+        return await DMDispatcher.send(bot_token, user_id, message)
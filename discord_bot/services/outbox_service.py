@@ -0,0 +1,154 @@
+# services/outbox_service.py
+# Why: イベント通知の DM を送信ループ内で直接送っていたため、Bot の再起動や
+#      一斉通知 API のタイムアウトで途中の参加者に届かず、失敗の記録も残らなかった。
+#      送る前に Bridge の通知 Outbox（notification_outbox）へ積み、ワーカーが取り出して送る。
+#
+# 配送の保証:
+#   - 積む時点で (participant_id, kind) により重複を除く（同じ通知を二重に積まない）。
+#     未送信のまま積み直した場合は本文を最新の描画に差し替え、送信済みの通知には触れない
+#   - 取り出しはリース付き。送信中にプロセスが落ちてもリース切れ後に別のワーカーが再送する
+#   - 送信に成功した時だけ sent にし、同じトランザクションで参加者の notified_at を立てる
+#   - 失敗は指数バックオフで再試行し、MAX_ATTEMPTS 回で断念（dead）。管理画面に一覧を出す
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .bridge_client import bridge_client
+from .dm_dispatcher import DMDispatcher
+from .event_admin_service import EventAdminService
+
+logger = logging.getLogger(__name__)
+
+# 選考結果（承認 / 否認 / 補欠）の通知
+KIND_EVENT_RESULT = "event_result"
+
+# 再試行の間隔: 30 秒から倍々で最大 1 時間。MAX_ATTEMPTS 回失敗したら断念する
+RETRY_BASE_SECONDS = 30
+RETRY_MAX_SECONDS = 3600
+MAX_ATTEMPTS = 8
+# 取り出した通知を他のワーカーに渡さない時間（この間に送り終える想定）
+LEASE_SECONDS = 120
+CLAIM_BATCH = 50
+
+
+def retry_delay(attempts: int) -> int:
+    """attempts 回目の失敗後、次の再試行までの秒数。"""
+    return min(RETRY_BASE_SECONDS * (2 ** max(attempts - 1, 0)), RETRY_MAX_SECONDS)
+
+
+class OutboxService:
+    """通知 Outbox の操作と配送。"""
+
+    @staticmethod
+    async def enqueue(event_id: int, messages: Iterable[Tuple[int, str, str]], kind: str = KIND_EVENT_RESULT) -> int:
+        """通知を積む。既に積まれている (participant_id, kind) は、送信済みでなければ本文を差し替えて
+        再試行回数をリセットする（断念した通知も再送対象に戻る）。送信済みなら何もしない。
+
+        Args:
+            messages: (参加者 ID, 送信先ユーザー ID, 本文) の列
+        Returns:
+            新しく積んだ・積み直した件数（Bridge エラー時は 0）
+        """
+        items = [
+            {
+                "participant_id": int(pid),
+                "kind": kind,
+                "event_id": int(event_id),
+                "user_id": int(user_id),
+                "content": content,
+            }
+            for pid, user_id, content in messages
+        ]
+        if not items:
+            return 0
+        res = await bridge_client.request("POST", "/outbox", json={"items": items})
+        return int(res.get("enqueued", 0)) if isinstance(res, dict) else 0
+
+    @staticmethod
+    async def claim(limit: int = CLAIM_BATCH, event_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        res = await bridge_client.request(
+            "POST", "/outbox/claim",
+            json={"limit": limit, "lease_seconds": LEASE_SECONDS, "event_id": event_id},
+        )
+        return res if isinstance(res, list) else []
+
+    @staticmethod
+    async def mark_sent(outbox_id: int) -> bool:
+        """送信成功を記録する（参加者の notified_at も Bridge 側で同時に立つ）。"""
+        res = await bridge_client.request("POST", f"/outbox/{outbox_id}/sent")
+        return res is not None
+
+    @staticmethod
+    async def mark_failed(outbox_id: int, attempts: int, error: str = "") -> bool:
+        give_up = attempts >= MAX_ATTEMPTS
+        res = await bridge_client.request(
+            "POST", f"/outbox/{outbox_id}/failed",
+            json={"error": error, "retry_in_seconds": retry_delay(attempts), "give_up": give_up},
+        )
+        return res is not None
+
+    @staticmethod
+    async def list_stuck(event_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """滞留している通知（断念 / 再試行待ち / リース切れ）。"""
+        params = {"event_id": event_id} if event_id is not None else None
+        res = await bridge_client.request("GET", "/outbox/stuck", params=params)
+        return res if isinstance(res, list) else []
+
+    @staticmethod
+    async def get_owner(outbox_id: int) -> Optional[Dict[str, int]]:
+        """{"event_id", "participant_id"}。見つからなければ None。"""
+        res = await bridge_client.request("GET", f"/outbox/{outbox_id}/event")
+        return res if isinstance(res, dict) and res.get("event_id") is not None else None
+
+    @staticmethod
+    async def requeue(outbox_id: int, user_id: Any, content: str) -> bool:
+        """断念・再試行待ちの通知を再送対象に戻す。本文は参加者の現在の状態から描画し直したものを渡す。"""
+        res = await bridge_client.request(
+            "POST", f"/outbox/{outbox_id}/requeue", json={"user_id": int(user_id), "content": content},
+        )
+        return res is not None
+
+    # ------------------------------------------------------------
+    # 配送
+    # ------------------------------------------------------------
+
+    @staticmethod
+    async def drain(bot_token: Optional[str], event_id: Optional[int] = None) -> Dict[str, Any]:
+        """送信可能な通知がなくなるまで取り出して送る。
+
+        Args:
+            event_id: 指定時はそのイベントの通知だけを送る（一斉通知 API から即時に送る場合）
+        Returns:
+            {"claimed", "sent", "failed", "elapsed"}（DMDispatcher.send_many の集計の合計）
+        """
+        total: Dict[str, Any] = {"claimed": 0, "sent": 0, "failed": 0, "elapsed": 0.0}
+        if not bot_token:
+            logger.warning("Bot token missing, cannot drain notification outbox.")
+            return total
+
+        while True:
+            batch = await OutboxService.claim(CLAIM_BATCH, event_id=event_id)
+            if not batch:
+                return total
+            attempts = {item["id"]: int(item.get("attempts") or 1) for item in batch}
+            report = await DMDispatcher.send_many(
+                bot_token,
+                [(item["id"], item["user_id"], item["content"]) for item in batch],
+                on_sent=OutboxService.mark_sent,
+            )
+            for outbox_id in report["failed_keys"]:
+                await OutboxService.mark_failed(outbox_id, attempts[outbox_id], "DM send failed")
+            # 送信済み（notified_at）を管理画面に反映する
+            for eid in {item["event_id"] for item in batch}:
+                EventAdminService.invalidate(eid)
+
+            total["claimed"] += len(batch)
+            total["sent"] += report["sent"]
+            total["failed"] += report["failed"]
+            total["elapsed"] = round(total["elapsed"] + report["elapsed"], 3)
+            logger.info(
+                "OutboxService.drain: claimed=%d sent=%d failed=%d",
+                len(batch), report["sent"], report["failed"],
+            )
+            if report["sent"] == 0:
+                # すべて失敗した場合は再試行時刻まで待つ（同じ呼び出しで取り直さない）
+                return total
@@ -0,0 +1,45 @@
+# services/survey_analytics_service.py
+# Why: 結果画面のクロス集計・絞り込み API のたびに全回答を取り直して索引を組むと重いため、
+#      common/survey_analytics.py の ResponseTable をアンケート単位で短時間キャッシュする。
+#      キーに質問スキーマのハッシュを含め、質問の編集後は古い索引を使わない。
+import logging
+from typing import Tuple
+
+from cachetools import TTLCache
+
+from common.survey_analytics import ResponseTable
+from common.survey_utils import QuestionSchema, decode_answers
+
+from .survey_service import SurveyService
+
+logger = logging.getLogger(__name__)
+
+# 新しい回答の反映はこの秒数まで遅れる（結果画面の自動更新間隔に合わせる）
+_TABLE_TTL_SECONDS = 15
+
+
+class SurveyAnalyticsService:
+    """アンケート回答のクロス集計用テーブルの取得"""
+
+    _tables: TTLCache = TTLCache(maxsize=32, ttl=_TABLE_TTL_SECONDS)
+
+    @staticmethod
+    async def get_table(survey_id: int, schema: QuestionSchema) -> ResponseTable:
+        """回答の索引。途中のページを取得できなければ SurveyResponsesError（不完全な索引はキャッシュしない）。"""
+        key: Tuple[int, str] = (int(survey_id), schema.digest)
+        table = SurveyAnalyticsService._tables.get(key)
+        if table is not None:
+            return table
+
+        answers = []
+        async for page in SurveyService.iter_response_pages(survey_id):
+            answers.extend(decode_answers(r.get("answers")) for r in page)
+        table = ResponseTable(schema, answers)
+        SurveyAnalyticsService._tables[key] = table
+        logger.debug("SurveyAnalyticsService: built table survey=%s rows=%d", survey_id, table.size)
+        return table
+
+    @staticmethod
+    def clear() -> None:
+        """キャッシュを破棄する（テスト用）。"""
+        SurveyAnalyticsService._tables.clear()
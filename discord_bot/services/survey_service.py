@@ -1,14 +1,22 @@
 # services/survey_service.py
 # Why: DB直接操作を廃止し、Rust Bridge (IPC) 経由に切り替える。
 #      Phase 3-B 以降、Python 側は DB 接続を持たない。
+import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
+from common.survey_utils import TEXT_PREVIEW_LIMIT, QuestionSchema, decode_cursor, encode_cursor
+
+from .access_control_service import AccessControlService
 from .bridge_client import bridge_client
 
 logger = logging.getLogger(__name__)
 
 
+class SurveyResponsesError(RuntimeError):
+    """回答一覧の 2 ページ目以降を取得できなかった（途中までの回答を全件として扱わないため）。"""
+
+
 class SurveyService:
     """アンケート操作のエントリポイント。
     
@@ -94,6 +102,8 @@ class SurveyService:
             f"/surveys/{survey_id}", 
             params={"owner_id": owner_id}
         )
+        if res is not None:
+            AccessControlService.invalidate_survey(survey_id)
         return res is not None
 
     @staticmethod
@@ -138,6 +148,88 @@ class SurveyService:
         res = await bridge_client.request("GET", f"/surveys/{survey_id}/responses")
         return res if isinstance(res, list) else []
 
+    @staticmethod
+    async def get_responses_page(
+        survey_id: int,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        """回答一覧を 1 ページ分取得する（新しい順、submitted_at + id のキーセットページング）。
+
+        Args:
+            cursor: 前回の戻り値の next_cursor。None なら先頭ページ。
+            filters: {"<質問index>": "値"}。回答がその値を含むものに絞り込む。
+        Returns:
+            {"items": [...], "next_cursor": str | None, "total": int | None}
+            total はフィルタ適用後の総件数で、先頭ページのみ返る。
+        Raises:
+            SurveyResponsesError: cursor 指定時（2 ページ目以降）に Bridge がエラーを返した場合。
+                先頭ページの失敗は従来どおり空のページを返す。
+        """
+        params: Dict[str, Any] = {"limit": limit}
+        before = decode_cursor(cursor)
+        if before:
+            params["before_at"], params["before_id"] = before
+        if filters:
+            params["filters"] = json.dumps(filters, ensure_ascii=False)
+
+        res = await bridge_client.request("GET", f"/surveys/{survey_id}/responses/page", params=params)
+        if not isinstance(res, dict):
+            if before:
+                logger.error("SurveyService.get_responses_page: survey=%s failed after cursor", survey_id)
+                raise SurveyResponsesError(f"failed to fetch responses of survey {survey_id} after cursor")
+            return {"items": [], "next_cursor": None, "total": 0}
+
+        nxt = res.get("next_cursor")
+        return {
+            "items": res.get("items") or [],
+            "next_cursor": encode_cursor(nxt["submitted_at"], nxt["id"]) if nxt else None,
+            "total": res.get("total"),
+        }
+
+    @staticmethod
+    async def get_results_summary(
+        survey_id: int,
+        schema: QuestionSchema,
+        text_limit: int = TEXT_PREVIEW_LIMIT,
+    ) -> Optional[Dict[str, Any]]:
+        """結果画面の質問ごとの集計を Bridge で計算して 1 往復で取得する（回答本文は転送しない）。
+
+        Returns:
+            {"total": 回答数, "questions": {"<質問index>": {"total", "counts": [[値, 件数], ...] | "texts": [...]}}}
+            Bridge エラー時は None。
+        """
+        params = {
+            "choice": ",".join(q.key for q in schema if q.is_choice),
+            "text": ",".join(q.key for q in schema if not q.is_choice),
+            "multi": ",".join(q.key for q in schema if q.is_multi),
+            "text_limit": text_limit,
+        }
+        res = await bridge_client.request("GET", f"/surveys/{survey_id}/responses/summary", params=params)
+        return res if isinstance(res, dict) else None
+
+    @staticmethod
+    async def iter_response_pages(
+        survey_id: int,
+        page_size: int = 200,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """全回答をページ単位で順に返す（メモリ上には常に 1 ページ分だけ保持する）。
+
+        途中のページを取得できなければ SurveyResponsesError を送出する（途中で打ち切らない）。
+        """
+        cursor = None
+        while True:
+            page = await SurveyService.get_responses_page(
+                survey_id, cursor=cursor, limit=page_size, filters=filters
+            )
+            if page["items"]:
+                yield page["items"]
+            cursor = page["next_cursor"]
+            if not cursor:
+                return
+
     @staticmethod
     async def get_existing_answers(
         pool: Any,
@@ -172,6 +264,7 @@ class SurveyService:
         res = await bridge_client.request(
             "POST", f"/surveys/{survey_id}/collaborators", json={"user_id": user_id}
         )
+        AccessControlService.invalidate_survey(survey_id)
         return res is not None
 
     @staticmethod
@@ -180,13 +273,14 @@ class SurveyService:
         res = await bridge_client.request(
             "DELETE", f"/surveys/{survey_id}/collaborators/{user_id}"
         )
+        AccessControlService.invalidate_survey(survey_id)
         return res is not None
 
     @staticmethod
     async def is_collaborator(survey_id: int, user_id: str) -> bool:
-        """指定ユーザーがそのアンケートのスタッフか判定する。"""
-        collaborators = await SurveyService.list_collaborators(survey_id)
-        return any(str(c.get("user_id")) == str(user_id) for c in collaborators)
+        """指定ユーザーがそのアンケートのスタッフか判定する（ACL キャッシュ経由）。"""
+        acl = await AccessControlService.get_survey_acl(survey_id)
+        return acl is not None and acl.is_collaborator(user_id)
 
     @staticmethod
     async def search_users(query: str) -> List[Dict[str, Any]]:
@@ -0,0 +1,105 @@
+# services/title_role_reconciler.py
+# Why: 称号ロールの付け外しは付与・装備切替の時点で個別に行っているため、失敗や Discord 側での
+#      手動操作でずれが溜まる。DB とギルドの状態を読み、common/title_role_reconcile.py が計算した
+#      差分の操作だけを適用する（変更のないメンバー・ロールには API を呼ばない）。
+#      同時実行数を制限して送り、レート制限の待ち合わせは services/discord_rest.py 側が行う。
+#      Bot は定期ジョブとして実行し（メンバーはゲートウェイのキャッシュを渡す）、
+#      Webapp の管理者 API からは dry-run で差分だけを確認できる。
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+from common.title_role_reconcile import ReconcilePlan, RoleOp, plan_title_roles
+
+from .discord_role_service import DiscordRoleService
+from .tournament_service import TitleService
+
+logger = logging.getLogger(__name__)
+
+# 同時に送る操作数の上限（ギルド単位のバケットを食い潰さない程度に抑える）
+DEFAULT_CONCURRENCY = 4
+_REASON = "称号ロールの整合"
+
+
+class TitleRoleReconciler:
+    """称号ロールの差分同期。"""
+
+    @staticmethod
+    async def plan(
+        guild_id: str,
+        members: Optional[Mapping[str, Iterable[Any]]] = None,
+    ) -> Optional[ReconcilePlan]:
+        """差分を計算する（Discord への書き込みなし）。必要なデータを取得できなければ None。
+
+        Args:
+            members: user_id → ロール ID。省略時は REST でギルドメンバーを取得する
+        """
+        titles = await TitleService.list_all()
+        holdings = await TitleService.list_holdings()
+        if not titles or holdings is None:
+            logger.warning("TitleRoleReconciler: titles/holdings unavailable")
+            return None
+        index = await DiscordRoleService.get_index(guild_id, reload=True)
+        if index is None:
+            return None
+        if members is None:
+            members = await DiscordRoleService.list_members(guild_id)
+            if members is None:
+                return None
+        role_ids = {str(t["discord_role_id"]) for t in titles if t.get("discord_role_id")}
+        guild_roles = {rid: index.get(rid) for rid in role_ids if rid in index}
+        return plan_title_roles(titles, holdings["earned"], holdings["active"], members, guild_roles)
+
+    @staticmethod
+    async def _apply_one(guild_id: str, op: RoleOp) -> bool:
+        if op.kind == "add":
+            return await DiscordRoleService.add_member_role(guild_id, op.user_id, op.role_id, reason=_REASON)
+        if op.kind == "remove":
+            return await DiscordRoleService.remove_member_role(guild_id, op.user_id, op.role_id, reason=_REASON)
+        status = await DiscordRoleService.edit_role(guild_id, op.role_id, reason=_REASON, **dict(op.fields))
+        return status == 200
+
+    @staticmethod
+    async def apply(guild_id: str, plan: ReconcilePlan, *, concurrency: int = DEFAULT_CONCURRENCY) -> Dict[str, Any]:
+        """計画の操作を送る。ロール名の修正を先に終えてから付け外しを行う。
+
+        Returns:
+            {"applied": 成功数, "failed": 失敗数, "failures": [失敗した操作]}
+        """
+        sem = asyncio.Semaphore(max(1, concurrency))
+        failures = []
+
+        async def run(op: RoleOp) -> None:
+            async with sem:
+                try:
+                    ok = await TitleRoleReconciler._apply_one(guild_id, op)
+                except Exception as e:
+                    logger.warning("TitleRoleReconciler: %s failed: %s", op, e)
+                    ok = False
+            if not ok:
+                failures.append(op.as_dict())
+
+        await asyncio.gather(*(run(op) for op in plan.patches))
+        await asyncio.gather(*(run(op) for op in plan.removes + plan.adds))
+        return {"applied": len(plan) - len(failures), "failed": len(failures), "failures": failures[:100]}
+
+    @staticmethod
+    async def reconcile(
+        guild_id: str,
+        *,
+        dry_run: bool = False,
+        members: Optional[Mapping[str, Iterable[Any]]] = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> Optional[Dict[str, Any]]:
+        """差分を計算して適用する。dry_run なら計算結果の報告のみ。取得失敗時は None。"""
+        started = time.monotonic()
+        plan = await TitleRoleReconciler.plan(guild_id, members)
+        if plan is None:
+            return None
+        report = plan.report()
+        report["dry_run"] = dry_run
+        if not dry_run and len(plan):
+            report.update(await TitleRoleReconciler.apply(guild_id, plan, concurrency=concurrency))
+        report["elapsed_ms"] = int((time.monotonic() - started) * 1000)
+        return report
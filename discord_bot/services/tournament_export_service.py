@@ -0,0 +1,96 @@
+# services/tournament_export_service.py
+# Why: 大会結果のエクスポートで、試合ごとにスコアを取りに行ったり全試合を一度に持ったりしないよう、
+#      Bridge の GET /tournament/rooms/{passcode}/export（試合 + スコアを match_id 順のページで返す）を
+#      1 ページずつ取得して common/tournament_export.py で CSV / JSON Lines に変換しながら返す。
+#
+# 方式:
+#   - 参加者・総合順位・ユーザー名ディレクトリの読み込み・試合の 1 ページ目は並行に取得する
+#   - 書き出し中に次のページを先読みし、同時に持つ試合は最大 2 ページ分
+#   - ユーザー名は参加者一覧（Bridge が付ける username）→ UserDirectoryService の順に引く
+#   - 1 ページ目が取れなければ応答を始める前に None を返す。途中のページで失敗したら
+#     TournamentExportError を送出し、途中までのファイルを完全なものとして渡さない
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from common.tournament_export import (
+    encode_header, encode_records, match_records, member_records, standing_records,
+)
+
+from .lobby_service import LobbyService
+from .tournament_service import TournamentService
+from .user_directory_service import UserDirectoryService
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PAGE_SIZE = 500
+
+
+class TournamentExportError(RuntimeError):
+    """エクスポートの途中で試合を取得できなかった。"""
+
+
+class TournamentExportService:
+    """ロビー大会結果のストリーミングエクスポート。"""
+
+    @staticmethod
+    async def open_stream(
+        passcode: str,
+        fmt: str,
+        *,
+        members: Optional[List[Dict[str, Any]]] = None,
+        page_size: int = EXPORT_PAGE_SIZE,
+    ) -> Optional[AsyncIterator[str]]:
+        """エクスポートの本文を文字列のチャンクで返す非同期イテレータ。1 ページ目が取れなければ None。
+
+        members: 呼び出し元で取得済みの参加者一覧（権限確認などで取得済みなら再取得しない）
+        """
+        first_page, standings, fetched_members, _ = await asyncio.gather(
+            TournamentService.export_matches_page(passcode, 0, page_size),
+            TournamentService.get_standings(passcode),
+            LobbyService.get_members(passcode) if members is None else _ready(members),
+            UserDirectoryService.ensure_loaded(),
+        )
+        if first_page is None:
+            return None
+
+        member_names = {
+            str(m["user_id"]): m.get("username") for m in fetched_members if m.get("user_id") is not None
+        }
+
+        def name_of(user_id: Any) -> Optional[str]:
+            if user_id is None:
+                return None
+            return member_names.get(str(user_id)) or UserDirectoryService.name_of(user_id)
+
+        async def chunks() -> AsyncIterator[str]:
+            yield encode_header(fmt)
+            yield encode_records(fmt, member_records(fetched_members, name_of))
+
+            page: Optional[Dict[str, Any]] = first_page
+            next_page: Optional[asyncio.Task] = None
+            try:
+                while page is not None:
+                    after = page.get("next_after")
+                    if after is not None:
+                        next_page = asyncio.create_task(
+                            TournamentService.export_matches_page(passcode, after, page_size)
+                        )
+                    yield encode_records(fmt, match_records(page.get("matches") or [], name_of))
+                    if next_page is None:
+                        break
+                    page, next_page = await next_page, None
+                    if page is None:
+                        logger.error("TournamentExport %s: failed to fetch matches after %s", passcode, after)
+                        raise TournamentExportError(f"failed to fetch matches after {after}")
+            finally:
+                if next_page is not None:
+                    next_page.cancel()
+
+            yield encode_records(fmt, standing_records(standings, name_of))
+
+        return chunks()
+
+
+async def _ready(value: Any) -> Any:
+    return value
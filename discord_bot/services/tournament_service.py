@@ -1,7 +1,14 @@
 # services/tournament_service.py
+import asyncio
+import time
 from typing import Any, Dict, List, Optional
+
+from common.title_catalog import TitleCatalog
 from services.bridge_client import bridge_client
 
+# 称号マスタ索引の再読み込み間隔（Bot など別プロセスでの変更への追随）
+_CATALOG_TTL_SECONDS = 300
+
 
 class TournamentService:
     @staticmethod
@@ -27,6 +34,15 @@ class TournamentService:
         res = await bridge_client.request("GET", f"/tournament/matches/{match_id}/scores")
         return res if res else []
 
+    @staticmethod
+    async def export_matches_page(passcode: str, after: int = 0, limit: int = 500) -> Optional[Dict[str, Any]]:
+        """大会結果エクスポート用に、試合（各試合の scores 付き）を match_id 順に 1 ページ取得する。
+        戻り値: {"matches": [...], "next_after": int | None}。失敗時は None。"""
+        res = await bridge_client.request(
+            "GET", f"/tournament/rooms/{passcode}/export", params={"after": after, "limit": limit},
+        )
+        return res if isinstance(res, dict) else None
+
     @staticmethod
     async def get_standings(passcode: str) -> List[Dict[str, Any]]:
         res = await bridge_client.request("GET", f"/tournament/rooms/{passcode}/standings")
@@ -34,11 +50,40 @@ class TournamentService:
 
 
 class TitleService:
+    # 称号マスタの索引（common/title_catalog.py）。upsert / delete で破棄する
+    _catalog: Optional[TitleCatalog] = None
+    _catalog_lock: Optional[asyncio.Lock] = None
+
     @staticmethod
     async def list_all() -> List[Dict[str, Any]]:
         res = await bridge_client.request("GET", "/titles")
         return res if res else []
 
+    @staticmethod
+    async def get_catalog() -> Optional[TitleCatalog]:
+        """称号マスタの索引。読み込めなければ（古い索引も無ければ）None。
+
+        同時に呼ばれても /titles の取得は 1 回にまとめる。
+        """
+        catalog = TitleService._catalog
+        if catalog is not None and time.monotonic() - catalog.loaded_at < _CATALOG_TTL_SECONDS:
+            return catalog
+        if TitleService._catalog_lock is None:
+            TitleService._catalog_lock = asyncio.Lock()
+        async with TitleService._catalog_lock:
+            current = TitleService._catalog
+            if current is not None and current is not catalog:
+                return current
+            res = await bridge_client.request("GET", "/titles")
+            if not isinstance(res, list):
+                return current
+            TitleService._catalog = TitleCatalog(res, loaded_at=time.monotonic())
+            return TitleService._catalog
+
+    @staticmethod
+    def invalidate_catalog() -> None:
+        TitleService._catalog = None
+
     @staticmethod
     async def upsert(
         name: str,
@@ -60,11 +105,13 @@ class TitleService:
         if title_id is not None:
             payload["id"] = title_id
         res = await bridge_client.request("POST", "/titles", json=payload)
+        TitleService.invalidate_catalog()
         return res.get("id") if res else None
 
     @staticmethod
     async def delete(title_id: int) -> bool:
         res = await bridge_client.request("DELETE", f"/titles/{title_id}")
+        TitleService.invalidate_catalog()
         return res is not None and res.get("status") == "ok"
 
     @staticmethod
@@ -97,12 +144,22 @@ class TitleService:
         res = await bridge_client.request("DELETE", f"/titles/player/{user_id}/active")
         return res is not None and res.get("status") == "ok"
 
+    @staticmethod
+    async def list_holdings() -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """全プレイヤーの獲得称号・装備中の称号。{"earned": [...], "active": [...]}（各要素は user_id, title_id）。
+        取得できなければ None（称号ロールの整合で「全員未所持」と誤認しないため空にしない）。"""
+        res = await bridge_client.request("GET", "/titles/holdings")
+        if not isinstance(res, dict) or "earned" not in res:
+            return None
+        return res
+
     @staticmethod
     async def update_discord_role_id(title_id: int, discord_role_id: str) -> bool:
         res = await bridge_client.request(
             "PATCH", f"/titles/{title_id}/discord_role",
             json={"discord_role_id": discord_role_id}
         )
+        TitleService.invalidate_catalog()
         return res is not None and res.get("status") == "ok"
 
     @staticmethod
@@ -121,3 +178,18 @@ class TitleService:
             "POST", f"/titles/player/{user_id}/grant-tournament"
         )
         return res.get("newly_granted", []) if res else []
+
+    @staticmethod
+    async def grant_batch(players: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """ランク称号・優勝称号を 1 往復でまとめて付与する（ラウンジセッション終了時）。
+
+        Args:
+            players: {"user_id", "mmr", "session_winner"} の一覧
+        Returns:
+            [{"user_id", "newly_granted": [title_id], "activated": 新たに装備した title_id or None}]。
+            失敗時は None。
+        """
+        res = await bridge_client.request("POST", "/titles/grant-batch", json={"players": players})
+        if not isinstance(res, dict) or res.get("status") != "ok":
+            return None
+        return res.get("results", [])
@@ -0,0 +1,107 @@
+# services/user_directory_service.py
+# Why: スタッフ検索（/api/users/search）のたびに Bridge の LIKE 検索を往復していたため、
+#      user_networks のユーザー名を一度だけロードして common/user_index.py の索引に載せる。
+#      webapp 内の同期（LobbyService.sync_user / bulk_sync_users）は即時反映し、
+#      Bot プロセス側の一括同期には TTL での再ロードで追随する。
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from common.user_index import UserIndex
+
+from .bridge_client import bridge_client
+
+logger = logging.getLogger(__name__)
+
+# Bot（別プロセス）のギルドメンバー同期は起動時 + 定期実行のため、この間隔で再ロードする
+_RELOAD_INTERVAL_SECONDS = 600
+
+
+class UserDirectoryService:
+    """ユーザー名ディレクトリ（プロセス内シングルトン）"""
+
+    _index: Optional[UserIndex] = None
+    _loaded_at: float = 0.0
+    _lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def _get_lock() -> asyncio.Lock:
+        if UserDirectoryService._lock is None:
+            UserDirectoryService._lock = asyncio.Lock()
+        return UserDirectoryService._lock
+
+    @staticmethod
+    def _is_fresh() -> bool:
+        return (
+            UserDirectoryService._index is not None
+            and time.monotonic() - UserDirectoryService._loaded_at < _RELOAD_INTERVAL_SECONDS
+        )
+
+    @staticmethod
+    async def load() -> bool:
+        """Bridge から全ユーザーを読み込み、索引を作り直す。失敗時は既存の索引を維持する。"""
+        res = await bridge_client.request("GET", "/users")
+        if not isinstance(res, list):
+            logger.warning("UserDirectoryService.load: unexpected response from /users")
+            return False
+        UserDirectoryService._index = UserIndex(
+            (u.get("user_id"), u.get("username")) for u in res if u.get("user_id")
+        )
+        UserDirectoryService._loaded_at = time.monotonic()
+        logger.info("UserDirectoryService: loaded %d users", len(UserDirectoryService._index))
+        return True
+
+    @staticmethod
+    async def ensure_loaded() -> bool:
+        """索引が未ロードまたは古ければ再ロードする。索引が使える状態なら True。"""
+        if UserDirectoryService._is_fresh():
+            return True
+        async with UserDirectoryService._get_lock():
+            if UserDirectoryService._is_fresh():
+                return True
+            await UserDirectoryService.load()
+        return UserDirectoryService._index is not None
+
+    @staticmethod
+    async def search(
+        query: str,
+        limit: int = 20,
+        exclude: Optional[Iterable[Any]] = None,
+    ) -> List[Dict[str, str]]:
+        """ユーザー名で検索する。索引を用意できない場合は Bridge の LIKE 検索にフォールバックする。"""
+        if await UserDirectoryService.ensure_loaded():
+            return UserDirectoryService._index.search(query, limit=limit, exclude=exclude)
+
+        res = await bridge_client.request("GET", "/users/search", params={"q": query})
+        results = res if isinstance(res, list) else []
+        excluded = {str(e) for e in exclude} if exclude else set()
+        return [r for r in results if str(r.get("user_id")) not in excluded][:limit]
+
+    @staticmethod
+    def name_of(discord_id: Any) -> Optional[str]:
+        """ロード済みの索引からユーザー名を引く（未ロード・未登録なら None）。"""
+        index = UserDirectoryService._index
+        return index.name(discord_id) if index is not None and discord_id is not None else None
+
+    @staticmethod
+    def upsert(discord_id: Any, username: Optional[str]) -> None:
+        """同期済みユーザーを索引に反映する（未ロード時は次回ロードに任せる）。"""
+        if UserDirectoryService._index is not None and username:
+            UserDirectoryService._index.upsert(discord_id, username)
+
+    @staticmethod
+    def upsert_many(members: Iterable[Dict[str, Any]]) -> None:
+        """bulk_sync_users と同じ形式 [{"discord_id", "username"}] をまとめて反映する。"""
+        if UserDirectoryService._index is None:
+            return
+        for m in members:
+            if m.get("username"):
+                UserDirectoryService._index.upsert(m.get("discord_id"), m["username"])
+
+    @staticmethod
+    def clear() -> None:
+        """索引を破棄する（テスト用）。"""
+        UserDirectoryService._index = None
+        UserDirectoryService._loaded_at = 0.0
+        UserDirectoryService._lock = None
@@ -176,26 +176,47 @@
 
     const btnSync = document.getElementById('btn-sync-roles');
     if (btnSync) {
+        const describe = (d) => {
+            const s = d.summary;
+            return `ロール名の修正 ${s.patch} 件 / 付与 ${s.add} 件 / 解除 ${s.remove} 件` +
+                (s.skipped ? `（反映できないもの ${s.skipped} 件）` : '');
+        };
+        const syncRoles = (dryRun) => fetch('/tournament/api/titles/sync-discord-roles', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ dry_run: dryRun }),
+        }).then(res => res.json());
+
         btnSync.addEventListener('click', async () => {
             const resultEl = document.getElementById('sync-roles-result');
             btnSync.disabled = true;
-            btnSync.textContent = '同期中...';
+            btnSync.textContent = '差分を確認中...';
             resultEl.style.display = 'none';
             try {
-                const res = await fetch('/tournament/api/titles/sync-discord-roles', { method: 'POST' });
-                const data = await res.json();
-                if (data.status === 'ok') {
-                    const summary = data.results.map(r => `${r.name}: ${r.status}`).join('<br>');
-                    resultEl.innerHTML = `<span style="color:var(--success)">✓ 同期完了</span><br><small style="color:var(--gray)">${summary}</small>`;
+                // まず dry-run で差分を確認してから適用する
+                const preview = await syncRoles(true);
+                if (preview.status !== 'ok') {
+                    resultEl.innerHTML = `<span style="color:var(--danger)">エラー: ${preview.message}</span>`;
+                } else if (preview.summary.patch + preview.summary.add + preview.summary.remove === 0) {
+                    resultEl.innerHTML = `<span style="color:var(--success)">✓ 差分はありません</span>`;
+                } else if (confirm(`${describe(preview)}\nDiscord に反映しますか？`)) {
+                    btnSync.textContent = '同期中...';
+                    const data = await syncRoles(false);
+                    if (data.status === 'ok') {
+                        const failed = data.failed ? `<br><small style="color:var(--danger)">失敗 ${data.failed} 件</small>` : '';
+                        resultEl.innerHTML = `<span style="color:var(--success)">✓ 同期完了</span><br><small style="color:var(--gray)">${describe(data)}</small>${failed}`;
+                    } else {
+                        resultEl.innerHTML = `<span style="color:var(--danger)">エラー: ${data.message}</span>`;
+                    }
                 } else {
-                    resultEl.innerHTML = `<span style="color:var(--danger)">エラー: ${data.message}</span>`;
+                    resultEl.innerHTML = `<small style="color:var(--gray)">${describe(preview)}（未反映）</small>`;
                 }
             } catch (e) {
                 resultEl.innerHTML = `<span style="color:var(--danger)">通信エラー</span>`;
             }
             resultEl.style.display = 'block';
             btnSync.disabled = false;
-            btnSync.innerHTML = '<i class="fas fa-sync"></i> ロール名を同期する';
+            btnSync.innerHTML = '<i class="fas fa-sync"></i> 称号ロールを同期する';
         });
     }
 
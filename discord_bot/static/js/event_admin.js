@@ -44,18 +44,120 @@
         });
     };
 
+    // ============================================================
+    // 一括更新（複数選択）
+    // ============================================================
+
+    function selectedIds() {
+        return Array.from(document.querySelectorAll('.select-row:checked')).map(el => parseInt(el.value));
+    }
+
+    window.updateSelection = function () {
+        const n = selectedIds().length;
+        const bar = document.getElementById('bulk-bar');
+        if (bar) bar.style.display = n ? 'flex' : 'none';
+        const count = document.getElementById('bulk-count');
+        if (count) count.textContent = n;
+        const all = document.getElementById('select-all');
+        const total = document.querySelectorAll('.select-row').length;
+        if (all) {
+            all.checked = n > 0 && n === total;
+            all.indeterminate = n > 0 && n < total;
+        }
+    };
+
+    window.selectAll = function (checked) {
+        document.querySelectorAll('.select-row').forEach(el => { el.checked = checked; });
+        window.updateSelection();
+    };
+
+    window.clearSelection = function () { window.selectAll(false); };
+
+    window.bulkApply = async function () {
+        const ids = selectedIds();
+        if (ids.length === 0) return;
+        const approval = document.getElementById('bulk-approval')?.value || '';
+        const sessionVal = document.getElementById('bulk-session')?.value ?? 'keep';
+        if (!approval && sessionVal === 'keep') { alert('変更する項目を選んでください'); return; }
+
+        const items = ids.map(pid => {
+            const item = { participant_id: pid };
+            if (approval) item.approval = approval;
+            if (sessionVal !== 'keep') item.session_id = sessionVal ? parseInt(sessionVal) : null;
+            return item;
+        });
+        const label = approval ? APPROVAL_LABELS[approval] : '部の変更';
+        if (!confirm(`${ids.length}名を「${label}」に更新しますか？`)) return;
+
+        const res = await fetch(`/event/api/${EVENT_ID}/participants`, {
+            method: 'PATCH',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ items }),
+        });
+        const d = await res.json().catch(() => ({}));
+        if (!res.ok || d.status !== 'ok') { alert('一括更新に失敗しました'); return; }
+
+        // 成功した行だけ画面に反映する
+        const byId = new Map(items.map(it => [it.participant_id, it]));
+        let failed = 0;
+        (d.results || []).forEach(r => {
+            if (r.status !== 'ok') { failed++; return; }
+            const row = document.getElementById(`row-${r.participant_id}`);
+            const it = byId.get(r.participant_id);
+            if (!row || !it) return;
+            if (it.approval) row.querySelector('.select-approval').value = it.approval;
+            if ('session_id' in it) {
+                const sel = row.querySelector('.select-session');
+                if (sel) sel.value = it.session_id != null ? String(it.session_id) : '';
+            }
+            row.querySelector('.select-row').checked = false;
+        });
+        window.updateSelection();
+        alert(failed ? `${ids.length - failed}名を更新しました（${failed}名は更新できませんでした）。` : `${ids.length}名を更新しました。`);
+    };
+
     // ============================================================
     // 自動割り当て
     // ============================================================
 
     const APPROVAL_LABELS = { pending: '確認中', accepted: '承認', rejected: '否認', waitlist: '補欠' };
 
+    function describePlan(d) {
+        const s = d.summary;
+        const ranks = Object.keys(s.by_rank).sort().map(k =>
+            k === 'other' ? `希望外 ${s.by_rank[k]}名` : `第${k}希望 ${s.by_rank[k]}名`);
+        const loads = Object.entries(d.session_load).map(([sid, l]) => {
+            const name = sid === 'none' ? '定員' : (document.querySelector(`.select-session option[value="${sid}"]`)?.textContent || `部${sid}`);
+            return `・${name.trim()}: ${l.accepted}${l.capacity != null ? ` / ${l.capacity}` : ''}名`;
+        });
+        return [
+            `承認 ${s.accepted}名 / 補欠 ${s.waitlist}名（変更 ${s.changed}件）`,
+            ranks.length ? ranks.join('、') : '',
+            ...loads,
+        ].filter(Boolean).join('\n');
+    }
+
     window.autoAssign = async function () {
-        if (!confirm('自動割り当てを実行しますか？\n既に「承認」「否認」済みの方はスキップされます。')) return;
-        const res = await fetch(`/event/api/${EVENT_ID}/auto-assign`, { method: 'POST' });
-        if (!res.ok) { alert('割り当てに失敗しました'); return; }
-        const d = await res.json();
-        if (d.status !== 'ok') { alert('割り当てに失敗しました'); return; }
+        // 1. プレビュー（DB は変更しない）
+        const pre = await fetch(`/event/api/${EVENT_ID}/auto-assign/preview`, { method: 'POST' });
+        if (!pre.ok) { alert('割り当ての計算に失敗しました'); return; }
+        const plan = await pre.json();
+        if (plan.status !== 'ok') { alert('割り当ての計算に失敗しました'); return; }
+        if (plan.items.length === 0) { alert('割り当てを変更する応募者はいません。'); return; }
+        if (!confirm(`自動割り当ての結果:\n${describePlan(plan)}\n\nこの内容で確定しますか？\n既に「承認」「否認」済みの方は変更されません。`)) return;
+
+        // 2. 確定（プレビュー後に状態が変わっていれば何も変更されない）
+        const res = await fetch(`/event/api/${EVENT_ID}/auto-assign/commit`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ items: plan.items }),
+        });
+        const d = await res.json().catch(() => ({}));
+        if (res.status === 409) {
+            alert('計算後に参加者の状況が変わったため確定しませんでした。もう一度実行してください。');
+            return;
+        }
+        if (!res.ok || d.status !== 'ok') { alert('割り当てに失敗しました'); return; }
 
         // レスポンスに含まれる最新の参加者データでDOMを直接更新
         let updated = 0;
@@ -95,7 +197,8 @@
         const res = await fetch(`/event/api/${EVENT_ID}/notify`, { method: 'POST' });
         const d = await res.json();
         if (d.status === 'ok') {
-            alert(`${d.sent}件送信しました。ページを更新します。`);
+            const failed = d.failed ? `（${d.failed}件は送信できませんでした）` : '';
+            alert(`${d.sent}件送信しました${failed}。ページを更新します。`);
             location.reload();
         } else {
             alert('送信に失敗しました');
@@ -103,6 +206,62 @@
         }
     };
 
+    // ============================================================
+    // 未送信の通知（通知 Outbox）
+    // ============================================================
+
+    const OUTBOX_STATUS = { dead: '送信断念', pending: '再送待ち', sending: '送信中断' };
+
+    function participantName(pid) {
+        const cell = document.querySelector(`#row-${pid} td`);
+        return cell ? cell.textContent.trim() : `#${pid}`;
+    }
+
+    async function loadStuckNotifications() {
+        const card = document.getElementById('outbox-stuck');
+        const body = document.getElementById('outbox-stuck-body');
+        if (!card || !body) return;
+        const res = await fetch(`/event/api/${EVENT_ID}/outbox/stuck`);
+        if (!res.ok) return;
+        const d = await res.json();
+        const items = d.items || [];
+        card.style.display = items.length ? '' : 'none';
+        document.getElementById('outbox-stuck-count').textContent = `${items.length}件`;
+        body.replaceChildren(...items.map(item => {
+            const tr = document.createElement('tr');
+            const cells = [
+                participantName(item.participant_id),
+                OUTBOX_STATUS[item.status] || item.status,
+                String(item.attempts),
+                item.status === 'dead' ? '—' : (item.next_attempt_at || '—'),
+                item.last_error || '',
+            ];
+            for (const text of cells) {
+                const td = document.createElement('td');
+                td.textContent = text;
+                tr.appendChild(td);
+            }
+            const td = document.createElement('td');
+            const btn = document.createElement('button');
+            btn.className = 'btn btn-outline btn-sm';
+            btn.innerHTML = '<i class="fas fa-redo"></i> 再送';
+            btn.onclick = () => requeueNotification(item.id, btn);
+            td.appendChild(btn);
+            tr.appendChild(td);
+            return tr;
+        }));
+    }
+
+    async function requeueNotification(outboxId, btn) {
+        btn.disabled = true;
+        const res = await fetch(`/event/api/${EVENT_ID}/outbox/${outboxId}/requeue`, { method: 'POST' });
+        const d = await res.json().catch(() => ({}));
+        if (d.status !== 'ok') alert('再送に失敗しました');
+        await loadStuckNotifications();
+    }
+
+    loadStuckNotifications();
+
     // ============================================================
     // 確認URL コピー
     // ============================================================
@@ -112,6 +271,11 @@
         navigator.clipboard.writeText(url).then(() => alert('確認URLをコピーしました'));
     };
 
+    // 主催者用のカレンダー購読 URL（URL を知っていれば誰でも読めるため共有先に注意）
+    window.copyCalendarFeed = function (url) {
+        navigator.clipboard.writeText(url).then(() => alert('カレンダーの購読URLをコピーしました'));
+    };
+
     // 回答リンク（/form/<survey_id>）を参加者へ共有するためにコピーする。
     window.copyFormLink = function (surveyId, btn) {
         const url = `${location.origin}/form/${surveyId}`;
@@ -0,0 +1,218 @@
+// static/js/event_checkin.js
+// 当日受付モード: 複数端末の同期（/event/<id>/ws/checkin）と、オフライン中の操作の再送。
+// - タップした時点で画面に反映し（楽観的更新）、操作は localStorage のキューに積む
+// - キューは「参加者ごとの最終状態」なので、同じ参加者を何度タップしても送るのは最後の 1 件
+// - サーバーの応答（checkin.ack）でキューから外す。接続が戻ったら残りを送り直す
+// - 他端末の変更（event.checkin）は、自端末に未送信の操作がない参加者だけに反映する
+(function () {
+    'use strict';
+
+    const EVENT_ID = window.EVENT_ID;
+    const QUEUE_KEY = `checkin-queue-${EVENT_ID}`;
+    const RETRY_MS = 5000;
+    const wsProto = location.protocol === 'https:' ? 'wss' : 'ws';
+
+    let ws = null;
+    let wsReconnectTimer = null;
+    let retryTimer = null;
+    let opSeq = 0;
+
+    // ============================================================
+    // 未送信キュー（participant_id → {op_id, checked_in}）
+    // ============================================================
+
+    function loadQueue() {
+        try { return JSON.parse(localStorage.getItem(QUEUE_KEY)) || {}; } catch (_) { return {}; }
+    }
+
+    const queue = loadQueue();
+
+    function saveQueue() {
+        try { localStorage.setItem(QUEUE_KEY, JSON.stringify(queue)); } catch (_) {}
+        renderSyncStatus();
+    }
+
+    function newOpId() {
+        opSeq += 1;
+        return `${Date.now().toString(36)}-${opSeq}`;
+    }
+
+    // ============================================================
+    // 画面への反映
+    // ============================================================
+
+    function renderRow(pid, checkedIn, label) {
+        const btn = document.getElementById(`ci-btn-${pid}`);
+        if (!btn) return;
+        const row = document.getElementById(`ci-row-${pid}`);
+        const time = document.getElementById(`ci-time-${pid}`);
+        btn.dataset.in = checkedIn ? '1' : '0';
+        btn.classList.toggle('is-in', checkedIn);
+        row.classList.toggle('is-in', checkedIn);
+        if (checkedIn) {
+            btn.innerHTML = '<i class="fas fa-check"></i> 受付済';
+        } else {
+            btn.textContent = '受付する';
+        }
+        time.textContent = label;
+    }
+
+    function applyServerState(pid, checkedInAt) {
+        // 自端末の未送信の操作が優先（送信後の ack で確定する）
+        if (queue[pid]) return;
+        renderRow(pid, !!checkedInAt, checkedInAt ? `受付済み ${checkedInAt}` : '未受付');
+    }
+
+    function renderCounter() {
+        const n = document.querySelectorAll('.checkin-toggle[data-in="1"]').length;
+        document.getElementById('checked-count').textContent = n;
+    }
+
+    function renderSyncStatus() {
+        const el = document.getElementById('sync-status');
+        if (!el) return;
+        const pending = Object.keys(queue).length;
+        const online = ws && ws.readyState === WebSocket.OPEN;
+        if (online && pending === 0) {
+            el.className = 'badge badge-success';
+            el.innerHTML = '<i class="fas fa-signal"></i> 同期中';
+        } else if (online) {
+            el.className = 'badge badge-warning';
+            el.innerHTML = `<i class="fas fa-sync fa-spin"></i> 送信中 ${pending}件`;
+        } else {
+            el.className = 'badge badge-danger';
+            el.innerHTML = `<i class="fas fa-plug"></i> オフライン${pending ? `（未送信 ${pending}件）` : ''}`;
+        }
+    }
+
+    // ============================================================
+    // 送信
+    // ============================================================
+
+    function scheduleRetry() {
+        if (retryTimer || Object.keys(queue).length === 0) return;
+        retryTimer = setTimeout(() => { retryTimer = null; flush(); }, RETRY_MS);
+    }
+
+    async function sendByHttp(pid, op) {
+        try {
+            const res = await fetch(`/event/${EVENT_ID}/api/participant/${pid}/checkin`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ checked_in: op.checked_in }),
+            });
+            const d = await res.json();
+            handleAck({ op_id: op.op_id, participant_id: Number(pid), ...d });
+        } catch (_) {
+            // ネットワーク断: キューに残して後で再送
+        }
+    }
+
+    function flush() {
+        const pids = Object.keys(queue);
+        if (pids.length === 0) return;
+        const online = ws && ws.readyState === WebSocket.OPEN;
+        for (const pid of pids) {
+            const op = queue[pid];
+            if (online) {
+                ws.send(JSON.stringify({
+                    type: 'checkin', op_id: op.op_id,
+                    participant_id: Number(pid), checked_in: op.checked_in,
+                }));
+            } else if (navigator.onLine) {
+                sendByHttp(pid, op);
+            }
+        }
+        scheduleRetry();
+    }
+
+    function handleAck(msg) {
+        const pid = String(msg.participant_id);
+        const op = queue[pid];
+        // 送信後にもう一度タップされていれば、新しい操作の ack を待つ
+        if (!op || op.op_id !== msg.op_id) return;
+
+        if (msg.status === 'unavailable') return;  // キューに残して再送
+        delete queue[pid];
+        saveQueue();
+
+        if (msg.status === 'ok') {
+            applyServerState(pid, msg.checked_in_at);
+        } else {
+            alert('受付の更新に失敗しました。最新の状態を読み込みます。');
+            resync();
+        }
+        renderCounter();
+    }
+
+    window.toggleCheckin = function (pid) {
+        const btn = document.getElementById(`ci-btn-${pid}`);
+        const next = btn.dataset.in !== '1';
+        queue[pid] = { op_id: newOpId(), checked_in: next };
+        saveQueue();
+        renderRow(pid, next, next ? '受付済み（送信待ち）' : '未受付');
+        renderCounter();
+        flush();
+    };
+
+    // ============================================================
+    // サーバーからの同期
+    // ============================================================
+
+    async function resync() {
+        try {
+            const res = await fetch(`/event/${EVENT_ID}/api/checkin/state`);
+            const d = await res.json();
+            if (d.status !== 'ok') return;
+            for (const [pid, checkedInAt] of Object.entries(d.checked_in)) {
+                applyServerState(pid, checkedInAt);
+            }
+            renderCounter();
+        } catch (_) {}
+    }
+
+    function handleWsMessage(msg) {
+        if (msg.type === 'event.checkin') {
+            applyServerState(String(msg.participant_id), msg.checked_in_at);
+            renderCounter();
+        } else if (msg.type === 'checkin.ack') {
+            handleAck(msg);
+        } else if (msg.type === 'checkin.resync') {
+            resync();
+        }
+    }
+
+    function connectWs() {
+        if (wsReconnectTimer) { clearTimeout(wsReconnectTimer); wsReconnectTimer = null; }
+        ws = new WebSocket(`${wsProto}://${location.host}/event/${EVENT_ID}/ws/checkin`);
+
+        ws.addEventListener('open', () => {
+            renderSyncStatus();
+            // 切断中の他端末の変更を取り直し、未送信の操作を送る
+            resync();
+            flush();
+        });
+
+        ws.addEventListener('message', (e) => {
+            let msg;
+            try { msg = JSON.parse(e.data); } catch (_) { return; }
+            handleWsMessage(msg);
+        });
+
+        ws.addEventListener('close', () => {
+            renderSyncStatus();
+            wsReconnectTimer = setTimeout(connectWs, 3000);
+        });
+    }
+
+    window.addEventListener('online', () => { flush(); if (!ws || ws.readyState === WebSocket.CLOSED) connectWs(); });
+    window.addEventListener('offline', renderSyncStatus);
+
+    // 前回の未送信の操作（リロード・電波断の前のもの）を画面に反映してから接続する
+    for (const [pid, op] of Object.entries(queue)) {
+        renderRow(pid, op.checked_in, op.checked_in ? '受付済み（送信待ち）' : '未受付');
+    }
+    renderCounter();
+    renderSyncStatus();
+    connectWs();
+})();
@@ -0,0 +1,123 @@
+// static/js/event_checkin_scan.js
+// QR 受付（キオスク）モード。カメラ（BarcodeDetector 対応ブラウザ）または
+// QR リーダー / 手入力で読み取った値を /event/<id>/api/checkin/scan へ送る。
+// 同じ QR をかざし続けても 1 回だけ送るよう、直近に送った値は一定時間無視する。
+(function () {
+    'use strict';
+
+    const EVENT_ID = window.EVENT_ID;
+    const REPEAT_IGNORE_MS = 3000;
+    const LOG_LIMIT = 20;
+
+    const recent = new Map();  // 読み取り値 → 最後に送った時刻
+
+    const $id = (id) => document.getElementById(id);
+
+    function escapeHtml(s) {
+        return String(s ?? '').replace(/[&<>"']/g, (c) => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;',
+        }[c]));
+    }
+
+    function showResult(cls, title, sub) {
+        const el = $id('scan-result');
+        el.className = `scan-result ${cls}`;
+        el.style.cssText = '';
+        el.innerHTML = `${escapeHtml(title)}${sub ? `<div class="scan-sub">${escapeHtml(sub)}</div>` : ''}`;
+    }
+
+    function addLog(text) {
+        const log = $id('scan-log');
+        const li = document.createElement('li');
+        li.textContent = `${new Date().toLocaleTimeString()}  ${text}`;
+        log.prepend(li);
+        while (log.children.length > LOG_LIMIT) log.lastChild.remove();
+    }
+
+    async function submitCode(code) {
+        code = (code || '').trim();
+        if (!code) return;
+        const now = Date.now();
+        if (now - (recent.get(code) || 0) < REPEAT_IGNORE_MS) return;
+        recent.set(code, now);
+
+        let d;
+        try {
+            const res = await fetch(`/event/${EVENT_ID}/api/checkin/scan`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ code }),
+            });
+            d = await res.json();
+        } catch (_) {
+            recent.delete(code);
+            showResult('ng', '通信エラー', 'もう一度読み取ってください');
+            return;
+        }
+
+        const name = d.username || '';
+        const session = d.session_name ? `（${d.session_name}）` : '';
+        if (d.status === 'ok') {
+            showResult('ok', `✅ ${name} さん 受付しました`, session);
+            addLog(`受付: ${name}${session}`);
+        } else if (d.status === 'already') {
+            showResult('already', `⚠️ ${name} さんは受付済みです`, d.checked_in_at ? `受付時刻 ${d.checked_in_at}` : '');
+            addLog(`受付済み: ${name}`);
+        } else if (d.status === 'not_accepted') {
+            showResult('ng', `❌ ${name} さんは参加確定していません`, 'スタッフにお問い合わせください');
+            addLog(`未承認: ${name}`);
+        } else if (d.status === 'not_found') {
+            showResult('ng', '❌ このイベントの QR コードではありません', '');
+        } else {
+            recent.delete(code);
+            showResult('ng', '受付できませんでした', 'もう一度読み取ってください');
+        }
+    }
+
+    // ============================================================
+    // QR リーダー / 手入力（Enter で送信）
+    // ============================================================
+
+    $id('scan-form').addEventListener('submit', (e) => {
+        e.preventDefault();
+        const input = $id('scan-input');
+        submitCode(input.value);
+        input.value = '';
+        input.focus();
+    });
+
+    // ============================================================
+    // カメラ
+    // ============================================================
+
+    async function startCamera() {
+        const note = $id('scan-camera-note');
+        if (!('BarcodeDetector' in window) || !navigator.mediaDevices?.getUserMedia) {
+            note.textContent = 'このブラウザはカメラでの読み取りに対応していません。QR リーダーか手入力をご利用ください。';
+            return;
+        }
+        let stream;
+        try {
+            stream = await navigator.mediaDevices.getUserMedia({ video: { facingMode: 'environment' } });
+        } catch (_) {
+            note.textContent = 'カメラを利用できません。QR リーダーか手入力をご利用ください。';
+            return;
+        }
+        const video = $id('scan-video');
+        video.srcObject = stream;
+        video.hidden = false;
+        await video.play();
+
+        const detector = new BarcodeDetector({ formats: ['qr_code'] });
+        async function tick() {
+            try {
+                const codes = await detector.detect(video);
+                for (const c of codes) submitCode(c.rawValue);
+            } catch (_) {}
+            setTimeout(tick, 200);
+        }
+        tick();
+    }
+
+    startCamera();
+})();
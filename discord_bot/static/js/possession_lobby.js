@@ -96,6 +96,11 @@ function handleLobbyEvent(event) {
             location.reload();
             break;
 
+        case "lobby.resync":
+            // 配信を取りこぼした可能性があるため、最新の状態を取り直す
+            location.reload();
+            break;
+
         case "user_synced":
             // ユーザーのIP情報が更新されてオンラインになった
             console.log(`User ${event.user_id} synced (online).`);
@@ -0,0 +1,116 @@
+// response_browser.js
+// 結果画面の回答一覧。/api/<survey_id>/responses を 1 ページずつ読み込む（キーセットページング）。
+// 選択式の質問で絞り込める。回答ブラウザを操作していない間は 15 秒ごとに画面を更新する。
+
+(function () {
+    const box = document.getElementById('response-browser');
+    if (!box) return;
+
+    const surveyId = box.dataset.surveyId;
+    const listBox = document.getElementById('rb-list');
+    const summary = document.getElementById('rb-summary');
+    const moreBtn = document.getElementById('rb-more');
+    const filters = Array.from(box.querySelectorAll('.rb-filter'));
+    const questions = Array.isArray(window.RESULT_QUESTIONS) ? window.RESULT_QUESTIONS : [];
+
+    const PAGE_SIZE = 50;
+    let cursor = null;
+    let loading = false;
+    let loaded = 0;
+
+    // 旧 <meta refresh> の代替。回答ブラウザを操作したら自動更新を止める。
+    let refreshTimer = setTimeout(function () { location.reload(); }, 15000);
+    function stopAutoRefresh() {
+        if (refreshTimer) {
+            clearTimeout(refreshTimer);
+            refreshTimer = null;
+        }
+    }
+
+    function escapeHtml(s) {
+        return String(s == null ? '' : s).replace(/[&<>"']/g, function (c) {
+            return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c];
+        });
+    }
+
+    function answerOf(answers, idx) {
+        // 旧形式では複数回答が "0[]" キーで保存されている
+        let v = answers[String(idx)];
+        if (v === undefined) v = answers[idx + '[]'];
+        if (Array.isArray(v)) return v.join(', ');
+        return v == null ? '' : v;
+    }
+
+    function renderItem(item) {
+        const row = document.createElement('div');
+        row.style.cssText = 'border-bottom:1px solid #eee; padding:.6rem 0;';
+        let html = '<div style="font-weight:bold;">' + escapeHtml(item.user_name) +
+            ' <span style="font-weight:normal; color:var(--gray); font-size:.85rem;">' + escapeHtml(item.submitted_at) + '</span></div>';
+        questions.forEach(function (text, idx) {
+            const val = answerOf(item.answers || {}, idx);
+            if (val === '') return;
+            html += '<div style="font-size:.9rem;"><span style="color:var(--accent);">Q' + (idx + 1) + '.</span> ' +
+                escapeHtml(text) + ': ' + escapeHtml(val) + '</div>';
+        });
+        row.innerHTML = html;
+        listBox.appendChild(row);
+    }
+
+    function buildQuery() {
+        const params = new URLSearchParams({ limit: PAGE_SIZE });
+        if (cursor) params.set('cursor', cursor);
+        filters.forEach(function (sel) {
+            if (sel.value) params.set('f.' + sel.dataset.q, sel.value);
+        });
+        return params.toString();
+    }
+
+    async function loadPage() {
+        if (loading) return;
+        loading = true;
+        moreBtn.disabled = true;
+        try {
+            const res = await fetch('/api/' + surveyId + '/responses?' + buildQuery());
+            if (!res.ok) {
+                summary.textContent = '回答の読み込みに失敗しました';
+                return;
+            }
+            const data = await res.json();
+            data.items.forEach(renderItem);
+            loaded += data.items.length;
+            if (data.total !== null && data.total !== undefined) {
+                summary.dataset.total = data.total;
+            }
+            summary.textContent = loaded + ' / ' + (summary.dataset.total || '?') + ' 件を表示';
+            if (loaded === 0) {
+                listBox.innerHTML = '<span style="color:var(--gray);">該当する回答はありません。</span>';
+            }
+            cursor = data.next_cursor;
+            moreBtn.style.display = cursor ? 'block' : 'none';
+        } finally {
+            loading = false;
+            moreBtn.disabled = false;
+        }
+    }
+
+    function reset() {
+        cursor = null;
+        loaded = 0;
+        listBox.innerHTML = '';
+        delete summary.dataset.total;
+        loadPage();
+    }
+
+    moreBtn.addEventListener('click', function () {
+        stopAutoRefresh();
+        loadPage();
+    });
+    filters.forEach(function (sel) {
+        sel.addEventListener('change', function () {
+            stopAutoRefresh();
+            reset();
+        });
+    });
+
+    loadPage();
+})();
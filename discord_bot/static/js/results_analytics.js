@@ -0,0 +1,66 @@
+// results_analytics.js
+// 結果画面のクロス集計パネル。/api/<survey_id>/analytics から
+// 行 × 列の人数表を取得して描画する。回答一覧（.rb-filter）の絞り込みも条件に含める。
+
+(function () {
+    const panel = document.getElementById('crosstab-panel');
+    if (!panel) return;
+
+    const surveyId = panel.dataset.surveyId;
+    const rowSel = document.getElementById('ct-row');
+    const colSel = document.getElementById('ct-col');
+    const summary = document.getElementById('ct-summary');
+    const tableBox = document.getElementById('ct-table');
+    const filters = Array.from(document.querySelectorAll('.rb-filter'));
+
+    function escapeHtml(s) {
+        return String(s == null ? '' : s).replace(/[&<>"']/g, function (c) {
+            return { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;' }[c];
+        });
+    }
+
+    function render(ct) {
+        let html = '<table class="table" style="width:100%; font-size:.9rem; border-collapse:collapse;">';
+        html += '<thead><tr><th></th>';
+        ct.col.labels.forEach(function (label) {
+            html += '<th style="text-align:right;">' + escapeHtml(label) + '</th>';
+        });
+        html += '<th style="text-align:right;">計</th></tr></thead><tbody>';
+        ct.row.labels.forEach(function (label, i) {
+            html += '<tr><th style="text-align:left;">' + escapeHtml(label) + '</th>';
+            ct.cells[i].forEach(function (n) {
+                const pct = ct.row_totals[i] > 0 ? Math.round(n / ct.row_totals[i] * 1000) / 10 : 0;
+                html += '<td style="text-align:right;">' + n +
+                    ' <span style="color:var(--gray); font-size:.8rem;">(' + pct + '%)</span></td>';
+            });
+            html += '<td style="text-align:right; font-weight:bold;">' + ct.row_totals[i] + '</td></tr>';
+        });
+        html += '<tr><th style="text-align:left;">計</th>';
+        ct.col_totals.forEach(function (n) {
+            html += '<td style="text-align:right; font-weight:bold;">' + n + '</td>';
+        });
+        html += '<td></td></tr></tbody></table>';
+        tableBox.innerHTML = html;
+    }
+
+    async function load() {
+        const params = new URLSearchParams({ row: rowSel.value, col: colSel.value });
+        filters.forEach(function (sel) {
+            if (sel.value) params.append('f.' + sel.dataset.q, sel.value);
+        });
+        const res = await fetch('/api/' + surveyId + '/analytics?' + params.toString());
+        if (!res.ok) {
+            summary.textContent = 'クロス集計の取得に失敗しました';
+            tableBox.innerHTML = '';
+            return;
+        }
+        const data = await res.json();
+        summary.textContent = '対象 ' + data.matched + ' / ' + data.total + ' 件（行ごとの割合を表示）';
+        render(data.crosstab);
+    }
+
+    rowSel.addEventListener('change', load);
+    colSel.addEventListener('change', load);
+    filters.forEach(function (sel) { sel.addEventListener('change', load); });
+    load();
+})();
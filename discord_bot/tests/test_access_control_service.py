@@ -0,0 +1,95 @@
+# tests/test_access_control_service.py
+# services/access_control_service.py のユニットテスト
+# - ACL の判定（オーナー / スタッフ / 第三者）
+# - キャッシュヒット時に Bridge を呼ばないこと
+# - スタッフ追加/削除でキャッシュが破棄されること
+import sys
+import os
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.access_control_service import AccessControlService
+from services.survey_service import SurveyService
+
+_ACL_RESPONSE = {
+    "survey_id": 10,
+    "owner_id": "111",
+    "owner_name": "owner",
+    "collaborator_ids": ["222", "333"],
+}
+
+
+class TestAccessControlService(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        AccessControlService.clear()
+
+    async def test_owner_and_collaborator_can_edit(self):
+        """オーナーとスタッフは編集可、第三者は不可"""
+        mock = AsyncMock(return_value=_ACL_RESPONSE)
+        with patch("services.access_control_service.bridge_client.request", new=mock):
+            self.assertTrue(await AccessControlService.can_edit("111", 10))
+            self.assertTrue(await AccessControlService.can_edit(222, 10))
+            self.assertFalse(await AccessControlService.can_edit("999", 10))
+            self.assertTrue(await AccessControlService.is_owner("111", 10))
+            self.assertFalse(await AccessControlService.is_owner("222", 10))
+
+    async def test_cache_hit_skips_bridge(self):
+        """2 回目以降の判定は Bridge を呼ばない"""
+        mock = AsyncMock(return_value=_ACL_RESPONSE)
+        with patch("services.access_control_service.bridge_client.request", new=mock):
+            await AccessControlService.can_edit("111", 10)
+            await AccessControlService.can_edit("222", 10)
+            await AccessControlService.is_owner("333", 10)
+        mock.assert_awaited_once_with("GET", "/surveys/10/acl")
+
+    async def test_missing_survey_is_denied_and_not_cached(self):
+        """存在しないアンケートは拒否し、結果をキャッシュしない"""
+        mock = AsyncMock(return_value=None)
+        with patch("services.access_control_service.bridge_client.request", new=mock):
+            self.assertFalse(await AccessControlService.can_edit("111", 10))
+            self.assertFalse(await AccessControlService.can_edit("111", 10))
+        self.assertEqual(mock.await_count, 2)
+
+    async def test_event_acl_resolves_survey_once(self):
+        """イベント経由の判定は /events/:id/acl の 1 往復で済み、以降はキャッシュされる"""
+        mock = AsyncMock(return_value={**_ACL_RESPONSE, "event_id": 5})
+        with patch("services.access_control_service.bridge_client.request", new=mock):
+            self.assertTrue(await AccessControlService.can_manage_event("222", 5))
+            self.assertFalse(await AccessControlService.can_manage_event("999", 5))
+            # 同じアンケートへの直接判定もキャッシュを共有する
+            self.assertTrue(await AccessControlService.can_edit("111", 10))
+        mock.assert_awaited_once_with("GET", "/events/5/acl")
+
+    async def test_add_collaborator_invalidates_cache(self):
+        """スタッフ追加後は ACL を取り直す"""
+        acls = [
+            {**_ACL_RESPONSE, "collaborator_ids": []},
+            {**_ACL_RESPONSE, "collaborator_ids": ["444"]},
+        ]
+
+        async def fake_request(method, path, **kwargs):
+            # bridge_client はシングルトンのため、パスで ACL 取得とスタッフ追加を振り分ける
+            if path.endswith("/acl"):
+                return acls.pop(0)
+            return {"status": "ok"}
+
+        with patch("services.bridge_client.bridge_client.request", new=fake_request):
+            self.assertFalse(await AccessControlService.can_edit("444", 10))
+            self.assertTrue(await SurveyService.add_collaborator(10, 444))
+            self.assertTrue(await AccessControlService.can_edit("444", 10))
+        self.assertEqual(acls, [])
+
+    async def test_is_collaborator_excludes_owner(self):
+        """SurveyService.is_collaborator はオーナーを含まない"""
+        mock = AsyncMock(return_value=_ACL_RESPONSE)
+        with patch("services.access_control_service.bridge_client.request", new=mock):
+            self.assertFalse(await SurveyService.is_collaborator(10, "111"))
+            self.assertTrue(await SurveyService.is_collaborator(10, "333"))
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
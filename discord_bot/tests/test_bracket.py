@@ -0,0 +1,160 @@
+# tests/test_bracket.py
+# common/bracket.py のユニットテスト
+# - 標準シード順で配置し、空き枠は上位シードの不戦勝として自動で勝ち上がること
+# - ダブルイリミネーションは 2 敗で敗退し、敗者側の勝者が勝った場合のみリセット戦を行うこと
+# - 総当たりは全組み合わせを 1 回ずつ、スイス式は可能な限り再戦を避けて組むこと
+# - tournament_matches の行から優勝者を求め、未決着・同率首位では None を返すこと
+import sys
+import os
+import random
+import unittest
+from itertools import combinations
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.bracket import (
+    DOUBLE_ELIMINATION, ROUND_ROBIN, SINGLE_ELIMINATION, SWISS,
+    build_bracket, resolve_champion, seed_order,
+)
+
+
+def _play(bracket, pick):
+    """結果待ちの試合がなくなるまで pick(match) の勝者で進める。"""
+    while True:
+        ready = [m for m in bracket.matches if m.ready]
+        if not ready:
+            return
+        for m in ready:
+            if m.ready:
+                bracket.report(m.key, pick(m))
+
+
+class TestElimination(unittest.TestCase):
+
+    def test_seeding_and_byes(self):
+        self.assertEqual(seed_order(8), [1, 8, 4, 5, 2, 7, 3, 6])
+        b = build_bracket(SINGLE_ELIMINATION, [10, 20, 30, 40, 50])
+        first = [m for m in b.matches if m.round_num == 1]
+        # 上位 3 シードは不戦勝で 2 回戦へ
+        self.assertEqual([m.status for m in first], ["skipped", "waiting", "skipped", "skipped"])
+        self.assertEqual(first[1].players, [40, 50])
+        second = [m for m in b.matches if m.round_num == 2]
+        self.assertEqual(second[0].players, [10, None])
+        self.assertEqual(second[1].players, [20, 30])
+        self.assertTrue(second[1].ready)
+
+        changed = b.report(first[1].key, 50)
+        self.assertEqual(changed, [first[1].key, second[0].key])
+        _play(b, lambda m: min(m.players))
+        self.assertEqual(b.champion(), 10)
+        self.assertEqual(resolve_champion(b.to_rows()), 10)
+
+    def test_report_validation(self):
+        b = build_bracket(SINGLE_ELIMINATION, [1, 2, 3, 4], win_condition=2)
+        final = b.matches[-1]
+        with self.assertRaises(ValueError):
+            b.report(final.key, 1)  # 対戦者が未確定
+        with self.assertRaises(ValueError):
+            b.report(1, 2)  # 対戦者でない
+        with self.assertRaises(ValueError):
+            b.report(1, 1, 1, 0)  # 2 勝先取に満たない
+        b.report(1, 4, 1, 2)
+        self.assertEqual(b.matches[0].loser_id, 1)
+        with self.assertRaises(ValueError):
+            b.report(1, 4)  # 決着済み
+
+    def test_double_elimination(self):
+        rng = random.Random(5)
+        for n in (3, 6, 8, 13):
+            b = build_bracket(DOUBLE_ELIMINATION, list(range(1, n + 1)))
+            losses = {}
+
+            def pick(m):
+                w = rng.choice(m.players)
+                loser = m.players[1 - m.players.index(w)]
+                losses[loser] = losses.get(loser, 0) + 1
+                return w
+
+            _play(b, pick)
+            self.assertTrue(b.is_finished)
+            alive = [p for p in range(1, n + 1) if losses.get(p, 0) < 2]
+            self.assertEqual(alive, [b.champion()])
+            self.assertEqual(resolve_champion(b.to_rows()), b.champion())
+
+    def test_grand_final_reset(self):
+        b = build_bracket(DOUBLE_ELIMINATION, [1, 2])
+        wb_final, gf1, gf2 = b.matches
+        b.report(wb_final.key, 1)
+        self.assertEqual(gf1.players, [1, 2])
+        b.report(gf1.key, 2)  # 敗者側から上がった 2 が勝つとリセット戦
+        self.assertTrue(gf2.ready)
+        self.assertIsNone(b.champion())
+        b.report(gf2.key, 2)
+        self.assertEqual(b.champion(), 2)
+
+        b = build_bracket(DOUBLE_ELIMINATION, [1, 2])
+        b.report(1, 1)
+        b.report(2, 1)
+        self.assertEqual(b.matches[2].status, "skipped")
+        self.assertEqual(resolve_champion(b.to_rows()), 1)
+
+
+class TestLeague(unittest.TestCase):
+
+    def test_round_robin(self):
+        b = build_bracket(ROUND_ROBIN, [1, 2, 3, 4, 5])
+        pairs = sorted(tuple(sorted(m.players)) for m in b.matches)
+        self.assertEqual(pairs, list(combinations(range(1, 6), 2)))
+        for r in {m.round_num for m in b.matches}:
+            in_round = [p for m in b.matches if m.round_num == r for p in m.players]
+            self.assertEqual(len(in_round), len(set(in_round)))
+        _play(b, lambda m: min(m.players))
+        self.assertEqual(b.champion(), 1)
+        self.assertEqual(resolve_champion(b.to_rows()), 1)
+
+    def test_swiss(self):
+        b = build_bracket(SWISS, list(range(1, 9)))
+        self.assertEqual([m.players for m in b.matches], [[1, 5], [2, 6], [3, 7], [4, 8]])
+        _play(b, lambda m: min(m.players))
+        self.assertTrue(b.is_finished)
+        self.assertEqual(max(m.round_num for m in b.matches), 3)
+        pairs = [tuple(sorted(m.players)) for m in b.matches]
+        self.assertEqual(len(pairs), len(set(pairs)))
+        self.assertEqual(b.standings()[0], {"player_id": 1, "wins": 3, "losses": 0, "score_diff": 0})
+
+    def test_swiss_odd_bye(self):
+        b = build_bracket(SWISS, [1, 2, 3])
+        byes = [m for m in b.matches if m.players[1] is None]
+        self.assertEqual([m.players[0] for m in byes], [2])
+        _play(b, lambda m: min(m.players))
+        byes = [m.players[0] for m in b.matches if m.players[1] is None]
+        self.assertEqual(len(byes), len(set(byes)))
+
+
+class TestResolveChampion(unittest.TestCase):
+
+    def test_rows(self):
+        self.assertIsNone(resolve_champion([]))
+        # next_match_id の無い従来の勝ち上がり表
+        knockout = [
+            {"round_num": 1, "player1_id": 1, "player2_id": 4, "winner_id": 1, "status": "finished"},
+            {"round_num": 1, "player1_id": 2, "player2_id": 3, "winner_id": 3, "status": "finished"},
+            {"round_num": 2, "player1_id": 1, "player2_id": 3, "winner_id": None, "status": "waiting"},
+        ]
+        self.assertIsNone(resolve_champion(knockout))
+        knockout[2].update(winner_id=3, status="finished")
+        self.assertEqual(resolve_champion(knockout), 3)
+        # 最終ラウンドが 1 試合でも総当たりなら勝数で決める
+        league = [
+            {"round_num": 1, "player1_id": 1, "player2_id": 2, "winner_id": 1, "status": "finished"},
+            {"round_num": 2, "player1_id": 1, "player2_id": 3, "winner_id": 1, "status": "finished"},
+            {"round_num": 3, "player1_id": 2, "player2_id": 3, "winner_id": 3, "status": "finished"},
+        ]
+        self.assertEqual(resolve_champion(league), 1)
+        league[1]["winner_id"] = 3
+        league[2]["winner_id"] = 2
+        self.assertIsNone(resolve_champion(league))  # 3 者が 1 勝ずつ
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# tests/test_bridge_event_hub.py
+# services/bridge_event_hub.py のユニットテスト
+# - listen_bridge_events がテキストメッセージを渡し、切断後は再接続として on_connect を呼ぶこと
+# - トピックに属さないメッセージは broadcasts が真のものだけ全購読者へ配ること
+import sys
+import os
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.bridge_event_hub import BridgeEventHub, listen_bridge_events
+
+
+class TestListenBridgeEvents(IsolatedAsyncioTestCase):
+
+    async def test_delivers_messages_and_reconnects(self):
+        connections = []
+
+        async def handler(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            connections.append(ws)
+            await ws.send_str(json.dumps({"type": "hello", "n": len(connections)}))
+            await ws.close()
+            return ws
+
+        app = web.Application()
+        app.router.add_get("/ws", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self.addAsyncCleanup(runner.cleanup)
+        port = site._server.sockets[0].getsockname()[1]
+
+        received, connects = [], []
+        await asyncio.wait_for(listen_bridge_events(
+            received.append,
+            ws_url=f"ws://127.0.0.1:{port}/ws",
+            on_connect=connects.append,
+            stopped=lambda: len(connects) >= 2,
+        ), timeout=10)
+        self.assertEqual(connects, [False, True])
+        self.assertEqual([json.loads(r)["n"] for r in received], [1, 2])
+
+
+class TestBridgeEventHub(IsolatedAsyncioTestCase):
+
+    async def test_topic_and_broadcast(self):
+        with patch.object(BridgeEventHub, "_listen", new=lambda hub: asyncio.Event().wait()):
+            hub = BridgeEventHub(
+                topic_key=lambda m: m.get("room"),
+                accepts=lambda m: m.get("type") != "ignored",
+                broadcasts=lambda m: m.get("type") == "all",
+                resync_type="x.resync",
+                queue_size=2,
+            )
+            async with hub.subscribe("a") as a, hub.subscribe("b") as b:
+                hub.handle_message(json.dumps({"type": "t", "room": "a"}))
+                hub.handle_message(json.dumps({"type": "ignored", "room": "a"}))
+                hub.handle_message(json.dumps({"type": "other"}))
+                hub.handle_message(json.dumps({"type": "all"}))
+                self.assertEqual([a.get_nowait()["type"] for _ in range(a.qsize())], ["t", "all"])
+                self.assertEqual([b.get_nowait()["type"] for _ in range(b.qsize())], ["all"])
+
+                for _ in range(3):
+                    hub.publish({"type": "t", "room": "b"})
+                self.assertEqual(b.get_nowait(), {"type": "x.resync"})
+            self.assertEqual(hub.subscriber_count(), 0)
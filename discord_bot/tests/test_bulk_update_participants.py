@@ -0,0 +1,64 @@
+# tests/test_bulk_update_participants.py
+# EventService.bulk_update_participants のユニットテスト
+# - 1 回の Bridge 呼び出し（PATCH /events/{id}/participants）にまとめること
+# - 更新があった場合のみ管理画面 / 受付索引のキャッシュを破棄すること
+# - 通信失敗時は None を返すこと
+import sys
+import os
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.event_service import EventService
+
+
+class TestBulkUpdateParticipants(IsolatedAsyncioTestCase):
+
+    async def _run(self, response):
+        calls = []
+
+        async def fake_request(method, path, json=None, params=None):
+            calls.append((method, path, json))
+            return response
+
+        with patch("services.event_service.bridge_client.request", new=fake_request), \
+                patch("services.event_service.EventAdminService.invalidate") as admin_inv, \
+                patch("services.event_service.CheckinIndexService.invalidate") as index_inv:
+            res = await EventService.bulk_update_participants(
+                7, [{"participant_id": 1, "approval": "accepted"},
+                    {"participant_id": 2, "session_id": None}],
+                all_or_nothing=True,
+            )
+        return res, calls, admin_inv, index_inv
+
+    async def test_single_bridge_call(self):
+        response = {"status": "ok", "updated": 2,
+                    "results": [{"participant_id": 1, "status": "ok"}, {"participant_id": 2, "status": "ok"}]}
+        res, calls, admin_inv, index_inv = await self._run(response)
+        self.assertEqual(res, response)
+        self.assertEqual(calls, [("PATCH", "/events/7/participants", {
+            "items": [{"participant_id": 1, "approval": "accepted"},
+                      {"participant_id": 2, "session_id": None}],
+            "all_or_nothing": True,
+        })])
+        admin_inv.assert_called_once_with(7)
+        index_inv.assert_called_once_with(7)
+
+    async def test_nothing_updated_keeps_cache(self):
+        response = {"status": "ok", "updated": 0,
+                    "results": [{"participant_id": 1, "status": "not_found"}]}
+        res, _, admin_inv, index_inv = await self._run(response)
+        self.assertEqual(res["results"][0]["status"], "not_found")
+        admin_inv.assert_not_called()
+        index_inv.assert_not_called()
+
+    async def test_bridge_failure(self):
+        res, _, admin_inv, _ = await self._run(None)
+        self.assertIsNone(res)
+        admin_inv.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+# tests/test_calendar_feed.py
+# common/calendar_utils.py / common/calendar_feed.py / services/calendar_feed_service.py のユニットテスト
+# - UID がイベント・部ごとに固定で、本文のエスケープ・折り返しが RFC 5545 に沿うこと
+# - 予定に関係しない変更では version（ETag）が変わらないこと
+# - If-None-Match / If-Modified-Since による 304 判定
+# - 参加者の承認・部が変わったときだけ参加者フィードの Last-Modified が進むこと
+# - 購読のたびに Bridge を呼ばず、イベント更新・参加者の変更で取り直すこと
+import sys
+import os
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.calendar_feed import (
+    EventCalendar, organizer_feed_token, verify_organizer_feed_token,
+)
+from common.calendar_utils import build_ics, event_uid
+from services.calendar_feed_service import CalendarFeedService
+from services.event_service import EventService
+
+EVENT = {"id": 7, "title": "夏祭り", "event_date": "2026-08-01 10:00:00", "end_date": None,
+         "location": "淡路", "capacity": 100}
+SESSIONS = [
+    {"id": 1, "name": "第1部", "event_date": "2026-08-01 10:00:00", "end_date": "2026-08-01 12:00:00", "location": "A"},
+    {"id": 2, "name": "第2部", "event_date": "2026-08-01 14:00:00", "end_date": "2026-08-01 16:00:00", "location": "B"},
+]
+NOW = datetime(2026, 7, 1, 9, 0, 0, tzinfo=timezone.utc)
+
+
+class TestBuildIcs(unittest.TestCase):
+
+    def test_stable_uid(self):
+        a = build_ics("夏祭り", "2026-08-01 10:00:00", None)
+        b = build_ics("夏祭り", "2026-08-01 10:00:00", None)
+        uid = [line for line in a.split("\r\n") if line.startswith("UID:")]
+        self.assertEqual(uid, [line for line in b.split("\r\n") if line.startswith("UID:")])
+        self.assertEqual(event_uid(7, 2), "event-7-session-2@awajiempire.net")
+
+    def test_escape_and_fold(self):
+        ics = build_ics("a,b;c" + "あ" * 40, "2026-08-01 10:00:00", None, location="1F\n2F")
+        self.assertIn("SUMMARY:a\\,b\\;c", ics)
+        self.assertIn("LOCATION:1F\\n2F", ics)
+        self.assertTrue(all(len(line.encode("utf-8")) <= 75 for line in ics.split("\r\n")))
+
+
+class TestEventCalendar(unittest.TestCase):
+
+    def test_documents(self):
+        cal = EventCalendar(EVENT, SESSIONS, modified_at=NOW)
+        doc = cal.participant_document("accepted", 2)
+        self.assertIn(f"UID:{event_uid(7, 2)}", doc.body)
+        self.assertNotIn(event_uid(7, 1), doc.body)
+        self.assertIs(cal.participant_document("accepted", 2), doc)
+
+        self.assertNotIn("BEGIN:VEVENT", cal.participant_document("waitlist", None).body)
+        organizer = cal.organizer_document().body
+        self.assertEqual(organizer.count("BEGIN:VEVENT"), 2)
+        # 部未割り当ての承認済みはイベント本体
+        self.assertIn(f"UID:{event_uid(7)}", cal.participant_document("accepted", None).body)
+
+    def test_version_ignores_unrelated_fields(self):
+        a = EventCalendar(EVENT, SESSIONS, modified_at=NOW)
+        b = EventCalendar(dict(EVENT, capacity=5), SESSIONS, modified_at=NOW + timedelta(hours=1))
+        c = EventCalendar(EVENT, [dict(SESSIONS[0], location="C"), SESSIONS[1]], modified_at=NOW)
+        self.assertEqual(a.version, b.version)
+        self.assertNotEqual(a.version, c.version)
+
+    def test_conditional(self):
+        doc = EventCalendar(EVENT, SESSIONS, modified_at=NOW).organizer_document()
+        self.assertTrue(doc.is_not_modified(doc.etag, None))
+        self.assertTrue(doc.is_not_modified(f'W/{doc.etag}, "x"', None))
+        self.assertFalse(doc.is_not_modified('"other"', NOW + timedelta(days=1)))
+        self.assertTrue(doc.is_not_modified(None, NOW))
+        self.assertFalse(doc.is_not_modified(None, NOW - timedelta(seconds=1)))
+        self.assertEqual(doc.last_modified_http, "Wed, 01 Jul 2026 09:00:00 GMT")
+
+    def test_participant_changed_at(self):
+        cal = EventCalendar(EVENT, SESSIONS, modified_at=NOW)
+        shared = cal.participant_document("accepted", 2)
+        self.assertIs(cal.participant_document("accepted", 2, NOW - timedelta(hours=1)), shared)
+        later = NOW + timedelta(hours=1, microseconds=5)
+        doc = cal.participant_document("accepted", 2, later)
+        self.assertEqual(doc.last_modified, NOW + timedelta(hours=1))
+        self.assertEqual((doc.body, doc.etag), (shared.body, shared.etag))
+        self.assertIs(cal.participant_document("accepted", 2, later), doc)
+        self.assertFalse(doc.is_not_modified(None, NOW))
+
+    def test_organizer_token(self):
+        token = organizer_feed_token("secret", 7)
+        self.assertTrue(verify_organizer_feed_token("secret", 7, token))
+        self.assertFalse(verify_organizer_feed_token("secret", 8, token))
+        self.assertFalse(verify_organizer_feed_token("other", 7, token))
+
+
+class TestCalendarFeedService(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        CalendarFeedService.clear()
+        self.calls = []
+        self.event = dict(EVENT)
+        self.participant = {"id": 3, "event_id": 7, "approval": "accepted", "session_id": 1}
+
+    async def _request(self, method, path, json=None, params=None):
+        self.calls.append((method, path))
+        if method == "GET" and path == "/events/7":
+            return {"event": self.event, "sessions": SESSIONS}
+        if path == "/events/participant/by-token/tok":
+            return dict(self.participant)
+        if path.startswith("/events/participant/by-token/"):
+            return {"status": "not_found"}
+        return {"status": "ok"}
+
+    def _patched(self):
+        return patch("services.calendar_feed_service.bridge_client.request", new=self._request), \
+            patch("services.event_service.bridge_client.request", new=self._request)
+
+    async def test_polling_is_cached(self):
+        p1, p2 = self._patched()
+        with p1, p2:
+            first = await CalendarFeedService.participant_feed("tok")
+            for _ in range(5):
+                self.assertIs(await CalendarFeedService.participant_feed("tok"), first)
+            self.assertEqual(len(self.calls), 2)
+            self.assertIsNone(await CalendarFeedService.participant_feed("nope"))
+
+    async def test_assignment_change(self):
+        p1, p2 = self._patched()
+        with p1, p2:
+            first = await CalendarFeedService.participant_feed("tok")
+            self.participant["session_id"] = 2
+            await EventService.update_participant(3, "accepted", 2)
+            moved = await CalendarFeedService.participant_feed("tok")
+            self.assertIn(event_uid(7, 2), moved.body)
+            self.assertNotEqual(first.etag, moved.etag)
+            # 予定自体は変わっていないので読み直していない
+            self.assertEqual(self.calls.count(("GET", "/events/7")), 1)
+
+    async def test_event_update_keeps_version_when_unchanged(self):
+        p1, p2 = self._patched()
+        with p1, p2:
+            first = await CalendarFeedService.organizer_feed(7)
+            await EventService.update_event(7, "夏祭り", capacity=5)
+            self.assertIs(await CalendarFeedService.organizer_feed(7), first)
+
+            self.event["title"] = "秋祭り"
+            await EventService.update_event(7, "秋祭り")
+            renamed = await CalendarFeedService.organizer_feed(7)
+            self.assertIn("SUMMARY:秋祭り 第1部", renamed.body)
+            self.assertNotEqual(first.etag, renamed.etag)
+            self.assertEqual(self.calls.count(("GET", "/events/7")), 3)
+
+    async def test_participant_change_moves_last_modified(self):
+        clock = [NOW]
+
+        class _Clock(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock[0]
+
+        p1, p2 = self._patched()
+        with p1, p2, patch("services.calendar_feed_service.datetime", _Clock):
+            first = await CalendarFeedService.participant_feed("tok")
+            self.assertEqual(first.last_modified, NOW)
+
+            # 承認の取り消し: 予定（イベント）は変わらないが参加者フィードは更新扱い
+            clock[0] = NOW + timedelta(hours=1)
+            self.participant["approval"] = "rejected"
+            await EventService.update_participant(3, "rejected", 1)
+            revoked = await CalendarFeedService.participant_feed("tok")
+            self.assertEqual(revoked.last_modified, NOW + timedelta(hours=1))
+            self.assertFalse(revoked.is_not_modified(None, first.last_modified))
+
+            # 再確認しても状態が同じなら Last-Modified は動かない
+            clock[0] = NOW + timedelta(hours=2)
+            CalendarFeedService.invalidate_participant(3)
+            again = await CalendarFeedService.participant_feed("tok")
+            self.assertIs(again, revoked)
+            self.assertTrue(again.is_not_modified(None, revoked.last_modified))
+
+
+if __name__ == '__main__':
+    unittest.main()
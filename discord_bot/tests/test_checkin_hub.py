@@ -0,0 +1,113 @@
+# tests/test_checkin_hub.py
+# services/checkin_hub.py / EventService.set_checkin のユニットテスト
+# - 同じイベントの購読者にだけ配ること、チェックイン以外の配信は無視すること
+# - 溢れた購読者には途中経過を捨てて resync を送ること
+# - 最後の購読解除で Bridge の購読を止めること
+# - set_checkin がイベント ID を付けて 1 回だけ書き込むこと
+# - 認証なしの /ws/hyouibana プロキシがチェックイン等の内部向け配信をブラウザへ中継しないこと
+import sys
+import os
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.checkin_hub import CHECKIN_CHANGED, RESYNC, CheckinHub
+from services.event_admin_service import EventAdminService
+from services.event_service import EventService
+
+
+def _change(event_id, pid, at="2026-08-01 10:00:00"):
+    return {"type": CHECKIN_CHANGED, "event_id": event_id, "participant_id": pid, "checked_in_at": at}
+
+
+class TestCheckinHub(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.listening = 0
+
+        async def fake_listen(hub):
+            self.listening += 1
+            try:
+                await asyncio.Event().wait()
+            finally:
+                self.listening -= 1
+
+        patcher = patch.object(CheckinHub, "_listen", new=fake_listen)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_fan_out_per_event(self):
+        hub = CheckinHub()
+        async with hub.subscribe(7) as a, hub.subscribe(7) as b, hub.subscribe(8) as other:
+            hub.handle_message(json.dumps(_change(7, 1)))
+            hub.handle_message(json.dumps({"type": "room_updated", "event_id": 7}))
+            hub.handle_message("not json")
+
+            self.assertEqual(a.get_nowait()["participant_id"], 1)
+            self.assertEqual(b.get_nowait()["participant_id"], 1)
+            self.assertTrue(a.empty())
+            self.assertTrue(other.empty())
+
+    async def test_overflow_sends_resync(self):
+        hub = CheckinHub(queue_size=3)
+        async with hub.subscribe(7) as q:
+            for pid in range(5):
+                hub.publish(_change(7, pid))
+            # 溢れた時点までの変更は捨てて resync、その後の変更はそのまま届く
+            self.assertEqual(q.get_nowait(), {"type": RESYNC})
+            self.assertEqual(q.get_nowait()["participant_id"], 4)
+            self.assertTrue(q.empty())
+
+    async def test_listener_runs_only_while_subscribed(self):
+        hub = CheckinHub()
+        async with hub.subscribe(7):
+            async with hub.subscribe(8):
+                await asyncio.sleep(0)
+                self.assertEqual(self.listening, 1)
+            self.assertEqual(hub.subscriber_count(), 1)
+        await asyncio.sleep(0)
+        self.assertEqual(self.listening, 0)
+        self.assertEqual(hub.subscriber_count(), 0)
+
+    async def test_publish_invalidates_admin_view(self):
+        hub = CheckinHub()
+        with patch.object(EventAdminService, "invalidate") as invalidate:
+            self.assertEqual(hub.publish(_change(7, 1)), 0)
+        invalidate.assert_called_once_with(7)
+
+
+class TestSetCheckin(IsolatedAsyncioTestCase):
+
+    async def test_scoped_single_write(self):
+        calls = []
+
+        async def fake_request(method, path, json=None, params=None):
+            calls.append((method, path, json))
+            return {"status": "ok", "event_id": 7, "participant_id": 3, "checked_in_at": "2026-08-01 10:00:00"}
+
+        with patch("services.event_service.bridge_client.request", new=fake_request):
+            res = await EventService.set_checkin(3, True, event_id=7)
+
+        self.assertEqual(calls, [("PATCH", "/events/participant/3/checkin", {"checked_in": True, "event_id": 7})])
+        self.assertEqual(res["checked_in_at"], "2026-08-01 10:00:00")
+
+    async def test_other_event_returns_none(self):
+        async def fake_request(method, path, json=None, params=None):
+            return None
+
+        with patch("services.event_service.bridge_client.request", new=fake_request):
+            self.assertIsNone(await EventService.set_checkin(3, True, event_id=8))
+
+
+class TestPublicWsProxyFilter(IsolatedAsyncioTestCase):
+
+    async def test_internal_event_messages_are_not_relayed(self):
+        from webapp import is_public_bridge_message
+        self.assertFalse(is_public_bridge_message(json.dumps(_change(7, 1))))
+        self.assertFalse(is_public_bridge_message(json.dumps({"type": "event.deadline_changed", "event_id": 7})))
+        self.assertFalse(is_public_bridge_message("not json"))
+        self.assertTrue(is_public_bridge_message(json.dumps({"type": "match_created", "passcode": "ABC"})))
+        self.assertTrue(is_public_bridge_message(json.dumps({"type": "user_synced", "user_id": 1})))
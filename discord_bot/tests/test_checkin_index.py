@@ -0,0 +1,114 @@
+# tests/test_checkin_index.py
+# common/checkin_index.py / services/checkin_index_service.py のユニットテスト
+# - 参加確認ページの URL / token だけの入力から token を取り出すこと
+# - 索引からの解決とチェックイン状態の更新
+# - 連続読み取りで Bridge を呼ばないこと（同時の読み込みは 1 回、未登録 token の読み直しは間隔を空ける）
+# - 承認の変更で索引を破棄すること
+import sys
+import os
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.checkin_index import CheckinIndex, extract_token
+from services.checkin_index_service import CheckinIndexService
+from services.event_admin_service import EventAdminService
+from services.event_service import EventService
+
+SESSIONS = {10: {"id": 10, "name": "第1部"}}
+
+
+def _p(pid, token, approval="accepted", session_id=10, checked_in_at=None, username=None):
+    return {"id": pid, "user_id": 1000 + pid, "username": username, "session_id": session_id,
+            "approval": approval, "access_token": token, "checked_in_at": checked_in_at}
+
+
+class TestExtractToken(unittest.TestCase):
+
+    def test_confirm_url(self):
+        self.assertEqual(extract_token("https://dash.example/event/confirm/abc-_123"), "abc-_123")
+        self.assertEqual(extract_token(" https://dash.example/event/confirm/abc?x=1\n"), "abc")
+
+    def test_plain_token(self):
+        self.assertEqual(extract_token("  abc123 "), "abc123")
+        self.assertEqual(extract_token(None), "")
+
+
+class TestCheckinIndex(unittest.TestCase):
+
+    def test_lookup_and_update(self):
+        index = CheckinIndex(7, [_p(1, "t1", username="alice"), _p(2, None), _p(3, "t3", session_id=None)], SESSIONS)
+        entry = index.lookup("t1")
+        self.assertEqual((entry.participant_id, entry.username, entry.session_name), (1, "alice", "第1部"))
+        self.assertIsNone(index.lookup("t3").session_name)
+        self.assertIsNone(index.lookup("nope"))
+        self.assertEqual(len(index), 3)
+
+        self.assertTrue(index.set_checked_in(1, "2026-08-01 10:00:00"))
+        self.assertEqual(index.lookup("t1").checked_in_at, "2026-08-01 10:00:00")
+        self.assertFalse(index.set_checked_in(99, None))
+
+
+class TestCheckinIndexService(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        CheckinIndexService.clear()
+        EventAdminService.clear()
+        self.bundle_calls = 0
+        self.participants = [_p(1, "t1"), _p(2, "t2", approval="waitlist")]
+
+    async def _request(self, method, path, json=None, params=None):
+        if path == "/events/7/admin-bundle":
+            self.bundle_calls += 1
+            await asyncio.sleep(0)
+            return {"event": {"id": 7, "survey_id": 3}, "sessions": [SESSIONS[10]],
+                    "participants": list(self.participants), "survey": None, "acl": None}
+        if path.endswith("/checkin"):
+            return {"status": "ok", "event_id": 7, "participant_id": 1, "checked_in_at": "2026-08-01 10:00:00"}
+        return {"status": "ok"}
+
+    def _patched(self):
+        return patch("services.event_admin_service.bridge_client.request", new=self._request), \
+            patch("services.event_service.bridge_client.request", new=self._request)
+
+    async def test_burst_loads_once(self):
+        p1, p2 = self._patched()
+        with p1, p2:
+            entries = await asyncio.gather(*[CheckinIndexService.resolve(7, "t1") for _ in range(10)])
+            self.assertTrue(all(e.participant_id == 1 for e in entries))
+            self.assertEqual(self.bundle_calls, 1)
+
+            # 受付は索引に反映され、次の読み取りも Bridge を呼ばない
+            await EventService.set_checkin(1, True, event_id=7)
+            entry = await CheckinIndexService.resolve(7, "t1")
+            self.assertEqual(entry.checked_in_at, "2026-08-01 10:00:00")
+            self.assertEqual(self.bundle_calls, 1)
+
+    async def test_unknown_token_reloads_at_interval(self):
+        p1, p2 = self._patched()
+        with p1, p2, patch("services.checkin_index_service.time.monotonic", return_value=100.0) as clock:
+            self.assertIsNone(await CheckinIndexService.resolve(7, "t9"))
+            self.assertIsNone(await CheckinIndexService.resolve(7, "t9"))
+            self.assertEqual(self.bundle_calls, 1)
+
+            # 間隔を空けた後は読み直し、後から登録された参加者を引ける
+            self.participants.append(_p(9, "t9"))
+            clock.return_value = 111.0
+            self.assertEqual((await CheckinIndexService.resolve(7, "t9")).participant_id, 9)
+            self.assertEqual(self.bundle_calls, 2)
+
+    async def test_approval_change_invalidates(self):
+        p1, p2 = self._patched()
+        with p1, p2:
+            self.assertEqual((await CheckinIndexService.resolve(7, "t2")).approval, "waitlist")
+            self.participants[1] = _p(2, "t2")
+            await EventService.update_participant(2, "accepted", 10)
+            self.assertEqual((await CheckinIndexService.resolve(7, "t2")).approval, "accepted")
+            self.assertEqual(self.bundle_calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
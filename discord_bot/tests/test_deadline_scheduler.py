@@ -0,0 +1,181 @@
+# tests/test_deadline_scheduler.py
+# common/deadline_queue.py と services/deadline_scheduler_service.py のユニットテスト
+# - DeadlineQueue: 締切順の取り出し・変更・取り消し
+# - DeadlineScheduler: 仮想時計で時間を進め、締切ちょうどに発火すること
+#   （変更通知での再スケジュール、安全網の再取得、処理失敗時の再試行）
+import sys
+import os
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.deadline_queue import DeadlineQueue
+from services.deadline_scheduler_service import DeadlineScheduler
+
+
+class TestDeadlineQueue(unittest.TestCase):
+
+    def test_pop_in_deadline_order(self):
+        q = DeadlineQueue()
+        q.schedule(1, 30.0)
+        q.schedule(2, 10.0)
+        q.schedule(3, 20.0)
+        self.assertEqual(q.next_due(), 10.0)
+        self.assertEqual(q.pop_due(25.0), [2, 3])
+        self.assertEqual(len(q), 1)
+        self.assertEqual(q.pop_due(25.0), [])
+
+    def test_reschedule_and_cancel(self):
+        """変更前の古いエントリは取り出されない"""
+        q = DeadlineQueue()
+        q.schedule(1, 10.0)
+        q.schedule(2, 20.0)
+        q.schedule(1, 50.0)
+        q.cancel(2)
+        self.assertEqual(q.next_due(), 50.0)
+        self.assertEqual(q.pop_due(40.0), [])
+        self.assertEqual(q.pop_due(50.0), [1])
+        self.assertNotIn(1, q)
+
+    def test_replace_all(self):
+        q = DeadlineQueue()
+        q.schedule(1, 10.0)
+        q.replace_all({2: 5.0, 3: 7.0})
+        self.assertNotIn(1, q)
+        self.assertEqual(q.pop_due(100.0), [2, 3])
+
+
+class VirtualClock:
+    """asyncio.sleep の代わりに使う仮想時計。advance() で時間を進める。"""
+
+    def __init__(self):
+        self.now = 0.0
+        self._sleepers = []
+
+    def time(self):
+        return self.now
+
+    async def sleep(self, delay):
+        if delay <= 0:
+            await asyncio.sleep(0)
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._sleepers.append((self.now + delay, fut))
+        await fut
+
+    @staticmethod
+    async def settle():
+        for _ in range(20):
+            await asyncio.sleep(0)
+
+    async def advance(self, seconds):
+        target = self.now + seconds
+        await self.settle()
+        while True:
+            self._sleepers = [(t, f) for t, f in self._sleepers if not f.done()]
+            ready = [s for s in self._sleepers if s[0] <= target]
+            if not ready:
+                break
+            wake_at, fut = min(ready, key=lambda s: s[0])
+            self.now = max(self.now, wake_at)
+            fut.set_result(None)
+            await self.settle()
+        self.now = target
+        await self.settle()
+
+
+class FakeBridge:
+    """/events/upcoming-deadlines を仮想時計基準で返す Bridge。"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.deadlines = {}
+        self.calls = 0
+
+    async def request(self, method, path, **kwargs):
+        assert (method, path) == ("GET", "/events/upcoming-deadlines")
+        self.calls += 1
+        return [
+            {"id": eid, "seconds_until": int(due - self.clock.now)}
+            for eid, due in self.deadlines.items()
+        ]
+
+
+class TestDeadlineScheduler(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.clock = VirtualClock()
+        self.bridge = FakeBridge(self.clock)
+        self.fired = []
+        self.fail = False
+        patcher = patch("services.deadline_scheduler_service.bridge_client.request", new=self.bridge.request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def _on_due(self, event_ids):
+        self.fired.append((self.clock.now, list(event_ids)))
+        if self.fail:
+            raise RuntimeError("dm failed")
+        for eid in event_ids:
+            self.bridge.deadlines.pop(eid, None)
+
+    def _start(self, **kwargs):
+        self.scheduler = DeadlineScheduler(
+            self._on_due, clock=self.clock.time, sleep=self.clock.sleep, **kwargs,
+        )
+        self.task = asyncio.create_task(self.scheduler.run())
+
+    async def asyncTearDown(self):
+        self.scheduler.stop()
+        await self.clock.settle()
+        self.task.cancel()
+
+    async def test_fires_exactly_at_deadline(self):
+        self.bridge.deadlines = {1: 120.0, 2: 300.0}
+        self._start()
+        await self.clock.advance(119)
+        self.assertEqual(self.fired, [])
+        await self.clock.advance(1)
+        self.assertEqual(self.fired, [(120.0, [1])])
+        await self.clock.advance(180)
+        self.assertEqual(self.fired[-1], (300.0, [2]))
+        # 締切の合間に空振りの問い合わせをしない（初回 + 処理後 2 回）
+        self.assertEqual(self.bridge.calls, 3)
+
+    async def test_refresh_request_picks_up_earlier_deadline(self):
+        self.bridge.deadlines = {1: 600.0}
+        self._start()
+        await self.clock.advance(10)
+        self.bridge.deadlines[2] = 70.0
+        self.scheduler.request_refresh()
+        await self.clock.advance(60)
+        self.assertEqual(self.fired, [(70.0, [2])])
+
+    async def test_safety_refresh_without_notification(self):
+        self._start(safety_interval=100)
+        await self.clock.advance(10)
+        # 変更通知を取りこぼした締切も安全網の再取得で拾う
+        self.bridge.deadlines[5] = 150.0
+        await self.clock.advance(140)
+        self.assertEqual(self.fired, [(150.0, [5])])
+
+    async def test_retry_after_failed_processing(self):
+        self.bridge.deadlines = {1: 50.0}
+        self.fail = True
+        self._start(retry_delay=60)
+        await self.clock.advance(50)
+        self.assertEqual(self.fired, [(50.0, [1])])
+        self.fail = False
+        await self.clock.advance(59)
+        self.assertEqual(len(self.fired), 1)
+        await self.clock.advance(1)
+        self.assertEqual(self.fired[-1], (110.0, [1]))
+        await self.clock.advance(600)
+        self.assertEqual(len(self.fired), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
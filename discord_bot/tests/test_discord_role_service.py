@@ -0,0 +1,132 @@
+# tests/test_discord_role_service.py
+# services/discord_rest.py（認証情報）/ common/guild_role_index.py / services/discord_role_service.py のユニットテスト
+# - Bot トークンは DISCORD_TOKEN → token.txt の順に一度だけ読み込むこと
+# - トークン未設定なら Discord に送らず失敗を返すこと
+# - ロール操作が共有クライアント経由で送られ、Authorization / 監査ログ理由が付くこと
+# - ロール索引の名前検索・作成/編集の反映、同時の ensure_role で重複作成しないこと
+import sys
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import services.discord_rest as discord_rest_module
+from common.guild_role_index import GuildRoleIndex
+from services.discord_rest import DiscordRestClient, load_bot_token
+from services.discord_role_service import DiscordRoleService
+
+
+class TestLoadBotToken(unittest.TestCase):
+
+    def setUp(self):
+        patcher = patch.object(discord_rest_module, "_bot_token", discord_rest_module._TOKEN_UNSET)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_env_is_read_once(self):
+        with patch.dict(os.environ, {"DISCORD_TOKEN": " env-token \n"}):
+            self.assertEqual(load_bot_token(), "env-token")
+        with patch.dict(os.environ, {"DISCORD_TOKEN": "changed"}):
+            self.assertEqual(load_bot_token(), "env-token")
+
+    def test_token_file_fallback(self):
+        with tempfile.TemporaryDirectory() as d, patch.dict(os.environ, {"DISCORD_TOKEN": ""}):
+            with open(os.path.join(d, "token.txt"), "w", encoding="utf-8") as f:
+                f.write("file-token\n")
+            cwd = os.getcwd()
+            os.chdir(d)
+            try:
+                self.assertEqual(load_bot_token(), "file-token")
+            finally:
+                os.chdir(cwd)
+
+
+class TestGuildRoleIndex(unittest.TestCase):
+
+    def test_lookup_and_updates(self):
+        index = GuildRoleIndex("1", [{"id": "30", "name": "A"}, {"id": "20", "name": "A"}, {"id": 40, "name": "B"}])
+        self.assertEqual(index.find_by_name("A")["id"], "20")  # 同名は古い方
+        self.assertIn(40, index)
+
+        index.upsert({"id": "20", "name": "C"})
+        self.assertEqual(index.find_by_name("A")["id"], "30")
+        self.assertEqual(index.find_by_name("C")["id"], "20")
+
+        index.remove("30")
+        self.assertIsNone(index.find_by_name("A"))
+        self.assertEqual(len(index), 2)
+
+
+class TestDiscordRoleService(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        DiscordRoleService.clear()
+        self.calls = []
+        self.roles = [{"id": "10", "name": "夏杯 優勝"}]
+        self.client = DiscordRestClient(
+            "https://discord.test/api/v10", transport=httpx.MockTransport(self._handler),
+        )
+        for target, value in (("services.discord_role_service.discord_rest", self.client),
+                              ("services.discord_rest._bot_token", "tok")):
+            patcher = patch(target, new=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    async def _handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.replace("/api/v10", "")
+        self.calls.append((request.method, path, request.headers.get("authorization"),
+                           request.headers.get("x-audit-log-reason")))
+        if request.method == "GET" and path == "/guilds/1/roles":
+            return httpx.Response(200, json=self.roles)
+        if request.method == "POST":
+            await asyncio.sleep(0)
+            role = dict(httpx.Response(200, content=request.content).json(), id=str(10 + len(self.roles)))
+            self.roles.append(role)
+            return httpx.Response(200, json=role)
+        if request.method == "PATCH" and not path.endswith("/roles/404"):
+            role_id = path.rsplit("/", 1)[1]
+            return httpx.Response(200, json=dict(httpx.Response(200, content=request.content).json(), id=role_id))
+        if path.endswith("/roles/404"):
+            return httpx.Response(404, json={"message": "Unknown Role"})
+        return httpx.Response(204)
+
+    async def test_role_operations(self):
+        self.assertEqual(await DiscordRoleService.list_roles("1"), self.roles)
+        self.assertEqual(await DiscordRoleService.create_role("1", "新称号", color=0xFFD700, reason="称号"), "11")
+        self.assertTrue(await DiscordRoleService.add_member_role("1", "5", "11"))
+        self.assertFalse(await DiscordRoleService.remove_member_role("1", "5", "404"))
+        self.assertEqual(self.calls[1], ("POST", "/guilds/1/roles", "Bot tok", "%E7%A7%B0%E5%8F%B7"))
+        self.assertTrue(all(c[2] == "Bot tok" for c in self.calls))
+
+    async def test_ensure_role_creates_once(self):
+        ids = await asyncio.gather(*[DiscordRoleService.ensure_role("1", "秋杯 優勝") for _ in range(5)])
+        self.assertEqual(set(ids), {"11"})
+        self.assertEqual(await DiscordRoleService.ensure_role("1", "夏杯 優勝"), "10")
+        methods = [c[0] for c in self.calls]
+        self.assertEqual((methods.count("GET"), methods.count("POST")), (1, 1))
+
+    async def test_edit_updates_index(self):
+        await DiscordRoleService.get_index("1")
+        self.assertEqual(await DiscordRoleService.edit_role("1", "10", name="冬杯 優勝"), 200)
+        self.assertEqual((await DiscordRoleService.find_role("1", "冬杯 優勝"))["id"], "10")
+        self.assertIsNone(await DiscordRoleService.find_role("1", "夏杯 優勝"))
+        self.assertEqual([c[0] for c in self.calls].count("GET"), 1)
+
+    async def test_missing_token_skips_request(self):
+        with patch("services.discord_rest._bot_token", None):
+            self.assertIsNone(await DiscordRoleService.list_roles("1"))
+            self.assertFalse(await DiscordRoleService.add_member_role("1", "5", "11"))
+        self.assertEqual(self.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,226 @@
+# tests/test_dm_dispatcher.py
+# services/discord_rest.py と services/dm_dispatcher.py のユニットテスト
+# - ルートキー（メジャーパラメータ単位のバケット）
+# - バケットの残量切れ・429 の Retry-After に従って待つこと
+# - 5xx の再送は冪等なメソッドだけ（DM 送信などの POST は再送しない）
+# - DM チャンネル ID のキャッシュ（2 回目以降は作成しない / 無効なら作り直す）
+# - 一斉送信の同時送信数の上限と結果の集計
+import sys
+import os
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.discord_ratelimit import RateLimitBucket, route_key
+from services.discord_rest import DiscordRestClient
+from services.dm_dispatcher import DMDispatcher
+
+
+class TestRouteKey(unittest.TestCase):
+
+    def test_major_params_split_buckets(self):
+        self.assertEqual(
+            route_key("POST", "/channels/111111111111/messages"),
+            ("POST channels/{id}/messages", "channels/111111111111"),
+        )
+        self.assertEqual(
+            route_key("PUT", "/guilds/1/members/222222222222/roles/333333333333"),
+            ("PUT guilds/{id}/members/{id}/roles/{id}", "guilds/1"),
+        )
+        self.assertEqual(route_key("post", "/users/@me/channels"), ("POST users/@me/channels", ""))
+
+    def test_bucket_reserve_and_reset(self):
+        b = RateLimitBucket()
+        self.assertEqual(b.reserve(0.0), 0.0)  # 残量不明の間は制限しない
+        b.update({"x-ratelimit-limit": "2", "x-ratelimit-remaining": "1", "x-ratelimit-reset-after": "5"}, 0.0)
+        self.assertEqual(b.reserve(1.0), 0.0)
+        self.assertAlmostEqual(b.reserve(1.0), 4.0)
+        self.assertEqual(b.reserve(5.0), 0.0)
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.slept.append(delay)
+        self.now += delay
+        await asyncio.sleep(0)
+
+
+class FakeDiscord:
+    """DM チャンネル作成とメッセージ送信だけを持つ Discord API。"""
+
+    def __init__(self, clock, delay=0.0):
+        self.clock = clock
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.blocked = set()
+        self.rate_limit_once = False
+        self.unknown_channels = set()
+        self.window_start = 0.0
+        self.window_used = 0
+        self.rejected = 0
+
+    async def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.replace("/api/v10", "")
+        self.calls.append((request.method, path, self.clock.now))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            if path == "/users/@me/channels":
+                uid = httpx.Response(200, content=request.content).json()["recipient_id"]
+                return httpx.Response(200, json={"id": f"dm-{uid}-{len(self.calls)}"})
+            channel_id = path.split("/")[2]
+            if self.rate_limit_once:
+                self.rate_limit_once = False
+                return httpx.Response(429, json={"retry_after": 2.5, "global": False})
+            if channel_id in self.unknown_channels:
+                return httpx.Response(404, json={"code": 10003, "message": "Unknown Channel"})
+            if any(channel_id.startswith(f"dm-{u}-") for u in self.blocked):
+                return httpx.Response(403, json={"code": 50007, "message": "Cannot send messages to this user"})
+            # 1 秒あたり 5 件のバケット（超過は 429）
+            now = self.clock.now
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_used = now, 0
+            if self.window_used >= 5:
+                self.rejected += 1
+                return httpx.Response(429, json={"retry_after": self.window_start + 1.0 - now, "global": False})
+            self.window_used += 1
+            return httpx.Response(200, json={"id": "m"}, headers={
+                "x-ratelimit-bucket": "msg", "x-ratelimit-limit": "5",
+                "x-ratelimit-remaining": str(5 - self.window_used),
+                "x-ratelimit-reset-after": str(self.window_start + 1.0 - now),
+            })
+        finally:
+            self.in_flight -= 1
+
+
+class DispatcherTestBase(IsolatedAsyncioTestCase):
+
+    delay = 0.0
+
+    async def asyncSetUp(self):
+        DMDispatcher.clear_cache()
+        self.clock = FakeClock()
+        self.discord = FakeDiscord(self.clock, delay=self.delay)
+        self.client = DiscordRestClient(
+            "https://discord.test/api/v10",
+            transport=httpx.MockTransport(self.discord.handler),
+            clock=self.clock.time,
+            sleep=self.clock.sleep,
+        )
+        patcher = patch("services.dm_dispatcher.discord_rest", new=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    def _count(self, suffix):
+        return sum(1 for _, path, _ in self.discord.calls if path.endswith(suffix))
+
+
+class TestDMSend(DispatcherTestBase):
+
+    async def test_channel_id_is_cached(self):
+        self.assertTrue(await DMDispatcher.send("tok", "1", "a"))
+        self.assertTrue(await DMDispatcher.send("tok", "1", "b"))
+        self.assertEqual(self._count("/users/@me/channels"), 1)
+        self.assertEqual(self._count("/messages"), 2)
+
+    async def test_retry_after_429(self):
+        self.discord.rate_limit_once = True
+        self.assertTrue(await DMDispatcher.send("tok", "1", "a"))
+        self.assertEqual(self._count("/messages"), 2)
+        self.assertIn(2.5, self.clock.slept)
+
+    async def test_unknown_channel_is_reopened(self):
+        self.assertTrue(await DMDispatcher.send("tok", "1", "a"))
+        self.discord.unknown_channels.add(DMDispatcher._channels["1"])
+        self.assertTrue(await DMDispatcher.send("tok", "1", "b"))
+        self.assertEqual(self._count("/users/@me/channels"), 2)
+
+    async def test_missing_token(self):
+        self.assertFalse(await DMDispatcher.send("", "1", "a"))
+        self.assertEqual(self.discord.calls, [])
+
+
+class TestServerErrorRetry(IsolatedAsyncioTestCase):
+
+    async def test_only_idempotent_methods_are_retried(self):
+        clock = FakeClock()
+        calls = []
+
+        def handler(request):
+            calls.append(request.method)
+            return httpx.Response(503, json={"message": "unavailable"})
+
+        client = DiscordRestClient(
+            "https://discord.test/api/v10",
+            transport=httpx.MockTransport(handler),
+            clock=clock.time,
+            sleep=clock.sleep,
+        )
+        self.addAsyncCleanup(client.aclose)
+        resp = await client.request("POST", "/channels/1/messages", "tok", json={"content": "a"})
+        self.assertEqual((resp.status_code, calls), (503, ["POST"]))
+        calls.clear()
+        resp = await client.request("GET", "/guilds/1/roles", "tok")
+        self.assertEqual((resp.status_code, calls), (503, ["GET"] * 4))
+
+
+class TestDMSendMany(DispatcherTestBase):
+
+    delay = 0.005
+
+    async def test_bounded_concurrency_and_report(self):
+        self.discord.blocked.add("3")
+        sent_keys = []
+
+        async def on_sent(key):
+            sent_keys.append(key)
+
+        progress = []
+        messages = [(i, str(i), f"hello {i}") for i in range(10)]
+        report = await DMDispatcher.send_many(
+            "tok", messages, concurrency=3, on_sent=on_sent,
+            on_progress=lambda done, total: progress.append((done, total)),
+        )
+
+        self.assertLessEqual(self.discord.max_in_flight, 3)
+        self.assertGreater(self.discord.max_in_flight, 1)
+        self.assertEqual(report["total"], 10)
+        self.assertEqual(report["sent"], 9)
+        self.assertEqual(report["failed_keys"], [3])
+        self.assertEqual(sorted(sent_keys), [i for i in range(10) if i != 3])
+        self.assertEqual(progress[-1], (10, 10))
+
+    async def test_waits_for_bucket_reset(self):
+        """残量 4 のバケットを使い切ったら reset-after まで待ってから送る"""
+        self.assertTrue(await DMDispatcher.send("tok", "1", "first"))
+        messages = [(i, "1", "x") for i in range(5)]
+        report = await DMDispatcher.send_many("tok", messages, concurrency=1)
+        self.assertEqual(report["sent"], 5)
+        self.assertEqual(self.discord.rejected, 0)
+        self.assertTrue(self.clock.slept)
+        last_send = [t for _, path, t in self.discord.calls if path.endswith("/messages")][-1]
+        self.assertGreaterEqual(last_send, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
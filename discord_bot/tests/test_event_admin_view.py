@@ -0,0 +1,117 @@
+# tests/test_event_admin_view.py
+# common/event_admin_view.py / services/event_admin_service.py のユニットテスト
+# - 部ごとの承認数・残席、当日受付の部ごとのグループとチェックイン数
+# - 回答の正規化（旧形式 "0[]" キー）と回答者名の補完
+# - キャッシュ: 2 回目は Bridge を呼ばない、参加者の更新で破棄される、ACL も一緒に載る
+import sys
+import os
+import json
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.event_admin_view import build_event_admin_view
+from services.access_control_service import AccessControlService
+from services.event_admin_service import EventAdminService
+
+QUESTIONS = json.dumps([
+    {"text": "参加枠", "type": "checkbox", "options": ["昼", "夜"]},
+    {"text": "コメント", "type": "text"},
+])
+
+
+def _bundle():
+    return {
+        "event": {"id": 7, "survey_id": 3, "title": "夏祭り"},
+        "sessions": [
+            {"id": 10, "name": "第1部", "capacity": 2},
+            {"id": 11, "name": "第2部", "capacity": None},
+        ],
+        "participants": [
+            {"id": 1, "user_id": 101, "username": "alice", "session_id": 10, "approval": "accepted",
+             "checked_in_at": "2026-08-01 10:00:00", "answers": json.dumps({"0[]": ["昼"], "1": "よろしく"})},
+            {"id": 2, "user_id": 102, "username": None, "session_id": 10, "approval": "accepted",
+             "checked_in_at": None, "answers": json.dumps({"0": ["夜"]})},
+            {"id": 3, "user_id": 103, "username": "carol", "session_id": 11, "approval": "waitlist",
+             "checked_in_at": None, "answers": None},
+            {"id": 4, "user_id": 104, "username": "dave", "session_id": None, "approval": "accepted",
+             "checked_in_at": None, "answers": "{}"},
+        ],
+        "survey": {"id": 3, "questions": QUESTIONS},
+        "acl": {"survey_id": 3, "owner_id": "900", "owner_name": "owner", "collaborator_ids": ["901"]},
+    }
+
+
+class TestBuildEventAdminView(unittest.TestCase):
+
+    def test_session_stats_and_checkin_groups(self):
+        view = build_event_admin_view(_bundle())
+        self.assertEqual(view.session_stats[10], {"accepted": 2, "capacity": 2, "remaining": 0})
+        self.assertEqual(view.session_stats[11], {"accepted": 0, "capacity": None, "remaining": None})
+        self.assertEqual([p["id"] for p in view.checkin_groups[10]], [1, 2])
+        self.assertEqual([p["id"] for p in view.checkin_groups[None]], [4])
+        self.assertNotIn(11, view.checkin_groups)
+        self.assertEqual(view.accepted_total, 3)
+        self.assertEqual(view.checked_in_count, 1)
+        self.assertEqual(view.participant_ids, frozenset({1, 2, 3, 4}))
+
+    def test_answers_and_username(self):
+        view = build_event_admin_view(_bundle())
+        p1, p2, p3, _ = view.participants
+        self.assertEqual(p1["answers"], {"0": ["昼"], "1": "よろしく"})
+        self.assertEqual(p2["answers"], {"0": ["夜"]})
+        self.assertEqual(p3["answers"], {})
+        self.assertEqual(p2["username"], "ID:102")
+        self.assertEqual([q["text"] for q in view.survey_questions], ["参加枠", "コメント"])
+
+    def test_without_survey(self):
+        bundle = _bundle()
+        bundle["survey"] = None
+        view = build_event_admin_view(bundle)
+        self.assertEqual(view.survey_questions, [])
+        self.assertEqual(view.participants[0]["answers"], {})
+
+
+class TestEventAdminService(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        EventAdminService.clear()
+        AccessControlService.clear()
+        self.calls = []
+
+    async def _request(self, method, path, json=None, params=None):
+        self.calls.append((method, path))
+        return _bundle() if path == "/events/7/admin-bundle" else None
+
+    async def test_cached_until_participant_changes(self):
+        with patch("services.event_admin_service.bridge_client.request", new=self._request):
+            view = await EventAdminService.get_view(7)
+            self.assertIs(await EventAdminService.get_view(7), view)
+            self.assertEqual(len(self.calls), 1)
+
+            EventAdminService.invalidate_participant(2)
+            await EventAdminService.get_view(7)
+            self.assertEqual(len(self.calls), 2)
+
+            # 所属の分からない参加者では破棄しない
+            EventAdminService.invalidate_participant(999)
+            await EventAdminService.get_view(7)
+            self.assertEqual(len(self.calls), 2)
+
+    async def test_acl_is_remembered(self):
+        with patch("services.event_admin_service.bridge_client.request", new=self._request):
+            await EventAdminService.get_view(7)
+        with patch("services.access_control_service.bridge_client.request") as acl_request:
+            self.assertTrue(await AccessControlService.can_manage_event("901", 7))
+            self.assertFalse(await AccessControlService.can_manage_event("555", 7))
+            acl_request.assert_not_called()
+
+    async def test_missing_event(self):
+        with patch("services.event_admin_service.bridge_client.request", new=self._request):
+            self.assertIsNone(await EventAdminService.get_view(8))
+
+
+if __name__ == '__main__':
+    unittest.main()
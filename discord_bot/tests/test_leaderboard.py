@@ -0,0 +1,131 @@
+# tests/test_leaderboard.py
+# common/leaderboard.py / LeaderboardService のユニットテスト
+# - 順位・ページ・ページ内の位置が、全員を並べ替えた結果と一致すること（同 MMR は同順位）
+# - 桁違いに大きい MMR が混ざっても順位が正しく、索引の大きさがプレイヤー数だけで決まること
+# - 全プレイヤーは 1 回だけ読み込み、セッション結果と get_player の MMR を即時反映すること
+import sys
+import os
+import asyncio
+import random
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.leaderboard import Leaderboard
+from services.leaderboard_service import LeaderboardService
+from services.lounge_service import LoungeService
+
+
+def _expected(mmrs):
+    order = sorted(mmrs.items(), key=lambda kv: (-kv[1], kv[0]))
+    return [{"rank": 1 + sum(1 for v in mmrs.values() if v > m), "user_id": u, "mmr": m} for u, m in order]
+
+
+class TestLeaderboard(unittest.TestCase):
+
+    def test_ties_and_pages(self):
+        board = Leaderboard([(1, 3000), (2, 1000), (3, 3000), (4, -50), (5, 1000)])
+        self.assertEqual(board.mmr(4), 0)  # 下限 0
+        self.assertEqual([e["rank"] for e in board.page(0, 10)], [1, 1, 3, 3, 5])
+        self.assertEqual(board.page(1, 2), [
+            {"rank": 1, "user_id": "3", "mmr": 3000},
+            {"rank": 3, "user_id": "2", "mmr": 1000},
+        ])
+        self.assertEqual(board.page(5, 10), [])
+        self.assertEqual(board.rank("5"), {"rank": 3, "total": 5, "mmr": 1000, "top_percent": 60.0})
+        self.assertEqual(board.position("5"), 3)
+        self.assertIsNone(board.rank("9"))
+
+        self.assertTrue(board.update(2, 5_000_000))  # 外れ値
+        self.assertFalse(board.update(2, 5_000_000))
+        self.assertEqual(board.rank(2)["rank"], 1)
+        self.assertTrue(board.remove(1))
+        self.assertFalse(board.remove(1))
+        self.assertEqual([e["user_id"] for e in board.page(0, 10)], ["2", "3", "5", "4"])
+
+    def test_matches_sorting(self):
+        rng = random.Random(11)
+        board = Leaderboard()
+        mmrs = {}
+        for _ in range(2000):
+            uid = str(rng.randint(1, 300))
+            if rng.random() < 0.1:
+                board.remove(uid)
+                mmrs.pop(uid, None)
+            else:
+                mmr = rng.choice([1000, rng.randint(0, 30000)])
+                board.update(uid, mmr)
+                mmrs[uid] = mmr
+        expected = _expected(mmrs)
+        self.assertEqual(len(board), len(mmrs))
+        for offset, limit in ((0, 1), (0, 50), (17, 33), (len(mmrs) - 5, 50)):
+            self.assertEqual(board.page(offset, limit), expected[offset:offset + limit])
+        for pos, e in enumerate(expected):
+            self.assertEqual(board.rank(e["user_id"])["rank"], e["rank"])
+            self.assertEqual(board.position(e["user_id"]), pos)
+
+    def test_many_players_and_outliers(self):
+        rng = random.Random(5)
+        mmrs = {str(i): rng.choice([1000, rng.randint(0, 30000)]) for i in range(5000)}
+        board = Leaderboard(mmrs.items())
+        for uid in rng.sample(sorted(mmrs), 300):
+            mmrs[uid] = rng.choice([0, 5_000_000, 10**12, rng.randint(0, 30000)])
+            board.update(uid, mmrs[uid])
+        for uid in rng.sample(sorted(mmrs), 2000):
+            board.remove(uid)
+            del mmrs[uid]
+        self.assertEqual(sum(len(b) for b in board._blocks), len(mmrs))
+        expected = _expected(mmrs)
+        for offset in (0, 1, 511, 512, 1023, 1500, len(mmrs) - 3):
+            self.assertEqual(board.page(offset, 40), expected[offset:offset + 40])
+        for e in expected[::97]:
+            self.assertEqual(board.rank(e["user_id"])["rank"], e["rank"])
+        self.assertEqual(board.count_above(10**12), 0)
+        self.assertEqual(board.count_above(-1), len(mmrs))
+
+
+class TestLeaderboardService(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        LeaderboardService.clear()
+        self.addCleanup(LeaderboardService.clear)
+        self.calls = []
+        players = {
+            "/lounge/players": [
+                {"user_id": "10", "username": "alice", "mmr": 5000},
+                {"user_id": "20", "username": "bob", "mmr": 2000},
+            ],
+            "/lounge/players/30": {"user_id": 30, "mmr": 1000, "peak_mmr": 1000},
+        }
+
+        async def fake_request(method, path, json=None, params=None):
+            self.calls.append(path)
+            await asyncio.sleep(0)
+            return players.get(path)
+
+        for target in ("services.leaderboard_service.bridge_client.request",
+                       "services.lounge_service.bridge_client.request"):
+            patcher = patch(target, new=fake_request)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def test_load_once_and_feed(self):
+        boards = await asyncio.gather(*[LeaderboardService.ensure_loaded() for _ in range(5)])
+        self.assertTrue(all(b is boards[0] for b in boards))
+        self.assertEqual(self.calls, ["/lounge/players"])
+
+        await LoungeService.get_player(30)
+        LeaderboardService.record_results([{"user_id": "20", "new_mmr": 9000}])
+        page = await LeaderboardService.get_page(0, 500)
+        self.assertEqual(page["limit"], 100)
+        self.assertEqual([(e["user_id"], e["username"]) for e in page["entries"]],
+                         [("20", "bob"), ("10", "alice"), ("30", None)])
+        rank = await LeaderboardService.get_rank(30, page_size=2)
+        self.assertEqual((rank["rank"], rank["total"], rank["offset"]), (3, 3, 2))
+        self.assertEqual(self.calls.count("/lounge/players"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
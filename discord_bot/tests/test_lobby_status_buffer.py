@@ -0,0 +1,165 @@
+# tests/test_lobby_status_buffer.py
+# services/lobby_status_buffer.py / services/lobby_hub.py のユニットテスト
+# - 連続した切り替えは (passcode, user_id) ごとの最新だけを 1 回の一括更新で書き込むこと
+# - 受け付けた時点で購読者へ配信し、未反映の間は参照（overlay）にバッファの値を返すこと
+# - Bridge に接続できなければ再送し（新しい変更を優先）、API エラーは捨てること
+# - Bridge から戻ってくる自分の一括更新の配信は中継しないこと
+# - 試合結果と passcode を持たないロビーのイベント（user_synced）は購読者へ中継すること
+# - /lobby/api/status は参加していないロビーのステータスを受け付けないこと（参加者一覧はキャッシュ）
+import sys
+import os
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from quart import Quart
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.bridge_client import BridgeUnavailableError
+from routes.lobby import lobby_bp
+from services.lobby_hub import MEMBER_STATUS_UPDATED, LobbyHub
+from services.lobby_service import LobbyService
+from services.lobby_status_buffer import LobbyStatusBuffer
+
+
+class TestLobbyStatusBuffer(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.writes = []
+        self.fail_with = None
+
+        async def fake_update(updates, source=None):
+            self.writes.append((sorted((u["passcode"], u["user_id"], u["status"]) for u in updates), source))
+            await asyncio.sleep(0)
+            if self.fail_with == "unavailable":
+                raise BridgeUnavailableError("down")
+            if self.fail_with == "api":
+                return None
+            return len(updates)
+
+        patcher = patch("services.lobby_status_buffer.LobbyService.update_member_statuses", new=fake_update)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        async def fake_listen(hub):
+            await asyncio.Event().wait()
+
+        patcher = patch.object(LobbyHub, "_listen", new=fake_listen)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_coalesce_and_publish(self):
+        hub = LobbyHub()
+        buf = LobbyStatusBuffer(hub, interval=0.01)
+        async with hub.subscribe("ABC") as queue:
+            for status in ("waiting", "playing", "waiting", "playing"):
+                buf.set("ABC", 1, status)
+            buf.set("ABC", 1, "playing")  # 同じステータスは配信しない
+            buf.set("ABC", 2, "waiting")
+            buf.set("XYZ", 1, "online")
+
+            published = [queue.get_nowait()["status"] for _ in range(queue.qsize())]
+            self.assertEqual(published, ["waiting", "playing", "waiting", "playing", "waiting"])
+            members = buf.overlay("ABC", [{"user_id": "1", "status": "offline"}, {"user_id": 3, "status": "offline"}])
+            self.assertEqual([m["status"] for m in members], ["playing", "offline"])
+
+            await buf._flusher
+        self.assertEqual(self.writes, [(
+            [("ABC", 1, "playing"), ("ABC", 2, "waiting"), ("XYZ", 1, "online")], hub.source_id,
+        )])
+        self.assertEqual(buf.pending_count(), 0)
+        self.assertIsNone(buf.get("ABC", 1))
+
+    async def test_retry_and_drop(self):
+        buf = LobbyStatusBuffer(interval=0.01)
+        self.fail_with = "unavailable"
+        buf.set("ABC", 1, "waiting")
+        buf._flusher.cancel()
+        self.assertEqual(await buf.flush(), 0)
+        self.assertEqual(buf.get("ABC", 1), "waiting")  # 再送待ち
+
+        buf._pending[("ABC", 1)] = "playing"  # 送信失敗後の新しい変更が優先される
+        self.fail_with = None
+        self.assertEqual(await buf.flush(), 1)
+        self.assertEqual(self.writes[-1][0], [("ABC", 1, "playing")])
+
+        self.fail_with = "api"
+        buf.set("ABC", 2, "waiting")
+        buf._flusher.cancel()
+        self.assertEqual(await buf.flush(), 0)
+        self.assertEqual(buf.pending_count(), 0)
+
+
+class TestLobbyHub(IsolatedAsyncioTestCase):
+
+    async def test_relay_skips_own_writes(self):
+        with patch.object(LobbyHub, "_listen", new=lambda hub: asyncio.Event().wait()):
+            hub = LobbyHub()
+            async with hub.subscribe("ABC") as queue:
+                own = {"type": MEMBER_STATUS_UPDATED, "passcode": "ABC", "user_id": 1,
+                       "status": "waiting", "source": hub.source_id}
+                hub.handle_message(json.dumps(own))
+                hub.handle_message(json.dumps(dict(own, source="other-worker")))
+                hub.handle_message(json.dumps({"type": "tournament_started", "passcode": "ABC"}))
+                hub.handle_message(json.dumps({"type": "tournament_started", "passcode": "XYZ"}))
+                hub.handle_message(json.dumps({"type": "event.checkin", "event_id": 1}))
+                self.assertEqual([queue.get_nowait()["type"] for _ in range(queue.qsize())],
+                                 [MEMBER_STATUS_UPDATED, "tournament_started"])
+            self.assertEqual(hub.subscriber_count(), 0)
+
+    async def test_relay_match_result_and_passcodeless_events(self):
+        with patch.object(LobbyHub, "_listen", new=lambda hub: asyncio.Event().wait()):
+            hub = LobbyHub()
+            async with hub.subscribe("ABC") as abc, hub.subscribe("XYZ") as xyz:
+                hub.handle_message(json.dumps(
+                    {"type": "match_winner_reported", "passcode": "ABC", "match_id": 7, "winner_id": 1}))
+                hub.handle_message(json.dumps({"type": "user_synced", "user_id": 2}))
+                hub.handle_message(json.dumps({"type": "event.checkin", "event_id": 1}))
+                self.assertEqual([abc.get_nowait() for _ in range(abc.qsize())], [
+                    {"type": "match_winner_reported", "passcode": "ABC", "match_id": 7, "winner_id": 1},
+                    {"type": "user_synced", "user_id": 2},
+                ])
+                self.assertEqual([xyz.get_nowait()["type"] for _ in range(xyz.qsize())], ["user_synced"])
+
+
+class TestStatusEndpointMembership(IsolatedAsyncioTestCase):
+
+    async def test_rejects_non_members(self):
+        LobbyService._member_ids.clear()
+        self.addCleanup(LobbyService._member_ids.clear)
+        calls, accepted = [], []
+
+        async def fake_request(method, path, json=None, params=None):
+            calls.append((method, path))
+            if path == "/lobby/join/ABC":
+                return [{"room_passcode": "ABC", "user_id": 42, "role": "player"}]
+            if path == "/lobby/join":
+                return {"status": "ok"}
+            return None
+
+        app = Quart(__name__)
+        app.secret_key = "test"
+        app.register_blueprint(lobby_bp)
+        client = app.test_client()
+        with patch("services.lobby_service.bridge_client.request", new=fake_request), \
+                patch("routes.lobby.lobby_status_buffer.set", new=lambda *a: accepted.append(a)):
+            async with client.session_transaction() as sess:
+                sess["discord_user"] = {"id": "42"}
+            for _ in range(3):
+                res = await client.post("/lobby/api/status", json={"passcode": "ABC", "status": "playing"})
+                self.assertEqual(res.status_code, 200)
+            res = await client.post("/lobby/api/status", json={"passcode": "XYZ", "status": "playing"})
+            self.assertEqual(res.status_code, 403)
+
+            async with client.session_transaction() as sess:
+                sess["discord_user"] = {"id": "7"}
+            res = await client.post("/lobby/api/status", json={"passcode": "ABC", "status": "playing"})
+            self.assertEqual(res.status_code, 403)
+            # 参加するとキャッシュを破棄し、次の切り替えから受け付ける
+            await LobbyService.join_lobby("ABC", 7, "player")
+            self.assertTrue(await LobbyService.is_member("ABC", 42))
+
+        self.assertEqual(accepted, [("ABC", 42, "playing")] * 3)
+        self.assertEqual(calls.count(("GET", "/lobby/join/ABC")), 2)
@@ -0,0 +1,106 @@
+# tests/test_lounge_finish_service.py
+# services/lounge_finish_service.py のユニットテスト
+# - MMR 計算結果から一括付与の入力を作り、Bridge への付与は 1 回にまとめること
+# - ロールの確保は称号ごとに 1 回、付与は同時実行数の上限内で並行に送ること
+# - 一部のロール付与が失敗しても他の付与を続けること
+import sys
+import os
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.title_catalog import TitleCatalog
+from services.lounge_finish_service import LoungeFinishService
+
+RESULTS = [
+    {"user_id": "1", "final_rank": 1, "new_mmr": 2100},
+    {"user_id": "2", "final_rank": 2, "new_mmr": 1500},
+    {"user_id": "3", "final_rank": 3, "new_mmr": 900},
+    {"user_id": None, "final_rank": 4, "new_mmr": 800},
+]
+TITLES = [{"id": 1, "name": "Bronze"}, {"id": 2, "name": "Gold"}, {"id": 9, "name": "優勝"}]
+
+
+class TestBuildGrantPlayers(unittest.TestCase):
+
+    def test_players_and_grouping(self):
+        players = LoungeFinishService.build_grant_players(RESULTS)
+        self.assertEqual(players, [
+            {"user_id": 1, "mmr": 2100, "session_winner": True},
+            {"user_id": 2, "mmr": 1500, "session_winner": False},
+            {"user_id": 3, "mmr": 900, "session_winner": False},
+        ])
+        grants = [{"user_id": "1", "newly_granted": [1, 2, 9]}, {"user_id": "2", "newly_granted": [1]},
+                  {"user_id": "3", "newly_granted": []}]
+        self.assertEqual(LoungeFinishService.group_by_title(grants), {1: ["1", "2"], 2: ["1"], 9: ["1"]})
+
+
+class TestRunTitlePipeline(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.batch_calls = []
+        self.ensured = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.added = []
+
+        async def grant_batch(players):
+            self.batch_calls.append(players)
+            return [{"user_id": "1", "newly_granted": [1, 2, 9], "activated": 1},
+                    {"user_id": "2", "newly_granted": [1], "activated": None},
+                    {"user_id": "3", "newly_granted": [], "activated": None}]
+
+        async def get_catalog():
+            return TitleCatalog(TITLES)
+
+        async def add_member_role(guild_id, user_id, role_id, reason=None):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0)
+            self.in_flight -= 1
+            self.added.append((user_id, role_id))
+            return role_id != "r9"
+
+        for target, fn in (
+            ("services.lounge_finish_service.TitleService.grant_batch", grant_batch),
+            ("services.lounge_finish_service.TitleService.get_catalog", get_catalog),
+            ("services.lounge_finish_service.DiscordRoleService.add_member_role", add_member_role),
+        ):
+            patcher = patch(target, new=fn)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _ensure_role(self, title):
+        self.ensured.append(title["id"])
+        return None if title["id"] == 2 else f"r{title['id']}"
+
+    async def test_pipeline(self):
+        report = await LoungeFinishService.run_title_pipeline(RESULTS, "g", self._ensure_role)
+        self.assertEqual(len(self.batch_calls), 1)
+        self.assertEqual(len(self.batch_calls[0]), 3)
+        self.assertEqual(sorted(self.ensured), [1, 2, 9])
+        # 称号 2 はロールを確保できないため付与しない
+        self.assertEqual(sorted(self.added), [("1", "r1"), ("1", "r9"), ("2", "r1")])
+        self.assertEqual((report["assigned"], report["failed"]), (2, 1))
+
+    async def test_concurrency_is_bounded(self):
+        by_title = {1: [str(i) for i in range(10)]}
+        result = await LoungeFinishService.assign_roles("g", by_title, {1: "r1"}, concurrency=3)
+        self.assertEqual(result, {"assigned": 10, "failed": 0})
+        self.assertLessEqual(self.max_in_flight, 3)
+        self.assertGreater(self.max_in_flight, 1)
+
+    async def test_grant_failure_returns_none(self):
+        async def failing(players):
+            return None
+
+        with patch("services.lounge_finish_service.TitleService.grant_batch", new=failing):
+            self.assertIsNone(await LoungeFinishService.run_title_pipeline(RESULTS, "g", self._ensure_role))
+        self.assertEqual(self.ensured, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
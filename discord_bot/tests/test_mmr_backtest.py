@@ -0,0 +1,129 @@
+# tests/test_mmr_backtest.py
+# common/mmr_backtest.py / LoungeBacktestService のユニットテスト
+# - 除外・未申告の行と 2 人未満のセッションを除き、初出順にプレイヤーへ番号を振ること
+# - 固定テーブル式が Bridge の MMR_DELTA と下限どおりに加算し、多人数 Elo の変動量の合計が 0 になること
+# - 実力どおりの順位が続くと、多人数 Elo の経験者同士の予測精度がほぼ 1.0 になること
+# - Bridge から取得したセッション列をそのまま SessionTable に変換すること
+import sys
+import os
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.mmr_backtest import (
+    LOUNGE_MMR_DELTA, FixedTableFormula, MultiplayerEloFormula, RatingFormula, SessionTable, backtest, compare,
+)
+from services.lounge_backtest_service import LoungeBacktestService
+
+
+class TestSessionTable(unittest.TestCase):
+
+    def test_from_rows(self):
+        rows = [
+            {"session_id": 1, "user_id": 10, "final_rank": 1},
+            {"session_id": 1, "user_id": 20, "final_rank": 2},
+            {"session_id": 1, "user_id": 30, "final_rank": 3, "excluded": True},
+            {"session_id": 2, "user_id": 30, "final_rank": 1},
+            {"session_id": 2, "user_id": 40, "final_rank": None},
+            {"session_id": 3, "user_id": 40, "final_rank": "2", "submitted": True},
+            {"session_id": 3, "user_id": 20, "final_rank": 1},
+            {"session_id": 3, "user_id": 50, "final_rank": 3, "submitted": False},
+        ]
+        table = SessionTable.from_rows(rows)
+        self.assertEqual(table.session_ids, [1, 3])  # セッション 2 は 1 人しか残らない
+        self.assertEqual(table.user_ids, ["10", "20", "40"])
+        self.assertEqual(table.offsets.tolist(), [0, 2, 4])
+        self.assertEqual(table.player_idx.tolist(), [0, 1, 2, 1])
+        self.assertEqual(table.ranks.tolist(), [1, 2, 2, 1])
+
+
+class TestFormulas(unittest.TestCase):
+
+    def test_fixed_table(self):
+        f = FixedTableFormula()
+        ranks = np.array([1, 2, 12, 24, 30], dtype=np.int16)
+        self.assertEqual(f.deltas(np.zeros(5), ranks).tolist(),
+                         [LOUNGE_MMR_DELTA[1], LOUNGE_MMR_DELTA[2], LOUNGE_MMR_DELTA[12],
+                          LOUNGE_MMR_DELTA[24], LOUNGE_MMR_DELTA[24]])
+
+        table = SessionTable.from_sessions([(1, [("a", 1), ("b", 2)])])
+        report = backtest(table, FixedTableFormula(table=(0, 50, -5000)))
+        self.assertEqual(report.ratings.tolist(), [1050.0, 0.0])  # 下限 0
+
+    def test_formula_requires_deltas(self):
+        class NoDeltas(RatingFormula):
+            name = 'broken'
+
+        with self.assertRaises(TypeError):
+            NoDeltas()
+
+    def test_elo_zero_sum(self):
+        f = MultiplayerEloFormula()
+        ratings = np.array([1500.0, 1000.0, 1000.0, 800.0])
+        deltas = f.deltas(ratings, np.array([4, 1, 1, 2], dtype=np.int16))
+        self.assertAlmostEqual(float(deltas.sum()), 0.0, places=9)
+        self.assertLess(deltas[0], 0)
+        self.assertAlmostEqual(float(deltas[1]), float(deltas[2]))
+
+
+class TestBacktest(unittest.TestCase):
+
+    def _ordered_sessions(self, n):
+        # プレイヤー番号が小さいほど常に上位
+        rng = np.random.default_rng(1)
+        for s in range(n):
+            players = sorted(rng.choice(10, size=4, replace=False).tolist())
+            yield s, [(p, rank) for rank, p in enumerate(players, start=1)]
+
+    def test_accuracy_and_history(self):
+        table = SessionTable.from_sessions(self._ordered_sessions(200))
+        report = backtest(table, MultiplayerEloFormula(), min_games=20, keep_history=True)
+        self.assertEqual(report.sessions, 200)
+        self.assertGreater(report.pairwise_accuracy, 0.95)
+        self.assertGreater(report.winner_accuracy, 0.9)
+        self.assertEqual(np.argsort(-report.ratings).tolist(), [table.user_ids.index(str(p)) for p in range(10)])
+        self.assertEqual(int(report.games.sum()), 800)
+        last = slice(table.offsets[-2], table.offsets[-1])
+        np.testing.assert_allclose(report.history[last], report.ratings[table.player_idx[last]])
+
+        # 全員が初参加のセッションしか無ければ集計対象なし
+        fresh = SessionTable.from_sessions([(1, [("a", 1), ("b", 2)])])
+        self.assertIsNone(backtest(fresh, FixedTableFormula(), min_games=1).pairwise_accuracy)
+
+    def test_distribution(self):
+        table = SessionTable.from_sessions([(1, [("a", 1), ("b", 2), ("c", 24)])])
+        summaries = compare(table, [FixedTableFormula()], bins=(0, 5000, 10000))
+        dist = summaries[0]["distribution"]
+        self.assertEqual(summaries[0]["formula"], "fixed_table")
+        self.assertEqual(dist["players"], 3)
+        self.assertEqual(dist["by_bin"], {"0": 1, "5000": 1, "10000": 1})
+
+
+class TestLoungeBacktestService(IsolatedAsyncioTestCase):
+
+    async def test_load_table(self):
+        scores = {
+            5: [{"user_id": "1", "final_rank": 2}, {"user_id": "2", "final_rank": 1}],
+            6: [{"user_id": "2", "final_rank": 1}, {"user_id": "3", "final_rank": 2, "excluded": True}],
+            7: [{"user_id": "3", "final_rank": 1}, {"user_id": "1", "final_rank": 2}],
+        }
+
+        async def fake_final_scores(session_id):
+            return scores[session_id]
+
+        patcher = patch("services.lounge_backtest_service.LoungeService.get_final_scores", new=fake_final_scores)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        table = await LoungeBacktestService.load_table([5, 6, 7], concurrency=2)
+        self.assertEqual(table.session_ids, [5, 7])
+        self.assertEqual(table.user_ids, ["1", "2", "3"])
+        self.assertEqual(table.ranks.tolist(), [2, 1, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
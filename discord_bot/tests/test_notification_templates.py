@@ -0,0 +1,110 @@
+# tests/test_notification_templates.py
+# common/notification_templates.py のユニットテスト
+# - テンプレートの分解・部分適用（埋め込んだ値の "{" "}" を再解析しない）
+# - 選考結果 DM の本文（部あり / 部なし、否認、補欠、補欠をお断りとして送る場合）
+# - カレンダー URL を部ごとに 1 回だけ生成すること
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.calendar_utils import build_calendar_urls
+from common.notification_templates import MessageTemplate, render_event_notifications
+
+DASHBOARD = "https://dash.example"
+
+EVENT = {
+    "id": 1, "title": "夏祭り", "fee": 500,
+    "event_date": "2026-08-01 18:00:00", "end_date": None, "location": "淡路島",
+}
+SESSIONS = [
+    {"id": 10, "name": "第1部", "event_date": "2026-08-01 10:00:00", "end_date": None, "location": "会場A"},
+    {"id": 11, "name": "第2部", "event_date": None, "end_date": None, "location": None},
+]
+
+
+def _p(pid, approval, session_id=None, notified_at=None):
+    return {"id": pid, "user_id": 1000 + pid, "approval": approval, "session_id": session_id,
+            "access_token": f"tok{pid}", "notified_at": notified_at}
+
+
+class TestMessageTemplate(unittest.TestCase):
+
+    def test_bind_then_render(self):
+        tpl = MessageTemplate.compile("【{title}】{name} さん")
+        bound = tpl.bind(title="{危険}なタイトル")
+        self.assertEqual(bound.fields, ["name"])
+        self.assertEqual(bound.render(name="太郎"), "【{危険}なタイトル】太郎 さん")
+
+    def test_compile_is_cached(self):
+        self.assertIs(MessageTemplate.compile("a {x}"), MessageTemplate.compile("a {x}"))
+
+    def test_missing_field_raises(self):
+        with self.assertRaises(KeyError):
+            MessageTemplate.compile("{x}").render()
+
+
+class TestRenderEventNotifications(unittest.TestCase):
+
+    def test_accepted_with_session(self):
+        (pid, uid, msg), = render_event_notifications(EVENT, SESSIONS, [_p(1, "accepted", 10)], DASHBOARD)
+        cal = build_calendar_urls(title="夏祭り 第1部", start_str="2026-08-01 10:00:00", end_str=None, location="会場A")
+        self.assertEqual((pid, uid), (1, "1001"))
+        self.assertEqual(msg, "\n".join([
+            "【夏祭り】参加確定のお知らせ",
+            "━━━━━━━━━━━━━━━",
+            "✅ 第1部 参加確定",
+            "📅 2026-08-01 10:00:00",
+            "📍 会場A",
+            "💴 参加費: 500円",
+            "",
+            "📆 カレンダーに追加:",
+            f"・Google: <{cal['google']}>",
+            f"・Outlook: <{cal['outlook']}>",
+            "━━━━━━━━━━━━━━━",
+            "詳細確認: https://dash.example/event/confirm/tok1",
+        ]))
+
+    def test_accepted_without_session_uses_event(self):
+        event = dict(EVENT, fee=None)
+        (_, _, msg), = render_event_notifications(event, [], [_p(1, "accepted")], DASHBOARD)
+        self.assertIn("✅ 参加確定\n📅 2026-08-01 18:00:00\n📍 淡路島\n\n", msg)
+        self.assertNotIn("参加費", msg)
+
+    def test_session_without_date_or_location(self):
+        (_, _, msg), = render_event_notifications(EVENT, SESSIONS, [_p(1, "accepted", 11)], DASHBOARD)
+        self.assertIn("✅ 第2部 参加確定\n💴 参加費: 500円\n", msg)
+
+    def test_rejected_waitlist_and_skips(self):
+        participants = [
+            _p(1, "rejected"), _p(2, "waitlist"), _p(3, "pending"),
+            _p(4, "accepted", 10, notified_at="2026-07-01 00:00:00"),
+        ]
+        msgs = render_event_notifications(EVENT, SESSIONS, participants, DASHBOARD)
+        self.assertEqual([m[0] for m in msgs], [1, 2])
+        self.assertTrue(msgs[0][2].startswith("【夏祭り】参加について\n申し訳ございませんが"))
+        self.assertEqual(msgs[1][2], (
+            "【夏祭り】補欠登録のお知らせ\n"
+            "現在補欠となっています。キャンセルが出た場合にご連絡します。\n"
+            "詳細確認: https://dash.example/event/confirm/tok2"
+        ))
+
+    def test_waitlist_as_rejected(self):
+        (_, _, msg), = render_event_notifications(
+            EVENT, SESSIONS, [_p(2, "waitlist")], DASHBOARD, waitlist_as_rejected=True,
+        )
+        self.assertIn("今回は参加をお断り", msg)
+
+    def test_calendar_urls_built_once_per_session(self):
+        participants = [_p(i, "accepted", 10 if i % 2 else 11) for i in range(1, 101)]
+        with patch("common.notification_templates.build_calendar_urls", wraps=build_calendar_urls) as spy:
+            msgs = render_event_notifications(EVENT, SESSIONS, participants, DASHBOARD)
+        self.assertEqual(len(msgs), 100)
+        self.assertEqual(spy.call_count, 2)
+        self.assertTrue(msgs[41][2].endswith("/event/confirm/tok42"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+# tests/test_outbox_service.py
+# services/outbox_service.py のユニットテスト
+# - 通知を積む時のペイロード
+# - drain: 成功分は sent（Bridge 側で notified_at も立つ）、失敗分は指数バックオフで再試行 / 断念
+# - すべて失敗した場合に同じ呼び出しの中で取り直し続けないこと
+# - 承認が変わった参加者の通知は、積み直し・再送のどちらでも現在の状態から描画した本文になること
+import sys
+import os
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from quart import Quart
+
+from common.notification_templates import render_event_notifications
+from routes.event import DASHBOARD_URL, event_bp
+from services.dm_dispatcher import DMDispatcher
+from services.outbox_service import MAX_ATTEMPTS, OutboxService, retry_delay
+
+
+class FakeOutboxBridge:
+    """/outbox 系のエンドポイントだけを持つ Bridge。"""
+
+    def __init__(self, batches):
+        self.batches = list(batches)
+        self.calls = []
+
+    async def request(self, method, path, json=None, params=None):
+        self.calls.append((method, path, json))
+        if path == "/outbox/claim":
+            return self.batches.pop(0) if self.batches else []
+        if path == "/outbox":
+            return {"status": "ok", "enqueued": len(json["items"])}
+        if path.endswith("/event"):
+            return {"event_id": 7, "participant_id": 3}
+        return {"status": "ok"}
+
+    def posted(self, suffix):
+        return [(path, body) for method, path, body in self.calls if path.endswith(suffix)]
+
+
+def _item(outbox_id, user_id, attempts=1):
+    return {"id": outbox_id, "participant_id": outbox_id * 10, "event_id": 7, "user_id": str(user_id),
+            "content": f"msg {outbox_id}", "attempts": attempts}
+
+
+class TestRetryDelay(unittest.TestCase):
+
+    def test_exponential_with_cap(self):
+        self.assertEqual(retry_delay(1), 30)
+        self.assertEqual(retry_delay(2), 60)
+        self.assertEqual(retry_delay(4), 240)
+        self.assertEqual(retry_delay(20), 3600)
+
+
+class TestOutboxService(IsolatedAsyncioTestCase):
+
+    async def _run(self, bridge, coro, ok_users=()):
+        async def fake_send(bot_token, user_id, content):
+            return user_id in ok_users
+
+        with patch("services.outbox_service.bridge_client.request", new=bridge.request), \
+             patch.object(DMDispatcher, "send", new=staticmethod(fake_send)):
+            return await coro
+
+    async def test_enqueue_payload(self):
+        bridge = FakeOutboxBridge([])
+        n = await self._run(bridge, OutboxService.enqueue(7, [(1, "111", "hello"), (2, "222", "bye")]))
+        self.assertEqual(n, 2)
+        _, body = bridge.posted("/outbox")[0]
+        self.assertEqual(body["items"][0], {
+            "participant_id": 1, "kind": "event_result", "event_id": 7, "user_id": 111, "content": "hello",
+        })
+
+    async def test_drain_marks_sent_and_backs_off_failures(self):
+        bridge = FakeOutboxBridge([[_item(1, 100), _item(2, 200, attempts=3), _item(3, 300)]])
+        report = await self._run(bridge, OutboxService.drain("tok", event_id=7), ok_users={"100", "300"})
+
+        self.assertEqual(report["claimed"], 3)
+        self.assertEqual(report["sent"], 2)
+        self.assertEqual(sorted(p for p, _ in bridge.posted("/sent")), ["/outbox/1/sent", "/outbox/3/sent"])
+        (path, body), = bridge.posted("/failed")
+        self.assertEqual(path, "/outbox/2/failed")
+        self.assertEqual(body["retry_in_seconds"], retry_delay(3))
+        self.assertFalse(body["give_up"])
+        # claim はイベント指定付きで、空になるまで繰り返す
+        claims = bridge.posted("/claim")
+        self.assertEqual(len(claims), 2)
+        self.assertEqual(claims[0][1]["event_id"], 7)
+
+    async def test_gives_up_after_max_attempts(self):
+        bridge = FakeOutboxBridge([[_item(1, 100, attempts=MAX_ATTEMPTS)], [_item(9, 900)]])
+        report = await self._run(bridge, OutboxService.drain("tok"))
+
+        (_, body), = bridge.posted("/failed")
+        self.assertTrue(body["give_up"])
+        # 全件失敗したら取り直さずに戻る
+        self.assertEqual(report["claimed"], 1)
+        self.assertEqual(len(bridge.posted("/claim")), 1)
+
+    async def test_missing_token_does_not_claim(self):
+        bridge = FakeOutboxBridge([[_item(1, 100)]])
+        report = await self._run(bridge, OutboxService.drain(None))
+        self.assertEqual(report["claimed"], 0)
+        self.assertEqual(bridge.calls, [])
+
+
+class TestRenotifyAfterApprovalChange(IsolatedAsyncioTestCase):
+
+    EVENT = {"id": 7, "title": "夏祭り", "status": "open", "fee": 0,
+             "event_date": "2026-08-01 18:00:00", "end_date": None, "location": None}
+
+    def setUp(self):
+        self.participant = {"id": 3, "user_id": 1003, "approval": "accepted", "session_id": None,
+                            "access_token": "tok3", "notified_at": None}
+        self.bridge = FakeOutboxBridge([])
+
+        async def get_event(event_id):
+            return {"event": self.EVENT, "sessions": []}
+
+        async def list_participants(event_id):
+            return [dict(self.participant)]
+
+        async def can_manage_event(user_id, event_id):
+            return True
+
+        async def fake_send(bot_token, user_id, content):
+            return False
+
+        for target, new in [
+            ("services.outbox_service.bridge_client.request", self.bridge.request),
+            ("routes.event.EventService.get_event", get_event),
+            ("routes.event.EventService.list_participants", list_participants),
+            ("routes.event.AccessControlService.can_manage_event", can_manage_event),
+            ("services.dm_dispatcher.DMDispatcher.send", fake_send),
+        ]:
+            patcher = patch(target, new=new)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _render(self):
+        (pid, user_id, content), = render_event_notifications(self.EVENT, [], [self.participant], DASHBOARD_URL)
+        return pid, user_id, content
+
+    async def test_changed_approval_is_reenqueued_and_requeued_with_current_text(self):
+        await OutboxService.enqueue(7, [self._render()])
+        accepted = self.bridge.posted("/outbox")[0][1]["items"][0]["content"]
+
+        # 送信に失敗した後で否認に変わった
+        self.participant["approval"] = "rejected"
+        await OutboxService.enqueue(7, [self._render()])
+        item = self.bridge.posted("/outbox")[1][1]["items"][0]
+        self.assertEqual((item["participant_id"], item["user_id"]), (3, 1003))
+        self.assertNotEqual(item["content"], accepted)
+        self.assertEqual(item["content"], self._render()[2])
+
+        # 管理画面の「再送」も積んだ時の本文ではなく現在の状態から描画し直す
+        app = Quart(__name__)
+        app.secret_key = "test"
+        app.register_blueprint(event_bp)
+        client = app.test_client()
+        async with client.session_transaction() as sess:
+            sess["discord_user"] = {"id": "42"}
+        res = await client.post("/event/api/7/outbox/5/requeue")
+        self.assertEqual(res.status_code, 200)
+        (path, body), = self.bridge.posted("/requeue")
+        self.assertEqual(path, "/outbox/5/requeue")
+        self.assertEqual(body, {"user_id": 1003, "content": self._render()[2]})
+
+        # 通知の対象でなくなった（未選考に戻った）参加者は再送しない
+        self.participant["approval"] = "pending"
+        res = await client.post("/event/api/7/outbox/5/requeue")
+        self.assertEqual(res.status_code, 409)
+        self.assertEqual(len(self.bridge.posted("/requeue")), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
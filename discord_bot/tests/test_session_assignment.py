@@ -0,0 +1,166 @@
+# tests/test_session_assignment.py
+# common/session_assignment.py / EventService の割り当てのユニットテスト
+# - 貪欲法では埋まらない組み合わせでも確定数・希望順位を最適化すること
+# - 同じ条件なら先に応募した人を優先すること（同順位の応募者が多数いても総希望順位を優先すること）
+# - 承認/否認済み・不参加の扱い、部制なしの定員
+# - 確定に送るのは変更分のみで、計画時の approval を付けること
+# - 締切処理の自動割り当ては衝突時に計算し直すこと
+import sys
+import os
+import itertools
+import json
+import random
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.session_assignment import parse_preferences, plan_assignment
+from services.event_service import EventService
+
+
+def _p(pid, prefs, approval="pending", session_id=None):
+    return {"id": pid, "approval": approval, "session_id": session_id,
+            "preferred_session_ids": None if prefs is None else json.dumps(prefs)}
+
+
+def _by_id(plan):
+    return {a.participant_id: a for a in plan.assignments}
+
+
+class TestParsePreferences(unittest.TestCase):
+
+    def test_formats(self):
+        self.assertIsNone(parse_preferences(None))
+        self.assertEqual(parse_preferences("[]"), [])
+        self.assertEqual(parse_preferences("[2, 1, 2]"), [2, 1])
+        self.assertEqual(parse_preferences([3, "4", "x"]), [3, 4])
+        self.assertEqual(parse_preferences("broken"), [])
+
+
+class TestPlanAssignment(unittest.TestCase):
+
+    SESSIONS = [{"id": 1, "capacity": 1}, {"id": 2, "capacity": 1}]
+
+    def test_beats_greedy(self):
+        # 応募順の貪欲法だと 1 番が部 1 を取り、部 1 しか希望していない 2 番が溢れる
+        plan = plan_assignment(self.SESSIONS, [_p(1, [1, 2]), _p(2, [1])], allow_unpreferred=False)
+        got = _by_id(plan)
+        self.assertEqual((got[1].session_id, got[1].rank), (2, 1))
+        self.assertEqual((got[2].session_id, got[2].rank), (1, 0))
+        self.assertEqual(plan.summary()["accepted"], 2)
+
+    def test_prefers_lower_rank_over_unpreferred(self):
+        plan = plan_assignment(self.SESSIONS, [_p(1, [1, 2]), _p(2, [1])])
+        got = _by_id(plan)
+        self.assertEqual(got[2].session_id, 1)
+        self.assertEqual(plan.summary()["by_rank"], {"1": 1, "2": 1})
+
+    def test_earlier_applicant_wins_ties(self):
+        plan = plan_assignment([{"id": 1, "capacity": 1}], [_p(5, [1]), _p(3, [1])], allow_unpreferred=False)
+        got = _by_id(plan)
+        self.assertEqual(got[3].approval, "accepted")
+        self.assertEqual(got[5].approval, "waitlist")
+
+    def test_fixed_and_absent_participants(self):
+        participants = [
+            _p(1, [1], approval="accepted", session_id=1),
+            _p(2, [1], approval="rejected"),
+            _p(3, None),
+            _p(4, [1]),
+            _p(5, []),
+        ]
+        plan = plan_assignment(self.SESSIONS, participants)
+        got = _by_id(plan)
+        self.assertEqual(set(got), {4, 5})
+        # 部 1 は承認済みで満席 → 希望外の部 2 へ。部の希望なし（[]）は空きがなく補欠
+        self.assertEqual((got[4].session_id, got[4].rank), (2, None))
+        self.assertEqual(got[5].approval, "waitlist")
+        self.assertEqual(plan.session_load[1], {"accepted": 1, "capacity": 1})
+
+    def test_without_sessions_uses_event_capacity(self):
+        participants = [_p(1, [], approval="accepted"), _p(2, []), _p(3, []), _p(4, None)]
+        plan = plan_assignment([], participants, event_capacity=2)
+        got = _by_id(plan)
+        self.assertEqual((got[2].approval, got[3].approval), ("accepted", "waitlist"))
+        self.assertEqual(plan.session_load[None], {"accepted": 2, "capacity": 2})
+
+    def test_items_only_changes(self):
+        participants = [_p(1, [1], approval="waitlist"), _p(2, [2], approval="pending")]
+        plan = plan_assignment([{"id": 1, "capacity": 0}, {"id": 2, "capacity": None}], participants,
+                               allow_unpreferred=False)
+        self.assertEqual(plan.items(), [
+            {"participant_id": 2, "approval": "accepted", "session_id": 2, "expected_approval": "pending"},
+        ])
+
+    def test_many_tied_units_keep_rank_then_applicant_order(self):
+        # 同じ希望の応募者が複数いるグループが並ぶ場合も、総希望順位を最小にしたうえで先着順
+        sessions = [{"id": 1, "capacity": 2}, {"id": 2, "capacity": 2}]
+        participants = [_p(i, [1, 2] if i % 2 else [2, 1]) for i in range(1, 7)]
+        got = _by_id(plan_assignment(sessions, participants, allow_unpreferred=False))
+        self.assertEqual({pid: got[pid].session_id for pid in got}, {1: 1, 2: 2, 3: 1, 4: 2, 5: None, 6: None})
+        self.assertTrue(all(got[pid].rank == 0 for pid in (1, 2, 3, 4)))
+
+    def test_matches_brute_force_on_small_events(self):
+        # (確定数 最大, 総希望順位 最小, 確定した応募者のグループ順の和 最小) の辞書式最適と一致すること
+        rng = random.Random(5)
+        for _ in range(300):
+            sessions = [{"id": sid, "capacity": rng.randint(1, 2)} for sid in (1, 2, 3)]
+            participants = [_p(i, rng.sample([1, 2, 3], rng.randint(1, 3))) for i in range(1, 7)]
+            prefs = {p["id"]: json.loads(p["preferred_session_ids"]) for p in participants}
+            group_of = {}
+            for pid in sorted(prefs):
+                group_of.setdefault(tuple(prefs[pid]), len(group_of))
+
+            def key(seats):
+                ranks = [prefs[pid].index(sid) for pid, sid in seats.items() if sid is not None]
+                tie = sum(group_of[tuple(prefs[pid])] for pid, sid in seats.items() if sid is not None)
+                return (-len(ranks), sum(ranks), tie)
+
+            best = None
+            pids = sorted(prefs)
+            for choice in itertools.product(*[[None] + prefs[pid] for pid in pids]):
+                if all(choice.count(s["id"]) <= s["capacity"] for s in sessions):
+                    k = key(dict(zip(pids, choice)))
+                    best = k if best is None or k < best else best
+
+            plan = plan_assignment(sessions, participants, allow_unpreferred=False)
+            self.assertEqual(key({a.participant_id: a.session_id for a in plan.assignments}), best)
+
+    def test_large_event_fills_all_seats(self):
+        rng = random.Random(3)
+        sessions = [{"id": 10 + i, "capacity": 300} for i in range(5)]
+        participants = [_p(i, rng.sample([10, 11, 12, 13, 14], rng.randint(1, 3))) for i in range(1, 3001)]
+        plan = plan_assignment(sessions, participants)
+        summary = plan.summary()
+        self.assertEqual(summary["accepted"], 1500)
+        self.assertEqual(summary["waitlist"], 1500)
+        self.assertTrue(all(load["accepted"] == 300 for load in plan.session_load.values()))
+
+
+class TestAutoAssign(IsolatedAsyncioTestCase):
+
+    async def test_replans_on_conflict(self):
+        responses = [{"status": "conflict", "reason": "stale", "participant_ids": [1]},
+                     {"status": "ok", "updated": 1, "participants": []}]
+        commits = []
+
+        async def fake_request(method, path, json=None, params=None):
+            if path == "/events/7":
+                return {"event": {"id": 7, "capacity": None}, "sessions": [{"id": 1, "capacity": 5}]}
+            if path == "/events/7/participants":
+                return [_p(1, [1])]
+            if path == "/events/7/assignments":
+                commits.append(json["items"])
+                return responses.pop(0)
+            return None
+
+        with patch("services.event_service.bridge_client.request", new=fake_request):
+            self.assertTrue(await EventService.auto_assign(7))
+        self.assertEqual(len(commits), 2)
+        self.assertEqual(commits[0][0]["session_id"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
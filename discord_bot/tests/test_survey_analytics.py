@@ -0,0 +1,80 @@
+# tests/test_survey_analytics.py
+# common/survey_analytics.py のユニットテスト
+# - 選択肢ごとのビットマップによる件数集計
+# - 絞り込み（質問内 OR / 質問間 AND）
+# - クロス集計（複数回答・選択肢外の値・旧形式キー）
+import sys
+import os
+from unittest import TestCase
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.survey_analytics import ResponseTable
+from common.survey_utils import compile_questions
+
+_QUESTIONS = (
+    '[{"text": "名前", "type": "text"},'
+    ' {"text": "学年", "type": "radio", "options": ["1年", "2年"], "has_other": true},'
+    ' {"text": "趣味", "type": "checkbox", "options": ["A", "B", "C"]}]'
+)
+
+_ANSWERS = [
+    {"0": "a", "1": "1年", "2": ["A", "B"]},
+    {"0": "b", "1": "1年", "2": ["B"]},
+    {"0": "c", "1": "2年", "2[]": ["A"]},   # 旧形式のキー
+    {"0": "d", "1": "OB"},                 # 選択肢外（その他の自由記述）
+    {"0": "e", "2": ["C"]},                # 学年未回答
+]
+
+
+class TestResponseTable(TestCase):
+
+    def setUp(self):
+        self.table = ResponseTable(compile_questions(_QUESTIONS), _ANSWERS)
+
+    def test_counts(self):
+        counts = self.table.counts()
+        self.assertEqual(self.table.size, 5)
+        self.assertNotIn("0", counts)  # 自由記述は索引化しない
+        self.assertEqual(counts["1"]["counts"], {"1年": 2, "2年": 1, "OB": 1})
+        self.assertEqual(counts["1"]["answered"], 4)
+        self.assertEqual(counts["2"]["counts"], {"A": 2, "B": 2, "C": 1})
+
+    def test_filter_or_within_and_across(self):
+        """同じ質問内は OR、質問間は AND"""
+        self.assertEqual(self.table.filter_mask({"2": ["A", "C"]}).bit_count(), 3)
+        mask = self.table.filter_mask({"1": ["1年"], "2": ["B"]})
+        self.assertEqual(mask.bit_count(), 2)
+        self.assertEqual(self.table.counts(mask)["2"]["counts"], {"A": 1, "B": 2, "C": 0})
+        self.assertEqual(self.table.filter_mask({"1": ["3年"]}), 0)
+
+    def test_crosstab(self):
+        ct = self.table.crosstab("1", "2")
+        self.assertEqual(ct["row"]["labels"], ["1年", "2年", "OB"])
+        self.assertEqual(ct["col"]["labels"], ["A", "B", "C"])
+        self.assertEqual(ct["cells"], [[1, 2, 0], [1, 0, 0], [0, 0, 0]])
+        self.assertEqual(ct["row_totals"], [2, 1, 1])
+        self.assertEqual(ct["col_totals"], [2, 2, 1])
+        self.assertEqual(ct["both_answered"], 3)
+
+    def test_crosstab_with_filter(self):
+        mask = self.table.filter_mask({"2": ["A"]})
+        ct = self.table.crosstab("1", "2", mask)
+        self.assertEqual(ct["cells"][0], [1, 1, 0])
+        self.assertEqual(ct["row_totals"], [1, 1, 0])
+
+    def test_non_choice_question_raises(self):
+        with self.assertRaises(KeyError):
+            self.table.filter_mask({"0": ["a"]})
+        with self.assertRaises(KeyError):
+            self.table.crosstab("0", "1")
+
+    def test_empty_table(self):
+        table = ResponseTable(compile_questions(_QUESTIONS), [])
+        self.assertEqual(table.size, 0)
+        self.assertEqual(table.crosstab("1", "2")["cells"], [[0, 0, 0], [0, 0, 0]])
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
@@ -0,0 +1,103 @@
+# tests/test_survey_service.py
+# services/survey_service.py のユニットテスト
+# - 回答一覧のキーセットページング（カーソル・フィルタの受け渡し）
+# - 2 ページ目以降の取得失敗で途中までの回答を全件として返さないこと
+import sys
+import os
+import json
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import AsyncMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.survey_utils import compile_questions, decode_cursor
+from services.survey_analytics_service import SurveyAnalyticsService
+from services.survey_service import SurveyResponsesError, SurveyService
+
+
+def _item(i):
+    return {"id": i, "user_name": f"u{i}", "answers": "{}", "submitted_at": f"2026-06-14 12:00:{i:02d}"}
+
+
+class TestResponsesPage(IsolatedAsyncioTestCase):
+
+    async def test_first_page_and_cursor(self):
+        """先頭ページではカーソルを送らず、next_cursor を不透明な文字列で返す"""
+        mock = AsyncMock(return_value={
+            "items": [_item(3), _item(2)],
+            "next_cursor": {"submitted_at": "2026-06-14 12:00:02", "id": 2},
+            "total": 3,
+        })
+        with patch("services.survey_service.bridge_client.request", new=mock):
+            page = await SurveyService.get_responses_page(10, limit=2, filters={"1": "赤"})
+
+        mock.assert_awaited_once_with(
+            "GET", "/surveys/10/responses/page",
+            params={"limit": 2, "filters": '{"1": "赤"}'},
+        )
+        self.assertEqual(page["total"], 3)
+        self.assertEqual(decode_cursor(page["next_cursor"]), ("2026-06-14 12:00:02", 2))
+
+    async def test_iter_pages_follows_cursor(self):
+        """iter_response_pages は next_cursor が無くなるまで順に取得する"""
+        pages = [
+            {"items": [_item(3), _item(2)], "next_cursor": {"submitted_at": "2026-06-14 12:00:02", "id": 2}, "total": 3},
+            {"items": [_item(1)], "next_cursor": None, "total": None},
+        ]
+        mock = AsyncMock(side_effect=pages)
+        with patch("services.survey_service.bridge_client.request", new=mock):
+            got = [page async for page in SurveyService.iter_response_pages(10, page_size=2)]
+
+        self.assertEqual([[r["id"] for r in p] for p in got], [[3, 2], [1]])
+        second_params = mock.await_args_list[1].kwargs["params"]
+        self.assertEqual((second_params["before_at"], second_params["before_id"]), ("2026-06-14 12:00:02", 2))
+
+    async def test_bridge_error_returns_empty_page(self):
+        mock = AsyncMock(return_value=None)
+        with patch("services.survey_service.bridge_client.request", new=mock):
+            page = await SurveyService.get_responses_page(10)
+        self.assertEqual(page, {"items": [], "next_cursor": None, "total": 0})
+
+    async def test_results_summary_params(self):
+        """結果画面の集計は質問の種類を渡して 1 往復で取得する"""
+        schema = compile_questions(json.dumps([
+            {"text": "名前", "type": "text"},
+            {"text": "色", "type": "radio", "options": ["赤", "青"]},
+            {"text": "趣味", "type": "checkbox", "options": ["A", "B"]},
+        ]))
+        mock = AsyncMock(return_value={"total": 0, "questions": {}})
+        with patch("services.survey_service.bridge_client.request", new=mock):
+            self.assertEqual(await SurveyService.get_results_summary(10, schema), {"total": 0, "questions": {}})
+        mock.assert_awaited_once_with(
+            "GET", "/surveys/10/responses/summary",
+            params={"choice": "1,2", "text": "0", "multi": "2", "text_limit": 20},
+        )
+
+        with patch("services.survey_service.bridge_client.request", new=AsyncMock(return_value=None)):
+            self.assertIsNone(await SurveyService.get_results_summary(10, schema))
+
+    async def test_bridge_error_on_later_page_raises(self):
+        """途中のページで失敗したら打ち切らずに送出し、不完全な索引をキャッシュしない"""
+        pages = [
+            {"items": [_item(3), _item(2)], "next_cursor": {"submitted_at": "2026-06-14 12:00:02", "id": 2}, "total": 3},
+            None,
+        ]
+        got = []
+        with patch("services.survey_service.bridge_client.request", new=AsyncMock(side_effect=pages)):
+            with self.assertRaises(SurveyResponsesError):
+                async for page in SurveyService.iter_response_pages(10, page_size=2):
+                    got.append(page)
+        self.assertEqual(len(got), 1)
+
+        SurveyAnalyticsService.clear()
+        self.addCleanup(SurveyAnalyticsService.clear)
+        schema = compile_questions(json.dumps([{"text": "色", "type": "radio", "options": ["赤", "青"]}]))
+        with patch("services.survey_service.bridge_client.request", new=AsyncMock(side_effect=pages)):
+            with self.assertRaises(SurveyResponsesError):
+                await SurveyAnalyticsService.get_table(10, schema)
+        self.assertEqual(len(SurveyAnalyticsService._tables), 0)
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
@@ -1,6 +1,8 @@
 # tests/test_survey_utils.py
 # common/survey_utils.py のユニットテスト
 # - parse_questions の正常系・異常系（不正JSON、空リスト等）
+# - compile_questions のメモ化・不変性、回答の検証/正規化
+# - 回答ページングのカーソル、Bridge の集計から結果画面の集計への変換
 import sys
 import os
 from unittest import TestCase
@@ -8,7 +10,15 @@ from unittest import TestCase
 # プロジェクトルートをパスに追加
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from common.survey_utils import parse_questions
+from common.survey_utils import (
+    TEXT_PREVIEW_LIMIT,
+    clear_schema_cache,
+    compile_questions,
+    decode_cursor,
+    encode_cursor,
+    parse_questions,
+    results_stats_from_summary,
+)
 
 
 class TestParseQuestions(TestCase):
@@ -73,6 +83,120 @@ class TestParseQuestions(TestCase):
         self.assertEqual(result, [])
 
 
+class _FakeForm(dict):
+    """get / getlist を持つ MultiDict 代替（値は常にリストで保持）"""
+
+    def get(self, key, default=None):
+        values = super().get(key)
+        return values[0] if values else default
+
+    def getlist(self, key):
+        return list(super().get(key, []))
+
+
+_SURVEY_JSON = (
+    '[{"text": "名前", "type": "text"},'
+    ' {"text": "色", "type": "radio", "options": ["赤", "青"], "has_other": true},'
+    ' {"text": "趣味", "type": "checkbox", "options": ["A", "B"],'
+    '  "logic": {"trigger_idx": 1, "trigger_val": "赤"}}]'
+)
+
+
+class TestCompileQuestions(TestCase):
+    """compile_questions / QuestionSchema のテスト"""
+
+    def setUp(self):
+        clear_schema_cache()
+
+    def test_same_content_is_memoized(self):
+        """同じ内容の文字列は同一のスキーマを返す"""
+        a = compile_questions(_SURVEY_JSON)
+        b = compile_questions(str(_SURVEY_JSON))
+        self.assertIs(a, b)
+        self.assertEqual(len(a), 3)
+        self.assertEqual(a[1].option_set, frozenset({"赤", "青"}))
+        self.assertTrue(a[2].is_multi)
+
+    def test_schema_is_immutable(self):
+        """スキーマ・質問オブジェクトは変更できない"""
+        schema = compile_questions(_SURVEY_JSON)
+        with self.assertRaises(AttributeError):
+            schema[0].text = "x"
+        with self.assertRaises(AttributeError):
+            schema.questions = ()
+
+    def test_parse_questions_returns_fresh_copies(self):
+        """parse_questions の戻り値を変更してもキャッシュに影響しない"""
+        first = parse_questions(_SURVEY_JSON)
+        first[1]['options'].append('緑')
+        first[2]['logic']['trigger_val'] = '青'
+        second = parse_questions(_SURVEY_JSON)
+        self.assertEqual(second[1]['options'], ['赤', '青'])
+        self.assertEqual(second[2]['logic'], {"trigger_idx": 1, "trigger_val": "赤"})
+
+    def test_normalize_answers(self):
+        """回答の正規化: 「その他」の置換、選択肢外の値とスキーマ外キーの除外"""
+        form = _FakeForm({
+            'q_0': ['太郎'],
+            'q_1': ['__other__'],
+            'q_1_other': ['  紫 '],
+            'q_2[]': ['A', 'Z', 'A'],
+            'q_9': ['unknown'],
+        })
+        answers = compile_questions(_SURVEY_JSON).normalize_answers(form)
+        self.assertEqual(answers, {'0': '太郎', '1': '紫', '2': ['A']})
+
+    def test_normalize_rejects_invalid_choice(self):
+        """選択肢に無い値は保存しない。空の「その他」は 'その他' になる"""
+        schema = compile_questions(_SURVEY_JSON)
+        self.assertEqual(schema.normalize_answers(_FakeForm({'q_1': ['黄']})), {})
+        self.assertEqual(
+            schema.normalize_answers(_FakeForm({'q_1': ['__other__'], 'q_1_other': ['']})),
+            {'1': 'その他'},
+        )
+        # has_other でない質問の __other__ は無視される
+        self.assertEqual(schema.normalize_answers(_FakeForm({'q_2[]': ['__other__']})), {'2': []})
+
+    def test_answer_of_reads_legacy_multi_key(self):
+        """旧形式（"2[]" キー）で保存された複数回答も読み出せる"""
+        schema = compile_questions(_SURVEY_JSON)
+        self.assertEqual(schema[2].answer_of({'2[]': ['B']}), ['B'])
+        self.assertEqual(schema[2].answer_of({'2': ['A']}), ['A'])
+
+
+class TestResponsePaging(TestCase):
+    """カーソルと逐次集計のテスト"""
+
+    def test_cursor_round_trip(self):
+        cursor = encode_cursor("2026-06-14 12:00:00", 42)
+        self.assertNotIn("=", cursor)
+        self.assertEqual(decode_cursor(cursor), ("2026-06-14 12:00:00", 42))
+
+    def test_invalid_cursor_is_first_page(self):
+        """壊れたカーソルは先頭ページ扱い（None）"""
+        self.assertIsNone(decode_cursor(None))
+        self.assertIsNone(decode_cursor("!!!"))
+        self.assertIsNone(decode_cursor(encode_cursor("x", 1)[:-3]))
+
+    def test_stats_from_summary(self):
+        """Bridge の集計: 選択肢の件数は出現順のまま、自由記述はプレビュー件数まで、集計の無い質問は 0 件"""
+        schema = compile_questions(_SURVEY_JSON)
+        summary = {
+            'total': 30,
+            'questions': {
+                '0': {'total': 30, 'texts': [f'name{i}' for i in range(TEXT_PREVIEW_LIMIT + 5)]},
+                '1': {'total': 26, 'counts': [['青', 1], ['赤', 25]]},
+            },
+        }
+        stats = results_stats_from_summary(schema, summary)
+
+        self.assertEqual(stats['0']['total'], 30)
+        self.assertEqual(len(stats['0']['texts']), TEXT_PREVIEW_LIMIT)
+        self.assertEqual(list(stats['1']['counts'].items()), [('青', 1), ('赤', 25)])
+        self.assertEqual(stats['1']['question'], '色')
+        self.assertEqual((stats['2']['total'], stats['2']['counts']), (0, {}))
+
+
 if __name__ == '__main__':
     import unittest
     unittest.main()
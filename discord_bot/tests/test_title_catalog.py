@@ -0,0 +1,79 @@
+# tests/test_title_catalog.py
+# common/title_catalog.py / TitleService.get_catalog のユニットテスト
+# - 無効な称号を索引に含めず、ID で引けること
+# - 表示するランク称号は保有している称号（スタッフ付与を含む）の最上位から引くこと
+# - 称号マスタは 1 回だけ読み込み、upsert / delete で破棄されること
+import sys
+import os
+import asyncio
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.title_catalog import TitleCatalog
+from services.tournament_service import TitleService
+
+TITLES = [
+    {"id": 3, "name": "Gold", "unlock_type": "lounge_rank", "unlock_threshold": 2000, "is_active": True},
+    {"id": 1, "name": "Bronze", "unlock_type": "lounge_rank", "unlock_threshold": 1000, "is_active": True},
+    {"id": 2, "name": "Silver", "unlock_type": "lounge_rank", "unlock_threshold": 1500, "is_active": True},
+    {"id": 4, "name": "Platinum", "unlock_type": "lounge_rank", "unlock_threshold": 2500, "is_active": False},
+    {"id": 5, "name": "3冠", "unlock_type": "tournament_win", "unlock_threshold": 3, "is_active": True},
+    {"id": 6, "name": "名誉", "unlock_type": "manual", "unlock_threshold": None, "is_active": True},
+]
+
+
+class TestTitleCatalog(unittest.TestCase):
+
+    def test_lookup(self):
+        catalog = TitleCatalog(TITLES)
+        self.assertEqual(len(catalog), 5)
+        self.assertIsNone(catalog.get(4))  # 無効な称号は含めない
+        self.assertEqual(catalog.highest_held("tournament_win", [5, 3])["id"], 5)
+        self.assertIsNone(catalog.highest_held("manual", [6]))  # 閾値の無い称号は順位付けしない
+        self.assertEqual(catalog.get("6")["name"], "名誉")
+
+    def test_held_rank_title(self):
+        catalog = TitleCatalog(TITLES)
+        self.assertIsNone(catalog.held_rank_title([]))
+        self.assertIsNone(catalog.held_rank_title([5, 6]))
+        # MMR に関係なく保有している最上位（スタッフが Gold だけを付与した場合も Gold）
+        self.assertEqual(catalog.held_rank_title([3])["name"], "Gold")
+        self.assertEqual(catalog.held_rank_title(["1", 2, 5])["name"], "Silver")
+        self.assertEqual(catalog.held_rank_title([1, 4])["name"], "Bronze")  # 無効な Platinum は対象外
+
+
+class TestTitleServiceCatalog(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        TitleService.invalidate_catalog()
+        self.addCleanup(TitleService.invalidate_catalog)
+        self.calls = []
+
+        async def fake_request(method, path, json=None, params=None):
+            self.calls.append((method, path))
+            await asyncio.sleep(0)
+            if method == "GET":
+                return TITLES
+            return {"status": "ok", "id": 7}
+
+        patcher = patch("services.tournament_service.bridge_client.request", new=fake_request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_loaded_once_and_invalidated(self):
+        catalogs = await asyncio.gather(*[TitleService.get_catalog() for _ in range(5)])
+        self.assertTrue(all(c is catalogs[0] for c in catalogs))
+        self.assertEqual(self.calls, [("GET", "/titles")])
+
+        await TitleService.upsert("Diamond", None, "lounge_rank", 3000, None)
+        await TitleService.get_catalog()
+        await TitleService.delete(7)
+        await TitleService.get_catalog()
+        self.assertEqual([c for c in self.calls if c[0] == "GET"], [("GET", "/titles")] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+# tests/test_title_role_reconcile.py
+# common/title_role_reconcile.py / services/title_role_reconciler.py のユニットテスト
+# - 装備中の称号のロールだけを持ち、装備なしは未獲得の称号ロールだけ外すこと
+# - 称号に紐づかないロールには触れず、ロール名のずれだけを PATCH すること
+# - dry-run では Discord に書き込まず、適用時は差分の操作だけを送ること
+import sys
+import os
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.guild_role_index import GuildRoleIndex
+from common.title_role_reconcile import plan_title_roles
+from services.title_role_reconciler import TitleRoleReconciler
+
+TITLES = [
+    {"id": 1, "name": "鉄", "discord_role_id": "101"},
+    {"id": 2, "name": "銅", "discord_role_id": "102"},
+    {"id": 3, "name": "覇者", "discord_role_id": "103"},
+    {"id": 4, "name": "特別", "discord_role_id": None},
+    {"id": 5, "name": "消えた称号", "discord_role_id": "999"},
+]
+ROLES = {"101": {"id": "101", "name": "鉄"}, "102": {"id": "102", "name": "銅"},
+         "103": {"id": "103", "name": "旧名"}, "500": {"id": "500", "name": "Booster"}}
+EARNED = [{"user_id": "1", "title_id": 1}, {"user_id": "1", "title_id": 2},
+          {"user_id": "2", "title_id": 1}, {"user_id": "3", "title_id": 3}]
+ACTIVE = [{"user_id": "1", "title_id": 2}, {"user_id": "3", "title_id": 3}, {"user_id": "9", "title_id": 1}]
+
+
+def _ops(ops):
+    return sorted((op.kind, op.user_id, op.role_id) for op in ops)
+
+
+class TestPlanTitleRoles(unittest.TestCase):
+
+    def test_diff(self):
+        members = {
+            "1": ["101", "500"],  # 装備: 銅 → 鉄を外して銅を付ける（Booster は触らない）
+            "2": ["101", "103"],  # 装備なし: 獲得済みの鉄は残し、未獲得の覇者は外す
+            "3": ["103"],         # 装備どおり → 操作なし
+            "4": [],              # 称号なし → 操作なし
+        }
+        plan = plan_title_roles(TITLES, EARNED, ACTIVE, members, ROLES)
+        self.assertEqual(_ops(plan.adds), [("add", "1", "102")])
+        self.assertEqual(_ops(plan.removes), [("remove", "1", "101"), ("remove", "2", "103")])
+        self.assertEqual([(p.role_id, dict(p.fields)) for p in plan.patches], [("103", {"name": "覇者"})])
+        reasons = sorted(s["reason"] for s in plan.skipped)
+        self.assertEqual(reasons, ["not_in_guild", "role_missing"])
+        self.assertEqual(plan.summary(), {"patch": 1, "remove": 2, "add": 1, "skipped": 2})
+
+    def test_converged_state_has_no_operations(self):
+        members = {"1": ["102"], "2": ["101"], "3": ["103"]}
+        roles = dict(ROLES, **{"103": {"id": "103", "name": "覇者"}})
+        self.assertEqual(len(plan_title_roles(TITLES, EARNED, ACTIVE, members, roles)), 0)
+
+
+class TestTitleRoleReconciler(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.sent = []
+
+        async def list_all():
+            return TITLES
+
+        async def list_holdings():
+            return {"earned": EARNED, "active": ACTIVE}
+
+        async def get_index(guild_id, reload=False):
+            return GuildRoleIndex(guild_id, ROLES.values())
+
+        async def add(guild_id, user_id, role_id, reason=None):
+            self.sent.append(("add", user_id, role_id))
+            return True
+
+        async def remove(guild_id, user_id, role_id, reason=None):
+            self.sent.append(("remove", user_id, role_id))
+            return role_id != "103"
+
+        async def edit(guild_id, role_id, reason=None, **fields):
+            self.sent.append(("patch", None, role_id))
+            return 200
+
+        for target, fn in (
+            ("services.title_role_reconciler.TitleService.list_all", list_all),
+            ("services.title_role_reconciler.TitleService.list_holdings", list_holdings),
+            ("services.title_role_reconciler.DiscordRoleService.get_index", get_index),
+            ("services.title_role_reconciler.DiscordRoleService.add_member_role", add),
+            ("services.title_role_reconciler.DiscordRoleService.remove_member_role", remove),
+            ("services.title_role_reconciler.DiscordRoleService.edit_role", edit),
+        ):
+            patcher = patch(target, new=fn)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.members = {"1": ["101"], "2": ["103"], "3": ["103"]}
+
+    async def test_dry_run_does_not_write(self):
+        report = await TitleRoleReconciler.reconcile("g", dry_run=True, members=self.members)
+        self.assertTrue(report["dry_run"])
+        self.assertEqual(report["summary"]["add"], 1)
+        self.assertEqual(self.sent, [])
+
+    async def test_apply_sends_only_diff(self):
+        report = await TitleRoleReconciler.reconcile("g", members=self.members, concurrency=2)
+        self.assertEqual(self.sent[0], ("patch", None, "103"))  # ロール名の修正が先
+        self.assertEqual(sorted(self.sent[1:]), [("add", "1", "102"), ("remove", "1", "101"),
+                                                 ("remove", "2", "103")])
+        self.assertEqual((report["applied"], report["failed"]), (3, 1))
+        self.assertEqual(report["failures"], [{"kind": "remove", "role_id": "103", "user_id": "2"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+# tests/test_tournament_export.py
+# common/tournament_export.py / TournamentExportService のユニットテスト
+# - 参加者・試合（続けてそのスコア）・総合順位を共通の列の CSV / 値のある列だけの JSON Lines にすること
+# - 試合はページ単位で取得し、次のページを先読みしながら書き出すこと
+# - ユーザー名は参加者一覧 → ユーザーディレクトリの順に引くこと
+# - 1 ページ目が取れなければ None、途中のページで失敗したら例外で打ち切ること
+import sys
+import os
+import asyncio
+import csv
+import io
+import json
+import unittest
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.tournament_export import (
+    EXPORT_COLUMNS, FORMAT_CSV, FORMAT_JSONL, encode_header, encode_records, match_records, standing_records,
+)
+from services.tournament_export_service import TournamentExportError, TournamentExportService
+from services.user_directory_service import UserDirectoryService
+
+NAMES = {"1": "alice", "2": "bob"}.get
+
+
+class TestEncoding(unittest.TestCase):
+
+    def test_csv_and_jsonl(self):
+        match = {"match_id": 5, "round_num": 1, "match_index": 0, "status": "finished",
+                 "player1_id": 1, "player2_id": 2, "winner_id": "2", "score1": 1, "score2": 2,
+                 "scores": [{"user_id": "2", "position": 1, "points": 10, "status": "approved"}]}
+        records = list(match_records([match], NAMES))
+        self.assertEqual([r["section"] for r in records], ["match", "score"])
+        self.assertEqual((records[0]["player1_name"], records[0]["winner_name"]), ("alice", "bob"))
+
+        text = encode_header(FORMAT_CSV) + encode_records(FORMAT_CSV, records)
+        self.assertTrue(text.startswith("\ufeff"))
+        rows = list(csv.DictReader(io.StringIO(text.lstrip("\ufeff"))))
+        self.assertEqual(tuple(rows[0]), EXPORT_COLUMNS)
+        self.assertEqual((rows[1]["section"], rows[1]["username"], rows[1]["points"], rows[1]["role"]),
+                         ("score", "bob", "10", ""))
+
+        self.assertEqual(encode_header(FORMAT_JSONL), "")
+        lines = encode_records(FORMAT_JSONL, records).splitlines()
+        self.assertEqual(json.loads(lines[1]), {"section": "score", "match_id": 5, "status": "approved",
+                                                "user_id": "2", "username": "bob", "position": 1, "points": 10})
+
+    def test_standing_ties(self):
+        standings = [{"user_id": 1, "total_points": 30}, {"user_id": 2, "total_points": 30},
+                     {"user_id": 3, "total_points": 10, "username": "carol"}]
+        records = list(standing_records(standings, NAMES))
+        self.assertEqual([r["rank"] for r in records], [1, 1, 3])
+        self.assertEqual([r["username"] for r in records], ["alice", "bob", "carol"])
+
+
+class TestTournamentExportService(IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.fail_after = None
+        matches = [{"match_id": i, "player1_id": i, "player2_id": i + 100, "scores": []} for i in range(1, 8)]
+
+        async def fake_page(passcode, after=0, limit=500):
+            self.calls.append(after)
+            await asyncio.sleep(0)
+            if self.fail_after is not None and after >= self.fail_after:
+                return None
+            rest = [m for m in matches if m["match_id"] > after]
+            page = rest[:limit]
+            return {"matches": page, "next_after": page[-1]["match_id"] if len(rest) > limit else None}
+
+        async def fake_standings(passcode):
+            return [{"user_id": 1, "total_points": 5}]
+
+        async def fake_loaded():
+            return True
+
+        for target, fn in (
+            ("services.tournament_export_service.TournamentService.export_matches_page", fake_page),
+            ("services.tournament_export_service.TournamentService.get_standings", fake_standings),
+            ("services.tournament_export_service.UserDirectoryService.ensure_loaded", fake_loaded),
+            ("services.tournament_export_service.UserDirectoryService.name_of",
+             lambda uid: {"101": "dir-user"}.get(str(uid))),
+        ):
+            patcher = patch(target, new=fn)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(UserDirectoryService.clear)
+        self.members = [{"user_id": 1, "username": "alice", "role": "player"}]
+
+    async def _collect(self, stream):
+        return "".join([chunk async for chunk in stream])
+
+    async def test_streams_pages(self):
+        stream = await TournamentExportService.open_stream("ABC", FORMAT_JSONL, members=self.members, page_size=3)
+        records = [json.loads(line) for line in (await self._collect(stream)).splitlines()]
+        self.assertEqual(self.calls, [0, 3, 6])
+        self.assertEqual([r["section"] for r in records], ["member"] + ["match"] * 7 + ["standing"])
+        self.assertEqual(records[1]["player1_name"], "alice")
+        self.assertEqual(records[1]["player2_name"], "dir-user")
+        self.assertNotIn("player1_name", records[2])
+
+    async def test_failures(self):
+        self.fail_after = 0
+        self.assertIsNone(await TournamentExportService.open_stream("ABC", FORMAT_CSV, members=self.members))
+
+        self.fail_after = 3
+        stream = await TournamentExportService.open_stream("ABC", FORMAT_CSV, members=self.members, page_size=3)
+        with self.assertRaises(TournamentExportError):
+            await self._collect(stream)
+
+
+if __name__ == '__main__':
+    unittest.main()
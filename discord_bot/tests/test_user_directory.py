@@ -0,0 +1,121 @@
+# tests/test_user_directory.py
+# common/user_index.py と services/user_directory_service.py のユニットテスト
+# - ランキング（完全一致 → 前方一致 → 単語の先頭一致 → 部分一致）
+# - カナ / 全角英数の正規化
+# - 追加・更新・削除の索引反映
+# - ディレクトリのロードと LobbyService 同期時の即時反映
+import sys
+import os
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import AsyncMock, patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from common.user_index import UserIndex
+from services.lobby_service import LobbyService
+from services.user_directory_service import UserDirectoryService
+
+
+def _names(results):
+    return [r['username'] for r in results]
+
+
+class TestUserIndex(TestCase):
+    """UserIndex のテスト"""
+
+    def setUp(self):
+        self.index = UserIndex([
+            ("1", "taro_yamada"),
+            ("2", "Taro"),
+            ("3", "yamada taro"),
+            ("4", "kentaro"),
+            ("5", "たろう"),
+            ("6", "ハナコ"),
+        ])
+
+    def test_ranking(self):
+        """完全一致 → 前方一致 → 単語の先頭一致 → 部分一致の順に並ぶ"""
+        self.assertEqual(
+            _names(self.index.search("taro")),
+            ["Taro", "taro_yamada", "yamada taro", "kentaro"],
+        )
+
+    def test_kana_and_width_are_normalized(self):
+        """カタカナ・半角カナ・全角英数でも一致する"""
+        self.assertEqual(_names(self.index.search("タロウ")), ["たろう"])
+        self.assertEqual(_names(self.index.search("ﾀﾛ")), ["たろう"])
+        self.assertEqual(_names(self.index.search("はなこ")), ["ハナコ"])
+        self.assertEqual(_names(self.index.search("ＴＡＲＯ"))[0], "Taro")
+
+    def test_limit_and_exclude(self):
+        """件数上限と除外 ID"""
+        self.assertEqual(len(self.index.search("taro", limit=2)), 2)
+        results = self.index.search("taro", exclude=[2])
+        self.assertNotIn("2", [r['user_id'] for r in results])
+
+    def test_upsert_and_remove(self):
+        """改名・削除が検索結果に反映される"""
+        self.index.upsert("2", "jiro")
+        self.assertNotIn("Taro", _names(self.index.search("taro")))
+        self.assertEqual(_names(self.index.search("jiro")), ["jiro"])
+        self.index.remove("4")
+        self.assertNotIn("kentaro", _names(self.index.search("taro")))
+        self.assertEqual(len(self.index), 5)
+
+    def test_no_match(self):
+        self.assertEqual(self.index.search("zzz"), [])
+        self.assertEqual(self.index.search(""), [])
+
+
+class TestUserDirectoryService(IsolatedAsyncioTestCase):
+    """UserDirectoryService のテスト"""
+
+    def setUp(self):
+        UserDirectoryService.clear()
+
+    def tearDown(self):
+        UserDirectoryService.clear()
+
+    async def test_loads_once_and_searches_in_memory(self):
+        """初回のみ /users をロードし、以降の検索は Bridge を呼ばない"""
+        mock = AsyncMock(return_value=[
+            {"user_id": "1", "username": "awaji"},
+            {"user_id": "2", "username": "awajima"},
+        ])
+        with patch("services.user_directory_service.bridge_client.request", new=mock):
+            self.assertEqual(_names(await UserDirectoryService.search("awa")), ["awaji", "awajima"])
+            self.assertEqual(_names(await UserDirectoryService.search("awa", exclude=["1"])), ["awajima"])
+        mock.assert_awaited_once_with("GET", "/users")
+
+    async def test_lobby_sync_updates_directory(self):
+        """LobbyService の同期結果が索引に即時反映される"""
+        async def fake_request(method, path, **kwargs):
+            if path == "/users":
+                return [{"user_id": "1", "username": "awaji"}]
+            if path == "/lobby/sync_user":
+                return {"status": "ok"}
+            if path == "/lobby/bulk_sync_users":
+                return {"status": "ok", "affected": 1}
+            return None
+
+        with patch("services.bridge_client.bridge_client.request", new=fake_request):
+            await UserDirectoryService.ensure_loaded()
+            await LobbyService.sync_user(2, "a@example.com", username="淡路太郎")
+            await LobbyService.bulk_sync_users([{"discord_id": 3, "username": "淡路花子"}])
+            self.assertEqual(_names(await UserDirectoryService.search("淡路")), ["淡路太郎", "淡路花子"])
+
+    async def test_falls_back_to_bridge_search(self):
+        """索引をロードできない場合は Bridge の LIKE 検索を使う"""
+        async def fake_request(method, path, **kwargs):
+            if path == "/users":
+                return None
+            return [{"user_id": "1", "username": "awaji"}, {"user_id": "9", "username": "awaji2"}]
+
+        with patch("services.bridge_client.bridge_client.request", new=fake_request):
+            results = await UserDirectoryService.search("awa", exclude=["9"])
+        self.assertEqual(_names(results), ["awaji"])
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
@@ -1,5 +1,6 @@
 import os
 import asyncio
+import json
 import aiohttp
 import httpx
 from quart import Quart, render_template, request, redirect, url_for, session, current_app, websocket
@@ -16,6 +17,7 @@ from routes.tournament import tournament_bp
 from routes.lounge import lounge_bp
 from routes.event import event_bp
 from services.lobby_service import LobbyService
+from services.lobby_status_buffer import lobby_status_buffer
 from services.tournament_service import TournamentService
 from services.lounge_service import LoungeService
 from services.bridge_client import BridgeUnavailableError
@@ -46,6 +48,22 @@ app.register_blueprint(event_bp)
 
 # --- WebSocket プロキシ (Rust Bridge → ブラウザ) ---
 BRIDGE_WS_URL = "ws://127.0.0.1:7878/ws/hyouibana"
+# Why: Bridge の配信にはイベント参加者のチェックイン（event.checkin）や締切変更（event.deadline_changed）など
+#      Webapp / Bot 内部向けのものも流れる。このプロキシは認証なしでブラウザへ中継するため、
+#      内部向けの種類は中継しない（当日受付の画面へは権限確認済みの /event/<id>/ws/checkin が配る）。
+INTERNAL_BRIDGE_EVENT_PREFIXES = ("event.",)
+
+
+def is_public_bridge_message(raw: str) -> bool:
+    """ブラウザへそのまま中継してよい Bridge の配信か。"""
+    try:
+        data = json.loads(raw)
+    except ValueError:
+        return False
+    if not isinstance(data, dict):
+        return False
+    return not str(data.get("type") or "").startswith(INTERNAL_BRIDGE_EVENT_PREFIXES)
+
 
 @app.websocket('/ws/hyouibana')
 async def ws_proxy():
@@ -57,7 +75,8 @@ async def ws_proxy():
                 async def bridge_to_client():
                     async for msg in bridge_ws:
                         if msg.type == aiohttp.WSMsgType.TEXT:
-                            await websocket.send(msg.data)
+                            if is_public_bridge_message(msg.data):
+                                await websocket.send(msg.data)
                         elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
                             break
 
@@ -85,6 +104,8 @@ async def startup():
 async def shutdown():
     """サーバー終了時の処理"""
     app.logger.info("Webapp shutting down")
+    # ロビーのステータス切り替えで Bridge へ未反映のものを書き込む
+    await lobby_status_buffer.flush()
 
 # --- コンテキストプロセッサ ---
 @app.context_processor